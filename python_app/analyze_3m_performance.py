@@ -1,10 +1,14 @@
 import os
+import argparse
 import rust_core
 from datetime import datetime, timedelta
 import logging
+import math
 import statistics
 import time
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
+from parallel_runner import (run_date_tasks, format_time,
+                             STATUS_SUCCESS, STATUS_NO_DATA, STATUS_ERROR)
 
 # 로깅 설정 - 더 상세한 정보를 위해 INFO 레벨로 변경
 logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -13,6 +17,8 @@ os.environ["RUST_LOG"] = "warn"
 
 # 수수료 기준 (승률 계산용)
 COMMISSION_RATE = 0.249
+# 순차 실행 시 미리 읽을 거래일 수
+PREFETCH_DEPTH = 2
 
 def calculate_win_rate(rates: List[float]) -> float:
     """수수료 0.249% 이상의 수익률을 보여준 비율을 계산합니다."""
@@ -21,16 +27,6 @@ def calculate_win_rate(rates: List[float]) -> float:
     winning_trades = sum(1 for rate in rates if rate > COMMISSION_RATE)
     return (winning_trades / len(rates)) * 100
 
-def plus_30_minutes(time: str) -> str:
-    """30분을 더한 시간을 반환합니다."""
-    hour = int(time[:2])
-    minute = int(time[2:])
-
-    if minute ==30:
-        return f"{hour+1:02d}00"
-    else:
-        return f"{hour:02d}30"
-
 def generate_time_intervals() -> List[str]:
     """하루 중 30분 간격의 시간대를 생성합니다."""
     intervals = []
@@ -48,51 +44,55 @@ def generate_date_list(days: int = 90) -> List[str]:
     today = datetime.strptime("2025-01-30", "%Y-%m-%d")
     return [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
 
-def format_time(seconds: float) -> str:
-    """초를 읽기 쉬운 시간 형식으로 변환합니다."""
-    if seconds < 60:
-        return f"{seconds:.1f}초"
-    elif seconds < 3600:
-        minutes = int(seconds // 60)
-        remaining_seconds = seconds % 60
-        return f"{minutes}분 {remaining_seconds:.1f}초"
-    else:
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        remaining_seconds = seconds % 60
-        return f"{hours}시간 {minutes}분 {remaining_seconds:.1f}초"
+def select_d_stocks(date: str, interval: str) -> List[Tuple[str, str, str]]:
+    """한 (날짜, 시간대)의 D 선별 결과 [(종목코드, 종목명, 업종명)]
 
-def print_progress(current: int, total: int, start_time: float, current_time: float, 
-                  success_count: int, error_count: int, no_data_count: int):
-    """진행률과 예상 완료 시간을 출력합니다."""
-    progress = current / total * 100
-    elapsed_time = current_time - start_time
-    
-    if current > 0:
-        avg_time_per_item = elapsed_time / current
-        remaining_items = total - current
-        estimated_remaining_time = avg_time_per_item * remaining_items
-        estimated_completion_time = current_time + estimated_remaining_time
-        
-        # 진행률 바 생성 (50자 길이)
-        bar_length = 50
-        filled_length = int(bar_length * current // total)
-        bar = '█' * filled_length + '░' * (bar_length - filled_length)
-        
-        # 성공률 계산
-        total_processed = success_count + error_count + no_data_count
-        success_rate = (success_count / total_processed * 100) if total_processed > 0 else 0
-        
-        print(f"\r[{bar}] {current}/{total} ({progress:.1f}%) | "
-              f"성공: {success_count} | 에러: {error_count} | 데이터없음: {no_data_count} | "
-              f"성공률: {success_rate:.1f}% | "
-              f"경과: {format_time(elapsed_time)} | "
-              f"예상완료: {format_time(estimated_remaining_time)} | "
-              f"완료시각: {datetime.fromtimestamp(estimated_completion_time).strftime('%H:%M:%S')}", 
-              end='', flush=True)
+    evaluate_d_for_date_and_time 과 같은 결과를 일별 캐시 위에서 계산하므로, 같은 날짜의 다른 시간대와
+    run_date_tasks 의 프리페치가 하루치 로드를 공유합니다.
+    """
+    return rust_core.evaluate_strategies_for_date(date, [interval], ["d"])["d"][interval]
+
+def evaluate_attempt(date: str, interval: str) -> Dict:
+    """한 (날짜, 시간대)의 업종별 최고 종목을 선별하고 다음 30분 상승률을 계산합니다.
+
+    프로세스 풀 워커에서도 실행되므로 결과는 체크포인트에 그대로 기록 가능한 dict 로 반환합니다.
+    """
+    try:
+        # 해당 시간대까지의 업종별 최고 종목 선별
+        selected_stocks = select_d_stocks(date, interval)
+    except Exception as e:
+        logging.warning(f"  ⚠️ {date} {interval} 처리 실패: {e}")
+        return {'status': STATUS_ERROR, 'error': str(e)}
+
+    if not selected_stocks:
+        return {'status': STATUS_NO_DATA}
+
+    code, name, sector = selected_stocks[0]
+
+    # 실제 상승률 계산 (interval 부터 30분, 같은 날짜는 캐시된 선행 수익률 행렬에서 조회)
+    try:
+        increase_rate = rust_core.forward_return(code, date, interval, "30")
+        if math.isnan(increase_rate):
+            increase_rate = 0.0  # 구간에 데이터가 없으면 0%로 처리
+    except Exception as e:
+        logging.warning(f"  ⚠️ {code} 상승률 계산 실패: {e}")
+        # 상승률 계산 실패시 0%로 처리
+        increase_rate = 0.0
+
+    return {
+        'status': STATUS_SUCCESS,
+        'stock': [code, name, sector],
+        'rate': increase_rate
+    }
 
-def analyze_3m_performance() -> Dict:
-    """3달 동안 30분 간격으로 업종별 최고 종목 선별 및 상승률 분석"""
+def analyze_3m_performance(workers: int = 1, checkpoint_path: Optional[str] = None,
+                           trace_path: Optional[str] = None) -> Dict:
+    """3달 동안 30분 간격으로 업종별 최고 종목 선별 및 상승률 분석
+
+    workers 가 2 이상이면 날짜를 프로세스 풀로 나누어 처리하고,
+    checkpoint_path 가 주어지면 완료된 시도를 기록해 중단 후 재실행 시 이어서 진행합니다.
+    trace_path 가 주어지면 구간 추적 결과를 저장합니다 (.folded 이면 flamegraph 입력, 그 외 Chrome trace JSON).
+    """
     
     # 날짜와 시간대 설정
     date_list = generate_date_list(90)
@@ -104,9 +104,31 @@ def analyze_3m_performance() -> Dict:
     print(f"📅 분석 기간: {len(date_list)}일 ({date_list[-1]} ~ {date_list[0]})")
     print(f"⏰ 분석 시간대: {len(time_intervals)}개 ({time_intervals})")
     print(f"📊 총 시도 횟수: {total_attempts:,}회")
+    print(f"🧵 워커 프로세스: {workers}개")
     print(f"⏱️ 시작 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("-" * 80)
     
+    start_time = time.time()
+    records = run_date_tasks(evaluate_attempt, date_list, time_intervals,
+                             workers=workers, checkpoint_path=checkpoint_path,
+                             trace_path=trace_path, prefetch_depth=PREFETCH_DEPTH)
+    
+    results = aggregate_records(records, date_list, time_intervals)
+    
+    # 실행 시간 정보 추가
+    total_time = time.time() - start_time
+    results['execution_info'] = {
+        'start_time': datetime.fromtimestamp(start_time).strftime('%Y-%m-%d %H:%M:%S'),
+        'end_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total_time': total_time,
+        'avg_time_per_attempt': total_time / total_attempts if total_attempts > 0 else 0
+    }
+    
+    return results
+
+def aggregate_records(records: List[Dict], date_list: List[str], time_intervals: List[str]) -> Dict:
+    """(date, interval) 레코드들을 날짜/시간대 순서대로 집계해 분석 결과를 만듭니다."""
+    
     # 결과 저장용 딕셔너리 - 데이터 가용성 분석 추가
     results = {
         'total_attempts': 0,
@@ -132,14 +154,9 @@ def analyze_3m_performance() -> Dict:
         }
         results['data_unavailable_intervals'][interval] = []
     
-    # 진행률 추적 변수
-    start_time = time.time()
-    current_attempt = 0
-    success_count = 0
-    error_count = 0
-    no_data_count = 0
+    records_by_key = {(record['date'], record['interval']): record for record in records}
     
-    # 각 날짜별로 분석
+    # 각 날짜별로 집계
     for date in date_list:
         daily_rates = []
         daily_stocks = []
@@ -147,72 +164,44 @@ def analyze_3m_performance() -> Dict:
         daily_no_data = 0
         
         for interval in time_intervals:
-            current_attempt += 1
+            record = records_by_key.get((date, interval))
+            if record is None:
+                continue
             results['total_attempts'] += 1
             
-            try:
-                # 해당 시간대까지의 업종별 최고 종목 선별
-                selected_stocks = rust_core.evaluate_d_for_date_and_time(date, interval)
+            if record['status'] == STATUS_SUCCESS:
+                results['successful_selections'] += 1
+                results['interval_stats'][interval]['count'] += 1
                 
-                if selected_stocks:
-
-                    best_stock = selected_stocks[0]
-
-                    results['successful_selections'] += 1
-                    results['interval_stats'][interval]['count'] += 1
-                    success_count += 1
-                    
-                    # 선별된 종목 정보 저장
-                    for code, name, sector in [best_stock]:
-                        stock_info = {
-                            'date': date,
-                            'time': interval,
-                            'code': code,
-                            'name': name,
-                            'sector': sector
-                        }
-                        results['selected_stocks'].append(stock_info)
-                        results['interval_stats'][interval]['stocks'].append(stock_info)
-                        daily_stocks.append(stock_info)
-                    
-                    # 실제 상승률 계산 (30분 간격)
-                    for code, name, sector in [best_stock]:
-                        try:
-                            interval_30 = plus_30_minutes(interval)
-                            increase_rate = rust_core.calculate_30min_increase_rate(code, date, interval_30)
-                            
-                            results['increase_rates'].append(increase_rate)
-                            results['interval_stats'][interval]['rates'].append(increase_rate)
-                            daily_rates.append(increase_rate)
-                            
-                        except Exception as e:
-                            logging.warning(f"  ⚠️ {code} 상승률 계산 실패: {e}")
-                            # 상승률 계산 실패시 0%로 처리
-                            results['increase_rates'].append(0.0)
-                            results['interval_stats'][interval]['rates'].append(0.0)
-                            daily_rates.append(0.0)
-                else:
-                    results['interval_stats'][interval]['no_data'] += 1
-                    daily_no_data += 1
-                    no_data_count += 1
-                    results['data_unavailable_intervals'][interval].append(date)
-                    
-            except Exception as e:
-                error_msg = f"{date} {interval} 처리 실패: {e}"
-                logging.warning(f"  ⚠️ {error_msg}")
+                # 선별된 종목 정보 저장
+                code, name, sector = record['stock']
+                stock_info = {
+                    'date': date,
+                    'time': interval,
+                    'code': code,
+                    'name': name,
+                    'sector': sector
+                }
+                results['selected_stocks'].append(stock_info)
+                results['interval_stats'][interval]['stocks'].append(stock_info)
+                daily_stocks.append(stock_info)
+                
+                increase_rate = record['rate']
+                results['increase_rates'].append(increase_rate)
+                results['interval_stats'][interval]['rates'].append(increase_rate)
+                daily_rates.append(increase_rate)
+            elif record['status'] == STATUS_NO_DATA:
+                results['interval_stats'][interval]['no_data'] += 1
+                daily_no_data += 1
+                results['data_unavailable_intervals'][interval].append(date)
+            else:
                 results['interval_stats'][interval]['errors'] += 1
                 daily_errors += 1
-                error_count += 1
                 results['error_details'].append({
                     'date': date,
                     'interval': interval,
-                    'error': str(e)
+                    'error': record.get('error', '')
                 })
-            
-            # 진행률 출력 (매 10번째 시도마다 또는 마지막 시도)
-            if current_attempt % 10 == 0 or current_attempt == total_attempts:
-                print_progress(current_attempt, total_attempts, start_time, time.time(),
-                             success_count, error_count, no_data_count)
         
         # 일별 통계 저장
         if daily_rates:
@@ -240,11 +229,6 @@ def analyze_3m_performance() -> Dict:
                 'no_data': daily_no_data
             }
     
-    # 최종 진행률 출력
-    print_progress(total_attempts, total_attempts, start_time, time.time(),
-                  success_count, error_count, no_data_count)
-    print()  # 줄바꿈
-    
     # 각 시간대별 승률 계산
     for interval in time_intervals:
         if results['interval_stats'][interval]['rates']:
@@ -261,15 +245,6 @@ def analyze_3m_performance() -> Dict:
             'win_rate': calculate_win_rate(results['increase_rates'])
         }
     
-    # 실행 시간 정보 추가
-    total_time = time.time() - start_time
-    results['execution_info'] = {
-        'start_time': datetime.fromtimestamp(start_time).strftime('%Y-%m-%d %H:%M:%S'),
-        'end_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'total_time': total_time,
-        'avg_time_per_attempt': total_time / total_attempts if total_attempts > 0 else 0
-    }
-    
     return results
 
 def print_analysis_results(results: Dict):
@@ -368,11 +343,21 @@ def print_analysis_results(results: Dict):
     for i, (stock_name, count) in enumerate(sorted_stocks[:10], 1):
         print(f"  {i}. {stock_name}: {count}회 선별")
 
+def parse_args() -> argparse.Namespace:
+    """명령행 인자를 파싱합니다."""
+    parser = argparse.ArgumentParser(description="3개월 대장주 성과 분석")
+    parser.add_argument("--workers", type=int, default=1, help="날짜를 나누어 처리할 워커 프로세스 수")
+    parser.add_argument("--checkpoint", type=str, default=None, help="완료된 (date, interval) 레코드를 기록할 체크포인트 파일")
+    parser.add_argument("--trace", type=str, default=None, help="구간 추적 저장 경로 (.json: Chrome trace, .folded: flamegraph)")
+    return parser.parse_args()
+
 def main():
     """메인 실행 함수"""
+    args = parse_args()
     try:
         # 분석 실행
-        results = analyze_3m_performance()
+        results = analyze_3m_performance(workers=args.workers, checkpoint_path=args.checkpoint,
+                                         trace_path=args.trace)
         
         # 결과 출력
         print_analysis_results(results)
@@ -0,0 +1,61 @@
+import os
+import argparse
+import rust_core
+import logging
+import time
+from datetime import datetime, timedelta
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+os.environ["RUST_LOG"] = "info"
+
+DB_PATH = "D:/db/stock_price(5min).db"
+ARCHIVE_PATH = "D:/db/stock_price(5min).rca"
+
+def weekdays_between(start: str, end: str):
+    """start~end 사이 평일 목록 (YYYY-MM-DD)"""
+    day = datetime.strptime(start, "%Y-%m-%d")
+    last = datetime.strptime(end, "%Y-%m-%d")
+    dates = []
+    while day <= last:
+        if day.weekday() < 5:
+            dates.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return dates
+
+def timed_sweep(dates, db_path):
+    """캐시를 비운 상태에서 같은 스윕을 돌려 읽기 시간을 비교"""
+    rust_core.clear_cache()
+    start_time = time.time()
+    result = rust_core.sweep_d_parameters(dates, ["1000"], [5.0], [30], [30], [3], db_path=db_path)
+    return time.time() - start_time, result
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="5분봉 DB를 압축 컬럼형 아카이브로 저장하고 읽기 속도 비교")
+    parser.add_argument("--start", type=str, required=True, help="시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, required=True, help="종료 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--output", type=str, default=ARCHIVE_PATH, help="아카이브 저장 경로 (.rca)")
+    parser.add_argument("--compare-days", type=int, default=20, help="SQLite/아카이브 읽기 시간을 비교할 거래일 수 (0이면 건너뜀)")
+    args = parser.parse_args()
+
+    print(f"🗜️ 아카이브 생성: {args.start} ~ {args.end}")
+    start_time = time.time()
+    info = rust_core.build_history_archive(args.start, args.end, output=args.output, db_path=DB_PATH)
+    print(f"   {info['days']:,}일, {info['bars']:,}개 봉 ({time.time() - start_time:.2f}초)")
+    print(f"   아카이브 {info['bytes'] / 2**20:,.1f} MiB / 원본 DB {info['source_bytes'] / 2**20:,.1f} MiB")
+    if info['bars'] > 0:
+        print(f"   봉당 {info['bytes'] / info['bars']:.1f}바이트")
+
+    if args.compare_days > 0 and info['days'] > 0:
+        dates = weekdays_between(args.start, args.end)[:args.compare_days]
+        db_seconds, db_result = timed_sweep(dates, DB_PATH)
+        archive_seconds, archive_result = timed_sweep(dates, args.output)
+        same = db_result['selections'] == archive_result['selections'] and db_result['win_rate'] == archive_result['win_rate']
+        print(f"\n⏱️ {len(dates)}일 스윕: SQLite {db_seconds:.2f}초, 아카이브 {archive_seconds:.2f}초 "
+              f"({db_seconds / max(archive_seconds, 1e-9):.1f}배), 결과 일치: {'✅' if same else '❌'}")
+
+    print("\n✅ 아카이브 생성 완료")
+
+if __name__ == "__main__":
+    main()
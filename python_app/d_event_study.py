@@ -0,0 +1,81 @@
+import os
+import argparse
+import rust_core
+import logging
+import time
+from build_archive import weekdays_between
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+os.environ["RUST_LOG"] = "info"
+
+DB_PATH = "D:/db/stock_price(5min).db"
+DEFAULT_TIMES = "0930,1000,1030,1100,1130,1200,1230,1300,1330,1400,1430,1500"
+
+def collect_d_events(dates, times):
+    """날짜 x 시간대별 D 종목을 (날짜, 시간, 종목코드) 이벤트로 수집 (날짜마다 하루치 데이터를 한 번 읽어 모든 시간대 평가)"""
+    events = []
+    for date in dates:
+        try:
+            by_time = rust_core.evaluate_strategies_for_date(date, times, ["d"])["d"]
+        except Exception as e:
+            print(f"⚠️ {date} D 평가 실패: {e}")
+            continue
+        for t in times:
+            events.extend((date, t, code) for code, _, _ in by_time.get(t, []))
+    return events
+
+def print_groups(result, title):
+    """그룹별 평균 경로 / 적중률 곡선 출력"""
+    horizons = result['horizons']
+    print(f"\n📊 {title}")
+    print(f"   {'그룹':<24}{'이벤트':>6}  " + "".join(f"{h:>16}" for h in horizons))
+    for i, key in enumerate(result['groups']):
+        cells = "".join(f"{result['mean'][i, h]:>+7.2f}% ({result['hit_rate'][i, h] * 100:>4.0f}%)" for h in range(len(horizons)))
+        print(f"   {key:<24}{result['events'][i]:>6}  {cells}")
+    print("   (평균 누적 수익률, 괄호는 적중률)")
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="D 신호 이후 여러 구간의 누적 수익률 경로를 신호 시각/업종별로 요약")
+    parser.add_argument("--start", type=str, required=True, help="시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, required=True, help="종료 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--times", type=str, default=DEFAULT_TIMES, help="신호 시간대 (HHMM, 쉼표 구분)")
+    parser.add_argument("--horizons", type=str, default="5,15,30,60,close", help="구간 (분 또는 close, 쉼표 구분)")
+    parser.add_argument("--hit-threshold", type=float, default=0.249, help="적중으로 볼 최소 수익률 (%%, 기본 수수료)")
+    parser.add_argument("--top-sectors", type=int, default=15, help="업종별 표에 보일 최대 업종 수 (이벤트 많은 순)")
+    args = parser.parse_args()
+
+    dates = weekdays_between(args.start, args.end)
+    times = [t.strip() for t in args.times.split(",") if t.strip()]
+    horizons = [h.strip() for h in args.horizons.split(",") if h.strip()]
+
+    print(f"🔎 D 신호 수집: {len(dates)}일 x {len(times)}개 시간대")
+    start_time = time.time()
+    events = collect_d_events(dates, times)
+    print(f"   이벤트 {len(events):,}개 ({time.time() - start_time:.2f}초)")
+    if not events:
+        print("❌ 이벤트가 없습니다")
+        return
+
+    start_time = time.time()
+    # 경로는 한 번만 계산하고 전체/신호 시각/업종 요약을 함께 받음
+    study = rust_core.event_study(events, horizons=horizons, group_by=["all", "interval", "sector"],
+                                  hit_threshold=args.hit_threshold, db_path=DB_PATH)
+    print(f"🔭 이벤트 스터디 계산 ({time.time() - start_time:.2f}초)")
+
+    summaries = {key: dict(summary, horizons=study['horizons']) for key, summary in study['summaries'].items()}
+    print_groups(summaries["all"], "전체")
+    print_groups(summaries["interval"], "신호 시각별")
+
+    by_sector = summaries["sector"]
+
+    order = sorted(range(len(by_sector['groups'])), key=lambda i: -by_sector['events'][i])[:args.top_sectors]
+    by_sector = dict(by_sector, groups=[by_sector['groups'][i] for i in order], events=[by_sector['events'][i] for i in order],
+                     mean=by_sector['mean'][order], hit_rate=by_sector['hit_rate'][order])
+    print_groups(by_sector, f"업종별 (이벤트 상위 {len(order)}개)")
+
+    print("\n✅ 이벤트 스터디 완료")
+
+if __name__ == "__main__":
+    main()
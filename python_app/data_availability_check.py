@@ -1,14 +1,19 @@
 import os
+import argparse
 import rust_core
 from datetime import datetime, timedelta
 import logging
-from typing import List, Dict, Set
+import time
+from typing import List, Dict, Set, Optional
 from collections import defaultdict
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 os.environ["RUST_LOG"] = "info"
 
+# 커버리지 인덱스 저장 경로 (5분봉 DB 옆에 보관)
+COVERAGE_INDEX_PATH = "D:/db/coverage_index.db"
+
 def generate_date_list(days: int = 90) -> List[str]:
     """최근 N일간의 날짜 리스트를 생성합니다."""
     today = datetime.today()
@@ -26,8 +31,32 @@ def generate_time_intervals() -> List[str]:
             intervals.append(f"{hour:02d}{minute:02d}")
     return intervals
 
-def check_data_availability() -> Dict:
-    """데이터 가용성을 체계적으로 분석합니다."""
+def load_coverage_index(index_path: str = COVERAGE_INDEX_PATH, rebuild: bool = False,
+                        threads: Optional[int] = None):
+    """저장된 커버리지 인덱스를 읽어 새 봉만 반영합니다. 없거나 rebuild 이면 5분봉 DB 전체를 스캔합니다."""
+    start_time = time.time()
+
+    if rebuild or not os.path.exists(index_path):
+        print(f"🗂️ 커버리지 인덱스 생성 중 (5분봉 DB 전체 스캔)...")
+        index = rust_core.CoverageIndex.build(threads=threads)
+        changed = True
+    else:
+        index = rust_core.CoverageIndex.load(index_path)
+        new_bars = index.update(threads=threads)
+        changed = new_bars > 0
+        print(f"🗂️ 커버리지 인덱스 로드: 새 봉 {new_bars:,}개 반영")
+
+    if changed:
+        index.save(index_path)
+
+    print(f"   종목 {index.ticker_count:,}개, (종목, 날짜) {index.entry_count:,}개 ({time.time() - start_time:.2f}초)")
+    return index
+
+def check_data_availability(index) -> Dict:
+    """커버리지 인덱스로 (날짜, 시간대)별 데이터 가용성을 분석합니다.
+
+    시간대 슬롯에 한 종목이라도 5분봉이 있으면 해당 (날짜, 시간대)는 데이터가 있는 것으로 봅니다.
+    """
     
     date_list = generate_date_list(90)
     time_intervals = generate_time_intervals()
@@ -35,19 +64,20 @@ def check_data_availability() -> Dict:
     print(f"🔍 데이터 가용성 분석 시작")
     print(f"📅 분석 기간: {len(date_list)}일 ({date_list[-1]} ~ {date_list[0]})")
     print(f"⏰ 분석 시간대: {len(time_intervals)}개 ({time_intervals})")
-    print(f"📊 총 시도 횟수: {len(date_list) * len(time_intervals):,}회")
+    print(f"📊 총 확인 횟수: {len(date_list) * len(time_intervals):,}회")
+    
+    date_totals = index.date_totals(date_list)
     
     # 결과 저장용 딕셔너리
     results = {
         'total_attempts': 0,
         'successful_selections': 0,
-        'data_unavailable_dates': set(),
+        'data_unavailable_dates': set(index.zero_bar_dates(date_list)),
         'data_unavailable_intervals': defaultdict(list),
-        'error_details': [],
         'daily_summary': {},
-        'interval_summary': defaultdict(lambda: {'success': 0, 'no_data': 0, 'error': 0}),
+        'interval_summary': defaultdict(lambda: {'success': 0, 'no_data': 0}),
         'consecutive_no_data_days': [],
-        'weekday_analysis': defaultdict(lambda: {'total': 0, 'success': 0, 'no_data': 0, 'error': 0})
+        'weekday_analysis': index.weekday_coverage(date_list)
     }
     
     current_no_data_streak = 0
@@ -55,64 +85,30 @@ def check_data_availability() -> Dict:
     streak_start_date = None
     
     for date in date_list:
-        print(f"\n📅 {date} 분석 중...")
-        
-        # 요일 분석
-        weekday = datetime.strptime(date, "%Y-%m-%d").strftime("%A")
-        results['weekday_analysis'][weekday]['total'] += len(time_intervals)
+        tickers, bars, slots = date_totals.get(date, (0, 0, []))
+        slots = set(slots)
         
         daily_success = 0
         daily_no_data = 0
-        daily_errors = 0
         
         for interval in time_intervals:
             results['total_attempts'] += 1
             
-            try:
-                selected_stocks = rust_core.evaluate_d_for_date_and_time(date, interval)
-                
-                if selected_stocks:
-                    results['successful_selections'] += 1
-                    results['interval_summary'][interval]['success'] += 1
-                    daily_success += 1
-                    results['weekday_analysis'][weekday]['success'] += 1
-                    
-                    # 연속 데이터 없음 스트릭 리셋 (업종별 최고 종목 선별 성공)
-                    if current_no_data_streak > 0:
-                        if current_no_data_streak > max_no_data_streak:
-                            max_no_data_streak = current_no_data_streak
-                        results['consecutive_no_data_days'].append({
-                            'start': streak_start_date,
-                            'end': date,
-                            'days': current_no_data_streak
-                        })
-                        current_no_data_streak = 0
-                        streak_start_date = None
-                    
-                else:
-                    results['interval_summary'][interval]['no_data'] += 1
-                    daily_no_data += 1
-                    results['weekday_analysis'][weekday]['no_data'] += 1
-                    results['data_unavailable_intervals'][interval].append(date)
-                    
-            except Exception as e:
-                error_msg = f"{date} {interval} 처리 실패: {e}"
-                print(f"  ⚠️ {error_msg}")
-                
-                results['interval_summary'][interval]['error'] += 1
-                daily_errors += 1
-                results['weekday_analysis'][weekday]['error'] += 1
-                results['error_details'].append({
-                    'date': date,
-                    'interval': interval,
-                    'error': str(e)
-                })
+            if interval in slots:
+                results['successful_selections'] += 1
+                results['interval_summary'][interval]['success'] += 1
+                daily_success += 1
+            else:
+                results['interval_summary'][interval]['no_data'] += 1
+                daily_no_data += 1
+                results['data_unavailable_intervals'][interval].append(date)
         
         # 일별 요약 저장
         results['daily_summary'][date] = {
             'success': daily_success,
             'no_data': daily_no_data,
-            'error': daily_errors,
+            'tickers': tickers,
+            'bars': bars,
             'total': len(time_intervals),
             'success_rate': daily_success / len(time_intervals) * 100 if daily_success > 0 else 0
         }
@@ -122,7 +118,6 @@ def check_data_availability() -> Dict:
             if current_no_data_streak == 0:
                 streak_start_date = date
             current_no_data_streak += 1
-            results['data_unavailable_dates'].add(date)
         else:
             # 연속 데이터 없음 스트릭 종료
             if current_no_data_streak > 0:
@@ -157,9 +152,9 @@ def print_data_availability_results(results: Dict):
     
     # 전체 통계
     print(f"\n📋 전체 통계:")
-    print(f"  - 총 시도 횟수: {results['total_attempts']:,}회")
-    print(f"  - 성공 선별 횟수: {results['successful_selections']:,}회")
-    print(f"  - 선별 성공률: {results['successful_selections']/results['total_attempts']*100:.1f}%")
+    print(f"  - 총 확인 횟수: {results['total_attempts']:,}회")
+    print(f"  - 데이터 있는 (날짜, 시간대): {results['successful_selections']:,}회")
+    print(f"  - 데이터 보유율: {results['successful_selections']/results['total_attempts']*100:.1f}%")
     print(f"  - 데이터 없는 날짜: {len(results['data_unavailable_dates'])}일")
     print(f"  - 데이터 없는 날짜 비율: {len(results['data_unavailable_dates'])/len(results['daily_summary'])*100:.1f}%")
     
@@ -176,46 +171,21 @@ def print_data_availability_results(results: Dict):
     for weekday in weekday_order:
         if weekday in results['weekday_analysis']:
             stats = results['weekday_analysis'][weekday]
-            if stats['total'] > 0:
-                success_rate = stats['success'] / stats['total'] * 100
-                no_data_rate = stats['no_data'] / stats['total'] * 100
-                error_rate = stats['error'] / stats['total'] * 100
-                print(f"  - {weekday}: 성공 {stats['success']}회 ({success_rate:.1f}%), "
-                      f"데이터없음 {stats['no_data']}회 ({no_data_rate:.1f}%), "
-                      f"에러 {stats['error']}회 ({error_rate:.1f}%)")
+            if stats['days'] > 0:
+                coverage_rate = stats['days_with_data'] / stats['days'] * 100
+                print(f"  - {weekday}: 데이터 있는 날 {stats['days_with_data']}/{stats['days']}일 ({coverage_rate:.1f}%), "
+                      f"5분봉 {stats['bars']:,}개")
     
     # 시간대별 분석
     print(f"\n⏰ 시간대별 분석:")
     for interval in sorted(results['interval_summary'].keys()):
         stats = results['interval_summary'][interval]
-        total = stats['success'] + stats['no_data'] + stats['error']
+        total = stats['success'] + stats['no_data']
         if total > 0:
             success_rate = stats['success'] / total * 100
             no_data_rate = stats['no_data'] / total * 100
-            error_rate = stats['error'] / total * 100
-            print(f"  - {interval}: 성공 {stats['success']}회 ({success_rate:.1f}%), "
-                  f"데이터없음 {stats['no_data']}회 ({no_data_rate:.1f}%), "
-                  f"에러 {stats['error']}회 ({error_rate:.1f}%)")
-    
-    # 에러 분석
-    if results['error_details']:
-        print(f"\n⚠️ 에러 분석:")
-        error_types = defaultdict(int)
-        for error in results['error_details']:
-            error_msg = error['error'].lower()
-            if 'database' in error_msg or 'connection' in error_msg:
-                error_types['DB 연결 오류'] += 1
-            elif 'table' in error_msg:
-                error_types['테이블 없음'] += 1
-            elif 'data' in error_msg:
-                error_types['데이터 없음'] += 1
-            elif 'file' in error_msg:
-                error_types['파일 오류'] += 1
-            else:
-                error_types['기타 오류'] += 1
-        
-        for error_type, count in error_types.items():
-            print(f"  - {error_type}: {count}회")
+            print(f"  - {interval}: 데이터있음 {stats['success']}회 ({success_rate:.1f}%), "
+                  f"데이터없음 {stats['no_data']}회 ({no_data_rate:.1f}%)")
     
     # 데이터 없는 날짜 샘플
     if results['data_unavailable_dates']:
@@ -224,17 +194,40 @@ def print_data_availability_results(results: Dict):
         for date in sorted_dates[:10]:
             print(f"  - {date}")
 
+def print_missing_slots(index, date: str, limit: int = 20):
+    """특정 날짜에 시장 전체 대비 빠진 5분봉 슬롯이 있는 종목을 출력합니다."""
+    summary = index.date_summary(date)
+    missing = index.tickers_missing_slots(date)
+    
+    print(f"\n🔎 {date} 슬롯 누락 종목: {len(missing)}개 "
+          f"(데이터 있는 종목 {summary['tickers']}개, {summary['first']} ~ {summary['last']}, 슬롯 {len(summary['slots'])}개)")
+    for code, slots in sorted(missing, key=lambda x: len(x[1]), reverse=True)[:limit]:
+        sample = ", ".join(slots[:6]) + (" ..." if len(slots) > 6 else "")
+        print(f"  - {code}: {len(slots)}개 슬롯 누락 ({sample})")
+
 def main():
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="데이터 가용성 분석")
+    parser.add_argument("--index", type=str, default=COVERAGE_INDEX_PATH, help="커버리지 인덱스 저장 경로")
+    parser.add_argument("--rebuild", action="store_true", help="저장된 인덱스를 무시하고 5분봉 DB 전체를 다시 스캔")
+    parser.add_argument("--threads", type=int, default=None, help="인덱스 생성/갱신 스캔 스레드 수 (기본: CPU 코어 수)")
+    parser.add_argument("--missing-date", type=str, default=None, help="슬롯 누락 종목을 출력할 날짜 (YYYY-MM-DD)")
+    args = parser.parse_args()
+    
     try:
         print("🚀 데이터 가용성 분석 시작")
         
+        index = load_coverage_index(args.index, rebuild=args.rebuild, threads=args.threads)
+        
         # 분석 실행
-        results = check_data_availability()
+        results = check_data_availability(index)
         
         # 결과 출력
         print_data_availability_results(results)
         
+        if args.missing_date:
+            print_missing_slots(index, args.missing_date)
+        
         print("\n✅ 데이터 가용성 분석 완료")
         
     except Exception as e:
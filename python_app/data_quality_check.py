@@ -0,0 +1,50 @@
+import os
+import argparse
+import rust_core
+import logging
+import time
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+os.environ["RUST_LOG"] = "info"
+
+# 격리 목록 저장 경로 (rust_core 가 이 경로에 파일이 있으면 자동으로 읽음)
+QUARANTINE_PATH = "D:/db/quarantine.db"
+
+ISSUE_LABELS = {
+    'non_positive_price': '시가/고가/저가/종가 0 이하',
+    'null_value': 'NULL 컬럼',
+    'duplicate_date': '중복 date',
+    'unsorted_date': '역순 date',
+    'missing_slots': '빠진 5분 슬롯 (격리 안 함)',
+    'daily_mismatch': '일봉/5분봉 불일치',
+}
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="5분봉/일봉 DB 데이터 품질 검사 및 격리 목록 생성")
+    parser.add_argument("--start", type=str, default=None, help="검사 시작 날짜 (YYYY-MM-DD, 기본: 전체)")
+    parser.add_argument("--end", type=str, default=None, help="검사 종료 날짜 (YYYY-MM-DD, 기본: 전체)")
+    parser.add_argument("--threads", type=int, default=None, help="검사 스레드 수 (기본: CPU 코어 수)")
+    parser.add_argument("--output", type=str, default=QUARANTINE_PATH, help="검사 결과/격리 목록 저장 경로")
+    parser.add_argument("--no-daily", action="store_true", help="일봉 DB 검사와 일봉/5분봉 대조 건너뛰기")
+    args = parser.parse_args()
+
+    print("🩺 데이터 품질 검사 시작")
+    start_time = time.time()
+    result = rust_core.scan_data_quality(
+        start=args.start,
+        end=args.end,
+        threads=args.threads,
+        day_db_path="" if args.no_daily else None,
+        output=args.output,
+    )
+
+    print(f"   종목 {result['tables']:,}개, {result['rows']:,}행 검사 ({time.time() - start_time:.2f}초)")
+    for kind, count in result['issues'].items():
+        print(f"  - {ISSUE_LABELS.get(kind, kind)}: {count:,}건")
+    print(f"🚧 격리 종목-날짜: {result['quarantined']:,}개 → {result['output']}")
+    print("\n✅ 데이터 품질 검사 완료")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import os
+import argparse
+import rust_core
+import logging
+import tempfile
+import time
+from build_archive import weekdays_between
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+os.environ["RUST_LOG"] = "info"
+
+DB_PATH = "D:/db/stock_price(5min).db"
+DEFAULT_TIMES = "0930,1000,1030,1100,1130,1200,1230,1300,1330,1400,1430,1500"
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="기준 D 구현과 빠른 경로를 나란히 실행해 결과와 속도 비교")
+    parser.add_argument("--start", type=str, required=True, help="시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, required=True, help="종료 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--times", type=str, default=DEFAULT_TIMES, help="비교할 시간대 (HHMM, 쉼표 구분)")
+    parser.add_argument("--db", type=str, default=DB_PATH, help="5분봉 DB 경로")
+    parser.add_argument("--archive", type=str, default=None, help="함께 비교할 아카이브(.rca) 경로")
+    parser.add_argument("--synthetic", action="store_true", help="실제 DB 대신 임시 폴더에 합성 DB를 만들어 비교")
+    parser.add_argument("--tickers", type=int, default=300, help="합성 DB 종목 수")
+    parser.add_argument("--seed", type=int, default=42, help="합성 DB 난수 시드")
+    args = parser.parse_args()
+
+    dates = weekdays_between(args.start, args.end)
+    times = [t.strip() for t in args.times.split(",") if t.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db
+        archive_path = args.archive
+        if args.synthetic:
+            db_path = os.path.join(tmp_dir, "synthetic(5min).db")
+            info = rust_core.generate_synthetic_db(db_path, dates, tickers=args.tickers, seed=args.seed)
+            print(f"🧪 합성 DB 생성: {info['tables']:,}개 종목, {info['bars']:,}개 봉")
+            if archive_path is None:
+                archive_path = os.path.join(tmp_dir, "synthetic(5min).rca")
+                rust_core.build_history_archive(args.start, args.end, output=archive_path, db_path=db_path)
+
+        print(f"🔬 차분 비교 시작: {len(dates)}일 x {len(times)}개 시간대")
+        start_time = time.time()
+        result = rust_core.differential_benchmark(dates, times, db_path=db_path, archive_path=archive_path)
+
+    print(f"   {result['attempts']:,}개 (날짜, 시간대) 비교 ({time.time() - start_time:.2f}초)")
+    print(f"   기준 구현: {result['reference_seconds']:.2f}초")
+    for engine, stats in result['engines'].items():
+        status = "✅" if stats['mismatches'] == 0 else "❌"
+        print(f"  {status} {engine}: {stats['seconds']:.2f}초 ({stats['speedup']:.1f}배), 불일치 {stats['mismatches']:,}건")
+
+    for m in result['mismatches'][:20]:
+        print(f"  - {m['date']} {m['time']} {m['engine']} {m['field']}")
+        print(f"      기준: {m['reference']}")
+        print(f"      빠른: {m['fast']}")
+    if result['total_mismatches'] > 20:
+        print(f"  ... 외 {result['total_mismatches'] - 20:,}건")
+
+    if result['total_mismatches'] == 0:
+        print("\n✅ 모든 엔진이 기준 구현과 일치")
+    else:
+        print(f"\n❌ 불일치 {result['total_mismatches']:,}건")
+
+if __name__ == "__main__":
+    main()
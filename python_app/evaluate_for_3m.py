@@ -1,44 +1,130 @@
+import argparse
 import rust_core
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 import logging
+import numpy as np
+from parallel_runner import run_date_tasks, task_id, STATUS_SUCCESS, STATUS_NO_DATA, STATUS_ERROR
+from shard_runner import run_coordinator, run_worker, worker_command_for
+
+TIME_INTERVALS = ["0930"]
+# 순차 실행 시 미리 읽을 날짜 수
+PREFETCH_DEPTH = 2
 
 # 날짜 리스트 생성 (최근 3개월, 실제 DB에 있는 날짜만 사용해야 함)
 def generate_date_list(days=90):
     today = datetime.today()
     return [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
 
+# 커버리지 인덱스로 5분봉이 하나도 없는 날짜(휴장일, 주말)를 빼고 거래일만 남김 (샤드가 거래일 기준으로 고르게 나뉘도록)
+def split_trading_days(date_list):
+    from data_availability_check import load_coverage_index
+    closed = set(load_coverage_index().zero_bar_dates(date_list))
+    return [date for date in date_list if date not in closed], [date for date in date_list if date in closed]
+
+# 한 날짜의 D 종목 선별 (프로세스 풀 워커에서도 실행됨)
+def evaluate_industries(date, interval):
+    # evaluate_d_for_date_and_time 과 같은 선별을 일별 캐시 위에서 계산 (프리페치한 날짜를 그대로 사용)
+    results = rust_core.evaluate_strategies_for_date(date, [interval], ["d"])["d"][interval]
+    if not results:
+        return {'status': STATUS_NO_DATA}  # D 종목이 없는 날짜는 제외
+    return {'status': STATUS_SUCCESS, 'stocks': [list(stock) for stock in results]}
+
 # D 종목 수집 및 업종 분석
-def analyze_industry_overlaps(date_list):
+def analyze_industry_overlaps(date_list, workers=1, checkpoint_path=None):
+    records = run_date_tasks(evaluate_industries, date_list, TIME_INTERVALS,
+                             workers=workers, checkpoint_path=checkpoint_path,
+                             show_progress=workers > 1, prefetch_depth=PREFETCH_DEPTH)
+    return count_industries(records)
+
+# 레코드에서 업종별 선정 빈도와 날짜 집계
+def count_industries(records):
     industry_counter = Counter()
     industry_date_map = defaultdict(set)
 
-    for date in date_list:
-        try:
-            results = rust_core.evaluate_d_for_date_and_time(date, "0930")
-            if not results:
-                continue  # D 종목이 없는 날짜는 제외
-
-            # 업종별 최고 종목들이 반환되므로 각 업종별로 카운트
-            for _, _, industry in results:
-                industry_counter[industry] += 1
-                industry_date_map[industry].add(date)
+    for record in records:
+        date = record['date']
+        if record['status'] == STATUS_ERROR:
+            print(f"⚠️ {date} 처리 실패: {record.get('error', '')}")
+            continue
+        if record['status'] != STATUS_SUCCESS:
+            continue
 
-        except Exception as e:
-            print(f"⚠️ {date} 처리 실패: {e}")
+        # 업종별 최고 종목들이 반환되므로 각 업종별로 카운트
+        for _, _, industry in record['stocks']:
+            industry_counter[industry] += 1
+            industry_date_map[industry].add(date)
 
     return industry_counter, industry_date_map
 
+# 레코드를 열 단위 배열로 변환 (D 종목 한 개가 한 행, 레코드 순서 유지 → 단일 노드/샤드 실행 결과를 그대로 비교 가능)
+def records_to_columns(records):
+    columns = {'date': [], 'interval': [], 'code': [], 'name': [], 'industry': []}
+    for record in records:
+        if record['status'] != STATUS_SUCCESS:
+            continue
+        for code, name, industry in record['stocks']:
+            columns['date'].append(record['date'])
+            columns['interval'].append(record['interval'])
+            columns['code'].append(code)
+            columns['name'].append(name)
+            columns['industry'].append(industry)
+    return {key: np.array(values, dtype=str) for key, values in columns.items()}
+
 # 실행 예시
 if __name__ == "__main__":
-    date_list = generate_date_list(90)
+    parser = argparse.ArgumentParser(description="업종별 D 종목 선정 빈도 분석")
+    parser.add_argument("--workers", type=int, default=1, help="날짜를 나누어 처리할 워커 프로세스 수")
+    parser.add_argument("--checkpoint", type=str, default=None, help="완료된 날짜 레코드를 기록할 체크포인트 파일")
+    parser.add_argument("--days", type=int, default=90, help="분석할 최근 일수")
+    parser.add_argument("--coordinator", type=str, default=None, metavar="HOST:PORT",
+                        help="코디네이터 모드: 날짜를 샤드로 나누어 접속한 워커들에게 분배 (포트 0 이면 빈 포트)")
+    parser.add_argument("--worker", type=str, default=None, metavar="HOST:PORT",
+                        help="워커 모드: 코디네이터에 접속해 받은 샤드를 처리 (--workers 개 프로세스 사용)")
+    parser.add_argument("--local-workers", type=int, default=0, help="코디네이터가 이 호스트에 띄울 워커 프로세스 수")
+    parser.add_argument("--shard-days", type=int, default=5, help="샤드 하나의 날짜 수")
+    parser.add_argument("--max-retries", type=int, default=2, help="실패한 샤드 재시도 횟수")
+    parser.add_argument("--shard-timeout", type=float, default=None, help="샤드 응답 제한 시간 (초, 넘기면 다른 워커에게 재시도)")
+    parser.add_argument("--idle-timeout", type=float, default=None, help="연결된 워커 없이 기다릴 최대 시간 (초, 넘기면 남은 샤드 실패)")
+    parser.add_argument("--output", type=str, default=None, help="D 종목 열 데이터를 저장할 .npz 파일")
+    args = parser.parse_args()
+
+    if args.worker:
+        processed = run_worker(evaluate_industries, args.worker, workers=args.workers, prefetch_depth=PREFETCH_DEPTH)
+        print(f"👋 워커 종료: 샤드 {processed}개 처리")
+        raise SystemExit(0)
+
+    date_list = generate_date_list(args.days)
 
     logging.info(f"date_list 완성")
-    industry_counts, industry_dates = analyze_industry_overlaps(date_list)
+    if args.coordinator:
+        trading_days, closed_days = split_trading_days(date_list)
+        print(f"📅 거래일 {len(trading_days)}일 샤드 분배 (데이터 없는 날짜 {len(closed_days)}일 제외)")
+        records = run_coordinator(trading_days, TIME_INTERVALS, args.coordinator,
+                                  shard_days=args.shard_days, max_retries=args.max_retries,
+                                  checkpoint_path=args.checkpoint, shard_timeout=args.shard_timeout,
+                                  local_workers=args.local_workers, idle_timeout=args.idle_timeout,
+                                  task_name=task_id(evaluate_industries),
+                                  worker_command=worker_command_for(__file__, ["--workers", str(args.workers)]))
+        # 제외한 날짜는 단일 실행과 같이 데이터 없음 레코드로 채워 date_list 순서로 맞춤
+        by_key = {(record['date'], record['interval']): record for record in records}
+        records = [by_key.get((date, interval), {'status': STATUS_NO_DATA, 'date': date, 'interval': interval})
+                   for date in date_list for interval in TIME_INTERVALS
+                   if (date, interval) in by_key or date in closed_days]
+    else:
+        records = run_date_tasks(evaluate_industries, date_list, TIME_INTERVALS,
+                                 workers=args.workers, checkpoint_path=args.checkpoint,
+                                 show_progress=args.workers > 1, prefetch_depth=PREFETCH_DEPTH)
+    industry_counts, industry_dates = count_industries(records)
+
+    if args.output:
+        columns = records_to_columns(records)
+        np.savez(args.output, **columns)
+        print(f"💾 열 데이터 저장: {args.output} ({len(columns['code']):,}행)")
 
     logging.info(f"industry_counts 완성")
 
-    print("\n📌 업종별 선정 빈도 (최근 3개월 기준):")
+    print(f"\n📌 업종별 선정 빈도 (최근 {args.days}일 기준):")
     for industry, count in industry_counts.most_common():
         print(f"- {industry}: {count}일")
 
@@ -0,0 +1,342 @@
+import os
+import sys
+import json
+import queue
+import time
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 체크포인트 레코드의 상태값
+STATUS_SUCCESS = "success"
+STATUS_NO_DATA = "no_data"
+STATUS_ERROR = "error"
+
+def format_time(seconds: float) -> str:
+    """초를 읽기 쉬운 시간 형식으로 변환합니다."""
+    if seconds < 60:
+        return f"{seconds:.1f}초"
+    elif seconds < 3600:
+        minutes = int(seconds // 60)
+        remaining_seconds = seconds % 60
+        return f"{minutes}분 {remaining_seconds:.1f}초"
+    else:
+        hours = int(seconds // 3600)
+        minutes = int((seconds % 3600) // 60)
+        remaining_seconds = seconds % 60
+        return f"{hours}시간 {minutes}분 {remaining_seconds:.1f}초"
+
+def print_progress(current: int, total: int, start_time: float, current_time: float,
+                  success_count: int, error_count: int, no_data_count: int,
+                  resumed_count: int = 0, workers: int = 1):
+    """진행률과 예상 완료 시간을 출력합니다.
+
+    resumed_count 는 체크포인트에서 복원되어 이번 실행에서 처리하지 않은 건수로,
+    ETA는 이번 실행에서 모든 워커가 실제로 처리한 건수의 합산 처리속도로 계산합니다.
+    """
+    progress = current / total * 100 if total > 0 else 100.0
+    elapsed_time = current_time - start_time
+    processed_now = current - resumed_count
+
+    if current > 0:
+        throughput = processed_now / elapsed_time if elapsed_time > 0 and processed_now > 0 else 0.0
+        remaining_items = total - current
+        estimated_remaining_time = remaining_items / throughput if throughput > 0 else 0.0
+        estimated_completion_time = current_time + estimated_remaining_time
+
+        # 진행률 바 생성 (50자 길이)
+        bar_length = 50
+        filled_length = int(bar_length * current // total)
+        bar = '█' * filled_length + '░' * (bar_length - filled_length)
+
+        # 성공률 계산
+        total_processed = success_count + error_count + no_data_count
+        success_rate = (success_count / total_processed * 100) if total_processed > 0 else 0
+
+        resumed_text = f"복원: {resumed_count} | " if resumed_count > 0 else ""
+        print(f"\r[{bar}] {current}/{total} ({progress:.1f}%) | "
+              f"{resumed_text}"
+              f"성공: {success_count} | 에러: {error_count} | 데이터없음: {no_data_count} | "
+              f"성공률: {success_rate:.1f}% | "
+              f"처리속도: {throughput:.2f}건/초 ({workers}프로세스) | "
+              f"경과: {format_time(elapsed_time)} | "
+              f"예상완료: {format_time(estimated_remaining_time)} | "
+              f"완료시각: {datetime.fromtimestamp(estimated_completion_time).strftime('%H:%M:%S')}",
+              end='', flush=True)
+
+def task_id(task: Callable[[str, str], Dict]) -> str:
+    """체크포인트 레코드에 남기는 작업 식별자 "모듈 파일명.함수명" (스크립트로 실행해도 import 했을 때와 같은 값)"""
+    module = sys.modules.get(task.__module__)
+    path = getattr(module, "__file__", None)
+    name = os.path.splitext(os.path.basename(path))[0] if path else task.__module__
+    return f"{name}.{task.__qualname__}"
+
+def load_checkpoint(checkpoint_path: Optional[str], retry_errors: bool = True,
+                    expected_task: Optional[str] = None) -> Dict[Tuple[str, str], Dict]:
+    """체크포인트 파일에서 완료된 (date, interval) 레코드를 읽어옵니다.
+
+    중단 시점에 잘려 나간 마지막 줄은 무시하고, 같은 키가 여러 번 기록된 경우 마지막 레코드를 사용합니다.
+    retry_errors 이면 마지막 레코드가 에러인 작업은 완료로 보지 않습니다 (DB 잠금, 워커 종료 같은 일시적 실패를 재시작 시 재시도).
+    expected_task 가 주어지면 레코드의 작업 식별자(task_id)가 다른 체크포인트는 ValueError 로 거부합니다
+    (다른 드라이버의 파일을 가리켜 작업을 건너뛰지 않도록).
+    """
+    completed = {}
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return completed
+
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if expected_task is not None and record.get("task") != expected_task:
+                raise ValueError(f"체크포인트 {checkpoint_path} 는 다른 작업({record.get('task', '작업 식별자 없음')})의 "
+                                 f"기록입니다 (현재 작업: {expected_task})")
+            completed[(record["date"], record["interval"])] = record
+    if retry_errors:
+        completed = {key: record for key, record in completed.items() if record.get("status") != STATUS_ERROR}
+    return completed
+
+class CheckpointWriter:
+    """완료된 레코드를 한 줄씩 이어 쓰는 추가 전용 체크포인트 파일"""
+
+    def __init__(self, checkpoint_path: Optional[str]):
+        self.file = None
+        if checkpoint_path:
+            directory = os.path.dirname(os.path.abspath(checkpoint_path))
+            os.makedirs(directory, exist_ok=True)
+            self.file = open(checkpoint_path, "a", encoding="utf-8")
+
+    def write(self, record: Dict):
+        if self.file is None:
+            return
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+def _init_worker(rust_log: str):
+    """워커 프로세스 초기화 - 프로세스마다 자체 rust_core 세션을 준비합니다."""
+    os.environ["RUST_LOG"] = rust_log
+    import rust_core  # noqa: F401  워커별로 확장 모듈을 미리 적재
+
+def _trace_format(trace_path: str) -> str:
+    """추적 파일 확장자가 .folded/.txt 이면 flamegraph 용 folded stack, 아니면 Chrome trace JSON"""
+    return "folded" if trace_path.endswith((".folded", ".txt")) else "chrome"
+
+def _trace_parts_dir(trace_path: str) -> str:
+    return trace_path + ".parts"
+
+@contextmanager
+def _date_trace(trace_path: Optional[str], date: str):
+    """trace_path 가 있으면 한 날짜의 구간을 추적해 날짜별 조각 파일로 저장합니다."""
+    if not trace_path:
+        yield
+        return
+    import rust_core
+    rust_core.start_trace()
+    try:
+        with rust_core.TraceSpan("date", date):
+            yield
+    finally:
+        rust_core.stop_trace()
+        extension = ".folded" if _trace_format(trace_path) == "folded" else ".json"
+        part_path = os.path.join(_trace_parts_dir(trace_path), f"{date}_{os.getpid()}{extension}")
+        rust_core.write_trace(part_path, _trace_format(trace_path))
+
+def _start_prefetcher(dates: List[str], depth: int):
+    """순차 실행에서 다음 depth 일의 5분봉을 rust_core 일별 캐시에 미리 올리는 프리페처 (depth 0 이면 None)"""
+    if depth <= 0 or not dates:
+        return None
+    import rust_core
+    return rust_core.DayPrefetcher(dates, depth=depth)
+
+def merge_trace_parts(trace_path: str) -> int:
+    """날짜별 조각 파일을 하나의 추적 파일로 합치고 조각 폴더를 지웁니다. 합친 구간(또는 스택) 수를 반환합니다."""
+    parts_dir = _trace_parts_dir(trace_path)
+    if not os.path.isdir(parts_dir):
+        return 0
+    parts = sorted(os.path.join(parts_dir, name) for name in os.listdir(parts_dir))
+
+    if _trace_format(trace_path) == "folded":
+        stacks: Dict[str, int] = {}
+        for part in parts:
+            with open(part, "r", encoding="utf-8") as f:
+                for line in f:
+                    stack, _, count = line.rstrip("\n").rpartition(" ")
+                    if stack:
+                        stacks[stack] = stacks.get(stack, 0) + int(count)
+        with open(trace_path, "w", encoding="utf-8") as f:
+            for stack in sorted(stacks):
+                f.write(f"{stack} {stacks[stack]}\n")
+        merged = len(stacks)
+    else:
+        events = []
+        for part in parts:
+            with open(part, "r", encoding="utf-8") as f:
+                events.extend(json.load(f)["traceEvents"])
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump({"displayTimeUnit": "ms", "traceEvents": events}, f, ensure_ascii=False)
+        merged = len(events)
+
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    return merged
+
+def _run_date(task: Callable[[str, str], Dict], date: str, intervals: List[str], record_queue,
+              trace_path: Optional[str] = None) -> int:
+    """워커에서 한 날짜의 미완료 시간대를 처리하고 레코드를 즉시 큐로 흘려보냅니다."""
+    with _date_trace(trace_path, date):
+        for interval in intervals:
+            record_queue.put(_run_task(task, date, interval, trace_path))
+    return len(intervals)
+
+def _run_task(task: Callable[[str, str], Dict], date: str, interval: str,
+              trace_path: Optional[str] = None) -> Dict:
+    """단일 (date, interval) 작업을 실행해 체크포인트 레코드로 변환합니다."""
+    if trace_path:
+        import rust_core
+        span = rust_core.TraceSpan("task", date, interval)
+    else:
+        span = nullcontext()
+    try:
+        with span:
+            record = task(date, interval)
+    except Exception as e:
+        record = {'status': STATUS_ERROR, 'error': str(e)}
+    record['date'] = date
+    record['interval'] = interval
+    return record
+
+def run_date_tasks(task: Callable[[str, str], Dict], date_list: List[str], time_intervals: List[str],
+                   workers: int = 1, checkpoint_path: Optional[str] = None,
+                   show_progress: bool = True, trace_path: Optional[str] = None,
+                   retry_errors: bool = True, prefetch_depth: int = 0) -> List[Dict]:
+    """날짜 리스트를 프로세스 풀로 나누어 (date, interval) 작업을 실행합니다.
+
+    task 는 (date, interval) 을 받아 status 를 포함한 dict 를 반환하는 모듈 수준 함수여야 합니다.
+    완료된 레코드는 체크포인트 파일에 즉시 추가되며, 재시작하면 이미 완료된 작업은 건너뜁니다.
+    retry_errors 이면 체크포인트에 에러로 남은 작업은 완료로 보지 않고 다시 실행합니다.
+    레코드에는 task_id(task) 가 "task" 로 기록되고, 다른 작업의 체크포인트를 주면 ValueError 를 냅니다.
+    trace_path 가 주어지면 이번 실행에서 처리한 날짜의 rust_core 구간을 추적해 하나의 파일로 저장합니다.
+    prefetch_depth 가 0보다 크면 순차 실행(workers <= 1)에서 rust_core.DayPrefetcher 로 다음 날짜들을 미리 읽습니다
+    (일별 캐시를 거치는 rust_core 함수를 쓰는 작업에만 효과가 있고, 프로세스 풀에서는 쓰지 않음).
+    반환값은 date_list, time_intervals 순서로 정렬된 전체 레코드입니다.
+    """
+    task_name = task_id(task)
+    completed = load_checkpoint(checkpoint_path, retry_errors, task_name)
+    total = len(date_list) * len(time_intervals)
+
+    pending: List[Tuple[str, List[str]]] = []
+    for date in date_list:
+        remaining = [interval for interval in time_intervals if (date, interval) not in completed]
+        if remaining:
+            pending.append((date, remaining))
+
+    counts = {STATUS_SUCCESS: 0, STATUS_ERROR: 0, STATUS_NO_DATA: 0}
+    resumed_count = 0
+    for date in date_list:
+        for interval in time_intervals:
+            record = completed.get((date, interval))
+            if record is not None:
+                resumed_count += 1
+                counts[record['status']] = counts.get(record['status'], 0) + 1
+
+    if resumed_count > 0:
+        print(f"♻️ 체크포인트에서 {resumed_count:,}건 복원 ({checkpoint_path})")
+
+    if trace_path:
+        shutil.rmtree(_trace_parts_dir(trace_path), ignore_errors=True)
+        os.makedirs(_trace_parts_dir(trace_path), exist_ok=True)
+
+    writer = CheckpointWriter(checkpoint_path)
+    start_time = time.time()
+    current = resumed_count
+
+    def on_record(record: Dict):
+        nonlocal current
+        record['task'] = task_name
+        writer.write(record)
+        completed[(record['date'], record['interval'])] = record
+        counts[record['status']] = counts.get(record['status'], 0) + 1
+        current += 1
+        if show_progress and (current % 10 == 0 or current == total):
+            print_progress(current, total, start_time, time.time(),
+                           counts[STATUS_SUCCESS], counts[STATUS_ERROR], counts[STATUS_NO_DATA],
+                           resumed_count, workers)
+
+    prefetcher = _start_prefetcher([date for date, _ in pending], prefetch_depth) if workers <= 1 else None
+    try:
+        if workers <= 1:
+            for date, intervals in pending:
+                if prefetcher is not None:
+                    prefetcher.advance(date)
+                with _date_trace(trace_path, date):
+                    for interval in intervals:
+                        on_record(_run_task(task, date, interval, trace_path))
+        else:
+            _run_in_pool(task, pending, workers, on_record, trace_path)
+    finally:
+        writer.close()
+        if prefetcher is not None:
+            prefetcher.close()
+        if trace_path:
+            merged = merge_trace_parts(trace_path)
+            print(f"\n🧭 추적 저장: {trace_path} ({merged:,}개 {'스택' if _trace_format(trace_path) == 'folded' else '구간'})")
+
+    if show_progress:
+        print_progress(total, total, start_time, time.time(),
+                       counts[STATUS_SUCCESS], counts[STATUS_ERROR], counts[STATUS_NO_DATA],
+                       resumed_count, workers)
+        print()  # 줄바꿈
+
+    return [completed[(date, interval)] for date in date_list for interval in time_intervals
+            if (date, interval) in completed]
+
+def _run_in_pool(task: Callable[[str, str], Dict], pending: List[Tuple[str, List[str]]],
+                 workers: int, on_record: Callable[[Dict], None], trace_path: Optional[str] = None):
+    """프로세스 풀에 날짜 단위로 작업을 분배하고, 워커가 흘려보내는 레코드를 메인 프로세스에서 기록합니다."""
+    manager = multiprocessing.Manager()
+    record_queue = manager.Queue()
+    rust_log = os.environ.get("RUST_LOG", "warn")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(rust_log,)) as executor:
+            futures = {
+                executor.submit(_run_date, task, date, intervals, record_queue, trace_path): (date, intervals)
+                for date, intervals in pending
+            }
+
+            while True:
+                try:
+                    on_record(record_queue.get(timeout=0.2))
+                    continue
+                except queue.Empty:
+                    pass
+                if all(future.done() for future in futures):
+                    break
+
+            # 워커 종료 직전에 넣은 레코드 처리
+            while True:
+                try:
+                    on_record(record_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for future, (date, intervals) in futures.items():
+                error = future.exception()
+                if error is not None:
+                    print(f"\n⚠️ {date} 워커 실행 실패: {error}")
+    finally:
+        manager.shutdown()
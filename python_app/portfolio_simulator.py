@@ -0,0 +1,204 @@
+import os
+import csv
+import time
+import argparse
+import itertools
+import numpy as np
+import rust_core
+from typing import Dict, List, Optional, Sequence, Tuple
+from analyze_3m_performance import generate_date_list, generate_time_intervals, select_d_stocks, PREFETCH_DEPTH
+from parallel_runner import run_date_tasks, format_time, STATUS_SUCCESS, STATUS_NO_DATA, STATUS_ERROR
+
+os.environ["RUST_LOG"] = "warn"
+
+# 시도 한 번에 보관할 최대 선별 종목 수 (evaluate_d_for_date_and_time 결과 순서)
+MAX_PICKS = 5
+# 보유 구간 (분 또는 "close") - forward_return_matrix 의 horizons 와 같은 표기
+DEFAULT_HORIZONS = ["30", "60", "120", "close"]
+
+# 거래 비용 (%) - 편도 슬리피지/수수료, 매도 시 거래세
+DEFAULT_COSTS = {
+    'slippage': 0.05,
+    'commission': 0.015,
+    'tax': 0.18,
+}
+
+def round_trip_cost(costs: Dict[str, float]) -> float:
+    """매수 + 매도 한 번의 총 비용 (%)"""
+    return 2 * costs['slippage'] + 2 * costs['commission'] + costs['tax']
+
+def select_picks(date: str, interval: str) -> Dict:
+    """한 (날짜, 시간대)의 D 선별 결과를 순서대로 기록합니다. (프로세스 풀 워커에서 실행)"""
+    try:
+        selected = select_d_stocks(date, interval)
+    except Exception as e:
+        return {'status': STATUS_ERROR, 'error': str(e)}
+    if not selected:
+        return {'status': STATUS_NO_DATA}
+    return {'status': STATUS_SUCCESS, 'codes': [code for code, _, _ in selected[:MAX_PICKS]]}
+
+def build_return_tensor(records: List[Dict], time_intervals: List[str],
+                        horizons: Sequence[str]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """선별 레코드와 선행 수익률 행렬로 [시도, 순위, 구간] 수익률 배열을 만듭니다.
+
+    반환: (거래일 목록, 시도별 거래일 인덱스, 수익률 배열). 선별되지 않은 순위나 봉이 없는 구간은 NaN.
+    날짜마다 forward_return_matrix 를 한 번만 호출합니다.
+    """
+    by_date: Dict[str, List[Dict]] = {}
+    for record in records:
+        if record['status'] == STATUS_SUCCESS:
+            by_date.setdefault(record['date'], []).append(record)
+
+    days = sorted(by_date)
+    n_events = sum(len(by_date[date]) for date in days)
+    returns = np.full((n_events, MAX_PICKS, len(horizons)), np.nan)
+    day_index = np.empty(n_events, dtype=np.int64)
+    boundary_index = {interval: i for i, interval in enumerate(time_intervals)}
+
+    event = 0
+    for d, date in enumerate(days):
+        matrix = rust_core.forward_return_matrix(date, boundaries=time_intervals, horizons=list(horizons))
+        rows = {code: i for i, code in enumerate(matrix['codes'])}
+        for record in sorted(by_date[date], key=lambda r: r['interval']):
+            b = boundary_index[record['interval']]
+            for rank, code in enumerate(record['codes'][:MAX_PICKS]):
+                row = rows.get(code)
+                if row is not None:
+                    returns[event, rank, :] = matrix['returns'][row, b, :]
+            day_index[event] = d
+            event += 1
+
+    return days, day_index, returns
+
+def variant_grid(picks: Sequence[int] = (1, 3, 5), horizons: Sequence[str] = DEFAULT_HORIZONS,
+                 weightings: Sequence[str] = ("equal", "rank"),
+                 exposures: Sequence[float] = (1.0,)) -> List[Dict]:
+    """선별 종목 수 × 보유 구간 × 비중 방식 × 투입 비율 조합
+
+    exposure 는 하루 자본 중 전체 시도에 나누어 투입하는 비율로, 시도 하나에는 exposure / 시간대 수 만큼 들어갑니다.
+    """
+    variants = []
+    for k, horizon, weighting, exposure in itertools.product(picks, horizons, weightings, exposures):
+        if weighting == "rank" and k == 1:
+            continue  # 1종목이면 균등과 동일
+        variants.append({
+            'name': f"top{k}_{horizon}_{weighting}_x{exposure:g}",
+            'picks': k,
+            'horizon': horizon,
+            'weighting': weighting,
+            'exposure': exposure,
+        })
+    return variants
+
+def pick_weights(valid: np.ndarray, weighting: str) -> np.ndarray:
+    """[시도, 순위] 유효 마스크에서 시도별 합이 1인 비중 (유효 종목이 없으면 0)"""
+    if weighting == "equal":
+        raw = valid.astype(np.float64)
+    elif weighting == "rank":
+        raw = valid / np.arange(1, valid.shape[1] + 1, dtype=np.float64)
+    else:
+        raise ValueError(f"지원하지 않는 비중 방식입니다: {weighting}")
+    totals = raw.sum(axis=1, keepdims=True)
+    return np.divide(raw, totals, out=np.zeros_like(raw), where=totals > 0)
+
+def simulate(days: List[str], day_index: np.ndarray, returns: np.ndarray, horizons: Sequence[str],
+             variants: List[Dict], costs: Dict[str, float] = DEFAULT_COSTS,
+             events_per_day: Optional[int] = None) -> List[Dict]:
+    """모든 변형을 배열 연산으로 시뮬레이션합니다.
+
+    각 시도는 그날 시작 자본 기준으로 포지션을 잡고, 하루 손익을 합산한 뒤 다음 날로 복리 적용합니다.
+    순수익률 = 구간 수익률 - 왕복 비용, 결과는 일별 자산곡선과 최대 낙폭/회전율/적중률 요약입니다.
+    """
+    n_days = len(days)
+    events_per_day = events_per_day or max(int(np.bincount(day_index, minlength=n_days).max(initial=1)), 1)
+    cost = round_trip_cost(costs)
+    horizon_index = {h: i for i, h in enumerate(horizons)}
+
+    results = []
+    for variant in variants:
+        r = returns[:, :variant['picks'], horizon_index[variant['horizon']]]
+        valid = ~np.isnan(r)
+        weights = pick_weights(valid, variant['weighting'])
+        event_returns = np.where(valid, r - cost, 0.0)
+        event_pnl = (weights * event_returns).sum(axis=1)  # 시도별 순수익률 (%)
+        traded = valid.any(axis=1)
+
+        size = variant['exposure'] / events_per_day
+        daily = np.bincount(day_index, weights=size * event_pnl / 100, minlength=n_days)
+        equity = np.cumprod(1.0 + daily)
+        # 시작 자본 1.0 을 고점에 포함해야 첫날 손실도 낙폭으로 잡힘
+        peak = np.maximum.accumulate(np.concatenate(([1.0], equity)))[1:]
+        drawdown = equity / peak - 1.0
+        # 매수 + 매도 거래대금 / 자본
+        turnover = np.bincount(day_index, weights=2 * size * traded, minlength=n_days)
+
+        trades = int(traded.sum())
+        results.append({
+            'name': variant['name'],
+            'variant': variant,
+            'equity': equity,
+            'drawdown': drawdown,
+            'total_return': (equity[-1] - 1.0) * 100 if n_days else 0.0,
+            'max_drawdown': drawdown.min() * 100 if n_days else 0.0,
+            'avg_turnover': turnover.mean() if n_days else 0.0,
+            'trades': trades,
+            'hit_rate': (event_pnl[traded] > 0).mean() * 100 if trades else 0.0,
+            'avg_trade': event_pnl[traded].mean() if trades else 0.0,
+        })
+    return results
+
+def write_summary_csv(results: List[Dict], output_path: str):
+    """변형별 요약을 CSV 로 저장합니다."""
+    with open(output_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "picks", "horizon", "weighting", "exposure", "total_return",
+                         "max_drawdown", "avg_turnover", "trades", "hit_rate", "avg_trade"])
+        for result in results:
+            v = result['variant']
+            writer.writerow([result['name'], v['picks'], v['horizon'], v['weighting'], v['exposure'],
+                             f"{result['total_return']:.4f}", f"{result['max_drawdown']:.4f}",
+                             f"{result['avg_turnover']:.4f}", result['trades'],
+                             f"{result['hit_rate']:.2f}", f"{result['avg_trade']:.4f}"])
+
+def print_results(results: List[Dict], costs: Dict[str, float], top: int = 15):
+    """총수익률 순으로 상위 변형을 출력합니다."""
+    print(f"\n💰 왕복 비용 {round_trip_cost(costs):.3f}% "
+          f"(슬리피지 {costs['slippage']}% x2, 수수료 {costs['commission']}% x2, 거래세 {costs['tax']}%)")
+    print(f"{'변형':<28}{'총수익률':>10}{'최대낙폭':>10}{'회전율':>8}{'거래':>7}{'적중률':>8}{'평균':>8}")
+    for result in sorted(results, key=lambda r: r['total_return'], reverse=True)[:top]:
+        print(f"{result['name']:<28}{result['total_return']:>9.2f}%{result['max_drawdown']:>9.2f}%"
+              f"{result['avg_turnover']:>8.2f}{result['trades']:>7}{result['hit_rate']:>7.1f}%"
+              f"{result['avg_trade']:>7.2f}%")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="D 선별 결과 포트폴리오 시뮬레이션")
+    parser.add_argument("--days", type=int, default=90, help="분석할 최근 날짜 수")
+    parser.add_argument("--checkpoint", type=str, default=None, help="선별 결과 체크포인트 파일")
+    parser.add_argument("--workers", type=int, default=1, help="선별에 사용할 워커 프로세스 수")
+    parser.add_argument("--slippage", type=float, default=DEFAULT_COSTS['slippage'], help="편도 슬리피지 (%%)")
+    parser.add_argument("--commission", type=float, default=DEFAULT_COSTS['commission'], help="편도 수수료 (%%)")
+    parser.add_argument("--tax", type=float, default=DEFAULT_COSTS['tax'], help="매도 거래세 (%%)")
+    parser.add_argument("--output", type=str, default=None, help="변형별 요약을 저장할 CSV 경로")
+    args = parser.parse_args()
+
+    date_list = generate_date_list(args.days)
+    time_intervals = generate_time_intervals()
+    records = run_date_tasks(select_picks, date_list, time_intervals,
+                             workers=args.workers, checkpoint_path=args.checkpoint, prefetch_depth=PREFETCH_DEPTH)
+
+    start_time = time.time()
+    days, day_index, returns = build_return_tensor(records, time_intervals, DEFAULT_HORIZONS)
+    load_time = time.time() - start_time
+
+    costs = {'slippage': args.slippage, 'commission': args.commission, 'tax': args.tax}
+    variants = variant_grid(exposures=(0.5, 1.0))
+    start_time = time.time()
+    results = simulate(days, day_index, returns, DEFAULT_HORIZONS, variants, costs,
+                       events_per_day=len(time_intervals))
+    print(f"\n⏱️ 수익률 배열 {returns.shape} 준비 {format_time(load_time)}, "
+          f"{len(variants)}개 변형 시뮬레이션 {format_time(time.time() - start_time)}")
+
+    print_results(results, costs)
+    if args.output:
+        write_summary_csv(results, args.output)
+        print(f"\n💾 요약 저장: {args.output}")
@@ -0,0 +1,69 @@
+import os
+import argparse
+import rust_core
+import logging
+import time
+from build_archive import weekdays_between
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+os.environ["RUST_LOG"] = "info"
+
+DB_PATH = "D:/db/stock_price(5min).db"
+DEFAULT_TIMES = "0930,1000,1030,1100,1130,1200,1230,1300,1330,1400,1430,1500"
+
+def timed_sweep(dates, times, db_path, prefetch):
+    """캐시를 비운 상태에서 스윕 한 번 실행"""
+    rust_core.clear_cache()
+    start_time = time.time()
+    result = rust_core.sweep_d_parameters(dates, times, [3.0, 5.0], [20, 30], [20, 30], [2, 3], db_path=db_path, prefetch=prefetch)
+    return time.time() - start_time, result
+
+def timed_python_loop(dates, db_path, depth):
+    """파이썬 루프에서 날짜별로 선행 수익률 행렬을 읽는 배치 (DayPrefetcher 사용 여부 비교)"""
+    rust_core.clear_cache()
+    prefetcher = rust_core.DayPrefetcher(dates, depth=depth, forward=True, db_path=db_path) if depth > 0 else None
+    start_time = time.time()
+    for date in dates:
+        if prefetcher is not None:
+            prefetcher.advance(date)
+        rust_core.forward_return_matrix(date, db_path=db_path)
+        rust_core.sector_index_for_date(date, db_path=db_path)
+    elapsed = time.time() - start_time
+    stats = prefetcher.stats() if prefetcher is not None else None
+    if prefetcher is not None:
+        prefetcher.close()
+    return elapsed, stats
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="다음 거래일 백그라운드 프리페치 유무에 따른 배치 실행 시간 비교")
+    parser.add_argument("--start", type=str, required=True, help="시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, required=True, help="종료 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--times", type=str, default=DEFAULT_TIMES, help="시간대 (HHMM, 쉼표 구분)")
+    parser.add_argument("--db", type=str, default=DB_PATH, help="5분봉 DB 또는 아카이브(.rca) 경로")
+    parser.add_argument("--depth", type=int, default=2, help="프리페치 깊이 (일)")
+    args = parser.parse_args()
+
+    dates = weekdays_between(args.start, args.end)
+    times = [t.strip() for t in args.times.split(",") if t.strip()]
+
+    print(f"📐 스윕: {len(dates)}일 x {len(times)}개 시간대")
+    plain_seconds, plain = timed_sweep(dates, times, args.db, 0)
+    fetched_seconds, fetched = timed_sweep(dates, times, args.db, args.depth)
+    same = plain['selections'] == fetched['selections'] and plain['win_rate'] == fetched['win_rate']
+    print(f"   프리페치 없음 {plain_seconds:.2f}초, 깊이 {args.depth} {fetched_seconds:.2f}초 "
+          f"({plain_seconds / max(fetched_seconds, 1e-9):.2f}배), 결과 일치: {'✅' if same else '❌'}")
+
+    print(f"\n🐍 파이썬 루프: {len(dates)}일")
+    plain_seconds, _ = timed_python_loop(dates, args.db, 0)
+    fetched_seconds, stats = timed_python_loop(dates, args.db, args.depth)
+    print(f"   프리페치 없음 {plain_seconds:.2f}초, 깊이 {stats['depth']} {fetched_seconds:.2f}초 "
+          f"({plain_seconds / max(fetched_seconds, 1e-9):.2f}배)")
+    print(f"   준비됨 {stats['ready_hits']}일 / 직접 읽음 {stats['misses']}일, 대기 {stats['wait_seconds']:.2f}초, "
+          f"하루치 {stats['day_bytes'] / 2**20:,.1f} MiB")
+
+    print("\n✅ 비교 완료")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import os
+import argparse
+import rust_core
+import logging
+import time
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+os.environ["RUST_LOG"] = "info"
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="캐시를 유지하며 여러 분석 프로세스의 요청을 처리하는 로컬 쿼리 데몬")
+    parser.add_argument("command", choices=["start", "status", "stop"], help="start: 데몬 실행 (블록), status: 상태 확인, stop: 종료")
+    parser.add_argument("--socket", type=str, default=None, help="소켓 경로 (기본: RUST_CORE_DAEMON_SOCKET 또는 /tmp/rust_core_daemon.sock)")
+    parser.add_argument("--cache-mb", type=int, default=None, help="데몬 캐시 메모리 예산 (MiB)")
+    args = parser.parse_args()
+
+    if args.command == "start":
+        if args.cache_mb is not None:
+            rust_core.configure_cache(budget_mb=args.cache_mb)
+        print("🛰️ 쿼리 데몬 시작 (종료: query_daemon.py stop)")
+        start_time = time.time()
+        served = rust_core.run_query_daemon(args.socket)
+        print(f"✅ 쿼리 데몬 종료: 요청 {served:,}건 처리 ({time.time() - start_time:.0f}초)")
+    elif args.command == "status":
+        status = rust_core.query_daemon_status(args.socket)
+        if status['running']:
+            print(f"🟢 실행 중: {status['socket']} (pid {status['pid']}, 요청 {status['served']:,}건, {status['uptime_secs']:,}초)")
+        else:
+            print(f"⚪ 실행 중이 아님: {status['socket']}")
+    else:
+        if rust_core.stop_query_daemon(args.socket):
+            print("🛑 쿼리 데몬 종료 요청 완료")
+        else:
+            print("⚪ 실행 중인 데몬이 없습니다")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+import argparse
+import rust_core
+
+os.environ["RUST_LOG"] = "warn"
+
+def replay_date(date, speed=0.0, chunk_size=64, verify=True):
+    """과거 하루를 실시간 엔진으로 재생하고 결과 요약을 출력합니다."""
+    result = rust_core.replay_d_session(date, speed=speed, chunk_size=chunk_size, verify=verify)
+
+    count, mean, p50, p99, max_us = result['latency_us']
+    print(f"\n🔁 {date} 재생: {result['bars']}개 봉, {result['wall_ms']:.1f}ms (배속 대기 {result['sleep_ms']:.1f}ms)")
+    print(f"   ⏱️ 봉당 지연: 평균 {mean:.1f}µs, p50 {p50}µs, p99 {p99}µs, 최대 {max_us}µs")
+    if result['late_bars']:
+        print(f"   ⚠️ 확정된 경계 이후 도착한 봉: {result['late_bars']}개")
+
+    for time, stocks in result['leaders']:
+        codes = ", ".join(code for code, _, _ in stocks) or "-"
+        print(f"   {time}: {codes}")
+
+    if not result['verified']:
+        return True
+
+    if result['mismatches']:
+        print(f"   ❌ 기준 평가와 불일치: {len(result['mismatches'])}개 경계")
+        for time, live, reference in result['mismatches']:
+            print(f"      {time}: 실시간={live}, 기준={reference}")
+        return False
+
+    print("   ✅ 모든 경계에서 evaluate_d_for_date_and_time 과 일치")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="과거 5분봉을 실시간 D 엔진으로 재생하여 검증")
+    parser.add_argument("dates", nargs="+", help="재생할 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--speed", type=float, default=0.0, help="장중 시간 대비 배속 (0 이면 최대 속도)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="종목별 커서가 한 번에 읽는 봉 개수")
+    parser.add_argument("--no-verify", action="store_true", help="기준 평가와의 비교를 생략")
+    args = parser.parse_args()
+
+    failed = [date for date in args.dates
+              if not replay_date(date, args.speed, args.chunk_size, not args.no_verify)]
+
+    if failed:
+        print(f"\n❌ 불일치 날짜: {failed}")
+        raise SystemExit(1)
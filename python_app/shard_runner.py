@@ -0,0 +1,376 @@
+import os
+import sys
+import time
+import socket
+import secrets
+import ipaddress
+import threading
+import subprocess
+from multiprocessing.connection import Listener, Client
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from parallel_runner import run_date_tasks, load_checkpoint, CheckpointWriter, format_time, STATUS_ERROR
+
+# 코디네이터 ↔ 워커 인증 키 (다른 호스트의 워커도 같은 값을 써야 합니다)
+# multiprocessing.connection 은 받은 메시지를 언피클하므로 키를 아는 쪽만 접속할 수 있어야 합니다.
+AUTHKEY_ENV = "RUST_CORE_SHARD_AUTHKEY"
+
+def is_loopback(host: str) -> bool:
+    """host 가 이 호스트 안에서만 닿는 루프백 주소인지"""
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+def _coordinator_authkey(host: str) -> str:
+    """코디네이터 인증 키: RUST_CORE_SHARD_AUTHKEY, 없으면 루프백에서만 이번 실행용 임의 키 (로컬 워커에게 환경 변수로 전달)"""
+    key = os.environ.get(AUTHKEY_ENV)
+    if key:
+        return key
+    if not is_loopback(host):
+        raise ValueError(f"루프백이 아닌 주소({host})에 코디네이터를 열려면 {AUTHKEY_ENV} 환경 변수로 인증 키를 지정해야 합니다")
+    return secrets.token_hex(16)
+
+def _worker_authkey() -> str:
+    key = os.environ.get(AUTHKEY_ENV)
+    if not key:
+        raise ValueError(f"{AUTHKEY_ENV} 환경 변수에 코디네이터와 같은 인증 키를 지정해야 합니다")
+    return key
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """"host:port" 문자열을 (host, port) 로 변환합니다."""
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"주소 형식이 올바르지 않습니다: {address} (host:port)")
+    return host, int(port)
+
+def split_shards(date_list: List[str], shard_days: int) -> List[List[str]]:
+    """날짜 리스트를 연속된 shard_days 일 단위 샤드로 나눕니다 (같은 워커가 이어지는 날짜를 읽어 캐시/프리페치를 살림)."""
+    shard_days = max(1, shard_days)
+    return [date_list[i:i + shard_days] for i in range(0, len(date_list), shard_days)]
+
+class _ShardBoard:
+    """샤드 대기열과 시도 기록, 연결된 워커, 샤드별로 아직 받지 못한 (date, interval) 을 여러 연결 스레드가 함께 다루는 상태"""
+
+    def __init__(self, shards: List[List[str]], time_intervals: List[str], completed: Dict[Tuple[str, str], Dict],
+                 max_retries: int, on_records: Callable[[List[Dict]], None]):
+        self.shards = shards
+        self.time_intervals = time_intervals
+        self.max_retries = max_retries
+        self.on_records = on_records
+        self.pending: List[int] = list(range(len(shards)))
+        self.attempts = [0] * len(shards)
+        # 샤드별로 아직 성공 레코드를 받지 못한 (date, interval) - 재시도는 이 쌍만 다시 보냄
+        self.missing: List[Set[Tuple[str, str]]] = [
+            {(date, interval) for date in shard for interval in time_intervals if (date, interval) not in completed}
+            for shard in shards
+        ]
+        # 샤드별 마지막 시도의 에러 레코드 (재시도 한도를 넘기면 이 레코드로 마무리)
+        self.errors: List[Dict[Tuple[str, str], Dict]] = [{} for _ in shards]
+        # 샤드별로 이미 시도한 워커 (재시도는 시도하지 않은 워커에게 먼저 보냄)
+        self.tried: List[Set[str]] = [set() for _ in shards]
+        self.workers: Set[str] = set()
+        self.idle_since = time.time()
+        self.done: Set[int] = set()
+        self.failed: Dict[int, str] = {}
+        self.cond = threading.Condition()
+        self.finished = threading.Event()
+        if not shards:
+            self.finished.set()
+
+    @property
+    def remaining(self) -> int:
+        return len(self.shards) - len(self.done)
+
+    def join(self, worker: str):
+        with self.cond:
+            self.workers.add(worker)
+            self.cond.notify_all()
+
+    def leave(self, worker: str):
+        with self.cond:
+            self.workers.discard(worker)
+            if not self.workers:
+                self.idle_since = time.time()
+            self.cond.notify_all()
+
+    def idle_seconds(self) -> float:
+        """연결된 워커가 없었던 시간 (연결된 워커가 있으면 0)"""
+        with self.cond:
+            return 0.0 if self.workers else time.time() - self.idle_since
+
+    def take(self, worker: str) -> Optional[int]:
+        """worker 가 처리할 다음 샤드 번호 (모든 샤드가 끝나면 None)
+
+        worker 가 이미 시도한 샤드는 그 샤드를 시도하지 않은 다른 워커가 연결되어 있는 동안 남겨 두고,
+        그런 워커가 없을 때만 다시 받습니다. 다른 워커가 처리 중인 샤드가 재시도될 수 있으므로 끝날 때까지 기다립니다.
+        """
+        with self.cond:
+            while not self.finished.is_set():
+                for shard_id in self.pending:
+                    tried = self.tried[shard_id]
+                    if worker not in tried or not (self.workers - tried):
+                        self.pending.remove(shard_id)
+                        self.attempts[shard_id] += 1
+                        tried.add(worker)
+                        return shard_id
+                self.cond.wait(timeout=0.2)
+        return None
+
+    def work(self, shard_id: int) -> Tuple[List[str], List[str]]:
+        """샤드에서 아직 받지 못한 쌍이 있는 날짜와 그 시간대 (첫 시도는 샤드 전체, 재시도는 실패한 쌍만)"""
+        with self.cond:
+            missing = self.missing[shard_id]
+            dates = [date for date in self.shards[shard_id] if any(key[0] == date for key in missing)]
+            intervals = [interval for interval in self.time_intervals if any(key[1] == interval for key in missing)]
+            return dates, intervals
+
+    def complete(self, shard_id: int, worker: str, records: List[Dict]):
+        """워커가 돌려준 레코드 중 성공한 쌍만 받아들이고, 남은 쌍(에러 레코드, 누락)이 있으면 그 쌍만 재시도합니다."""
+        with self.cond:
+            if self.finished.is_set():
+                return
+            missing = self.missing[shard_id]
+            accepted = []
+            for record in records:
+                key = (record['date'], record['interval'])
+                if key not in missing:
+                    continue
+                if record.get('status') == STATUS_ERROR:
+                    self.errors[shard_id][key] = record
+                else:
+                    missing.discard(key)
+                    self.errors[shard_id].pop(key, None)
+                    accepted.append(record)
+            if not missing:
+                self._finish_one(shard_id, accepted)
+                return
+            if accepted:
+                self.on_records(accepted)
+            errors = [self.errors[shard_id][key] for key in sorted(missing) if key in self.errors[shard_id]]
+            error = (f"에러 레코드 {len(errors)}건 ({errors[0]['date']} {errors[0]['interval']}: {errors[0].get('error')})"
+                     if errors else f"레코드 누락 {len(missing)}건")
+            self._retry_or_fail(shard_id, worker, error)
+
+    def fail(self, shard_id: int, worker: str, error: str):
+        """레코드 없이 실패한 샤드(작업 예외, 연결 끊김, 시간 초과)의 남은 쌍을 재시도합니다."""
+        with self.cond:
+            if self.finished.is_set():
+                return
+            self._retry_or_fail(shard_id, worker, error)
+
+    def abandon(self, reason: str):
+        """남은 샤드를 모두 실패로 처리하고 끝냅니다 (처리할 워커가 더 없을 때)"""
+        with self.cond:
+            if self.finished.is_set():
+                return
+            unfinished = [shard_id for shard_id in range(len(self.shards)) if shard_id not in self.done]
+            print(f"\n❌ {reason} - 남은 샤드 {len(unfinished)}개를 실패로 처리합니다")
+            for shard_id in unfinished:
+                self.failed[shard_id] = reason
+                self.done.add(shard_id)
+            self.pending.clear()
+            self.finished.set()
+            self.cond.notify_all()
+
+    def _retry_or_fail(self, shard_id: int, worker: str, error: str):
+        """남은 쌍을 다시 대기열에 넣습니다. 재시도 한도를 넘으면 마지막 시도의 에러 레코드로 마무리합니다."""
+        attempts = self.attempts[shard_id]
+        shard = self.shards[shard_id]
+        remaining = len(self.missing[shard_id])
+        if attempts <= self.max_retries:
+            print(f"\n⚠️ 샤드 {shard_id} ({shard[0]}~{shard[-1]}) 남은 {remaining}건 실패 [{worker}] - "
+                  f"재시도 {attempts}/{self.max_retries}: {error}")
+            self.pending.append(shard_id)
+            self.cond.notify_all()
+            return
+        print(f"\n❌ 샤드 {shard_id} ({shard[0]}~{shard[-1]}) 남은 {remaining}건 재시도 한도 초과 [{worker}]: {error}")
+        self.failed[shard_id] = error
+        self._finish_one(shard_id, list(self.errors[shard_id].values()))
+
+    def _finish_one(self, shard_id: int, records: List[Dict]):
+        self.done.add(shard_id)
+        self.on_records(records)
+        if self.remaining == 0:
+            self.finished.set()
+        self.cond.notify_all()
+
+def _serve_worker(conn, board: _ShardBoard, shard_timeout: Optional[float]):
+    """워커 연결 하나를 맡아 샤드를 보내고 결과를 받습니다. 연결이 끊기거나 시간이 초과되면 처리 중이던 샤드를 재시도로 돌립니다."""
+    worker = None
+    shard_id = None
+    try:
+        hello = conn.recv()
+        worker = f"{hello.get('host', '?')}:{hello.get('pid', '?')}"
+        board.join(worker)
+        print(f"\n🔌 워커 연결: {worker}")
+        while True:
+            shard_id = board.take(worker)
+            if shard_id is None:
+                conn.send({"type": "stop"})
+                return
+            dates, intervals = board.work(shard_id)
+            conn.send({"type": "shard", "shard": shard_id, "dates": dates, "intervals": intervals})
+            if shard_timeout is not None and not conn.poll(shard_timeout):
+                raise TimeoutError(f"{shard_timeout:.0f}초 안에 응답이 없습니다")
+            reply = conn.recv()
+            if reply.get("type") == "done":
+                board.complete(shard_id, worker, reply["records"])
+            else:
+                board.fail(shard_id, worker, reply.get("error", "알 수 없는 오류"))
+            shard_id = None
+    except (EOFError, OSError, TimeoutError) as e:
+        if shard_id is not None:
+            board.fail(shard_id, worker or "?", f"연결 끊김: {e}")
+        else:
+            print(f"\n🔌 워커 연결 종료: {worker or '?'}")
+    finally:
+        conn.close()
+        if worker is not None:
+            board.leave(worker)
+
+def spawn_local_workers(command: List[str], address: Tuple[str, int], count: int,
+                        authkey: str) -> List[subprocess.Popen]:
+    """같은 호스트에 워커 프로세스를 띄웁니다 (command 뒤에 --worker host:port 를 붙이고 인증 키는 환경 변수로 전달)."""
+    host, port = address
+    env = dict(os.environ, **{AUTHKEY_ENV: authkey})
+    return [subprocess.Popen(command + ["--worker", f"{host}:{port}"], env=env) for _ in range(count)]
+
+def run_coordinator(date_list: List[str], time_intervals: List[str], address: str = "127.0.0.1:0",
+                    shard_days: int = 5, max_retries: int = 2, checkpoint_path: Optional[str] = None,
+                    shard_timeout: Optional[float] = None, local_workers: int = 0,
+                    worker_command: Optional[List[str]] = None, idle_timeout: Optional[float] = None,
+                    task_name: Optional[str] = None) -> List[Dict]:
+    """거래일 리스트를 샤드로 나누어 TCP 로 접속한 워커들에게 분배하고 레코드를 모읍니다.
+
+    워커는 다른 호스트에서 run_worker 로 접속하거나, local_workers 개를 worker_command 로 이 호스트에 띄울 수 있습니다.
+    루프백이 아닌 주소에 열 때는 RUST_CORE_SHARD_AUTHKEY 가 있어야 하고, 루프백에서는 없으면 이번 실행용 키를 만듭니다.
+    워커가 돌려준 성공 레코드는 바로 받아들이고, 에러 레코드나 누락된 (date, interval) 만 max_retries 번까지 다시 보냅니다
+    (연결 끊김, shard_timeout 초과도 남은 쌍만 재시도). 그 샤드를 아직 시도하지 않은 워커가 연결되어 있으면 그 워커에게 먼저 보냅니다.
+    한도를 넘긴 쌍은 마지막 시도의 에러 레코드를 쓰고, 레코드가 없는 (date, interval) 은 에러 레코드로 남깁니다.
+    로컬 워커가 모두 종료되고 연결된 워커가 없거나, idle_timeout 초 동안 연결된 워커가 없으면 남은 샤드를 실패로 처리합니다.
+    성공 레코드는 체크포인트 파일에 즉시 추가되며 재시작하면 이미 완료된 작업은 건너뜁니다 (에러 레코드는 기록하지 않아 다시 실행).
+    task_name(워커 작업의 task_id)가 주어지면 다른 작업의 체크포인트는 ValueError 로 거부합니다.
+    반환값은 run_date_tasks 와 같이 date_list, time_intervals 순서로 정렬된 전체 레코드입니다.
+    """
+    completed = load_checkpoint(checkpoint_path, expected_task=task_name)
+    if completed:
+        print(f"♻️ 체크포인트에서 {len(completed):,}건 복원 ({checkpoint_path})")
+    pending_dates = [date for date in date_list
+                     if any((date, interval) not in completed for interval in time_intervals)]
+    shards = split_shards(pending_dates, shard_days)
+    total = len(date_list) * len(time_intervals)
+
+    writer = CheckpointWriter(checkpoint_path)
+    start_time = time.time()
+
+    def on_records(records: List[Dict]):
+        for record in records:
+            if record.get('status') != STATUS_ERROR:
+                writer.write(record)
+            completed[(record['date'], record['interval'])] = record
+        print(f"\r📦 샤드 {len(board.done)}/{len(shards)} 완료 | 레코드 {len(completed):,}/{total:,} | "
+              f"경과: {format_time(time.time() - start_time)}", end='', flush=True)
+
+    board = _ShardBoard(shards, time_intervals, completed, max_retries, on_records)
+    host, port = parse_address(address)
+    authkey = _coordinator_authkey(host)
+    listener = Listener((host, port), authkey=authkey.encode("utf-8"))
+    bound = listener.address
+    print(f"🛰️ 코디네이터 시작: {bound[0]}:{bound[1]} | 샤드 {len(shards)}개 ({shard_days}일 단위) | "
+          f"남은 날짜 {len(pending_dates)}일 x {len(time_intervals)}개 시간대")
+
+    def accept_loop():
+        while not board.finished.is_set():
+            try:
+                conn = listener.accept()
+            except OSError:
+                return  # 리스너 종료
+            except Exception as e:
+                print(f"\n⚠️ 워커 접속 거부: {e}")
+                continue
+            threading.Thread(target=_serve_worker, args=(conn, board, shard_timeout), daemon=True).start()
+
+    threading.Thread(target=accept_loop, daemon=True).start()
+    processes = (spawn_local_workers(worker_command, bound, local_workers, authkey)
+                 if local_workers > 0 and worker_command else [])
+
+    try:
+        while not board.finished.wait(timeout=1.0):
+            idle = board.idle_seconds()
+            if processes and idle > 0 and all(p.poll() is not None for p in processes):
+                board.abandon("로컬 워커가 모두 종료되었고 연결된 워커가 없습니다")
+            elif idle_timeout is not None and idle > idle_timeout:
+                board.abandon(f"{idle_timeout:.0f}초 동안 연결된 워커가 없습니다")
+    finally:
+        listener.close()
+        writer.close()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    print()
+
+    for shard_id in board.failed:
+        for date in shards[shard_id]:
+            for interval in time_intervals:
+                completed.setdefault((date, interval), {'status': STATUS_ERROR, 'error': board.failed[shard_id],
+                                                        'date': date, 'interval': interval})
+
+    print(f"✅ 샤드 실행 완료: {len(shards) - len(board.failed)}/{len(shards)}개 성공 ({format_time(time.time() - start_time)})")
+    return [completed[(date, interval)] for date in date_list for interval in time_intervals
+            if (date, interval) in completed]
+
+def run_worker(task: Callable[[str, str], Dict], address: str, workers: int = 1,
+               connect_timeout: float = 30.0, prefetch_depth: int = 0) -> int:
+    """코디네이터에 접속해 샤드를 받아 처리하고 레코드를 돌려보냅니다. 처리한 샤드 수를 반환합니다.
+
+    샤드 안의 날짜는 run_date_tasks 로 workers 개 프로세스에 나누어 실행합니다 (workers 가 1이면 prefetch_depth 만큼 미리 읽음).
+    인증 키는 RUST_CORE_SHARD_AUTHKEY 환경 변수로 받습니다 (코디네이터가 띄운 로컬 워커는 자동으로 전달됨).
+    에러 레코드를 포함한 모든 레코드를 돌려보내며, 코디네이터가 에러나 누락이 있는 (date, interval) 만 다시 보냅니다.
+    """
+    host, port = parse_address(address)
+    authkey = _worker_authkey().encode("utf-8")
+    deadline = time.time() + connect_timeout
+    while True:
+        try:
+            conn = Client((host, port), authkey=authkey)
+            break
+        except (ConnectionRefusedError, OSError) as e:
+            if time.time() >= deadline:
+                raise ConnectionError(f"코디네이터 접속 실패: {address} ({e})")
+            time.sleep(0.5)
+
+    processed = 0
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        conn.send({"type": "hello", "host": socket.gethostname(), "pid": os.getpid()})
+        while True:
+            message = conn.recv()
+            if message.get("type") != "shard":
+                break
+            started = time.time()
+            try:
+                records = run_date_tasks(task, message["dates"], message["intervals"],
+                                         workers=workers, show_progress=False, prefetch_depth=prefetch_depth)
+            except Exception as e:
+                conn.send({"type": "failed", "shard": message["shard"], "error": f"{type(e).__name__}: {e}"})
+                continue
+            # 에러 레코드와 누락된 쌍은 코디네이터가 골라 그 쌍만 재시도
+            conn.send({"type": "done", "shard": message["shard"], "records": records})
+            processed += 1
+            dates = message["dates"]
+            errors = sum(1 for record in records if record.get('status') == STATUS_ERROR)
+            print(f"🧩 [{worker}] 샤드 {message['shard']} ({dates[0]}~{dates[-1]}) 완료 "
+                  f"(에러 {errors}건, {format_time(time.time() - started)})", flush=True)
+    except (EOFError, OSError):
+        pass  # 코디네이터 종료
+    finally:
+        conn.close()
+    return processed
+
+def worker_command_for(script_path: str, extra_args: Optional[List[str]] = None) -> List[str]:
+    """로컬 워커 실행 명령 (현재 파이썬으로 같은 스크립트를 워커 모드로 실행)"""
+    return [sys.executable, os.path.abspath(script_path)] + (extra_args or [])
+
@@ -0,0 +1,69 @@
+import os
+import argparse
+import rust_core
+import logging
+import time
+import numpy as np
+from multiprocessing import Pool
+from build_archive import weekdays_between
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+os.environ["RUST_LOG"] = "info"
+
+DB_PATH = "D:/db/stock_price(5min).db"
+
+def worker_top_movers(args):
+    """워커: 공유 스냅샷에 붙어 09:00~10:00 상승률 상위 종목 계산 (봉을 다시 읽지 않음)"""
+    date, db_path, snapshot_dir = args
+    snap = rust_core.attach_day_snapshot(date, db_path=db_path, snapshot_dir=snapshot_dir, publish=False)
+    offsets, dates, opens, closes = snap['offsets'], snap['date'], snap['open'], snap['close']
+    cutoff = int(date.replace("-", "")) * 10000 + 1000
+    rates = np.full(len(snap['codes']), np.nan)
+    for i in range(len(snap['codes'])):
+        lo, hi = offsets[i], offsets[i + 1]
+        end = lo + np.searchsorted(dates[lo:hi], cutoff, side="right")
+        if end > lo and opens[lo] > 0:
+            rates[i] = (closes[end - 1] - opens[lo]) / opens[lo] * 100.0
+    top = np.argsort(-np.nan_to_num(rates, nan=-np.inf))[:5]
+    return date, [(snap['codes'][i], float(rates[i])) for i in top]
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="일별 스냅샷을 공유 메모리에 발행하고 여러 워커 프로세스가 복사 없이 사용")
+    parser.add_argument("--start", type=str, required=True, help="시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, required=True, help="종료 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--db", type=str, default=DB_PATH, help="5분봉 DB 또는 아카이브(.rca) 경로")
+    parser.add_argument("--snapshot-dir", type=str, default=None, help="스냅샷 폴더 (기본: /dev/shm/rust_core_snapshots)")
+    parser.add_argument("--workers", type=int, default=4, help="워커 프로세스 수")
+    parser.add_argument("--cleanup", action="store_true", help="끝난 뒤 발행한 스냅샷 삭제")
+    args = parser.parse_args()
+
+    dates = weekdays_between(args.start, args.end)
+    print(f"🧊 스냅샷 발행: {len(dates)}일")
+    start_time = time.time()
+    published = []
+    for date in dates:
+        info = rust_core.publish_day_snapshot(date, db_path=args.db, snapshot_dir=args.snapshot_dir)
+        if info['bars'] > 0:
+            published.append(date)
+        status = "새로 발행" if info['created'] else "기존 사용"
+        print(f"   {date}: {info['tickers']:,}개 종목, {info['bars']:,}개 봉, {info['bytes'] / 2**20:,.1f} MiB ({status})")
+    print(f"   ({time.time() - start_time:.2f}초)")
+
+    print(f"\n👷 워커 {args.workers}개로 {len(published)}일 처리")
+    start_time = time.time()
+    with Pool(args.workers) as pool:
+        results = pool.map(worker_top_movers, [(d, args.db, args.snapshot_dir) for d in published])
+    for date, top in results:
+        print(f"   {date}: " + ", ".join(f"{code} {rate:+.2f}%" for code, rate in top))
+    print(f"   ({time.time() - start_time:.2f}초)")
+
+    if args.cleanup:
+        removed = rust_core.remove_day_snapshots(snapshot_dir=args.snapshot_dir)
+        print(f"\n🧹 스냅샷 {removed}개 삭제")
+
+    print("\n✅ 완료")
+
+if __name__ == "__main__":
+    main()
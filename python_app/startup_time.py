@@ -0,0 +1,62 @@
+import os
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# 새 프로세스에서 import → initialize → 첫 결과까지 시간을 재는 코드
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import rust_core
+t1 = time.perf_counter()
+info = rust_core.initialize()
+t2 = time.perf_counter()
+date, hhmm = sys.argv[1], sys.argv[2]
+if date:
+    rust_core.evaluate_d_for_date_and_time(date, hhmm)
+else:
+    rust_core.screen_columns()
+t3 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "init_ms": (t2 - t1) * 1000,
+                  "first_ms": (t3 - t2) * 1000, "total_ms": (t3 - t0) * 1000,
+                  "sector_source": info["sector_source"], "stocks": info["stocks"]}))
+"""
+
+def run_probe(date, hhmm):
+    """콜드 프로세스 한 번 실행 결과"""
+    env = dict(os.environ, RUST_LOG="warn", RUST_CORE_DAEMON="off")
+    out = subprocess.run([sys.executable, "-c", PROBE, date or "", hhmm], capture_output=True, text=True, env=env, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="새 프로세스에서 rust_core import 부터 첫 결과까지 걸리는 시간 측정")
+    parser.add_argument("--runs", type=int, default=10, help="측정 횟수")
+    parser.add_argument("--date", type=str, default=None, help="첫 결과로 D 평가를 실행할 날짜 (없으면 DB 없이 측정)")
+    parser.add_argument("--time", type=str, default="1000", help="D 평가 시간 (HHMM)")
+    parser.add_argument("--target-ms", type=float, default=200.0, help="import → 첫 결과 목표 시간 (ms, 중앙값 기준)")
+    args = parser.parse_args()
+
+    print(f"⏱️ 콜드 시작 측정: {args.runs}회")
+    results = [run_probe(args.date, args.time) for _ in range(args.runs)]
+    first = results[0]
+    print(f"   업종 표: {first['sector_source']} ({first['stocks']:,}개 종목)")
+    for key, label in [("import_ms", "import"), ("init_ms", "initialize"), ("first_ms", "첫 결과"), ("total_ms", "합계")]:
+        values = [r[key] for r in results]
+        print(f"   {label:>10}: 중앙값 {statistics.median(values):8.1f}ms, 최대 {max(values):8.1f}ms")
+
+    median_total = statistics.median(r["total_ms"] for r in results)
+    if median_total <= args.target_ms:
+        print(f"\n✅ 목표 달성: {median_total:.1f}ms <= {args.target_ms:.0f}ms")
+    else:
+        print(f"\n❌ 목표 초과: {median_total:.1f}ms > {args.target_ms:.0f}ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
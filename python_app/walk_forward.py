@@ -0,0 +1,176 @@
+import os
+import csv
+import argparse
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+from analyze_3m_performance import (COMMISSION_RATE, PREFETCH_DEPTH, evaluate_attempt,
+                                    generate_date_list, generate_time_intervals)
+from parallel_runner import run_date_tasks, load_checkpoint, task_id, STATUS_SUCCESS
+
+os.environ["RUST_LOG"] = "warn"
+
+# 기본 롤링 윈도우 길이 (거래일)
+DEFAULT_WINDOWS = (20, 60)
+
+# 집계 그룹: ("all", "전체"), ("interval", "0930"), ("sector", "반도체") 형태의 키
+GroupKey = Tuple[str, str]
+
+class RollingStats:
+    """윈도우 안의 선별 건수, 상승률 합계, 수수료 초과 건수를 유지합니다.
+
+    하루치 묶음이 윈도우에 들어오고 나갈 때 더하고 빼기만 하므로 갱신 비용이 윈도우 길이와 무관합니다.
+    """
+
+    __slots__ = ("count", "total", "wins")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.wins = 0
+
+    def add(self, other: "RollingStats", sign: int = 1):
+        self.count += sign * other.count
+        self.total += sign * other.total
+        self.wins += sign * other.wins
+
+    def add_rate(self, rate: float):
+        self.count += 1
+        self.total += rate
+        if rate > COMMISSION_RATE:
+            self.wins += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        """calculate_win_rate 와 같은 정의 (수수료 초과 비율, %)"""
+        return self.wins / self.count * 100 if self.count else 0.0
+
+def day_buckets(records: Iterable[Dict]) -> Dict[GroupKey, RollingStats]:
+    """하루치 레코드를 전체/시간대/업종 그룹별로 한 번에 집계합니다."""
+    buckets: Dict[GroupKey, RollingStats] = {}
+    for record in records:
+        if record['status'] != STATUS_SUCCESS:
+            continue
+        _, _, sector = record['stock']
+        for key in (("all", "전체"), ("interval", record['interval']), ("sector", sector or "미분류")):
+            buckets.setdefault(key, RollingStats()).add_rate(record['rate'])
+    return buckets
+
+class WalkForwardEvaluator:
+    """일별 결과를 한 번만 읽으면서 여러 길이의 롤링 윈도우를 동시에 갱신합니다.
+
+    선별 결과가 없는 날(휴장일, 데이터 없음)은 윈도우를 움직이지 않으므로 윈도우 길이는 거래일 기준입니다.
+    """
+
+    def __init__(self, windows: Iterable[int] = DEFAULT_WINDOWS):
+        self.windows = sorted(set(windows))
+        if not self.windows or self.windows[0] <= 0:
+            raise ValueError(f"윈도우 길이는 양수여야 합니다: {windows}")
+        self.days: Deque[Tuple[str, Dict[GroupKey, RollingStats]]] = deque()
+        self.aggregates: Dict[int, Dict[GroupKey, RollingStats]] = {w: {} for w in self.windows}
+        # series[window][group] = [(date, count, mean, win_rate), ...]
+        self.series: Dict[int, Dict[GroupKey, List[Tuple[str, int, float, float]]]] = {w: {} for w in self.windows}
+
+    def push_day(self, date: str, records: Iterable[Dict]) -> bool:
+        """하루를 윈도우에 넣고, 각 윈도우에서 빠지는 날을 뺀 뒤 시계열에 한 점씩 추가합니다."""
+        buckets = day_buckets(records)
+        if not buckets:
+            return False
+
+        self.days.append((date, buckets))
+        for window in self.windows:
+            aggregate = self.aggregates[window]
+            for key, stats in buckets.items():
+                aggregate.setdefault(key, RollingStats()).add(stats)
+            # 가장 긴 윈도우만큼만 보관하므로 window 일 전 묶음은 뒤에서 인덱스로 찾음
+            if len(self.days) > window:
+                _, leaving = self.days[-window - 1]
+                for key, stats in leaving.items():
+                    aggregate[key].add(stats, -1)
+
+            series = self.series[window]
+            for key, stats in aggregate.items():
+                if stats.count > 0:
+                    series.setdefault(key, []).append((date, stats.count, stats.mean, stats.win_rate))
+
+        if len(self.days) > self.windows[-1]:
+            self.days.popleft()
+        return True
+
+    def latest(self, window: int, kind: str) -> List[Tuple[str, int, float, float]]:
+        """윈도우의 마지막 날 기준 그룹별 (그룹, 건수, 평균, 승률)"""
+        rows = []
+        for (group_kind, name), stats in self.aggregates[window].items():
+            if group_kind == kind and stats.count > 0:
+                rows.append((name, stats.count, stats.mean, stats.win_rate))
+        return sorted(rows)
+
+def evaluate_walk_forward(records: List[Dict], windows: Iterable[int] = DEFAULT_WINDOWS) -> WalkForwardEvaluator:
+    """(date, interval) 레코드를 날짜순으로 한 번 훑어 롤링 통계를 계산합니다."""
+    by_date: Dict[str, List[Dict]] = {}
+    for record in records:
+        by_date.setdefault(record['date'], []).append(record)
+
+    evaluator = WalkForwardEvaluator(windows)
+    for date in sorted(by_date):
+        evaluator.push_day(date, by_date[date])
+    return evaluator
+
+def load_records(checkpoint_path: Optional[str], workers: int) -> List[Dict]:
+    """체크포인트가 있으면 그대로 읽고, 없거나 미완료면 analyze_3m_performance 와 같은 작업으로 채웁니다."""
+    date_list = generate_date_list(90)
+    time_intervals = generate_time_intervals()
+    completed = load_checkpoint(checkpoint_path, expected_task=task_id(evaluate_attempt))
+    if completed and len(completed) >= len(date_list) * len(time_intervals):
+        return list(completed.values())
+    return run_date_tasks(evaluate_attempt, date_list, time_intervals,
+                          workers=workers, checkpoint_path=checkpoint_path, prefetch_depth=PREFETCH_DEPTH)
+
+def write_series_csv(evaluator: WalkForwardEvaluator, output_path: str):
+    """전체 시계열을 window, kind, group, date, count, mean_rate, win_rate 열의 CSV 로 저장합니다."""
+    with open(output_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["window", "kind", "group", "date", "count", "mean_rate", "win_rate"])
+        for window, groups in evaluator.series.items():
+            for (kind, name), points in sorted(groups.items()):
+                for date, count, mean, win_rate in points:
+                    writer.writerow([window, kind, name, date, count, f"{mean:.4f}", f"{win_rate:.2f}"])
+
+def print_walk_forward(evaluator: WalkForwardEvaluator):
+    """윈도우별 마지막 날 기준 전체/시간대/업종 통계를 출력합니다."""
+    if not evaluator.days:
+        print("⚠️ 선별 결과가 있는 날짜가 없습니다")
+        return
+
+    last_date = evaluator.days[-1][0]
+    for window in evaluator.windows:
+        print(f"\n📈 최근 {window}거래일 ({last_date} 기준, 승률 = 수수료 {COMMISSION_RATE}% 초과)")
+        for name, count, mean, win_rate in evaluator.latest(window, "all"):
+            print(f"  - {name}: {count}회, 평균 {mean:.2f}%, 승률 {win_rate:.1f}%")
+
+        print(f"  ⏰ 시간대별:")
+        for name, count, mean, win_rate in evaluator.latest(window, "interval"):
+            print(f"    {name}: {count}회, 평균 {mean:.2f}%, 승률 {win_rate:.1f}%")
+
+        print(f"  🏭 업종별 (선별 횟수 상위 10):")
+        sectors = sorted(evaluator.latest(window, "sector"), key=lambda row: row[1], reverse=True)
+        for name, count, mean, win_rate in sectors[:10]:
+            print(f"    {name}: {count}회, 평균 {mean:.2f}%, 승률 {win_rate:.1f}%")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="D 전략 롤링 윈도우 워크포워드 평가")
+    parser.add_argument("--windows", type=int, nargs="+", default=list(DEFAULT_WINDOWS), help="롤링 윈도우 길이 (거래일)")
+    parser.add_argument("--checkpoint", type=str, default=None, help="analyze_3m_performance 체크포인트 파일 (없으면 새로 실행)")
+    parser.add_argument("--workers", type=int, default=1, help="체크포인트가 없을 때 사용할 워커 프로세스 수")
+    parser.add_argument("--output", type=str, default=None, help="전체 시계열을 저장할 CSV 경로")
+    args = parser.parse_args()
+
+    evaluator = evaluate_walk_forward(load_records(args.checkpoint, args.workers), args.windows)
+    print_walk_forward(evaluator)
+
+    if args.output:
+        write_series_csv(evaluator, args.output)
+        print(f"\n💾 시계열 저장: {args.output}")
@@ -0,0 +1,543 @@
+// 압축 컬럼형 5분봉 아카이브
+// SQLite 5분봉 DB를 거래일 단위 블록으로 다시 써서 장기 백테스트가 읽는 바이트 수를 줄입니다.
+//
+// 파일 구조: [MAGIC][버전] [블록 ...] [인덱스] [인덱스 위치 u64][MAGIC]
+// 블록 하나 = 하루치 전 종목. 종목-날짜 구간마다 컬럼별로 연속 저장합니다.
+//   시각: 직전 봉 HHMM 과의 차이 (첫 봉은 09:00 기준)
+//   시가: 직전 봉 종가와의 차이 (첫 봉은 절대값)
+//   종가: 같은 봉 시가와의 차이
+//   고가/저가: max(시가, 종가) 위 / min(시가, 종가) 아래로 벌어진 폭
+//   거래량: 그대로
+// 모든 값은 zigzag varint 이므로 호가 단위 수준의 작은 차이는 1~2바이트로 끝납니다.
+// 인덱스에는 종목 목록(DB 테이블 순서)과 날짜별 블록 위치가 들어 있어 날짜 하나를 seek 한 번으로 읽습니다.
+
+use std::collections::{BTreeMap, HashMap};
+use std::fs::{self, File};
+use std::io::{BufWriter, Read, Seek, SeekFrom, Write};
+use std::sync::{Arc, Mutex};
+use once_cell::sync::Lazy;
+use log::{debug, info, warn};
+use crate::core::{bar_time, quality, trace};
+use crate::core::cache::{ByteReader, ByteWriter};
+use crate::core::day_data::{bar_trade_value, DayData, TickerDay};
+use crate::features::db;
+
+/// 아카이브 파일 확장자 (db_path 가 이 확장자로 끝나면 SQLite 대신 아카이브를 읽음)
+pub const ARCHIVE_EXTENSION: &str = ".rca";
+/// 아카이브 기본 경로
+pub const DEFAULT_ARCHIVE_PATH: &str = "D:/db/stock_price(5min).rca";
+const MAGIC: &[u8; 8] = b"RCARCH\0\0";
+const VERSION: u8 = 1;
+/// 시각 차분의 기준 (09:00)
+const BASE_HHMM: i64 = 900;
+
+/// 날짜별 블록 위치
+#[derive(Debug, Clone, Copy, PartialEq)]
+pub struct BlockEntry {
+    pub date_num: i64,
+    pub offset: u64,
+    pub len: u64,
+    pub bars: u64,
+}
+
+/// 아카이브 요약
+#[derive(Debug, Clone, Copy, Default, PartialEq)]
+pub struct ArchiveSummary {
+    pub days: usize,
+    pub tables: usize,
+    pub bars: u64,
+    pub bytes: u64,
+}
+
+pub fn is_archive_path(path: &str) -> bool {
+    path.ends_with(ARCHIVE_EXTENSION)
+}
+
+/// 종목-날짜 구간 하나를 블록 버퍼에 추가
+fn encode_ticker_day(out: &mut ByteWriter, id: usize, t: &TickerDay) {
+    out.uvar(id as u64);
+    out.uvar(t.len() as u64);
+
+    let mut prev = BASE_HHMM;
+    for &date in &t.dates {
+        let hhmm = date % 10000;
+        out.ivar(hhmm - prev);
+        prev = hhmm;
+    }
+    let mut prev_close = 0;
+    for (&open, &close) in t.open.iter().zip(&t.close) {
+        out.ivar(open - prev_close);
+        prev_close = close;
+    }
+    for (&open, &close) in t.open.iter().zip(&t.close) {
+        out.ivar(close - open);
+    }
+    for i in 0..t.len() {
+        out.ivar(t.high[i] - t.open[i].max(t.close[i]));
+    }
+    for i in 0..t.len() {
+        out.ivar(t.open[i].min(t.close[i]) - t.low[i]);
+    }
+    for &volume in &t.volume {
+        out.ivar(volume);
+    }
+}
+
+/// encode_ticker_day 의 역변환 (종목 id 와 봉 개수는 이미 읽은 상태)
+fn decode_ticker_day(input: &mut ByteReader<'_>, table: &str, date_num: i64, n: usize) -> Result<TickerDay, String> {
+    let mut dates = Vec::with_capacity(n);
+    let mut prev = BASE_HHMM;
+    for _ in 0..n {
+        prev += input.ivar()?;
+        dates.push(bar_time::at(date_num, prev));
+    }
+    let mut open = Vec::with_capacity(n);
+    let mut close = Vec::with_capacity(n);
+    // 종가 차분이 시가 뒤에 저장되어 있으므로 시가 차분의 기준(직전 종가)은 종가를 읽은 뒤 복원
+    for _ in 0..n {
+        open.push(input.ivar()?);
+    }
+    let mut prev_close = 0;
+    for o in open.iter_mut() {
+        *o += prev_close;
+        let c = *o + input.ivar()?;
+        close.push(c);
+        prev_close = c;
+    }
+    let mut high = Vec::with_capacity(n);
+    for i in 0..n {
+        high.push(open[i].max(close[i]) + input.ivar()?);
+    }
+    let mut low = Vec::with_capacity(n);
+    for i in 0..n {
+        low.push(open[i].min(close[i]) - input.ivar()?);
+    }
+    let mut volume = Vec::with_capacity(n);
+    let mut tv_prefix = Vec::with_capacity(n + 1);
+    tv_prefix.push(0);
+    for i in 0..n {
+        let v = input.ivar()?;
+        volume.push(v);
+        tv_prefix.push(tv_prefix[i] + bar_trade_value(open[i], close[i], v));
+    }
+    Ok(TickerDay { table: table.to_string(), dates, open, high, low, close, volume, tv_prefix })
+}
+
+/// 하루치 블록을 만드는 중인 버퍼
+#[derive(Default)]
+pub struct BlockBuilder {
+    out: ByteWriter,
+    tickers: u64,
+    bars: u64,
+}
+
+impl BlockBuilder {
+    /// 봉이 없는 종목-날짜는 저장하지 않음 (읽을 때 빈 종목으로 채움)
+    pub fn push(&mut self, id: usize, ticker: &TickerDay) {
+        if ticker.len() == 0 {
+            return;
+        }
+        encode_ticker_day(&mut self.out, id, ticker);
+        self.tickers += 1;
+        self.bars += ticker.len() as u64;
+    }
+}
+
+/// 아카이브 파일 쓰기 (블록은 날짜 오름차순으로 추가)
+pub struct ArchiveWriter {
+    file: BufWriter<File>,
+    tables: Vec<String>,
+    blocks: Vec<BlockEntry>,
+    offset: u64,
+}
+
+impl ArchiveWriter {
+    pub fn create(path: &str, tables: Vec<String>) -> Result<Self, Box<dyn std::error::Error>> {
+        let mut file = BufWriter::new(File::create(path)?);
+        file.write_all(MAGIC)?;
+        file.write_all(&[VERSION])?;
+        Ok(Self { file, tables, blocks: Vec::new(), offset: MAGIC.len() as u64 + 1 })
+    }
+
+    pub fn write_block(&mut self, date_num: i64, block: BlockBuilder) -> Result<(), Box<dyn std::error::Error>> {
+        if let Some(last) = self.blocks.last() {
+            if last.date_num >= date_num {
+                return Err(format!("아카이브 블록은 날짜 오름차순이어야 합니다: {} 다음 {}", last.date_num, date_num).into());
+            }
+        }
+        let mut head = ByteWriter::default();
+        head.uvar(block.tickers);
+        self.file.write_all(&head.buf)?;
+        self.file.write_all(&block.out.buf)?;
+        let len = (head.buf.len() + block.out.buf.len()) as u64;
+        self.blocks.push(BlockEntry { date_num, offset: self.offset, len, bars: block.bars });
+        self.offset += len;
+        Ok(())
+    }
+
+    /// DayData 하나를 블록으로 저장 (종목은 아카이브 종목 목록에서 이름으로 찾음)
+    #[cfg(test)]
+    pub fn write_day(&mut self, day: &DayData) -> Result<(), Box<dyn std::error::Error>> {
+        let ids: HashMap<&str, usize> = self.tables.iter().enumerate().map(|(i, t)| (t.as_str(), i)).collect();
+        let mut block = BlockBuilder::default();
+        for ticker in &day.tickers {
+            let id = *ids.get(ticker.table.as_str())
+                .ok_or_else(|| format!("아카이브 종목 목록에 없는 종목입니다: {}", ticker.table))?;
+            block.push(id, ticker);
+        }
+        self.write_block(day.date_num, block)
+    }
+
+    /// 인덱스와 꼬리말을 쓰고 닫기
+    pub fn finish(mut self) -> Result<ArchiveSummary, Box<dyn std::error::Error>> {
+        let mut index = ByteWriter::default();
+        index.u64(self.tables.len() as u64);
+        for table in &self.tables {
+            index.str(table);
+        }
+        index.u64(self.blocks.len() as u64);
+        for block in &self.blocks {
+            index.i64(block.date_num);
+            index.u64(block.offset);
+            index.u64(block.len);
+            index.u64(block.bars);
+        }
+        self.file.write_all(&index.buf)?;
+        self.file.write_all(&self.offset.to_le_bytes())?;
+        self.file.write_all(MAGIC)?;
+        self.file.flush()?;
+
+        Ok(ArchiveSummary {
+            days: self.blocks.len(),
+            tables: self.tables.len(),
+            bars: self.blocks.iter().map(|b| b.bars).sum(),
+            bytes: self.offset + index.buf.len() as u64 + 8 + MAGIC.len() as u64,
+        })
+    }
+}
+
+/// 열린 아카이브 (인덱스만 메모리에 두고 블록은 날짜마다 읽음)
+#[derive(Debug)]
+pub struct Archive {
+    pub path: String,
+    pub tables: Vec<String>,
+    pub blocks: Vec<BlockEntry>,
+    by_date: HashMap<i64, usize>,
+    bytes: u64,
+}
+
+impl Archive {
+    pub fn open(path: &str) -> Result<Self, Box<dyn std::error::Error>> {
+        let _span = trace::span("archive.open");
+        let mut file = File::open(path)?;
+        let bytes = file.metadata()?.len();
+        let footer_len = 8 + MAGIC.len() as u64;
+        let header_len = MAGIC.len() as u64 + 1;
+        if bytes < header_len + footer_len {
+            return Err(format!("아카이브 파일이 너무 작습니다: {} ({}바이트)", path, bytes).into());
+        }
+
+        let mut header = [0u8; 9];
+        file.read_exact(&mut header)?;
+        if &header[..8] != MAGIC {
+            return Err(format!("아카이브 파일이 아닙니다: {}", path).into());
+        }
+        if header[8] != VERSION {
+            return Err(format!("지원하지 않는 아카이브 버전입니다: {} (버전 {})", path, header[8]).into());
+        }
+
+        let mut footer = [0u8; 16];
+        file.seek(SeekFrom::End(-(footer_len as i64)))?;
+        file.read_exact(&mut footer)?;
+        if &footer[8..] != MAGIC {
+            return Err(format!("아카이브 꼬리말이 손상되었습니다 (쓰기 도중 중단?): {}", path).into());
+        }
+        let index_offset = u64::from_le_bytes(footer[..8].try_into().unwrap());
+        if index_offset < header_len || index_offset > bytes - footer_len {
+            return Err(format!("아카이브 인덱스 위치가 잘못되었습니다: {}", index_offset).into());
+        }
+
+        let mut index = vec![0u8; (bytes - footer_len - index_offset) as usize];
+        file.seek(SeekFrom::Start(index_offset))?;
+        file.read_exact(&mut index)?;
+        let mut input = ByteReader::new(&index);
+        let n_tables = input.u64()? as usize;
+        let tables = (0..n_tables).map(|_| input.str()).collect::<Result<Vec<_>, _>>()?;
+        let n_blocks = input.u64()? as usize;
+        let mut blocks = Vec::with_capacity(n_blocks);
+        for _ in 0..n_blocks {
+            let block = BlockEntry { date_num: input.i64()?, offset: input.u64()?, len: input.u64()?, bars: input.u64()? };
+            if block.offset + block.len > index_offset {
+                return Err(format!("{} 블록이 인덱스 영역을 침범합니다", block.date_num).into());
+            }
+            blocks.push(block);
+        }
+        let by_date = blocks.iter().enumerate().map(|(i, b)| (b.date_num, i)).collect();
+
+        debug!("🗜️ 아카이브 열기: {} ({}일, {}개 종목)", path, blocks.len(), tables.len());
+        Ok(Self { path: path.to_string(), tables, blocks, by_date, bytes })
+    }
+
+    pub fn dates(&self) -> Vec<i64> {
+        self.blocks.iter().map(|b| b.date_num).collect()
+    }
+
+    pub fn summary(&self) -> ArchiveSummary {
+        ArchiveSummary {
+            days: self.blocks.len(),
+            tables: self.tables.len(),
+            bars: self.blocks.iter().map(|b| b.bars).sum(),
+            bytes: self.bytes,
+        }
+    }
+
+    /// 하루치 읽기. 종목 순서는 아카이브를 만든 DB의 테이블 순서이고 DayData::load 와 같게
+    /// 봉이 없거나 격리된 종목-날짜는 빈 데이터로 둡니다.
+    /// 아카이브 기간 밖의 날짜는 에러 (기간 안에서 블록이 없는 휴장일은 빈 데이터)
+    pub fn read_day(&self, date_num: i64) -> Result<DayData, Box<dyn std::error::Error>> {
+        let _span = trace::span("archive.read_day");
+        let mut tickers: Vec<TickerDay> = self.tables.iter().map(|t| TickerDay::from_rows(t, vec![])).collect();
+        let i = match self.by_date.get(&date_num) {
+            Some(&i) => i,
+            None => {
+                match (self.blocks.first(), self.blocks.last()) {
+                    (Some(first), Some(last)) if (first.date_num..=last.date_num).contains(&date_num) => {
+                        warn!("⚠️ 아카이브 기간 안이지만 {} 블록이 없습니다 (휴장일?): {}", date_num, self.path);
+                        return Ok(DayData { date_num, tickers });
+                    },
+                    (Some(first), Some(last)) => {
+                        return Err(format!("{} 는 아카이브 기간({}~{}) 밖입니다: {}", date_num, first.date_num, last.date_num, self.path).into());
+                    },
+                    _ => return Err(format!("빈 아카이브입니다: {}", self.path).into()),
+                }
+            }
+        };
+        let block = self.blocks[i];
+
+        let mut buf = vec![0u8; block.len as usize];
+        let mut file = File::open(&self.path)?;
+        file.seek(SeekFrom::Start(block.offset))?;
+        file.read_exact(&mut buf)?;
+
+        let _decode = trace::span("archive.decode");
+        let mut input = ByteReader::new(&buf);
+        let n = input.uvar()?;
+        for _ in 0..n {
+            let id = input.uvar()? as usize;
+            let bars = input.uvar()? as usize;
+            let table = self.tables.get(id)
+                .ok_or_else(|| format!("{} 블록의 종목 번호가 범위를 벗어났습니다: {}", date_num, id))?;
+            tickers[id] = decode_ticker_day(&mut input, table, date_num, bars)?;
+        }
+        if input.remaining() != 0 {
+            return Err(format!("{} 블록 끝에 해석하지 못한 {}바이트가 남았습니다", date_num, input.remaining()).into());
+        }
+
+        let quarantine = quality::QUARANTINE.read().unwrap();
+        for ticker in tickers.iter_mut() {
+            if quarantine.contains(&ticker.table, date_num) {
+                *ticker = TickerDay::from_rows(&ticker.table, vec![]);
+            }
+        }
+        Ok(DayData { date_num, tickers })
+    }
+}
+
+/// 경로별로 한 번만 연 아카이브와 열 때의 수정 시각 (인덱스 재해석 방지)
+static OPENED: Lazy<Mutex<HashMap<String, (u64, Arc<Archive>)>>> = Lazy::new(|| Mutex::new(HashMap::new()));
+
+/// 경로의 아카이브를 공유해서 열기 (파일 수정 시각이 바뀌었으면 다시 열어 다시 만든 아카이브를 반영)
+pub fn shared(path: &str) -> Result<Arc<Archive>, Box<dyn std::error::Error>> {
+    let stamp = db::modified_stamp(path);
+    if let Some((opened_stamp, archive)) = OPENED.lock().unwrap().get(path) {
+        if *opened_stamp == stamp {
+            return Ok(archive.clone());
+        }
+        debug!("🔄 아카이브가 바뀌어 다시 엽니다: {}", path);
+    }
+    let archive = Arc::new(Archive::open(path)?);
+    OPENED.lock().unwrap().insert(path.to_string(), (stamp, archive.clone()));
+    Ok(archive)
+}
+
+/// start..=end (YYYYMMDD) 를 달 단위 구간으로 나누기
+fn month_ranges(start: i64, end: i64) -> Vec<(i64, i64)> {
+    let mut ranges = Vec::new();
+    let (mut year, mut month) = (start / 10000, start / 100 % 100);
+    while year * 100 + month <= end / 100 {
+        let ym = year * 100 + month;
+        ranges.push(((ym * 100 + 1).max(start), (ym * 100 + 31).min(end)));
+        month += 1;
+        if month > 12 {
+            year += 1;
+            month = 1;
+        }
+    }
+    ranges
+}
+
+type NullableRow = (i64, Option<i64>, Option<i64>, Option<i64>, Option<i64>, Option<i64>);
+
+/// 종목 하나의 구간 봉을 날짜별 블록에 나눠 담기.
+/// DayData::load 에서 행 하나만 읽기에 실패해도 그 종목-날짜 전체가 빈 데이터가 되므로, NULL 이 있는 날은 통째로 뺍니다.
+fn push_range_rows(blocks: &mut BTreeMap<i64, BlockBuilder>, id: usize, table: &str, rows: Vec<NullableRow>) {
+    let mut i = 0;
+    while i < rows.len() {
+        let date_num = rows[i].0 / 10000;
+        let end = i + rows[i..].partition_point(|r| r.0 / 10000 == date_num);
+        let complete: Option<Vec<_>> = rows[i..end].iter()
+            .map(|&(date, o, h, l, c, v)| Some((date, o?, h?, l?, c?, v?)))
+            .collect();
+        if let Some(bars) = complete {
+            blocks.entry(date_num).or_default().push(id, &TickerDay::from_rows(table, bars));
+        }
+        i = end;
+    }
+}
+
+/// 5분봉 DB의 start..=end 구간을 아카이브로 저장 (임시 파일에 쓴 뒤 이름 변경)
+pub fn build_archive(db_path: &str, out_path: &str, start: i64, end: i64) -> Result<ArchiveSummary, Box<dyn std::error::Error>> {
+    let _span = trace::span("archive.build");
+    if start > end {
+        return Err(format!("시작 날짜가 종료 날짜보다 늦습니다: {} > {}", start, end).into());
+    }
+    let tmp_path = format!("{}.tmp", out_path);
+    let summary = match write_archive(db_path, &tmp_path, start, end) {
+        Ok(summary) => summary,
+        Err(e) => {
+            // 실패하면 쓰다 만 임시 파일을 남기지 않음
+            let _ = fs::remove_file(&tmp_path);
+            return Err(e);
+        }
+    };
+    fs::rename(&tmp_path, out_path)?;
+    OPENED.lock().unwrap().remove(out_path);
+    info!("🗜️ 아카이브 생성 완료: {} ({}일, {}개 봉, {}바이트)", out_path, summary.days, summary.bars, summary.bytes);
+    Ok(summary)
+}
+
+fn write_archive(db_path: &str, tmp_path: &str, start: i64, end: i64) -> Result<ArchiveSummary, Box<dyn std::error::Error>> {
+    let conn = db::open(db_path)?;
+    let tables = db::get_all_tables(&conn)?;
+    let mut writer = ArchiveWriter::create(tmp_path, tables.clone())?;
+
+    for (from, to) in month_ranges(start, end) {
+        let mut blocks: BTreeMap<i64, BlockBuilder> = BTreeMap::new();
+        for (id, table) in tables.iter().enumerate() {
+            let query = format!(
+                "SELECT date, open, high, low, close, volume FROM {} WHERE date BETWEEN ?1 AND ?2 ORDER BY date",
+                table
+            );
+            let mut stmt = conn.prepare(&query)?;
+            let rows = stmt
+                .query_map([from * 10000, to * 10000 + 2359], |row| {
+                    Ok((row.get(0)?, row.get(1)?, row.get(2)?, row.get(3)?, row.get(4)?, row.get(5)?))
+                })?
+                .collect::<Result<Vec<NullableRow>, _>>()?;
+            push_range_rows(&mut blocks, id, table, rows);
+        }
+        let days = blocks.len();
+        for (date_num, block) in blocks {
+            writer.write_block(date_num, block)?;
+        }
+        debug!("🗜️ {}~{} 아카이브 블록 {}개 저장", from, to, days);
+    }
+    writer.finish()
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn sample_day() -> DayData {
+        let a = vec![
+            (20250430_0900, 10000, 10050, 9990, 10020, 1500),
+            (20250430_0905, 10020, 10020, 9900, 9950, 0),
+            // 09:10 빠짐, 고가가 시가/종가보다 낮은 이상치도 그대로 보존
+            (20250430_0915, 9950, 9940, 9800, 9960, 2_000_000),
+            (20250430_1000, 12000, 12100, 11900, 11950, 42),
+        ];
+        let b = vec![(20250430_1530, 500, 510, 495, 505, 7)];
+        DayData::from_tickers(20250430, vec![
+            TickerDay::from_rows("A000001", a),
+            TickerDay::from_rows("A000002", vec![]),
+            TickerDay::from_rows("A000003", b),
+        ])
+    }
+
+    #[test]
+    fn test_ticker_day_roundtrip() {
+        let day = sample_day();
+        let mut out = ByteWriter::default();
+        encode_ticker_day(&mut out, 0, &day.tickers[0]);
+        // 차분 인코딩으로 봉당 48바이트(i64 6개)보다 훨씬 작아야 함
+        assert!(out.buf.len() < day.tickers[0].len() * 16);
+
+        let mut input = ByteReader::new(&out.buf);
+        assert_eq!(input.uvar().unwrap(), 0);
+        let n = input.uvar().unwrap() as usize;
+        let decoded = decode_ticker_day(&mut input, "A000001", 20250430, n).unwrap();
+        let original = &day.tickers[0];
+        assert_eq!(input.remaining(), 0);
+        assert_eq!(decoded.dates, original.dates);
+        assert_eq!((&decoded.open, &decoded.high, &decoded.low, &decoded.close), (&original.open, &original.high, &original.low, &original.close));
+        assert_eq!(decoded.volume, original.volume);
+        assert_eq!(decoded.tv_prefix, original.tv_prefix);
+    }
+
+    #[test]
+    fn test_archive_file_roundtrip() {
+        let path = std::env::temp_dir().join(format!("rust_core_archive_test_{}{}", std::process::id(), ARCHIVE_EXTENSION));
+        let path = path.to_str().unwrap();
+        let tables: Vec<String> = ["A000001", "A000002", "A000003"].iter().map(|s| s.to_string()).collect();
+        let day = sample_day();
+
+        let mut writer = ArchiveWriter::create(path, tables).unwrap();
+        writer.write_day(&day).unwrap();
+        assert!(writer.write_day(&day).is_err());
+        writer.write_day(&DayData::from_tickers(20250506, vec![])).unwrap();
+        let summary = writer.finish().unwrap();
+        assert_eq!((summary.days, summary.bars), (2, 5));
+        assert_eq!(summary.bytes, fs::metadata(path).unwrap().len());
+
+        let archive = Archive::open(path).unwrap();
+        assert_eq!(archive.summary(), summary);
+        let decoded = archive.read_day(20250430).unwrap();
+        assert_eq!(decoded.tickers.len(), 3);
+        for (a, b) in decoded.tickers.iter().zip(&day.tickers) {
+            assert_eq!((&a.table, &a.dates, &a.close, &a.tv_prefix), (&b.table, &b.dates, &b.close, &b.tv_prefix));
+        }
+        // 기간 안에서 블록이 없는 날짜는 모든 종목이 빈 데이터, 기간 밖은 에러
+        assert!(archive.read_day(20250502).unwrap().tickers.iter().all(|t| t.len() == 0));
+        assert!(archive.read_day(20250601).is_err());
+        let _ = fs::remove_file(path);
+    }
+
+    #[test]
+    fn test_shared_reopens_rebuilt_archive() {
+        let path = std::env::temp_dir().join(format!("rust_core_archive_shared_{}{}", std::process::id(), ARCHIVE_EXTENSION));
+        let path = path.to_str().unwrap();
+        let write = |date_num: i64, mtime_secs: u64| {
+            let mut writer = ArchiveWriter::create(path, vec!["A000001".to_string()]).unwrap();
+            writer.write_day(&DayData::from_tickers(date_num, vec![TickerDay::from_rows("A000001", vec![])])).unwrap();
+            writer.finish().unwrap();
+            let mtime = std::time::UNIX_EPOCH + std::time::Duration::from_secs(mtime_secs);
+            fs::File::options().write(true).open(path).unwrap().set_modified(mtime).unwrap();
+        };
+
+        write(20250430, 1_700_000_000);
+        assert_eq!(shared(path).unwrap().dates(), vec![20250430]);
+        assert!(Arc::ptr_eq(&shared(path).unwrap(), &shared(path).unwrap()));
+
+        // 같은 경로에 다시 만든 아카이브는 수정 시각이 바뀌므로 새로 읽음
+        write(20250502, 1_700_000_100);
+        assert_eq!(shared(path).unwrap().dates(), vec![20250502]);
+        OPENED.lock().unwrap().remove(path);
+        let _ = fs::remove_file(path);
+    }
+
+    #[test]
+    fn test_month_ranges() {
+        assert_eq!(month_ranges(20241215, 20250210), vec![(20241215, 20241231), (20250101, 20250131), (20250201, 20250210)]);
+    }
+}
@@ -0,0 +1,124 @@
+// 5분봉 시각 모델
+// DB의 date 컬럼은 YYYYMMDDHHMM 정수이므로 시간 계산과 SQL 바인딩은 모두 정수로 처리하고,
+// 문자열은 파이썬 경계에서 한 번만 파싱합니다.
+
+/// 장 시작 시각 (09:00, 자정 기준 분)
+pub const SESSION_OPEN_MINUTES: i64 = 9 * 60;
+/// 봉 간격 (분)
+pub const SLOT_MINUTES: i64 = 5;
+
+/// 거래일 + 09:00 기준 5분 슬롯 번호 (슬롯 0 = 09:00, 1 = 09:05, ...) - 재생 배속 계산용
+///
+/// (day, slot) 순서가 곧 시간 순서이므로 정렬/비교가 정수 비교로 끝납니다.
+#[derive(Debug, Clone, Copy, PartialEq, Eq, PartialOrd, Ord)]
+pub struct BarTime {
+    /// YYYYMMDD
+    pub day: u32,
+    /// 09:00 이전 봉은 음수
+    pub slot: i16,
+}
+
+impl BarTime {
+    /// DB date 값 (YYYYMMDDHHMM, 5분 경계가 아니면 None)
+    pub fn from_db(value: i64) -> Option<Self> {
+        slot_of(value % 10000).map(|slot| Self { day: (value / 10000) as u32, slot: slot as i16 })
+    }
+}
+
+/// HHMM → 자정 기준 분
+#[inline]
+pub fn hhmm_to_minutes(hhmm: i64) -> i64 {
+    (hhmm / 100) * 60 + hhmm % 100
+}
+
+/// 자정 기준 분 → HHMM
+#[inline]
+pub fn minutes_to_hhmm(minutes: i64) -> i64 {
+    (minutes / 60) * 100 + minutes % 60
+}
+
+/// HHMM 에 분을 더한 HHMM (음수면 빼기)
+#[inline]
+pub fn plus_minutes(hhmm: i64, minutes: i64) -> i64 {
+    minutes_to_hhmm(hhmm_to_minutes(hhmm) + minutes)
+}
+
+/// HHMM → 슬롯 번호 (5분 경계가 아니면 None)
+pub fn slot_of(hhmm: i64) -> Option<i64> {
+    let offset = hhmm_to_minutes(hhmm) - SESSION_OPEN_MINUTES;
+    (offset % SLOT_MINUTES == 0).then(|| offset / SLOT_MINUTES)
+}
+
+/// 슬롯 번호 → HHMM
+pub fn slot_hhmm(slot: i64) -> i64 {
+    minutes_to_hhmm(SESSION_OPEN_MINUTES + slot * SLOT_MINUTES)
+}
+
+/// 하루 전체를 덮는 DB date 범위 [YYYYMMDD0000, YYYYMMDD2359]
+#[inline]
+pub fn day_range(date_num: i64) -> (i64, i64) {
+    (date_num * 10000, date_num * 10000 + 2359)
+}
+
+/// 날짜 + HHMM → DB date 값
+#[inline]
+pub fn at(date_num: i64, hhmm: i64) -> i64 {
+    date_num * 10000 + hhmm
+}
+
+/// to 부터 step 분씩 이전으로 first 까지의 시각 목록 (시간순)
+pub fn cutoffs_back_to(to: i64, first: i64, step: i64) -> Vec<i64> {
+    let mut cutoffs = Vec::new();
+    let mut current = to;
+    while current >= first {
+        cutoffs.push(current);
+        current = plus_minutes(current, -step);
+    }
+    cutoffs.reverse();
+    cutoffs
+}
+
+/// "YYYY-MM-DD" 또는 "YYYYMMDD" → YYYYMMDD
+pub fn parse_date(date: &str) -> Result<i64, String> {
+    let digits: String = date.chars().filter(|&c| c != '-').collect();
+    match digits.parse::<i64>() {
+        Ok(n) if digits.len() == 8 && (1..=12).contains(&(n / 100 % 100)) && (1..=31).contains(&(n % 100)) => Ok(n),
+        _ => Err(format!("날짜 형식 오류: {} (YYYY-MM-DD 또는 YYYYMMDD)", date)),
+    }
+}
+
+/// "HHMM" → HHMM
+pub fn parse_hhmm(time: &str) -> Result<i64, String> {
+    match time.parse::<i64>() {
+        Ok(t) if time.len() == 4 && t / 100 < 24 && t % 100 < 60 => Ok(t),
+        _ => Err(format!("시간 형식 오류: {} (HHMM)", time)),
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_bar_time_roundtrip() {
+        let t = BarTime::from_db(202504300935).unwrap();
+        assert_eq!((t.day, t.slot), (20250430, 7));
+        assert_eq!(at(t.day as i64, slot_hhmm(t.slot as i64)), 202504300935);
+        assert!(BarTime::from_db(202505010900).unwrap() > t);
+        assert!(BarTime::from_db(202504300903).is_none());
+        assert!(BarTime::from_db(202504300855).unwrap() < BarTime::from_db(202504300900).unwrap());
+    }
+
+    #[test]
+    fn test_time_arithmetic() {
+        assert_eq!(plus_minutes(930, 30), 1000);
+        assert_eq!(plus_minutes(1500, 30), 1530);
+        assert_eq!(plus_minutes(1000, -30), 930);
+        assert_eq!(cutoffs_back_to(1030, 930, 30), vec![930, 1000, 1030]);
+        assert!(cutoffs_back_to(900, 930, 30).is_empty());
+        assert_eq!(parse_date("2025-04-30"), Ok(20250430));
+        assert!(parse_date("2025-4-30").is_err());
+        assert_eq!(parse_hhmm("0930"), Ok(930));
+        assert!(parse_hhmm("0975").is_err());
+    }
+}
@@ -0,0 +1,614 @@
+use std::any::Any;
+use std::collections::{BTreeMap, HashMap};
+use std::collections::hash_map::DefaultHasher;
+use std::fs;
+use std::hash::{Hash, Hasher};
+use std::ops::Deref;
+use std::path::PathBuf;
+use std::sync::{Arc, Mutex};
+use once_cell::sync::Lazy;
+use log::{debug, info, warn};
+
+/// 기본 메모리 예산 (2 GiB)
+pub const DEFAULT_BUDGET_BYTES: usize = 2 << 30;
+/// 최근 거래일로 취급할 날짜 수 (캐시에 있는 날짜 중 가장 최근 N일)
+const RECENT_DAYS: usize = 5;
+/// 최근 거래일 항목의 제거 우선순위 가중치 (클수록 늦게 제거)
+const RECENT_DAY_WEIGHT: f64 = 4.0;
+/// 디스크 스필 파일 형식 버전
+const SPILL_VERSION: u8 = 1;
+
+/// 캐시에 넣을 수 있는 값: 메모리 크기 추정과 디스크 스필용 직렬화
+pub trait CacheValue: Any + Send + Sync + Sized {
+    /// 힙을 포함한 대략적인 메모리 사용량 (바이트)
+    fn size_bytes(&self) -> usize;
+    fn encode(&self, out: &mut ByteWriter);
+    fn decode(input: &mut ByteReader<'_>) -> Result<Self, String>;
+}
+
+/// 리틀 엔디언 고정 길이 + varint 인코더
+#[derive(Default)]
+pub struct ByteWriter {
+    pub buf: Vec<u8>,
+}
+
+impl ByteWriter {
+    pub fn u64(&mut self, v: u64) {
+        self.buf.extend_from_slice(&v.to_le_bytes());
+    }
+
+    pub fn i64(&mut self, v: i64) {
+        self.buf.extend_from_slice(&v.to_le_bytes());
+    }
+
+    pub fn str(&mut self, s: &str) {
+        self.u64(s.len() as u64);
+        self.buf.extend_from_slice(s.as_bytes());
+    }
+
+    pub fn i64s(&mut self, values: &[i64]) {
+        self.u64(values.len() as u64);
+        for &v in values {
+            self.i64(v);
+        }
+    }
+
+    pub fn f64s(&mut self, values: &[f64]) {
+        self.u64(values.len() as u64);
+        for &v in values {
+            self.buf.extend_from_slice(&v.to_bits().to_le_bytes());
+        }
+    }
+
+    /// LEB128 부호 없는 varint (7비트씩, 작은 값일수록 짧음)
+    pub fn uvar(&mut self, mut v: u64) {
+        while v >= 0x80 {
+            self.buf.push(v as u8 | 0x80);
+            v >>= 7;
+        }
+        self.buf.push(v as u8);
+    }
+
+    /// zigzag + varint (절대값이 작은 음수도 짧게)
+    pub fn ivar(&mut self, v: i64) {
+        self.uvar(((v << 1) ^ (v >> 63)) as u64);
+    }
+}
+
+pub struct ByteReader<'a> {
+    buf: &'a [u8],
+    pos: usize,
+}
+
+impl<'a> ByteReader<'a> {
+    pub fn new(buf: &'a [u8]) -> Self {
+        Self { buf, pos: 0 }
+    }
+
+    fn take(&mut self, n: usize) -> Result<&'a [u8], String> {
+        if self.buf.len() - self.pos < n {
+            return Err(format!("직렬화 데이터가 잘렸습니다 (위치 {}, 필요 {}바이트)", self.pos, n));
+        }
+        let bytes = &self.buf[self.pos..self.pos + n];
+        self.pos += n;
+        Ok(bytes)
+    }
+
+    pub fn u64(&mut self) -> Result<u64, String> {
+        Ok(u64::from_le_bytes(self.take(8)?.try_into().unwrap()))
+    }
+
+    pub fn i64(&mut self) -> Result<i64, String> {
+        Ok(i64::from_le_bytes(self.take(8)?.try_into().unwrap()))
+    }
+
+    pub fn str(&mut self) -> Result<String, String> {
+        let n = self.u64()? as usize;
+        String::from_utf8(self.take(n)?.to_vec()).map_err(|e| e.to_string())
+    }
+
+    pub fn i64s(&mut self) -> Result<Vec<i64>, String> {
+        let n = self.u64()? as usize;
+        self.take(n.saturating_mul(8))?.chunks_exact(8).map(|c| Ok(i64::from_le_bytes(c.try_into().unwrap()))).collect()
+    }
+
+    pub fn f64s(&mut self) -> Result<Vec<f64>, String> {
+        let n = self.u64()? as usize;
+        self.take(n.saturating_mul(8))?.chunks_exact(8).map(|c| Ok(f64::from_bits(u64::from_le_bytes(c.try_into().unwrap())))).collect()
+    }
+
+    pub fn uvar(&mut self) -> Result<u64, String> {
+        let mut value = 0u64;
+        let mut shift = 0;
+        loop {
+            let byte = *self.buf.get(self.pos)
+                .ok_or_else(|| format!("직렬화 데이터가 잘렸습니다 (위치 {}, varint)", self.pos))?;
+            self.pos += 1;
+            if shift >= 64 {
+                return Err(format!("varint 가 너무 깁니다 (위치 {})", self.pos));
+            }
+            value |= ((byte & 0x7f) as u64) << shift;
+            if byte & 0x80 == 0 {
+                return Ok(value);
+            }
+            shift += 7;
+        }
+    }
+
+    pub fn ivar(&mut self) -> Result<i64, String> {
+        let v = self.uvar()?;
+        Ok((v >> 1) as i64 ^ -((v & 1) as i64))
+    }
+
+    /// 아직 읽지 않은 바이트 수
+    pub fn remaining(&self) -> usize {
+        self.buf.len() - self.pos
+    }
+}
+
+/// 캐시 현황 (파이썬에 그대로 노출)
+#[derive(Debug, Clone, Copy, Default, PartialEq)]
+pub struct CacheStats {
+    pub budget_bytes: usize,
+    pub used_bytes: usize,
+    pub peak_bytes: usize,
+    pub entries: usize,
+    pub pinned_days: usize,
+    pub hits: u64,
+    pub misses: u64,
+    /// 스필 파일에서 다시 읽어온 횟수 (hits 에 포함)
+    pub disk_hits: u64,
+    pub evictions: u64,
+    pub spills: u64,
+    pub spilled_entries: usize,
+    pub spilled_bytes: u64,
+}
+
+type EncodeFn = fn(&(dyn Any + Send + Sync), &mut ByteWriter);
+
+fn encode_any<T: CacheValue>(value: &(dyn Any + Send + Sync), out: &mut ByteWriter) {
+    if let Some(value) = value.downcast_ref::<T>() {
+        value.encode(out);
+    }
+}
+
+struct Entry {
+    value: Arc<dyn Any + Send + Sync>,
+    encode: EncodeFn,
+    bytes: usize,
+    day: i64,
+    last_used: u64,
+}
+
+struct SpillFile {
+    path: PathBuf,
+    bytes: u64,
+    day: i64,
+}
+
+/// 바이트 예산 안에서 날짜별 데이터와 파생 배열을 보관하는 캐시
+///
+/// 예산을 넘으면 고정되지 않은 항목 중 (유휴 시간 × 크기 / 최근 날짜 가중치) 가 가장 큰 것부터 제거하고,
+/// 스필 폴더가 설정되어 있으면 제거한 항목을 디스크에 써 두었다가 다음 조회 때 다시 읽습니다.
+pub struct CacheManager {
+    budget: usize,
+    spill_dir: Option<PathBuf>,
+    entries: HashMap<String, Entry>,
+    spilled: HashMap<String, SpillFile>,
+    /// 캐시에 있는 날짜별 항목 수 (최근 날짜 판정용)
+    days: BTreeMap<i64, usize>,
+    pins: HashMap<i64, u32>,
+    clock: u64,
+    stats: CacheStats,
+}
+
+impl CacheManager {
+    pub fn new(budget: usize, spill_dir: Option<PathBuf>) -> Self {
+        Self {
+            budget,
+            spill_dir,
+            entries: HashMap::new(),
+            spilled: HashMap::new(),
+            days: BTreeMap::new(),
+            pins: HashMap::new(),
+            clock: 0,
+            stats: CacheStats::default(),
+        }
+    }
+
+    /// 예산 / 스필 폴더 변경 (예산을 줄이면 즉시 제거)
+    pub fn configure(&mut self, budget: Option<usize>, spill_dir: Option<Option<PathBuf>>) -> Result<(), String> {
+        if let Some(Some(dir)) = &spill_dir {
+            fs::create_dir_all(dir).map_err(|e| format!("스필 폴더 생성 실패: {} ({})", dir.display(), e))?;
+            let removed = remove_stale_spills(dir);
+            if removed > 0 {
+                info!("🧹 종료된 프로세스의 스필 파일 {}개 삭제: {}", removed, dir.display());
+            }
+        }
+        if let Some(dir) = spill_dir {
+            self.spill_dir = dir;
+        }
+        if let Some(budget) = budget {
+            self.budget = budget;
+        }
+        self.evict_to_budget();
+        Ok(())
+    }
+
+    /// 메모리 → 스필 파일 순으로 조회 (스필에서 읽은 항목은 다시 메모리에 올림)
+    pub fn get<T: CacheValue>(&mut self, key: &str) -> Option<Arc<T>> {
+        self.clock += 1;
+        if let Some(entry) = self.entries.get_mut(key) {
+            if let Ok(value) = entry.value.clone().downcast::<T>() {
+                entry.last_used = self.clock;
+                self.stats.hits += 1;
+                return Some(value);
+            }
+        }
+
+        if let Some(spill) = self.spilled.remove(key) {
+            self.stats.spilled_bytes -= spill.bytes;
+            match read_spill::<T>(&spill.path) {
+                Ok(value) => {
+                    let value = Arc::new(value);
+                    self.insert(key, spill.day, value.clone());
+                    self.stats.hits += 1;
+                    self.stats.disk_hits += 1;
+                    debug!("💽 스필 파일에서 복원: {}", key);
+                    return Some(value);
+                }
+                Err(e) => warn!("⚠️ 스필 파일 읽기 실패: {} ({})", spill.path.display(), e),
+            }
+        }
+
+        self.stats.misses += 1;
+        None
+    }
+
+    pub fn insert<T: CacheValue>(&mut self, key: &str, day: i64, value: Arc<T>) {
+        self.clock += 1;
+        self.remove(key);
+        let bytes = value.size_bytes();
+        self.entries.insert(key.to_string(), Entry {
+            value,
+            encode: encode_any::<T>,
+            bytes,
+            day,
+            last_used: self.clock,
+        });
+        *self.days.entry(day).or_insert(0) += 1;
+        self.stats.used_bytes += bytes;
+        self.stats.peak_bytes = self.stats.peak_bytes.max(self.stats.used_bytes);
+        self.evict_to_budget();
+    }
+
+    /// 날짜를 고정해 그 날짜의 항목이 제거되지 않도록 함 (중첩 가능)
+    pub fn pin_day(&mut self, day: i64) {
+        *self.pins.entry(day).or_insert(0) += 1;
+    }
+
+    #[cfg(test)]
+    pub fn is_pinned(&self, day: i64) -> bool {
+        self.pins.contains_key(&day)
+    }
+
+    pub fn unpin_day(&mut self, day: i64) {
+        if let Some(count) = self.pins.get_mut(&day) {
+            *count -= 1;
+            if *count == 0 {
+                self.pins.remove(&day);
+            }
+        }
+        self.evict_to_budget();
+    }
+
+    /// 메모리와 스필 파일 모두 비움 (고정 상태와 통계 누적값은 유지)
+    pub fn clear(&mut self) {
+        self.release_spills();
+        self.entries.clear();
+        self.days.clear();
+        self.stats.used_bytes = 0;
+        self.stats.spilled_bytes = 0;
+    }
+
+    /// 이 캐시가 쓴 스필 파일을 모두 삭제 (메모리 항목은 유지, 프로세스 종료 시 호출)
+    pub fn release_spills(&mut self) {
+        for (_, spill) in self.spilled.drain() {
+            let _ = fs::remove_file(&spill.path);
+        }
+        self.stats.spilled_bytes = 0;
+    }
+
+    pub fn stats(&self) -> CacheStats {
+        CacheStats {
+            budget_bytes: self.budget,
+            entries: self.entries.len(),
+            pinned_days: self.pins.len(),
+            spilled_entries: self.spilled.len(),
+            ..self.stats
+        }
+    }
+
+    fn remove(&mut self, key: &str) -> Option<Entry> {
+        let entry = self.entries.remove(key)?;
+        self.stats.used_bytes -= entry.bytes;
+        if let Some(count) = self.days.get_mut(&entry.day) {
+            *count -= 1;
+            if *count == 0 {
+                self.days.remove(&entry.day);
+            }
+        }
+        Some(entry)
+    }
+
+    /// 캐시에 있는 날짜 중 최근 RECENT_DAYS 일의 시작 날짜
+    fn recent_threshold(&self) -> i64 {
+        self.days.keys().rev().nth(RECENT_DAYS - 1).copied().unwrap_or(i64::MIN)
+    }
+
+    fn evict_to_budget(&mut self) {
+        let recent_from = self.recent_threshold();
+        while self.stats.used_bytes > self.budget {
+            let victim = self.entries.iter()
+                .filter(|(_, e)| !self.pins.contains_key(&e.day))
+                .max_by(|(_, a), (_, b)| {
+                    let score = |e: &Entry| {
+                        let weight = if e.day >= recent_from { RECENT_DAY_WEIGHT } else { 1.0 };
+                        (self.clock - e.last_used + 1) as f64 * e.bytes as f64 / weight
+                    };
+                    score(a).total_cmp(&score(b))
+                })
+                .map(|(key, _)| key.clone());
+
+            let Some(key) = victim else {
+                warn!("⚠️ 고정된 날짜만 남아 캐시 예산을 초과합니다: {} / {} 바이트", self.stats.used_bytes, self.budget);
+                break;
+            };
+            let entry = self.remove(&key).unwrap();
+            self.stats.evictions += 1;
+            self.spill(&key, &entry);
+        }
+    }
+
+    fn spill(&mut self, key: &str, entry: &Entry) {
+        let Some(dir) = &self.spill_dir else {
+            return;
+        };
+        let mut hasher = DefaultHasher::new();
+        key.hash(&mut hasher);
+        // 같은 spill_dir 을 쓰는 다른 프로세스의 스필과 겹치지 않도록 pid 포함
+        let path = dir.join(format!("{}_{:016x}.bin", std::process::id(), hasher.finish()));
+
+        let mut out = ByteWriter::default();
+        out.buf.push(SPILL_VERSION);
+        (entry.encode)(entry.value.as_ref(), &mut out);
+        match fs::write(&path, &out.buf) {
+            Ok(()) => {
+                self.stats.spills += 1;
+                self.stats.spilled_bytes += out.buf.len() as u64;
+                self.spilled.insert(key.to_string(), SpillFile { path, bytes: out.buf.len() as u64, day: entry.day });
+            }
+            Err(e) => warn!("⚠️ 스필 파일 쓰기 실패: {} ({})", path.display(), e),
+        }
+    }
+}
+
+impl Drop for CacheManager {
+    fn drop(&mut self) {
+        self.release_spills();
+    }
+}
+
+/// 스필 폴더에서 이미 종료된 프로세스가 남긴 "{pid}_{hash}.bin" 파일을 삭제하고 삭제한 개수를 반환
+fn remove_stale_spills(dir: &PathBuf) -> usize {
+    let entries = match fs::read_dir(dir) {
+        Ok(entries) => entries,
+        Err(_) => return 0,
+    };
+    let own = std::process::id();
+    let mut alive: HashMap<u32, bool> = HashMap::new();
+    let mut removed = 0;
+    for entry in entries.flatten() {
+        let name = entry.file_name();
+        let pid = match name.to_str()
+            .and_then(|n| n.strip_suffix(".bin"))
+            .and_then(|n| n.split_once('_'))
+            .and_then(|(pid, _)| pid.parse::<u32>().ok()) {
+            Some(pid) => pid,
+            None => continue,
+        };
+        if pid == own || *alive.entry(pid).or_insert_with(|| process_alive(pid)) {
+            continue;
+        }
+        if fs::remove_file(entry.path()).is_ok() {
+            removed += 1;
+        }
+    }
+    removed
+}
+
+/// pid 프로세스가 실행 중인지 (확인할 수 없는 플랫폼에서는 실행 중으로 보고 파일을 남김)
+#[cfg(target_os = "linux")]
+fn process_alive(pid: u32) -> bool {
+    std::path::Path::new(&format!("/proc/{}", pid)).exists()
+}
+
+#[cfg(windows)]
+fn process_alive(pid: u32) -> bool {
+    match std::process::Command::new("tasklist")
+        .args(["/FI", &format!("PID eq {}", pid), "/NH", "/FO", "CSV"])
+        .output() {
+        Ok(output) => String::from_utf8_lossy(&output.stdout).contains(&format!("\"{}\"", pid)),
+        Err(_) => true,
+    }
+}
+
+#[cfg(not(any(target_os = "linux", windows)))]
+fn process_alive(_pid: u32) -> bool {
+    true
+}
+
+fn read_spill<T: CacheValue>(path: &PathBuf) -> Result<T, String> {
+    let bytes = fs::read(path).map_err(|e| e.to_string())?;
+    let _ = fs::remove_file(path);
+    match bytes.split_first() {
+        Some((&SPILL_VERSION, body)) => T::decode(&mut ByteReader::new(body)),
+        _ => Err("지원하지 않는 스필 파일 형식".to_string()),
+    }
+}
+
+pub static CACHE: Lazy<Mutex<CacheManager>> = Lazy::new(|| {
+    Mutex::new(CacheManager::new(DEFAULT_BUDGET_BYTES, None))
+});
+
+/// 사용 중인 동안 해당 날짜를 고정하는 캐시 값 참조 (drop 시 고정 해제)
+pub struct Pinned<T> {
+    value: Arc<T>,
+    day: i64,
+}
+
+impl<T> Deref for Pinned<T> {
+    type Target = T;
+
+    fn deref(&self) -> &T {
+        &self.value
+    }
+}
+
+impl<T> Drop for Pinned<T> {
+    fn drop(&mut self) {
+        CACHE.lock().unwrap().unpin_day(self.day);
+    }
+}
+
+/// 캐시에 있으면 그대로, 없으면 load 결과를 넣고 반환. 반환값을 들고 있는 동안 day 는 고정됨
+///
+/// load 는 잠금 밖에서 실행되므로 같은 키를 여러 스레드가 동시에 계산할 수 있고, 마지막 결과가 남습니다.
+pub fn get_or_load<T, F>(key: &str, day: i64, load: F) -> Result<Pinned<T>, Box<dyn std::error::Error>>
+where
+    T: CacheValue,
+    F: FnOnce() -> Result<T, Box<dyn std::error::Error>>,
+{
+    let hit = {
+        let mut cache = CACHE.lock().unwrap();
+        cache.pin_day(day);
+        cache.get::<T>(key)
+    };
+    if let Some(value) = hit {
+        return Ok(Pinned { value, day });
+    }
+
+    match load() {
+        Ok(value) => {
+            let value = Arc::new(value);
+            CACHE.lock().unwrap().insert(key, day, value.clone());
+            Ok(Pinned { value, day })
+        }
+        Err(e) => {
+            CACHE.lock().unwrap().unpin_day(day);
+            Err(e)
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    struct Blob(Vec<i64>);
+
+    impl CacheValue for Blob {
+        fn size_bytes(&self) -> usize {
+            self.0.len() * 8
+        }
+
+        fn encode(&self, out: &mut ByteWriter) {
+            out.i64s(&self.0);
+        }
+
+        fn decode(input: &mut ByteReader<'_>) -> Result<Self, String> {
+            Ok(Blob(input.i64s()?))
+        }
+    }
+
+    #[test]
+    fn test_budget_eviction_respects_pins_and_recency() {
+        let mut cache = CacheManager::new(3 * 800, None);
+        for day in 1..=3 {
+            cache.insert(&format!("day:{}", day), day, Arc::new(Blob(vec![day; 100])));
+        }
+        cache.pin_day(1);
+        assert!(cache.get::<Blob>("day:2").is_some());
+        cache.insert("day:4", 4, Arc::new(Blob(vec![4; 100])));
+
+        // 1 은 고정, 2 는 방금 조회 → 3 이 제거됨
+        let stats = cache.stats();
+        assert_eq!((stats.entries, stats.evictions, stats.used_bytes), (3, 1, 2400));
+        assert!(cache.get::<Blob>("day:3").is_none());
+        assert!(cache.get::<Blob>("day:1").is_some());
+        assert_eq!(cache.stats().misses, 1);
+    }
+
+    #[test]
+    fn test_spill_and_reload() {
+        let dir = std::env::temp_dir().join(format!("rust_core_cache_test_{}", std::process::id()));
+        let mut cache = CacheManager::new(800, None);
+        cache.configure(None, Some(Some(dir.clone()))).unwrap();
+
+        cache.insert("a", 1, Arc::new(Blob((0..100).collect())));
+        cache.insert("b", 2, Arc::new(Blob(vec![7; 100])));
+        assert_eq!(cache.stats().spilled_entries, 1);
+
+        let a = cache.get::<Blob>("a").unwrap();
+        assert_eq!(a.0, (0..100).collect::<Vec<i64>>());
+        let stats = cache.stats();
+        assert_eq!((stats.disk_hits, stats.spills, stats.entries), (1, 2, 1));
+
+        cache.clear();
+        assert_eq!(cache.stats().spilled_entries, 0);
+        let _ = fs::remove_dir_all(&dir);
+    }
+
+    #[test]
+    fn test_spill_files_removed_on_drop_and_for_dead_pids() {
+        let dir = std::env::temp_dir().join(format!("rust_core_cache_stale_{}", std::process::id()));
+        fs::create_dir_all(&dir).unwrap();
+        // pid_max(최대 4194304)를 넘는 pid 는 실행 중일 수 없음
+        let stale = dir.join("4294967295_0000000000000001.bin");
+        let other = dir.join("notes.txt");
+        fs::write(&stale, [SPILL_VERSION]).unwrap();
+        fs::write(&other, b"keep").unwrap();
+
+        let mut cache = CacheManager::new(800, None);
+        cache.configure(None, Some(Some(dir.clone()))).unwrap();
+        assert!(!stale.exists());
+        assert!(other.exists());
+
+        cache.insert("a", 1, Arc::new(Blob(vec![1; 100])));
+        cache.insert("b", 2, Arc::new(Blob(vec![2; 100])));
+        assert_eq!(cache.stats().spilled_entries, 1);
+        let own_spills = || fs::read_dir(&dir).unwrap().flatten()
+            .filter(|e| e.file_name().to_string_lossy().starts_with(&format!("{}_", std::process::id())))
+            .count();
+        assert_eq!(own_spills(), 1);
+
+        drop(cache);
+        assert_eq!(own_spills(), 0);
+        let _ = fs::remove_dir_all(&dir);
+    }
+
+    #[test]
+    fn test_day_data_roundtrip() {
+        use crate::core::day_data::{DayData, TickerDay};
+        let rows = vec![(20250430_0905, 100, 103, 99, 102, 10), (20250430_0910, 102, 108, 101, 107, 20)];
+        let day = DayData::from_tickers(20250430, vec![TickerDay::from_rows("A000001", rows), TickerDay::from_rows("A000002", vec![])]);
+
+        let mut out = ByteWriter::default();
+        day.encode(&mut out);
+        let decoded = DayData::decode(&mut ByteReader::new(&out.buf)).unwrap();
+        assert_eq!(decoded.tickers.len(), 2);
+        assert_eq!(decoded.tickers[0].dates, day.tickers[0].dates);
+        assert_eq!(decoded.tickers[0].tv_prefix, day.tickers[0].tv_prefix);
+        assert!(DayData::decode(&mut ByteReader::new(&out.buf[..out.buf.len() - 4])).is_err());
+    }
+}
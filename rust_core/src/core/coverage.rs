@@ -0,0 +1,419 @@
+use std::collections::{BTreeMap, HashMap};
+use std::thread;
+use rusqlite::Connection;
+use log::{debug, info};
+use crate::core::bar_time;
+use crate::features::db;
+
+/// 비트맵에 담을 수 있는 최대 슬롯 수 (09:00 부터 5분 간격 128개)
+pub const MAX_SLOTS: i64 = 128;
+
+pub const WEEKDAY_NAMES: [&str; 7] = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"];
+
+/// 한 종목의 하루 커버리지
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub struct DayCoverage {
+    /// YYYYMMDD
+    pub date_num: i64,
+    pub bars: u32,
+    /// 첫 봉 / 마지막 봉 시각 (HHMM)
+    pub first: u16,
+    pub last: u16,
+    /// 09:00 기준 5분 슬롯별 봉 존재 여부
+    pub slots: u128,
+}
+
+impl DayCoverage {
+    fn new(date_num: i64) -> Self {
+        Self { date_num, bars: 0, first: u16::MAX, last: 0, slots: 0 }
+    }
+
+    fn add_bar(&mut self, hhmm: i64) {
+        self.bars += 1;
+        self.first = self.first.min(hhmm as u16);
+        self.last = self.last.max(hhmm as u16);
+        if let Some(slot) = slot_of(hhmm) {
+            self.slots |= 1u128 << slot;
+        }
+    }
+
+    fn merge(&mut self, other: &DayCoverage) {
+        self.bars += other.bars;
+        self.first = self.first.min(other.first);
+        self.last = self.last.max(other.last);
+        self.slots |= other.slots;
+    }
+}
+
+/// 전 종목을 합친 하루 커버리지
+#[derive(Debug, Clone, Copy, Default)]
+pub struct DateCoverage {
+    pub tickers: usize,
+    pub bars: u64,
+    pub first: u16,
+    pub last: u16,
+    /// 한 종목이라도 봉이 있는 슬롯
+    pub slots: u128,
+}
+
+impl DateCoverage {
+    fn add(&mut self, day: &DayCoverage) {
+        self.first = if self.tickers == 0 { day.first } else { self.first.min(day.first) };
+        self.tickers += 1;
+        self.bars += day.bars as u64;
+        self.last = self.last.max(day.last);
+        self.slots |= day.slots;
+    }
+}
+
+/// 요일별 커버리지
+#[derive(Debug, Clone, Copy, Default)]
+pub struct WeekdayCoverage {
+    /// 조회한 날짜 중 해당 요일 수
+    pub days: usize,
+    /// 그중 봉이 하나라도 있는 날 수
+    pub days_with_data: usize,
+    pub bars: u64,
+}
+
+/// HHMM 을 슬롯 번호로 변환 (5분 경계가 아니거나 범위 밖이면 None)
+pub fn slot_of(hhmm: i64) -> Option<u32> {
+    bar_time::slot_of(hhmm)
+        .filter(|slot| (0..MAX_SLOTS).contains(slot))
+        .map(|slot| slot as u32)
+}
+
+/// 슬롯 번호를 HHMM 으로 변환
+pub fn slot_hhmm(slot: u32) -> i64 {
+    bar_time::slot_hhmm(slot as i64)
+}
+
+/// 비트맵의 슬롯들을 HHMM 목록으로 변환
+pub fn slots_to_hhmm(slots: u128) -> Vec<i64> {
+    (0..MAX_SLOTS as u32).filter(|&s| slots & (1u128 << s) != 0).map(slot_hhmm).collect()
+}
+
+/// YYYYMMDD 의 요일 (0 = 월요일)
+pub fn weekday_of(date_num: i64) -> usize {
+    const OFFSETS: [i64; 12] = [0, 3, 2, 5, 0, 3, 5, 1, 4, 6, 2, 4];
+    let (mut y, m, d) = (date_num / 10000, date_num / 100 % 100, date_num % 100);
+    if m < 3 {
+        y -= 1;
+    }
+    // Sakamoto 공식 (0 = 일요일) 을 월요일 기준으로 변환
+    let sunday_based = (y + y / 4 - y / 100 + y / 400 + OFFSETS[(m - 1) as usize] + d) % 7;
+    ((sunday_based + 6) % 7) as usize
+}
+
+/// 종목별·날짜별 봉 개수와 첫/마지막 시각 인덱스
+#[derive(Debug, Clone, Default)]
+pub struct CoverageIndex {
+    tables: Vec<String>,
+    index: HashMap<String, usize>,
+    /// 종목별 날짜 오름차순 커버리지
+    days: Vec<Vec<DayCoverage>>,
+}
+
+impl CoverageIndex {
+    pub fn tables(&self) -> &[String] {
+        &self.tables
+    }
+
+    pub fn entry_count(&self) -> usize {
+        self.days.iter().map(Vec::len).sum()
+    }
+
+    fn ticker_index(&mut self, table: &str) -> usize {
+        if let Some(&idx) = self.index.get(table) {
+            return idx;
+        }
+        let idx = self.tables.len();
+        self.tables.push(table.to_string());
+        self.index.insert(table.to_string(), idx);
+        self.days.push(Vec::new());
+        idx
+    }
+
+    /// 종목별 마지막으로 인덱싱된 봉의 date 값 (없으면 0)
+    fn watermark(&self, idx: usize) -> i64 {
+        self.days[idx]
+            .last()
+            .map(|d| d.date_num * 10000 + d.last as i64)
+            .unwrap_or(0)
+    }
+
+    /// 종목 하루 커버리지를 병합 (같은 날짜가 이미 있으면 합침)
+    pub fn merge_day(&mut self, table: &str, day: DayCoverage) {
+        let idx = self.ticker_index(table);
+        let days = &mut self.days[idx];
+        match days.binary_search_by_key(&day.date_num, |d| d.date_num) {
+            Ok(pos) => days[pos].merge(&day),
+            Err(pos) => days.insert(pos, day),
+        }
+    }
+
+    pub fn ticker_day(&self, table: &str, date_num: i64) -> Option<&DayCoverage> {
+        let days = &self.days[*self.index.get(table)?];
+        days.binary_search_by_key(&date_num, |d| d.date_num).ok().map(|pos| &days[pos])
+    }
+
+    /// 5분봉 DB 전체를 스캔해 인덱스 생성
+    pub fn build(db_path: &str, threads: usize) -> Result<Self, Box<dyn std::error::Error>> {
+        let mut index = Self::default();
+        index.update(db_path, threads)?;
+        Ok(index)
+    }
+
+    /// 종목별 워터마크 이후의 봉만 읽어 인덱스 갱신 (새 테이블 포함). 새로 반영된 봉 개수를 반환
+    pub fn update(&mut self, db_path: &str, threads: usize) -> Result<u64, Box<dyn std::error::Error>> {
+        let tables = {
+            let conn = db::open(db_path)?;
+            db::get_all_tables(&conn)?
+        };
+        let jobs: Vec<(String, i64)> = tables
+            .into_iter()
+            .map(|table| {
+                let watermark = self.index.get(&table).map(|&i| self.watermark(i)).unwrap_or(0);
+                (table, watermark)
+            })
+            .collect();
+
+        let threads = threads.max(1).min(jobs.len().max(1));
+        let scanned: Vec<Result<Vec<(String, Vec<DayCoverage>)>, String>> = thread::scope(|scope| {
+            let handles: Vec<_> = (0..threads)
+                .map(|worker| {
+                    let jobs = &jobs;
+                    scope.spawn(move || {
+                        // SQLite 연결은 스레드 간 공유할 수 없으므로 워커마다 연결
+                        let conn = db::open(db_path).map_err(|e| e.to_string())?;
+                        let mut out = Vec::new();
+                        for (table, watermark) in jobs.iter().skip(worker).step_by(threads) {
+                            match scan_table(&conn, table, *watermark) {
+                                Ok(days) => out.push((table.clone(), days)),
+                                Err(e) => debug!("❌ {} 커버리지 스캔 에러: {}", table, e),
+                            }
+                        }
+                        Ok(out)
+                    })
+                })
+                .collect();
+            handles.into_iter().map(|h| h.join().unwrap_or_else(|_| Err("스캔 스레드 패닉".to_string()))).collect()
+        });
+
+        // 결과는 DB 테이블 순서대로 반영 (스레드 분배와 무관하게 같은 인덱스)
+        let mut by_table: HashMap<String, Vec<DayCoverage>> = HashMap::new();
+        for result in scanned {
+            by_table.extend(result?);
+        }
+
+        let mut new_bars = 0u64;
+        for (table, _) in &jobs {
+            self.ticker_index(table);
+            if let Some(days) = by_table.remove(table) {
+                for day in days {
+                    new_bars += day.bars as u64;
+                    self.merge_day(table, day);
+                }
+            }
+        }
+
+        info!("🗂️ 커버리지 인덱스 갱신: {}개 종목, 새 봉 {}개 ({}개 스레드)", jobs.len(), new_bars, threads);
+        Ok(new_bars)
+    }
+
+    /// 전 종목 날짜별 합계
+    pub fn date_totals(&self) -> BTreeMap<i64, DateCoverage> {
+        let mut totals: BTreeMap<i64, DateCoverage> = BTreeMap::new();
+        for day in self.days.iter().flatten() {
+            totals.entry(day.date_num).or_default().add(day);
+        }
+        totals
+    }
+
+    /// 특정 날짜의 전 종목 합계
+    pub fn date_coverage(&self, date_num: i64) -> DateCoverage {
+        let mut total = DateCoverage::default();
+        for days in &self.days {
+            if let Ok(pos) = days.binary_search_by_key(&date_num, |d| d.date_num) {
+                total.add(&days[pos]);
+            }
+        }
+        total
+    }
+
+    /// 조회한 날짜 중 전 종목 봉이 하나도 없는 날짜
+    pub fn zero_bar_dates(&self, date_nums: &[i64]) -> Vec<i64> {
+        let totals = self.date_totals();
+        date_nums.iter().copied().filter(|d| !totals.contains_key(d)).collect()
+    }
+
+    /// 해당 날짜에 시장 전체에서 봉이 있는 슬롯 중 빠진 슬롯이 있는 종목 [(종목 인덱스, 빠진 HHMM 목록)]
+    pub fn tickers_missing_slots(&self, date_num: i64) -> Vec<(usize, Vec<i64>)> {
+        let market = self.date_coverage(date_num).slots;
+        if market == 0 {
+            return vec![];
+        }
+
+        self.days
+            .iter()
+            .enumerate()
+            .filter_map(|(idx, days)| {
+                let slots = days
+                    .binary_search_by_key(&date_num, |d| d.date_num)
+                    .map(|pos| days[pos].slots)
+                    .unwrap_or(0);
+                let missing = market & !slots;
+                (missing != 0).then(|| (idx, slots_to_hhmm(missing)))
+            })
+            .collect()
+    }
+
+    /// 조회한 날짜들의 요일별 커버리지 (0 = 월요일)
+    pub fn weekday_coverage(&self, date_nums: &[i64]) -> [WeekdayCoverage; 7] {
+        let totals = self.date_totals();
+        let mut weekdays = [WeekdayCoverage::default(); 7];
+        for &date_num in date_nums {
+            let w = &mut weekdays[weekday_of(date_num)];
+            w.days += 1;
+            if let Some(total) = totals.get(&date_num) {
+                w.days_with_data += 1;
+                w.bars += total.bars;
+            }
+        }
+        weekdays
+    }
+
+    /// 인덱스를 SQLite 파일로 저장 (전체 교체)
+    pub fn save(&self, path: &str) -> Result<(), Box<dyn std::error::Error>> {
+        let mut conn = db::open(path)?;
+        let tx = conn.transaction()?;
+        tx.execute_batch(
+            "CREATE TABLE IF NOT EXISTS coverage (
+                ticker TEXT NOT NULL,
+                date INTEGER NOT NULL,
+                bars INTEGER NOT NULL,
+                first INTEGER NOT NULL,
+                last INTEGER NOT NULL,
+                slots_lo INTEGER NOT NULL,
+                slots_hi INTEGER NOT NULL,
+                PRIMARY KEY (ticker, date)
+            );
+            DELETE FROM coverage;"
+        )?;
+        {
+            let mut stmt = tx.prepare(
+                "INSERT INTO coverage (ticker, date, bars, first, last, slots_lo, slots_hi) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7)"
+            )?;
+            for (table, days) in self.tables.iter().zip(&self.days) {
+                for day in days {
+                    stmt.execute(rusqlite::params![
+                        table,
+                        day.date_num,
+                        day.bars,
+                        day.first,
+                        day.last,
+                        day.slots as u64 as i64,
+                        (day.slots >> 64) as u64 as i64,
+                    ])?;
+                }
+            }
+        }
+        tx.commit()?;
+        info!("💾 커버리지 인덱스 저장: {} ({}개 항목)", path, self.entry_count());
+        Ok(())
+    }
+
+    /// save 로 저장한 인덱스 읽기
+    pub fn load(path: &str) -> Result<Self, Box<dyn std::error::Error>> {
+        let conn = db::open(path)?;
+        let mut stmt = conn.prepare(
+            "SELECT ticker, date, bars, first, last, slots_lo, slots_hi FROM coverage ORDER BY ticker, date"
+        )?;
+        let rows = stmt.query_map((), |row| {
+            let lo: i64 = row.get(5)?;
+            let hi: i64 = row.get(6)?;
+            Ok((row.get::<_, String>(0)?, DayCoverage {
+                date_num: row.get(1)?,
+                bars: row.get(2)?,
+                first: row.get(3)?,
+                last: row.get(4)?,
+                slots: (lo as u64 as u128) | ((hi as u64 as u128) << 64),
+            }))
+        })?;
+
+        let mut index = Self::default();
+        for row in rows {
+            let (table, day) = row?;
+            let idx = index.ticker_index(&table);
+            index.days[idx].push(day);
+        }
+        debug!("📂 커버리지 인덱스 로드: {} ({}개 항목)", path, index.entry_count());
+        Ok(index)
+    }
+}
+
+/// 한 테이블에서 watermark 이후의 봉 시각만 읽어 날짜별로 집계
+fn scan_table(conn: &Connection, table: &str, watermark: i64) -> Result<Vec<DayCoverage>, rusqlite::Error> {
+    let query = format!("SELECT date FROM {} WHERE date > ?1 ORDER BY date", table);
+    let mut stmt = conn.prepare(&query)?;
+    let mut rows = stmt.query([watermark])?;
+
+    let mut days: Vec<DayCoverage> = Vec::new();
+    while let Some(row) = rows.next()? {
+        let date: i64 = row.get(0)?;
+        let (date_num, hhmm) = (date / 10000, date % 10000);
+        if days.last().map(|d| d.date_num) != Some(date_num) {
+            days.push(DayCoverage::new(date_num));
+        }
+        days.last_mut().unwrap().add_bar(hhmm);
+    }
+    Ok(days)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn day(date_num: i64, hhmms: &[i64]) -> DayCoverage {
+        let mut day = DayCoverage::new(date_num);
+        for &hhmm in hhmms {
+            day.add_bar(hhmm);
+        }
+        day
+    }
+
+    #[test]
+    fn test_slot_and_weekday() {
+        assert_eq!(slot_of(900), Some(0));
+        assert_eq!(slot_of(1530), Some(78));
+        assert_eq!(slot_of(903), None);
+        assert_eq!(slot_of(855), None);
+        assert_eq!(slot_hhmm(78), 1530);
+        // 2025-04-30 수요일, 2025-05-03 토요일
+        assert_eq!(WEEKDAY_NAMES[weekday_of(20250430)], "Wednesday");
+        assert_eq!(WEEKDAY_NAMES[weekday_of(20250503)], "Saturday");
+        assert_eq!(WEEKDAY_NAMES[weekday_of(20240101)], "Monday");
+    }
+
+    #[test]
+    fn test_coverage_queries() {
+        let mut index = CoverageIndex::default();
+        index.merge_day("A000001", day(20250430, &[900, 905, 910]));
+        index.merge_day("A000002", day(20250430, &[900, 910]));
+        index.merge_day("A000001", day(20250502, &[900]));
+        // 증분 갱신으로 같은 날짜의 뒤쪽 봉이 추가되는 경우
+        index.merge_day("A000002", day(20250430, &[915]));
+
+        let d = index.ticker_day("A000002", 20250430).unwrap();
+        assert_eq!((d.bars, d.first, d.last), (3, 900, 915));
+
+        assert_eq!(index.zero_bar_dates(&[20250430, 20250501, 20250502]), vec![20250501]);
+
+        let missing = index.tickers_missing_slots(20250430);
+        assert_eq!(missing, vec![(0, vec![915]), (1, vec![905])]);
+
+        let weekdays = index.weekday_coverage(&[20250430, 20250501, 20250502]);
+        assert_eq!((weekdays[2].days, weekdays[2].days_with_data, weekdays[2].bars), (1, 1, 6));
+        assert_eq!((weekdays[3].days, weekdays[3].days_with_data), (1, 0));
+    }
+}
@@ -1,5 +1,6 @@
 use crate::features::{db, volume, price, stock_info::STOCK_INFO_MANAGER, stock_filter};
 use crate::features::logging::init_logger;
+use crate::core::{bar_time, quality, trace};
 use log::{info, debug};
 use std::collections::HashSet;
 
@@ -10,36 +11,36 @@ pub struct DStock {
     pub sector: String,
 }
 
-/// 여러 시간대의 D 조건 만족 종목들을 수집하여 중복을 제거한 리스트 반환
-pub fn evaluate_d_logic_before(date: &str, to: &str) -> Result<Vec<DStock>, Box<dyn std::error::Error>> {
-    init_logger();
-    info!("🚀 D 종목 이전 데이터 수집 시작: {} (09:30 ~ {})", date, to);
-    
-    let conn = db::open("D:/db/stock_price(5min).db")?;
-    let tables = db::get_all_tables(&conn)?;
+/// 여러 시간대(09:30 ~ to, 30분 간격)의 D 조건 만족 종목들을 수집하여 중복을 제거한 리스트 반환
+pub fn evaluate_d_logic_before(
+    conn: &rusqlite::Connection,
+    tables: &[String],
+    date_num: i64,
+    to: i64
+) -> Result<Vec<DStock>, Box<dyn std::error::Error>> {
+    let _span = trace::span("d.before");
+    info!("🚀 D 종목 이전 데이터 수집 시작: {} (09:30 ~ {:04})", date_num, to);
     debug!("📊 전체 종목 수: {}개", tables.len());
     
-    // 날짜 형식 변환
-    let date_num = date.replace("-", "");
-    
     // 시간대 리스트 생성 (to부터 30분씩 이전으로, 09:30까지)
     let time_intervals = generate_time_intervals(to);
     debug!("⏰ 분석할 시간대: {:?}", time_intervals);
     
     let mut all_d_stocks: HashSet<String> = HashSet::new();
     let mut total_processed = 0;
+    let from = bar_time::at(date_num, 900);
     
-    for interval in &time_intervals {
-        debug!("📅 {} 시간대 분석 중...", interval);
+    for &interval in &time_intervals {
+        debug!("📅 {:04} 시간대 분석 중...", interval);
+        let _ctx = trace::context(date_num, interval);
         
-        let from = format!("{}0900", date_num);
-        let to_time = format!("{}{}", date_num, interval);
+        let to_time = bar_time::at(date_num, interval);
         
         // 1단계: 거래대금 기준 상위 30개 종목 선정
-        let top30 = select_top30_by_trade_value(&conn, &tables, &from, &to_time)?;
+        let top30 = select_top30_by_trade_value(conn, tables, from, to_time)?;
         
         // 2단계: D 조건 만족 종목 필터링
-        let d_codes = filter_d_stocks(&conn, &top30, &from, &to_time)?;
+        let d_codes = filter_d_stocks(conn, &top30, from, to_time)?;
         
         // 3단계: 종목 코드를 HashSet에 추가 (중복 자동 제거)
         let d_codes_count = d_codes.len();
@@ -48,7 +49,7 @@ pub fn evaluate_d_logic_before(date: &str, to: &str) -> Result<Vec<DStock>, Box<
         }
         
         total_processed += 1;
-        debug!("✅ {} 시간대 완료: D 조건 만족 종목 {}개 (누적 {}개)", 
+        debug!("✅ {:04} 시간대 완료: D 조건 만족 종목 {}개 (누적 {}개)", 
                interval, d_codes_count, all_d_stocks.len());
     }
     
@@ -68,69 +69,61 @@ pub fn evaluate_d_logic_before(date: &str, to: &str) -> Result<Vec<DStock>, Box<
 }
 
 /// 시간대 리스트 생성 (to부터 30분씩 이전으로, 09:30까지)
-fn generate_time_intervals(to: &str) -> Vec<String> {
-    let mut intervals = Vec::new();
-    let mut current = to.to_string();
-    
-    // 09:30까지 반복
-    while current >= "0930".to_string() {
-        intervals.push(current.clone());
-        
-        // 30분 이전 시간 계산
-        current = subtract_30_minutes(&current);
-    }
-    
-    intervals.reverse(); // 시간순으로 정렬
-    intervals
-}
-
-/// 시간에서 30분을 빼는 함수
-fn subtract_30_minutes(time: &str) -> String {
-    if time.len() != 4 {
-        return time.to_string();
-    }
-    
-    let hour: i32 = time[0..2].parse().unwrap_or(0);
-    let minute: i32 = time[2..4].parse().unwrap_or(0);
-    
-    let total_minutes = hour * 60 + minute;
-    let new_total_minutes = total_minutes - 30;
-    
-    if new_total_minutes < 0 {
-        return "0900".to_string(); // 09:00 이하로는 내려가지 않음
-    }
-    
-    let new_hour = new_total_minutes / 60;
-    let new_minute = new_total_minutes % 60;
-    
-    format!("{:02}{:02}", new_hour, new_minute)
+fn generate_time_intervals(to: i64) -> Vec<i64> {
+    bar_time::cutoffs_back_to(to, 930, 30)
 }
 
 pub fn evaluate_d_logic(date: &str, to: &str) -> Result<Vec<DStock>, Box<dyn std::error::Error>> {
     init_logger();
     info!("🚀 D 종목 분석 시작: {} (09:00 ~ {})", date, to);
     
-    let conn = db::open("D:/db/stock_price(5min).db")?;
-    let tables = db::get_all_tables(&conn)?;
+    // 문자열은 여기서 한 번만 정수로 변환
+    let date_num = bar_time::parse_date(date)?;
+    let to = bar_time::parse_hhmm(to)?;
+    let _ctx = trace::context(date_num, to);
+    let _span = trace::span("d.evaluate");
+    
+    let conn = db::open(db::MIN5_DB_PATH)?;
+    // 데이터 품질 검사에서 격리된 종목-날짜는 빠른 경로와 똑같이 제외
+    let tables = quality::without_quarantined(&db::get_all_tables(&conn)?, date_num);
+    Ok(evaluate_d_trace(&conn, &tables, date_num, to)?.leaders)
+}
+
+/// 기준 구현의 단계별 결과 (차분 벤치마크에서 빠른 경로와 단계마다 비교)
+#[derive(Debug, Clone, Default)]
+pub struct DTrace {
+    /// 거래대금 상위 30개 테이블명 (거래대금 내림차순)
+    pub top: Vec<String>,
+    /// top 중 D 조건 만족 테이블명 (top 순서)
+    pub d_codes: Vec<String>,
+    /// 업종별 대표 종목 (상승률 내림차순)
+    pub leaders: Vec<DStock>,
+}
+
+/// 테이블별 SQL 로 D 규칙을 끝까지 평가 (tables 는 격리 종목이 이미 빠진 목록)
+pub fn evaluate_d_trace(
+    conn: &rusqlite::Connection,
+    tables: &[String],
+    date_num: i64,
+    to: i64
+) -> Result<DTrace, Box<dyn std::error::Error>> {
     debug!("📊 전체 종목 수: {}개", tables.len());
     
-    // 날짜 형식 변환
-    let date_num = date.replace("-", "");
-    let from = format!("{}0900", date_num);
-    let to_time = format!("{}{}", date_num, to);
+    let from = bar_time::at(date_num, 900);
+    let to_time = bar_time::at(date_num, to);
     
     debug!("⏰ 분석 시간 범위: {} ~ {} (INT 형식)", from, to_time);
     
     // 1단계: 거래대금 기준 상위 30개 종목 선정
-    let top30 = select_top30_by_trade_value(&conn, &tables, &from, &to_time)?;
+    let top30 = select_top30_by_trade_value(conn, tables, from, to_time)?;
     debug!("🏆 상위 30개 종목 선정 완료");
     
     // 2단계: D 조건 만족 종목 필터링
-    let d_codes = filter_d_stocks(&conn, &top30, &from, &to_time)?;
+    let d_codes = filter_d_stocks(conn, &top30, from, to_time)?;
     info!("✅ D 조건 만족 종목: {}개", d_codes.len());
     
     // 3단계: 종목 정보 매핑
-    let ds = map_stock_info(d_codes)?;
+    let ds = map_stock_info(d_codes.clone())?;
     
     if !ds.is_empty() {
         let codes: Vec<String> = ds.iter().map(|s| s.code.clone()).collect();
@@ -138,16 +131,18 @@ pub fn evaluate_d_logic(date: &str, to: &str) -> Result<Vec<DStock>, Box<dyn std
     }
     
     // 4단계: 업종명 필터링 및 상승률 기반 최종 선정
-    stock_filter::select_best_stock_by_increase_rate(&conn, ds, &date_num, to)
+    let leaders = stock_filter::select_best_stock_by_increase_rate(conn, tables, ds, date_num, to)?;
+    Ok(DTrace { top: top30, d_codes, leaders })
 }
 
 /// 거래대금 기준 상위 30개 종목 선정
 fn select_top30_by_trade_value(
     conn: &rusqlite::Connection,
     tables: &[String],
-    from: &str,
-    to: &str
+    from: i64,
+    to: i64
 ) -> Result<Vec<String>, Box<dyn std::error::Error>> {
+    let _span = trace::span("d.top30");
     let mut scored = vec![];
     let mut success_count = 0;
     let mut zero_count = 0;
@@ -183,9 +178,10 @@ fn select_top30_by_trade_value(
 fn filter_d_stocks(
     conn: &rusqlite::Connection,
     codes: &[String],
-    from: &str,
-    to: &str
+    from: i64,
+    to: i64
 ) -> Result<Vec<String>, Box<dyn std::error::Error>> {
+    let _span = trace::span("d.filter");
     let d_codes: Vec<String> = codes
         .iter()
         .filter(|code| {
@@ -234,7 +230,7 @@ mod tests {
         
         println!("🧪 D 로직 테스트 시작");
         
-        let conn = db::open("D:/db/stock_price(5min).db");
+        let conn = db::open(db::MIN5_DB_PATH);
         if conn.is_err() {
             assert!(false, "실제 5분봉 DB가 존재하지 않습니다: D:/db/stock_price(5min).db");
         }
@@ -0,0 +1,472 @@
+// 로컬 쿼리 데몬
+// 분석 프로세스마다 DB/업종 CSV/캐시를 다시 만드는 대신, 유닉스 소켓의 상주 프로세스 하나가 캐시를 들고
+// D 평가, 상승률 일괄 계산, 하루치 봉 로드 요청을 처리합니다.
+//
+// 프레임: [u32 길이][본문] (리틀 엔디언)
+// 요청 본문: [버전 u8][종류 u8][필드 ...]
+// 응답 본문: [0][종류 u8][필드 ...] 또는 [1][에러 메시지]
+// 필드는 캐시 스필과 같은 ByteWriter/ByteReader 형식이고 하루치 봉은 DayData 인코딩을 그대로 씁니다.
+//
+// 클라이언트는 데몬이 없거나 통신이 끊기면 None 을 돌려주고, 호출하는 쪽은 프로세스 안에서 계산합니다.
+
+use crate::core::cache::{ByteReader, ByteWriter, CacheValue};
+use crate::core::day_data::DayData;
+
+/// 기본 소켓 경로
+pub const DEFAULT_SOCKET_PATH: &str = "/tmp/rust_core_daemon.sock";
+/// 소켓 경로 환경 변수
+pub const SOCKET_ENV: &str = "RUST_CORE_DAEMON_SOCKET";
+/// "off" 면 데몬을 찾지 않고 항상 프로세스 안에서 계산
+pub const MODE_ENV: &str = "RUST_CORE_DAEMON";
+const PROTOCOL_VERSION: u8 = 1;
+/// 프레임 하나의 최대 크기 (하루치 전 종목 봉이 여유 있게 들어가는 크기)
+const MAX_FRAME_BYTES: usize = 1 << 30;
+
+#[derive(Debug, Clone, PartialEq)]
+pub enum Request {
+    Ping,
+    EvaluateD { date: String, time: String },
+    IncreaseRates { codes: Vec<String>, date: String, time: String },
+    DayBars { db_path: String, cache_path: Option<String>, date_num: i64, minutes: i64 },
+    Shutdown,
+}
+
+#[derive(Debug, Clone)]
+pub enum Response {
+    Pong { pid: u64, served: u64, uptime_secs: u64 },
+    Stocks(Vec<(String, String, String)>),
+    Rates(Vec<(String, f64)>),
+    Day(DayData),
+    Done,
+}
+
+fn unexpected(response: &Response) -> String {
+    let kind = match response {
+        Response::Pong { .. } => "pong",
+        Response::Stocks(_) => "stocks",
+        Response::Rates(_) => "rates",
+        Response::Day(_) => "day",
+        Response::Done => "done",
+    };
+    format!("데몬이 예상하지 못한 응답을 보냈습니다: {}", kind)
+}
+
+impl Response {
+    pub fn into_stocks(self) -> Result<Vec<(String, String, String)>, String> {
+        match self { Response::Stocks(v) => Ok(v), other => Err(unexpected(&other)) }
+    }
+
+    pub fn into_rates(self) -> Result<Vec<(String, f64)>, String> {
+        match self { Response::Rates(v) => Ok(v), other => Err(unexpected(&other)) }
+    }
+
+    pub fn into_day(self) -> Result<DayData, String> {
+        match self { Response::Day(v) => Ok(v), other => Err(unexpected(&other)) }
+    }
+}
+
+fn write_strs(out: &mut ByteWriter, values: &[String]) {
+    out.u64(values.len() as u64);
+    for v in values {
+        out.str(v);
+    }
+}
+
+fn read_strs(input: &mut ByteReader<'_>) -> Result<Vec<String>, String> {
+    let n = input.u64()? as usize;
+    (0..n).map(|_| input.str()).collect()
+}
+
+impl Request {
+    pub fn encode(&self) -> Vec<u8> {
+        let mut out = ByteWriter::default();
+        out.buf.push(PROTOCOL_VERSION);
+        match self {
+            Request::Ping => out.buf.push(0),
+            Request::EvaluateD { date, time } => {
+                out.buf.push(1);
+                out.str(date);
+                out.str(time);
+            },
+            Request::IncreaseRates { codes, date, time } => {
+                out.buf.push(2);
+                write_strs(&mut out, codes);
+                out.str(date);
+                out.str(time);
+            },
+            Request::DayBars { db_path, cache_path, date_num, minutes } => {
+                out.buf.push(3);
+                out.str(db_path);
+                out.str(cache_path.as_deref().unwrap_or(""));
+                out.i64(*date_num);
+                out.i64(*minutes);
+            },
+            Request::Shutdown => out.buf.push(4),
+        }
+        out.buf
+    }
+
+    pub fn decode(body: &[u8]) -> Result<Self, String> {
+        let (&version, rest) = body.split_first().ok_or("빈 요청입니다")?;
+        if version != PROTOCOL_VERSION {
+            return Err(format!("프로토콜 버전이 다릅니다: 클라이언트 {} / 데몬 {}", version, PROTOCOL_VERSION));
+        }
+        let (&kind, rest) = rest.split_first().ok_or("요청 종류가 없습니다")?;
+        let mut input = ByteReader::new(rest);
+        let request = match kind {
+            0 => Request::Ping,
+            1 => Request::EvaluateD { date: input.str()?, time: input.str()? },
+            2 => Request::IncreaseRates { codes: read_strs(&mut input)?, date: input.str()?, time: input.str()? },
+            3 => Request::DayBars {
+                db_path: input.str()?,
+                cache_path: Some(input.str()?).filter(|p| !p.is_empty()),
+                date_num: input.i64()?,
+                minutes: input.i64()?,
+            },
+            4 => Request::Shutdown,
+            _ => return Err(format!("알 수 없는 요청 종류입니다: {}", kind)),
+        };
+        Ok(request)
+    }
+}
+
+/// 응답 본문 인코딩 (에러는 메시지만)
+pub fn encode_response(result: &Result<Response, String>) -> Vec<u8> {
+    let mut out = ByteWriter::default();
+    match result {
+        Err(message) => {
+            out.buf.push(1);
+            out.str(message);
+        },
+        Ok(response) => {
+            out.buf.push(0);
+            match response {
+                Response::Pong { pid, served, uptime_secs } => {
+                    out.buf.push(0);
+                    out.u64(*pid);
+                    out.u64(*served);
+                    out.u64(*uptime_secs);
+                },
+                Response::Stocks(stocks) => {
+                    out.buf.push(1);
+                    out.u64(stocks.len() as u64);
+                    for (code, name, sector) in stocks {
+                        out.str(code);
+                        out.str(name);
+                        out.str(sector);
+                    }
+                },
+                Response::Rates(rates) => {
+                    out.buf.push(2);
+                    out.u64(rates.len() as u64);
+                    for (code, rate) in rates {
+                        out.str(code);
+                        out.u64(rate.to_bits());
+                    }
+                },
+                Response::Day(day) => {
+                    out.buf.push(3);
+                    day.encode(&mut out);
+                },
+                Response::Done => out.buf.push(4),
+            }
+        },
+    }
+    out.buf
+}
+
+pub fn decode_response(body: &[u8]) -> Result<Result<Response, String>, String> {
+    let (&status, rest) = body.split_first().ok_or("빈 응답입니다")?;
+    if status != 0 {
+        return Ok(Err(ByteReader::new(rest).str()?));
+    }
+    let (&kind, rest) = rest.split_first().ok_or("응답 종류가 없습니다")?;
+    let mut input = ByteReader::new(rest);
+    let response = match kind {
+        0 => Response::Pong { pid: input.u64()?, served: input.u64()?, uptime_secs: input.u64()? },
+        1 => {
+            let n = input.u64()? as usize;
+            Response::Stocks((0..n).map(|_| Ok((input.str()?, input.str()?, input.str()?))).collect::<Result<_, String>>()?)
+        },
+        2 => {
+            let n = input.u64()? as usize;
+            Response::Rates((0..n).map(|_| Ok((input.str()?, f64::from_bits(input.u64()?)))).collect::<Result<_, String>>()?)
+        },
+        3 => Response::Day(DayData::decode(&mut input)?),
+        4 => Response::Done,
+        _ => return Err(format!("알 수 없는 응답 종류입니다: {}", kind)),
+    };
+    Ok(Ok(response))
+}
+
+pub fn socket_path() -> String {
+    std::env::var(SOCKET_ENV).unwrap_or_else(|_| DEFAULT_SOCKET_PATH.to_string())
+}
+
+#[cfg(unix)]
+pub use self::unix::{forward, serve, Client, Handler};
+
+#[cfg(unix)]
+mod unix {
+    use super::*;
+    use std::io::{self, Read, Write};
+    use std::os::unix::net::{UnixListener, UnixStream};
+    use std::sync::atomic::{AtomicBool, AtomicU64, Ordering};
+    use std::sync::{Arc, Mutex};
+    use std::time::{Duration, Instant};
+    use once_cell::sync::Lazy;
+    use log::{debug, info, warn};
+
+    /// 연결 실패 후 다시 연결을 시도하기까지 기다리는 시간
+    const RECONNECT_AFTER: Duration = Duration::from_secs(5);
+
+    /// 이 프로세스가 데몬이면 true (데몬 안의 계산이 자기 자신에게 다시 전달되지 않도록)
+    static IN_DAEMON: AtomicBool = AtomicBool::new(false);
+
+    fn write_frame(stream: &mut UnixStream, body: &[u8]) -> io::Result<()> {
+        stream.write_all(&(body.len() as u32).to_le_bytes())?;
+        stream.write_all(body)?;
+        stream.flush()
+    }
+
+    /// 상대가 연결을 닫았으면 None
+    fn read_frame(stream: &mut UnixStream) -> io::Result<Option<Vec<u8>>> {
+        let mut len = [0u8; 4];
+        match stream.read_exact(&mut len) {
+            Ok(()) => {},
+            Err(e) if e.kind() == io::ErrorKind::UnexpectedEof => return Ok(None),
+            Err(e) => return Err(e),
+        }
+        let len = u32::from_le_bytes(len) as usize;
+        if len > MAX_FRAME_BYTES {
+            return Err(io::Error::new(io::ErrorKind::InvalidData, format!("프레임이 너무 큽니다: {}바이트", len)));
+        }
+        let mut body = vec![0u8; len];
+        stream.read_exact(&mut body)?;
+        Ok(Some(body))
+    }
+
+    /// 데몬 연결 하나
+    pub struct Client {
+        stream: UnixStream,
+    }
+
+    impl Client {
+        pub fn connect(path: &str) -> io::Result<Self> {
+            Ok(Self { stream: UnixStream::connect(path)? })
+        }
+
+        /// 요청 하나를 보내고 응답을 기다림. 통신 오류는 Err, 데몬이 돌려준 계산 오류는 Ok(Err)
+        pub fn call(&mut self, request: &Request) -> io::Result<Result<Response, String>> {
+            write_frame(&mut self.stream, &request.encode())?;
+            let body = read_frame(&mut self.stream)?
+                .ok_or_else(|| io::Error::new(io::ErrorKind::UnexpectedEof, "데몬이 연결을 닫았습니다"))?;
+            decode_response(&body).map_err(|e| io::Error::new(io::ErrorKind::InvalidData, e))
+        }
+    }
+
+    struct Shared {
+        client: Option<Client>,
+        /// 연결을 만든 프로세스 (fork 된 자식이 부모의 소켓을 같이 쓰면 요청/응답 프레임이 뒤섞임)
+        pid: u32,
+        retry_at: Option<Instant>,
+    }
+
+    static SHARED: Lazy<Mutex<Shared>> = Lazy::new(|| Mutex::new(Shared { client: None, pid: 0, retry_at: None }));
+
+    /// 데몬에 요청 전달 (연결은 프로세스 안에서 재사용)
+    ///
+    /// 데몬이 꺼져 있거나(RUST_CORE_DAEMON=off 포함) 통신이 끊기면 None 을 돌려주므로 호출하는 쪽은 프로세스 안에서 계산합니다.
+    /// 연결에 실패하면 잠시 동안은 다시 시도하지 않아 데몬 없이 돌 때의 부담이 없습니다.
+    pub fn forward(request: &Request) -> Option<Result<Response, String>> {
+        if IN_DAEMON.load(Ordering::Relaxed) || std::env::var(MODE_ENV).map_or(false, |v| v == "off") {
+            return None;
+        }
+        let mut shared = SHARED.lock().unwrap();
+        let pid = std::process::id();
+        if shared.pid != pid {
+            // fork 로 물려받은 연결은 버리고 (부모 쪽 연결은 그대로) 이 프로세스의 연결을 새로 만듦
+            shared.client = None;
+            shared.retry_at = None;
+            shared.pid = pid;
+        }
+        if shared.client.is_none() {
+            if shared.retry_at.map_or(false, |at| Instant::now() < at) {
+                return None;
+            }
+            match Client::connect(&socket_path()) {
+                Ok(client) => {
+                    debug!("🔌 쿼리 데몬 연결: {}", socket_path());
+                    shared.client = Some(client);
+                },
+                Err(_) => {
+                    shared.retry_at = Some(Instant::now() + RECONNECT_AFTER);
+                    return None;
+                },
+            }
+        }
+        match shared.client.as_mut().unwrap().call(request) {
+            Ok(result) => Some(result),
+            Err(e) => {
+                warn!("⚠️ 쿼리 데몬 통신 실패, 프로세스 안에서 계산합니다: {}", e);
+                shared.client = None;
+                shared.retry_at = Some(Instant::now() + RECONNECT_AFTER);
+                None
+            },
+        }
+    }
+
+    pub type Handler = dyn Fn(Request) -> Result<Response, String> + Send + Sync;
+
+    struct ServerState {
+        path: String,
+        stop: AtomicBool,
+        served: AtomicU64,
+        started: Instant,
+    }
+
+    fn handle_connection(mut stream: UnixStream, state: Arc<ServerState>, handler: Arc<Handler>) {
+        loop {
+            let body = match read_frame(&mut stream) {
+                Ok(Some(body)) => body,
+                Ok(None) => break,
+                Err(e) => {
+                    debug!("🔌 데몬 연결 종료: {}", e);
+                    break;
+                },
+            };
+            let result = Request::decode(&body).and_then(|request| match request {
+                Request::Ping => Ok(Response::Pong {
+                    pid: std::process::id() as u64,
+                    served: state.served.load(Ordering::Relaxed),
+                    uptime_secs: state.started.elapsed().as_secs(),
+                }),
+                Request::Shutdown => {
+                    state.stop.store(true, Ordering::SeqCst);
+                    Ok(Response::Done)
+                },
+                request => {
+                    state.served.fetch_add(1, Ordering::Relaxed);
+                    handler(request)
+                },
+            });
+            if write_frame(&mut stream, &encode_response(&result)).is_err() {
+                break;
+            }
+            if state.stop.load(Ordering::SeqCst) {
+                // accept 대기 중인 메인 루프를 깨움
+                let _ = UnixStream::connect(&state.path);
+                break;
+            }
+        }
+    }
+
+    /// 데몬 실행 (Shutdown 요청을 받을 때까지 블록). 반환: 처리한 요청 수
+    ///
+    /// 연결마다 스레드 하나가 요청을 순서대로 처리하고, 캐시/업종 정보는 프로세스 전역이라 모든 연결이 공유합니다.
+    pub fn serve(path: &str, handler: Arc<Handler>) -> Result<u64, Box<dyn std::error::Error>> {
+        if std::path::Path::new(path).exists() {
+            if UnixStream::connect(path).is_ok() {
+                return Err(format!("이미 쿼리 데몬이 실행 중입니다: {}", path).into());
+            }
+            // 비정상 종료로 남은 소켓 파일
+            std::fs::remove_file(path)?;
+        }
+        let listener = UnixListener::bind(path)?;
+        IN_DAEMON.store(true, Ordering::SeqCst);
+        let state = Arc::new(ServerState {
+            path: path.to_string(),
+            stop: AtomicBool::new(false),
+            served: AtomicU64::new(0),
+            started: Instant::now(),
+        });
+        info!("🛰️ 쿼리 데몬 시작: {} (pid {})", path, std::process::id());
+
+        for stream in listener.incoming() {
+            if state.stop.load(Ordering::SeqCst) {
+                break;
+            }
+            match stream {
+                Ok(stream) => {
+                    let (state, handler) = (state.clone(), handler.clone());
+                    std::thread::spawn(move || handle_connection(stream, state, handler));
+                },
+                Err(e) => warn!("⚠️ 데몬 연결 수락 실패: {}", e),
+            }
+        }
+
+        let _ = std::fs::remove_file(path);
+        IN_DAEMON.store(false, Ordering::SeqCst);
+        let served = state.served.load(Ordering::Relaxed);
+        info!("🛰️ 쿼리 데몬 종료: 요청 {}건 처리", served);
+        Ok(served)
+    }
+}
+
+/// 유닉스 소켓이 없는 OS 에서는 항상 프로세스 안에서 계산
+#[cfg(not(unix))]
+pub fn forward(_request: &Request) -> Option<Result<Response, String>> {
+    None
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::core::day_data::TickerDay;
+
+    #[test]
+    fn test_protocol_roundtrip() {
+        let requests = [
+            Request::Ping,
+            Request::EvaluateD { date: "2025-04-30".into(), time: "1000".into() },
+            Request::IncreaseRates { codes: vec!["005930".into(), "000660".into()], date: "2025-04-30".into(), time: "1030".into() },
+            Request::DayBars { db_path: "a.db".into(), cache_path: None, date_num: 20250430, minutes: 15 },
+            Request::Shutdown,
+        ];
+        for request in requests {
+            assert_eq!(Request::decode(&request.encode()).unwrap(), request);
+        }
+        let mut old = Request::Ping.encode();
+        old[0] = 0;
+        assert!(Request::decode(&old).is_err());
+
+        let day = DayData::from_tickers(20250430, vec![TickerDay::from_rows("A000001", vec![(20250430_0905, 100, 103, 99, 102, 10)])]);
+        let decoded = decode_response(&encode_response(&Ok(Response::Day(day)))).unwrap().unwrap().into_day().unwrap();
+        assert_eq!(decoded.tickers[0].tv_prefix, vec![0, 1010]);
+        let rates = decode_response(&encode_response(&Ok(Response::Rates(vec![("005930".into(), -1.25)])))).unwrap().unwrap();
+        assert_eq!(rates.into_rates().unwrap(), vec![("005930".to_string(), -1.25)]);
+        let error = decode_response(&encode_response(&Err("실패".into()))).unwrap();
+        assert_eq!(error.unwrap_err(), "실패");
+    }
+
+    #[cfg(unix)]
+    #[test]
+    fn test_serve_and_shutdown() {
+        use std::sync::Arc;
+        let path = std::env::temp_dir().join(format!("rust_core_daemon_test_{}.sock", std::process::id()));
+        let path = path.to_str().unwrap().to_string();
+        let handler: Arc<Handler> = Arc::new(|request| match request {
+            Request::EvaluateD { date, time } => Ok(Response::Stocks(vec![(date, time, "업종".into())])),
+            _ => Err("지원하지 않는 요청".into()),
+        });
+        let server = {
+            let path = path.clone();
+            std::thread::spawn(move || serve(&path, handler).unwrap())
+        };
+
+        let mut client = loop {
+            match Client::connect(&path) {
+                Ok(client) => break client,
+                Err(_) => std::thread::sleep(std::time::Duration::from_millis(10)),
+            }
+        };
+        let stocks = client.call(&Request::EvaluateD { date: "2025-04-30".into(), time: "1000".into() }).unwrap().unwrap();
+        assert_eq!(stocks.into_stocks().unwrap()[0].1, "1000");
+        assert!(client.call(&Request::IncreaseRates { codes: vec![], date: String::new(), time: String::new() }).unwrap().is_err());
+        assert!(matches!(client.call(&Request::Ping).unwrap().unwrap(), Response::Pong { served: 2, .. }));
+        assert!(matches!(client.call(&Request::Shutdown).unwrap().unwrap(), Response::Done));
+
+        assert_eq!(server.join().unwrap(), 2);
+        assert!(!std::path::Path::new(&path).exists());
+    }
+}
@@ -0,0 +1,288 @@
+use std::collections::{HashMap, HashSet};
+use std::sync::Arc;
+use rusqlite::Connection;
+use log::{debug, info};
+use crate::core::{quality, trace};
+use crate::core::cache::{self, ByteReader, ByteWriter, CacheValue, Pinned, CACHE};
+use crate::core::day_data::{bar_trade_value, DayData};
+use crate::features::db;
+
+// 전일 기준 일봉 컨텍스트 (전일 종가, 최근 20일 고가, 전일 거래대금)
+// 5분봉 DB 연결 하나에 일봉 DB를 ATTACH 해서 종목별 쿼리 한 번으로 날짜 범위 전체를 계산하고,
+// 날짜별로 메모리 예산 캐시에 넣어 두므로 일중 평가에서는 추가 쿼리 없이 배열 조회만 합니다.
+
+/// 최근 고가 계산에 쓰는 거래일 수
+pub const HIGH_LOOKBACK_DAYS: usize = 20;
+
+/// 하루치 전 종목 전일 컨텍스트 (종목 순서는 5분봉 DB 테이블 순서, 값이 없으면 0)
+#[derive(Debug, Clone, Default)]
+pub struct DailyContext {
+    /// YYYYMMDD (이 날짜 이전 거래일 기준)
+    pub date_num: i64,
+    pub tables: Vec<String>,
+    /// 직전 거래일 (YYYYMMDD)
+    pub prev_date: Vec<i64>,
+    pub prev_close: Vec<i64>,
+    /// 직전 HIGH_LOOKBACK_DAYS 거래일 고가의 최댓값
+    pub high_20: Vec<i64>,
+    /// 직전 거래일 일봉 거래대금 (5분봉과 같은 정수 공식)
+    pub prev_trade_value: Vec<i64>,
+}
+
+impl DailyContext {
+    fn with_tables(date_num: i64, tables: &[String]) -> Self {
+        let n = tables.len();
+        Self {
+            date_num,
+            tables: tables.to_vec(),
+            prev_date: vec![0; n],
+            prev_close: vec![0; n],
+            high_20: vec![0; n],
+            prev_trade_value: vec![0; n],
+        }
+    }
+
+    /// 메모리 예산 캐시를 거쳐 하루치 컨텍스트 읽기 (캐시에 없으면 그 날짜만 계산)
+    pub fn cached(min5_db_path: &str, day_db_path: &str, date_num: i64) -> Result<Pinned<DailyContext>, Box<dyn std::error::Error>> {
+        cache::get_or_load(&cache_key(min5_db_path, day_db_path, date_num), date_num, || {
+            load_range(min5_db_path, day_db_path, &[date_num])?
+                .pop()
+                .ok_or_else(|| format!("{} 일봉 컨텍스트 계산 결과가 없습니다", date_num).into())
+        })
+    }
+
+    /// day.tickers 순서의 종목 인덱스 → 컨텍스트 인덱스 (테이블 목록이 같으면 그대로)
+    pub fn aligned_to(&self, day: &DayData) -> Vec<Option<usize>> {
+        if self.tables.len() == day.tickers.len() && self.tables.iter().zip(&day.tickers).all(|(a, t)| *a == t.table) {
+            return (0..self.tables.len()).map(Some).collect();
+        }
+        let index: HashMap<&str, usize> = self.tables.iter().enumerate().map(|(i, t)| (t.as_str(), i)).collect();
+        day.tickers.iter().map(|t| index.get(t.table.as_str()).copied()).collect()
+    }
+}
+
+impl CacheValue for DailyContext {
+    fn size_bytes(&self) -> usize {
+        std::mem::size_of::<Self>()
+            + self.tables.iter().map(|t| t.capacity() + std::mem::size_of::<String>()).sum::<usize>()
+            + (self.prev_date.capacity() + self.prev_close.capacity() + self.high_20.capacity() + self.prev_trade_value.capacity()) * 8
+    }
+
+    fn encode(&self, out: &mut ByteWriter) {
+        out.i64(self.date_num);
+        out.u64(self.tables.len() as u64);
+        for table in &self.tables {
+            out.str(table);
+        }
+        for column in [&self.prev_date, &self.prev_close, &self.high_20, &self.prev_trade_value] {
+            out.i64s(column);
+        }
+    }
+
+    fn decode(input: &mut ByteReader<'_>) -> Result<Self, String> {
+        let date_num = input.i64()?;
+        let n = input.u64()? as usize;
+        let tables = (0..n).map(|_| input.str()).collect::<Result<Vec<_>, _>>()?;
+        Ok(Self {
+            date_num,
+            tables,
+            prev_date: input.i64s()?,
+            prev_close: input.i64s()?,
+            high_20: input.i64s()?,
+            prev_trade_value: input.i64s()?,
+        })
+    }
+}
+
+fn cache_key(min5_db_path: &str, day_db_path: &str, date_num: i64) -> String {
+    format!("context:{}:{}:{}:{}:{}", min5_db_path, db::modified_stamp(min5_db_path),
+            day_db_path, db::modified_stamp(day_db_path), date_num)
+}
+
+/// 일봉 한 줄 (date, open, high, close, volume)
+type DailyRow = (i64, i64, i64, i64, i64);
+
+/// 가장 이른 날짜 이전 HIGH_LOOKBACK_DAYS 거래일부터 가장 늦은 날짜 직전까지의 일봉 (date 오름차순)
+fn load_daily_rows(conn: &Connection, table: &str, first: i64, last: i64) -> Result<Vec<DailyRow>, rusqlite::Error> {
+    let query = format!(
+        "SELECT date, open, high, close, volume FROM daily.{t}
+         WHERE date < ?2 AND date >= COALESCE(
+             (SELECT date FROM daily.{t} WHERE date < ?1 ORDER BY date DESC LIMIT 1 OFFSET {offset}), 0)
+         ORDER BY date",
+        t = table,
+        offset = HIGH_LOOKBACK_DAYS - 1
+    );
+    let mut stmt = conn.prepare(&query)?;
+    let rows = stmt
+        .query_map([first, last], |row| Ok((row.get(0)?, row.get(1)?, row.get(2)?, row.get(3)?, row.get(4)?)))?
+        .collect::<Result<Vec<DailyRow>, _>>()?;
+    Ok(rows)
+}
+
+/// 정렬된 일봉으로 날짜별 전일 컨텍스트를 채움 (rows 는 date 오름차순, date_nums 도 오름차순)
+fn fill_contexts(contexts: &mut [DailyContext], idx: usize, rows: &[DailyRow]) {
+    let mut k = 0;
+    for context in contexts.iter_mut() {
+        while k < rows.len() && rows[k].0 < context.date_num {
+            k += 1;
+        }
+        if k == 0 {
+            continue;
+        }
+        let (prev_date, open, _, close, volume) = rows[k - 1];
+        context.prev_date[idx] = prev_date;
+        context.prev_close[idx] = close;
+        context.prev_trade_value[idx] = bar_trade_value(open, close, volume);
+        context.high_20[idx] = rows[k.saturating_sub(HIGH_LOOKBACK_DAYS)..k].iter().map(|r| r.2).max().unwrap_or(0);
+    }
+}
+
+/// 5분봉 DB에 일봉 DB를 ATTACH 한 연결 하나로 여러 날짜의 컨텍스트를 한 번에 계산
+///
+/// 종목마다 일봉 쿼리 한 번으로 날짜 범위 전체를 처리합니다. 격리된 (종목, 날짜)는 0으로 둡니다.
+pub fn load_range(min5_db_path: &str, day_db_path: &str, date_nums: &[i64]) -> Result<Vec<DailyContext>, Box<dyn std::error::Error>> {
+    let _span = trace::span("context.load");
+    let mut dates = date_nums.to_vec();
+    dates.sort_unstable();
+    dates.dedup();
+    let (Some(&first), Some(&last)) = (dates.first(), dates.last()) else {
+        return Ok(vec![]);
+    };
+
+    let conn = db::open(min5_db_path)?;
+    conn.execute("ATTACH DATABASE ?1 AS daily", [day_db_path])?;
+    let tables = db::get_all_tables(&conn)?;
+    let daily_tables: HashSet<String> = {
+        let mut stmt = conn.prepare("SELECT name FROM daily.sqlite_master WHERE type='table'")?;
+        let names = stmt.query_map((), |row| row.get(0))?.collect::<Result<HashSet<String>, _>>()?;
+        names
+    };
+
+    let mut contexts: Vec<DailyContext> = dates.iter().map(|&d| DailyContext::with_tables(d, &tables)).collect();
+    let mut error_count = 0;
+    for (idx, table) in tables.iter().enumerate() {
+        if !daily_tables.contains(table) {
+            continue;
+        }
+        match load_daily_rows(&conn, table, first, last) {
+            Ok(rows) => fill_contexts(&mut contexts, idx, &rows),
+            Err(e) => {
+                error_count += 1;
+                if error_count <= 3 {
+                    debug!("❌ {} 일봉 컨텍스트 로드 에러: {}", table, e);
+                }
+            }
+        }
+    }
+
+    // 격리된 종목-날짜의 전일 값은 쓰지 않음
+    let quarantine = quality::QUARANTINE.read().unwrap();
+    if !quarantine.is_empty() {
+        for context in &mut contexts {
+            for (idx, table) in tables.iter().enumerate() {
+                if context.prev_date[idx] > 0 && quarantine.contains(table, context.prev_date[idx]) {
+                    context.prev_date[idx] = 0;
+                    context.prev_close[idx] = 0;
+                    context.high_20[idx] = 0;
+                    context.prev_trade_value[idx] = 0;
+                }
+            }
+        }
+    }
+
+    debug!("📆 일봉 컨텍스트 계산: {}개 날짜 x {}개 종목 (일봉 테이블 {}개, 에러 {}개)",
+           dates.len(), tables.len(), daily_tables.len(), error_count);
+    Ok(contexts)
+}
+
+/// 날짜 범위의 컨텍스트를 한 번에 계산해 캐시에 넣음 (이미 캐시에 있는 날짜는 건너뜀). 새로 계산한 날짜 수 반환
+pub fn prefetch_range(min5_db_path: &str, day_db_path: &str, date_nums: &[i64]) -> Result<usize, Box<dyn std::error::Error>> {
+    let missing: Vec<i64> = {
+        let mut cache = CACHE.lock().unwrap();
+        date_nums.iter().copied()
+            .filter(|&d| cache.get::<DailyContext>(&cache_key(min5_db_path, day_db_path, d)).is_none())
+            .collect()
+    };
+    if missing.is_empty() {
+        return Ok(0);
+    }
+
+    let contexts = load_range(min5_db_path, day_db_path, &missing)?;
+    let mut cache = CACHE.lock().unwrap();
+    for context in contexts {
+        let key = cache_key(min5_db_path, day_db_path, context.date_num);
+        let date_num = context.date_num;
+        cache.insert(&key, date_num, Arc::new(context));
+    }
+    info!("📆 일봉 컨텍스트 미리 계산: {}개 날짜", missing.len());
+    Ok(missing.len())
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_fill_contexts_uses_prior_days_only() {
+        let tables = vec!["A000001".to_string()];
+        let mut contexts = vec![
+            DailyContext::with_tables(20250102, &tables),
+            DailyContext::with_tables(20250110, &tables),
+            DailyContext::with_tables(20250301, &tables),
+        ];
+        // 1월 2일부터 영업일 25일, 고가는 날마다 10씩 증가하다 마지막 날 하락
+        let mut rows: Vec<DailyRow> = (0..25).map(|i| (20250102 + i, 1000, 1100 + i * 10, 1050, 100)).collect();
+        rows.push((20250201, 1000, 1200, 900, 200));
+        fill_contexts(&mut contexts, 0, &rows);
+
+        // 당일 일봉은 쓰지 않음
+        assert_eq!(contexts[0].prev_date[0], 0);
+
+        assert_eq!(contexts[1].prev_date[0], 20250109);
+        assert_eq!(contexts[1].prev_close[0], 1050);
+        assert_eq!(contexts[1].high_20[0], 1100 + 7 * 10);
+
+        assert_eq!(contexts[2].prev_date[0], 20250201);
+        assert_eq!(contexts[2].prev_trade_value[0], bar_trade_value(1000, 900, 200));
+        // 최근 20거래일: 21번째 행(인덱스 6)부터 마지막 행까지
+        assert_eq!(contexts[2].high_20[0], 1100 + 24 * 10);
+
+        let mut out = ByteWriter::default();
+        contexts[2].encode(&mut out);
+        let decoded = DailyContext::decode(&mut ByteReader::new(&out.buf)).unwrap();
+        assert_eq!(decoded.high_20, contexts[2].high_20);
+        assert_eq!(decoded.tables, tables);
+    }
+
+    #[test]
+    fn test_graph_context_features() {
+        use crate::core::day_data::TickerDay;
+        use crate::core::feature_graph::{FeatureGraph, FeatureKind};
+        use crate::features::stock_info::StockInfo;
+
+        let day = DayData::from_tickers(20250430, vec![
+            TickerDay::from_rows("A000001", vec![(202504300900, 1100, 1150, 1100, 1150, 10), (202504300905, 1150, 1300, 1150, 1250, 10)]),
+            TickerDay::from_rows("A000002", vec![(202504300900, 500, 510, 500, 510, 10)]),
+        ]);
+        // 테이블 순서가 달라도 이름으로 맞춤
+        let tables = vec!["A000002".to_string(), "A000001".to_string()];
+        let mut context = DailyContext::with_tables(20250430, &tables);
+        context.prev_date = vec![0, 20250429];
+        context.prev_close = vec![0, 1000];
+        context.high_20 = vec![0, 1250];
+        context.prev_trade_value = vec![0, 5_000_000];
+        let context = cache::get_or_load("test:context:20250430", 20250430, || Ok(context)).unwrap();
+
+        let infos = ["000001", "000002"].iter()
+            .map(|code| StockInfo { code: code.to_string(), name: code.to_string(), sector: "기타".to_string() })
+            .collect();
+        let mut graph = FeatureGraph::with_infos(&day, infos);
+        assert_eq!(graph.get_with(FeatureKind::PriorGap, 905, &Default::default()).rates(), &[None, None]);
+
+        graph.attach_context(context);
+        let params = Default::default();
+        assert_eq!(graph.get_with(FeatureKind::PriorGap, 905, &params).rates(), &[Some(10.0), None]);
+        assert_eq!(graph.get_with(FeatureKind::HighDistance, 905, &params).rates(), &[Some(0.0), None]);
+        assert_eq!(graph.get_with(FeatureKind::PriorTradeValue, 905, &params).values(), &[Some(5_000_000), None]);
+    }
+}
@@ -0,0 +1,255 @@
+use rusqlite::Connection;
+use crate::core::{archive, bar_time, quality, snapshot, trace};
+use crate::core::cache::{self, ByteReader, ByteWriter, CacheValue, Pinned};
+use crate::features::db;
+use log::debug;
+
+/// 한 종목의 하루치 5분봉 (date 오름차순)
+#[derive(Debug, Clone, Default)]
+pub struct TickerDay {
+    pub table: String,
+    pub dates: Vec<i64>,
+    pub open: Vec<i64>,
+    pub high: Vec<i64>,
+    pub low: Vec<i64>,
+    pub close: Vec<i64>,
+    pub volume: Vec<i64>,
+    /// tv_prefix[i] = 앞에서부터 i개 봉의 거래대금 합 (길이 = 봉 개수 + 1)
+    pub tv_prefix: Vec<i64>,
+}
+
+/// 5분봉 한 줄 (date, open, high, low, close, volume)
+pub type BarRow = (i64, i64, i64, i64, i64, i64);
+
+impl TickerDay {
+    pub fn from_rows(table: &str, rows: Vec<BarRow>) -> Self {
+        let mut day = TickerDay {
+            table: table.to_string(),
+            dates: Vec::with_capacity(rows.len()),
+            open: Vec::with_capacity(rows.len()),
+            high: Vec::with_capacity(rows.len()),
+            low: Vec::with_capacity(rows.len()),
+            close: Vec::with_capacity(rows.len()),
+            volume: Vec::with_capacity(rows.len()),
+            tv_prefix: Vec::with_capacity(rows.len() + 1),
+        };
+        day.tv_prefix.push(0);
+        for (date, open, high, low, close, volume) in rows {
+            day.push_bar(date, open, high, low, close, volume);
+        }
+        day
+    }
+
+    /// 봉 하나를 뒤에 추가하고 거래대금 누적합을 갱신
+    pub fn push_bar(&mut self, date: i64, open: i64, high: i64, low: i64, close: i64, volume: i64) {
+        self.push_bar_with_value(date, open, high, low, close, volume, bar_trade_value(open, close, volume));
+    }
+
+    /// 거래대금을 직접 지정해 봉 추가 (리샘플링된 봉은 5분봉 거래대금의 합을 사용)
+    pub fn push_bar_with_value(
+        &mut self,
+        date: i64,
+        open: i64,
+        high: i64,
+        low: i64,
+        close: i64,
+        volume: i64,
+        trade_value: i64
+    ) {
+        if self.tv_prefix.is_empty() {
+            self.tv_prefix.push(0);
+        }
+        let last = *self.tv_prefix.last().unwrap();
+        self.dates.push(date);
+        self.open.push(open);
+        self.high.push(high);
+        self.low.push(low);
+        self.close.push(close);
+        self.volume.push(volume);
+        self.tv_prefix.push(last + trade_value);
+    }
+
+    pub fn len(&self) -> usize {
+        self.dates.len()
+    }
+
+    /// i 번째 봉의 거래대금
+    pub fn trade_value_at(&self, i: usize) -> i64 {
+        self.tv_prefix[i + 1] - self.tv_prefix[i]
+    }
+
+    /// from <= date <= to 를 만족하는 봉의 인덱스 범위 [start, end)
+    pub fn range(&self, from: i64, to: i64) -> (usize, usize) {
+        let start = self.dates.partition_point(|&d| d < from);
+        let end = self.dates.partition_point(|&d| d <= to);
+        (start, end.max(start))
+    }
+
+    /// 구간 거래대금 합 (구간에 봉이 없으면 None)
+    pub fn trade_value_between(&self, from: i64, to: i64) -> Option<i64> {
+        let (start, end) = self.range(from, to);
+        if start == end {
+            return None;
+        }
+        Some(self.tv_prefix[end] - self.tv_prefix[start])
+    }
+
+    /// 구간 첫 봉의 시가와 마지막 봉의 종가
+    pub fn open_close_between(&self, from: i64, to: i64) -> Option<(i64, i64)> {
+        let (start, end) = self.range(from, to);
+        if start == end {
+            return None;
+        }
+        Some((self.open[start], self.close[end - 1]))
+    }
+
+    /// 구간 상승률 (%), 봉이 없으면 None
+    pub fn increase_rate_between(&self, from: i64, to: i64) -> Option<f64> {
+        self.open_close_between(from, to)
+            .map(|(open, close)| (close - open) as f64 / open as f64 * 100.0)
+    }
+}
+
+/// SQL `SUM(volume * (open + close) / 2)` 와 같은 정수 연산으로 계산한 봉 하나의 거래대금
+#[inline]
+pub fn bar_trade_value(open: i64, close: i64, volume: i64) -> i64 {
+    volume * (open + close) / 2
+}
+
+/// 하루치 전 종목 5분봉 (종목 순서는 DB 테이블 순서와 동일)
+#[derive(Debug, Clone, Default)]
+pub struct DayData {
+    /// YYYYMMDD
+    pub date_num: i64,
+    pub tickers: Vec<TickerDay>,
+}
+
+impl DayData {
+    pub fn from_tickers(date_num: i64, tickers: Vec<TickerDay>) -> Self {
+        Self { date_num, tickers }
+    }
+
+    /// 하루치 데이터를 종목별 쿼리 한 번씩으로 읽어오기
+    pub fn load(
+        conn: &Connection,
+        tables: &[String],
+        date_num: i64
+    ) -> Result<Self, Box<dyn std::error::Error>> {
+        let _span = trace::span("day.load");
+        let (day_start, day_end) = bar_time::day_range(date_num);
+
+        let mut tickers = Vec::with_capacity(tables.len());
+        let mut error_count = 0;
+        let mut quarantined = 0;
+        // 격리된 종목-날짜는 빈 데이터로 두어 종목 순서만 유지 (이후 계산은 행 단위 방어 검사 없이 진행)
+        let quarantine = quality::QUARANTINE.read().unwrap();
+
+        for table in tables {
+            if quarantine.contains(table, date_num) {
+                quarantined += 1;
+                tickers.push(TickerDay::from_rows(table, vec![]));
+                continue;
+            }
+            match load_ticker_day(conn, table, day_start, day_end) {
+                Ok(day) => tickers.push(day),
+                Err(e) => {
+                    error_count += 1;
+                    if error_count <= 3 {
+                        debug!("❌ {} 일중 데이터 로드 에러: {}", table, e);
+                    }
+                    tickers.push(TickerDay::from_rows(table, vec![]));
+                }
+            }
+        }
+
+        debug!("📦 {} 일중 데이터 로드 완료: {}개 종목 (에러 {}개, 격리 {}개)", date_num, tickers.len(), error_count, quarantined);
+        Ok(Self { date_num, tickers })
+    }
+
+    /// 메모리 예산 캐시를 거쳐 하루치 데이터 읽기 (캐시에 없을 때만 DB 연결)
+    /// db_path 가 아카이브(.rca)면 SQLite 대신 아카이브 블록을 해석합니다.
+    /// 다른 프로세스가 발행한 공유 스냅샷이 있으면 DB 대신 스냅샷을 읽습니다 (폴더는 snapshot::set_default_dir,
+    /// RUST_CORE_SNAPSHOT_DIR, 기본 폴더 순). 스냅샷도 힙으로 복사하므로 SQLite 해석만 건너뜁니다.
+    /// 캐시 키에 원본 파일의 수정 시각이 들어가므로 DB가 갱신되면 (장중 오늘 날짜 포함) 다시 읽습니다.
+    pub fn cached(db_path: &str, date_num: i64) -> Result<Pinned<DayData>, Box<dyn std::error::Error>> {
+        let key = format!("day:{}:{}:{}", db_path, db::modified_stamp(db_path), date_num);
+        cache::get_or_load(&key, date_num, || {
+            if let Some(info) = snapshot::SnapshotRegistry::new(None).find(db_path, date_num) {
+                return snapshot::read_day(&info);
+            }
+            if archive::is_archive_path(db_path) {
+                return archive::shared(db_path)?.read_day(date_num);
+            }
+            let conn = db::open(db_path)?;
+            let tables = db::get_all_tables(&conn)?;
+            Self::load(&conn, &tables, date_num)
+        })
+    }
+
+    /// 날짜 + HHMM 을 DB의 정수 date 값으로 변환
+    pub fn at(&self, hhmm: i64) -> i64 {
+        bar_time::at(self.date_num, hhmm)
+    }
+}
+
+impl CacheValue for DayData {
+    fn size_bytes(&self) -> usize {
+        std::mem::size_of::<Self>() + self.tickers.iter()
+            .map(|t| {
+                let columns = t.dates.capacity() + t.open.capacity() + t.high.capacity() + t.low.capacity()
+                    + t.close.capacity() + t.volume.capacity() + t.tv_prefix.capacity();
+                std::mem::size_of::<TickerDay>() + t.table.capacity() + columns * 8
+            })
+            .sum::<usize>()
+    }
+
+    fn encode(&self, out: &mut ByteWriter) {
+        out.i64(self.date_num);
+        out.u64(self.tickers.len() as u64);
+        for t in &self.tickers {
+            out.str(&t.table);
+            for column in [&t.dates, &t.open, &t.high, &t.low, &t.close, &t.volume, &t.tv_prefix] {
+                out.i64s(column);
+            }
+        }
+    }
+
+    fn decode(input: &mut ByteReader<'_>) -> Result<Self, String> {
+        let date_num = input.i64()?;
+        let n = input.u64()? as usize;
+        let mut tickers = Vec::with_capacity(n);
+        for _ in 0..n {
+            tickers.push(TickerDay {
+                table: input.str()?,
+                dates: input.i64s()?,
+                open: input.i64s()?,
+                high: input.i64s()?,
+                low: input.i64s()?,
+                close: input.i64s()?,
+                volume: input.i64s()?,
+                tv_prefix: input.i64s()?,
+            });
+        }
+        Ok(Self { date_num, tickers })
+    }
+}
+
+fn load_ticker_day(
+    conn: &Connection,
+    table: &str,
+    day_start: i64,
+    day_end: i64
+) -> Result<TickerDay, rusqlite::Error> {
+    let _span = trace::span("query.day_bars");
+    let query = format!(
+        "SELECT date, open, high, low, close, volume FROM {} WHERE date BETWEEN ?1 AND ?2 ORDER BY date",
+        table
+    );
+    let mut stmt = conn.prepare(&query)?;
+    let rows = stmt
+        .query_map([day_start, day_end], |row| {
+            Ok((row.get(0)?, row.get(1)?, row.get(2)?, row.get(3)?, row.get(4)?, row.get(5)?))
+        })?
+        .collect::<Result<Vec<BarRow>, _>>()?;
+    Ok(TickerDay::from_rows(table, rows))
+}
@@ -0,0 +1,378 @@
+// 차분 벤치마크: 기준 구현(테이블별 SQL)과 빠른 경로를 같은 날짜/시간대에서 나란히 실행해
+// 상위 30 목록, D 종목, 업종 대표 종목, 대표 종목 상승률을 단계별로 비교하고 속도 차이를 잽니다.
+// 실제 DB 대신 합성 DB(업종 CSV의 실제 종목코드 + 결정적 난수 5분봉)로도 돌릴 수 있습니다.
+
+use std::collections::HashMap;
+use std::fs;
+use std::time::Instant;
+use rusqlite::Connection;
+use log::{info, warn};
+use crate::core::{archive, bar_time, quality, trace};
+use crate::core::d_logic::evaluate_d_trace;
+use crate::core::day_data::{BarRow, DayData};
+use crate::core::feature_graph::{select_sector_leaders, DParams, FeatureGraph, FeatureKind};
+use crate::core::sector_index::index_cutoffs;
+use crate::features::{db, stock_filter};
+use crate::features::stock_info::{StockInfo, STOCK_INFO_MANAGER};
+
+/// 상승률 비교 허용 오차 (%)
+const RATE_TOLERANCE: f64 = 1e-9;
+
+/// 기준 구현과 비교할 빠른 경로
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Hash)]
+pub enum Engine {
+    /// SQLite 하루치 로드 + 피처 그래프
+    Graph,
+    /// SQLite 하루치 로드 + 업종 x 시간대 집계 인덱스
+    SectorIndex,
+    /// 압축 아카이브 로드 + 피처 그래프
+    Archive,
+}
+
+impl Engine {
+    pub fn label(&self) -> &'static str {
+        match self {
+            Engine::Graph => "graph",
+            Engine::SectorIndex => "sector_index",
+            Engine::Archive => "archive",
+        }
+    }
+}
+
+#[derive(Debug, Clone)]
+pub struct DiffConfig {
+    pub db_path: String,
+    /// 주면 아카이브 엔진도 함께 비교
+    pub archive_path: Option<String>,
+    pub dates: Vec<i64>,
+    pub cutoffs: Vec<i64>,
+}
+
+/// 한 (날짜, 시간대)의 단계별 결과
+#[derive(Debug, Clone, Default, PartialEq)]
+struct Outcome {
+    top: Vec<String>,
+    d_codes: Vec<String>,
+    leaders: Vec<String>,
+    rates: Vec<f64>,
+}
+
+#[derive(Debug, Clone)]
+pub struct Mismatch {
+    pub date_num: i64,
+    pub cutoff: i64,
+    pub engine: Engine,
+    /// "top" / "d_codes" / "leaders" / "rates"
+    pub field: &'static str,
+    pub reference: String,
+    pub fast: String,
+}
+
+#[derive(Debug, Clone, Default)]
+pub struct DiffReport {
+    /// 비교한 (날짜, 시간대) 수
+    pub attempts: usize,
+    pub reference_seconds: f64,
+    /// 엔진별 소요 시간 (하루치 로드 + 전체 시간대 평가)
+    pub engine_seconds: Vec<(Engine, f64)>,
+    pub mismatches: Vec<Mismatch>,
+}
+
+impl DiffReport {
+    /// 기준 구현 대비 배속
+    pub fn speedup(&self, engine: Engine) -> f64 {
+        self.engine_seconds.iter()
+            .find(|(e, _)| *e == engine)
+            .map(|(_, seconds)| self.reference_seconds / seconds.max(1e-9))
+            .unwrap_or(0.0)
+    }
+
+    pub fn mismatch_count(&self, engine: Engine) -> usize {
+        self.mismatches.iter().filter(|m| m.engine == engine).count()
+    }
+}
+
+fn join_rates(rates: &[f64]) -> String {
+    rates.iter().map(|r| format!("{:.6}", r)).collect::<Vec<_>>().join(",")
+}
+
+/// 단계별 차이 (상승률은 대표 종목이 같을 때만 비교)
+fn compare(reference: &Outcome, fast: &Outcome) -> Vec<(&'static str, String, String)> {
+    let mut diffs = Vec::new();
+    for (field, a, b) in [
+        ("top", &reference.top, &fast.top),
+        ("d_codes", &reference.d_codes, &fast.d_codes),
+        ("leaders", &reference.leaders, &fast.leaders),
+    ] {
+        if a != b {
+            diffs.push((field, a.join(","), b.join(",")));
+        }
+    }
+    if reference.leaders == fast.leaders
+        && reference.rates.iter().zip(&fast.rates).any(|(a, b)| (a - b).abs() > RATE_TOLERANCE)
+    {
+        diffs.push(("rates", join_rates(&reference.rates), join_rates(&fast.rates)));
+    }
+    diffs
+}
+
+fn reference_outcome(conn: &Connection, tables: &[String], date_num: i64, cutoff: i64) -> Result<(Outcome, f64), Box<dyn std::error::Error>> {
+    let started = Instant::now();
+    let d_trace = evaluate_d_trace(conn, tables, date_num, cutoff)?;
+    let seconds = started.elapsed().as_secs_f64();
+
+    // 대표 종목 상승률은 결과 비교용이므로 시간 측정에서 제외
+    let rates = d_trace.leaders.iter()
+        .map(|s| stock_filter::calculate_d_period_increase_rate(conn, &s.code, date_num, cutoff))
+        .collect::<Result<Vec<f64>, _>>()?;
+    let outcome = Outcome {
+        top: d_trace.top,
+        d_codes: d_trace.d_codes,
+        leaders: d_trace.leaders.into_iter().map(|s| s.code).collect(),
+        rates,
+    };
+    Ok((outcome, seconds))
+}
+
+/// 피처 그래프로 전 시간대를 평가 (DStrategy 와 같은 규칙)
+fn fast_outcomes(day: &DayData, cutoffs: &[i64], use_sector_index: bool) -> Vec<Outcome> {
+    let params = DParams::default();
+    let mut graph = FeatureGraph::new(day);
+    graph.set_use_sector_index(use_sector_index);
+
+    cutoffs.iter().map(|&cutoff| {
+        let top = graph.get_with(FeatureKind::TopTradeValue, cutoff, &params);
+        let d_codes = graph.get_with(FeatureKind::DCodes, cutoff, &params);
+        let rates = graph.get_with(FeatureKind::WindowReturn, cutoff, &params);
+        let leaders = select_sector_leaders(&mut graph, d_codes.indices(), cutoff, &params);
+        Outcome {
+            top: top.indices().iter().map(|&i| day.tickers[i].table.clone()).collect(),
+            d_codes: d_codes.indices().iter().map(|&i| day.tickers[i].table.clone()).collect(),
+            rates: leaders.iter().map(|&i| rates.rates()[i].unwrap_or(0.0)).collect(),
+            leaders: leaders.into_iter().map(|i| graph.stock(i).code).collect(),
+        }
+    }).collect()
+}
+
+/// 기준 구현과 빠른 경로를 날짜별로 나란히 실행
+///
+/// 빠른 경로는 캐시를 거치지 않고 엔진마다 하루치를 직접 읽으므로 로드 시간까지 포함해 비교합니다.
+pub fn run_differential(config: &DiffConfig) -> Result<DiffReport, Box<dyn std::error::Error>> {
+    let _span = trace::span("diff.run");
+    let conn = db::open(&config.db_path)?;
+    let all_tables = db::get_all_tables(&conn)?;
+    let opened = config.archive_path.as_deref().map(archive::shared).transpose()?;
+
+    let mut engines = vec![Engine::Graph, Engine::SectorIndex];
+    if opened.is_some() {
+        engines.push(Engine::Archive);
+    }
+    let mut engine_seconds: HashMap<Engine, f64> = HashMap::new();
+    let mut report = DiffReport::default();
+
+    for &date_num in &config.dates {
+        let _ctx = trace::context(date_num, 0);
+        let tables = quality::without_quarantined(&all_tables, date_num);
+
+        let mut reference = Vec::with_capacity(config.cutoffs.len());
+        for &cutoff in &config.cutoffs {
+            let (outcome, seconds) = reference_outcome(&conn, &tables, date_num, cutoff)?;
+            report.reference_seconds += seconds;
+            reference.push(outcome);
+        }
+        report.attempts += config.cutoffs.len();
+
+        for &engine in &engines {
+            let started = Instant::now();
+            let day = match engine {
+                Engine::Archive => opened.as_ref().unwrap().read_day(date_num)?,
+                _ => DayData::load(&conn, &all_tables, date_num)?,
+            };
+            let outcomes = fast_outcomes(&day, &config.cutoffs, engine == Engine::SectorIndex);
+            *engine_seconds.entry(engine).or_default() += started.elapsed().as_secs_f64();
+
+            for ((&cutoff, expected), actual) in config.cutoffs.iter().zip(&reference).zip(&outcomes) {
+                for (field, reference, fast) in compare(expected, actual) {
+                    if report.mismatches.len() < 5 {
+                        warn!("❌ {} {:04} {} {} 불일치: 기준 [{}] / 빠른 경로 [{}]", date_num, cutoff, engine.label(), field, reference, fast);
+                    }
+                    report.mismatches.push(Mismatch { date_num, cutoff, engine, field, reference, fast });
+                }
+            }
+        }
+        info!("🔬 {} 차분 비교 완료: {}개 시간대 (누적 불일치 {}건)", date_num, config.cutoffs.len(), report.mismatches.len());
+    }
+
+    report.engine_seconds = engines.iter().map(|e| (*e, engine_seconds.get(e).copied().unwrap_or(0.0))).collect();
+    Ok(report)
+}
+
+/// 결정적 난수 (SplitMix64)
+struct SplitMix64(u64);
+
+impl SplitMix64 {
+    fn next(&mut self) -> u64 {
+        self.0 = self.0.wrapping_add(0x9E37_79B9_7F4A_7C15);
+        let mut z = self.0;
+        z = (z ^ (z >> 30)).wrapping_mul(0xBF58_476D_1CE4_E5B9);
+        z = (z ^ (z >> 27)).wrapping_mul(0x94D0_49BB_1331_11EB);
+        z ^ (z >> 31)
+    }
+
+    /// [lo, hi) 정수
+    fn range(&mut self, lo: i64, hi: i64) -> i64 {
+        lo + (self.next() % (hi - lo) as u64) as i64
+    }
+
+    /// [0, 1) 실수
+    fn unit(&mut self) -> f64 {
+        (self.next() >> 11) as f64 / (1u64 << 53) as f64
+    }
+}
+
+/// 합성 DB에 넣을 종목 (업종 CSV 의 실제 종목코드를 써야 업종 매핑이 기준 구현과 같아짐)
+pub fn synthetic_infos(tickers: usize) -> Vec<StockInfo> {
+    let mut infos = STOCK_INFO_MANAGER.lock().unwrap().all();
+    infos.truncate(tickers);
+    infos
+}
+
+/// 하루치 합성 5분봉 (09:00 ~ 15:30)
+///
+/// 매일 종목이 3개 이상인 업종 몇 개를 "강세 업종"으로 골라 소속 종목 대부분을 꾸준히 오르게 하고 거래량을 키워
+/// 상위 30 / D 조건 / 업종 3개 이상 필터가 실제로 걸리게 만듭니다.
+/// 봉 누락과 거래대금 동률(앞 종목 복사)도 일부러 섞어 정렬/경계 처리 차이를 드러냅니다.
+pub fn synthetic_day(infos: &[StockInfo], date_num: i64, seed: u64) -> Vec<Vec<BarRow>> {
+    let mut rng = SplitMix64(seed ^ (date_num as u64).wrapping_mul(0x2545_F491_4F6C_DD1D));
+
+    let mut members: HashMap<&str, usize> = HashMap::new();
+    for info in infos {
+        *members.entry(info.sector.as_str()).or_default() += 1;
+    }
+    let mut candidates: Vec<&str> = members.iter().filter(|(_, &n)| n >= 3).map(|(s, _)| *s).collect();
+    candidates.sort();
+    let mut hot = Vec::new();
+    for _ in 0..3.min(candidates.len()) {
+        hot.push(candidates.remove(rng.range(0, candidates.len() as i64) as usize));
+    }
+
+    let cutoffs = index_cutoffs();
+    let mut days: Vec<Vec<BarRow>> = Vec::with_capacity(infos.len());
+    for (i, info) in infos.iter().enumerate() {
+        if i > 0 && i % 50 == 0 {
+            let copy = days[i - 1].clone();
+            days.push(copy);
+            continue;
+        }
+        let is_hot = hot.contains(&info.sector.as_str()) && rng.unit() < 0.8;
+        let drift = if is_hot { 0.004 } else { 0.0 };
+        let volume_scale = if is_hot { 20_000 } else { 2_000 };
+
+        let mut price = rng.range(100, 10_000) * 10;
+        let mut rows = Vec::with_capacity(cutoffs.len());
+        for &hhmm in &cutoffs {
+            let open = price;
+            let change = drift + (rng.unit() - 0.5) * 0.01;
+            let close = ((open as f64) * (1.0 + change)).round().max(1.0) as i64;
+            let high = open.max(close) + rng.range(0, open / 200 + 1);
+            let low = (open.min(close) - rng.range(0, open / 200 + 1)).max(1);
+            let volume = rng.range(0, volume_scale);
+            price = close;
+            // 2% 확률로 봉 누락
+            if rng.unit() < 0.02 {
+                continue;
+            }
+            rows.push((bar_time::at(date_num, hhmm), open, high, low, close, volume));
+        }
+        days.push(rows);
+    }
+    days
+}
+
+/// 합성 5분봉 DB 생성 (기존 파일은 덮어쓰지 않음). 반환: (종목 수, 봉 수)
+pub fn write_synthetic_db(path: &str, tickers: usize, dates: &[i64], seed: u64) -> Result<(usize, u64), Box<dyn std::error::Error>> {
+    let _span = trace::span("diff.synthetic");
+    if fs::metadata(path).is_ok() {
+        return Err(format!("이미 존재하는 파일에는 합성 DB를 만들지 않습니다: {}", path).into());
+    }
+    let infos = synthetic_infos(tickers);
+    let tables: Vec<String> = infos.iter().map(|info| format!("A{}", info.code)).collect();
+
+    let mut conn = db::open(path)?;
+    let tx = conn.transaction()?;
+    for table in &tables {
+        tx.execute_batch(&format!(
+            "CREATE TABLE {} (date INTEGER PRIMARY KEY, open INTEGER, high INTEGER, low INTEGER, close INTEGER, volume INTEGER)",
+            table
+        ))?;
+    }
+    let mut bars = 0u64;
+    for &date_num in dates {
+        for (table, rows) in tables.iter().zip(synthetic_day(&infos, date_num, seed)) {
+            let mut stmt = tx.prepare_cached(&format!(
+                "INSERT INTO {} (date, open, high, low, close, volume) VALUES (?1, ?2, ?3, ?4, ?5, ?6)",
+                table
+            ))?;
+            for (date, open, high, low, close, volume) in rows {
+                stmt.execute([date, open, high, low, close, volume])?;
+                bars += 1;
+            }
+        }
+    }
+    tx.commit()?;
+    info!("🧪 합성 DB 생성 완료: {} ({}개 종목, {}일, {}개 봉)", path, tables.len(), dates.len(), bars);
+    Ok((tables.len(), bars))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::core::day_data::TickerDay;
+
+    fn infos() -> Vec<StockInfo> {
+        (0..60).map(|i| StockInfo {
+            code: format!("{:06}", i),
+            name: format!("종목{}", i),
+            sector: format!("업종{}", i % 6),
+        }).collect()
+    }
+
+    #[test]
+    fn test_synthetic_day_is_deterministic_and_triggers_d() {
+        let infos = infos();
+        let a = synthetic_day(&infos, 20250430, 42);
+        assert_eq!(a, synthetic_day(&infos, 20250430, 42));
+        assert_ne!(a, synthetic_day(&infos, 20250502, 42));
+        // 50번째 종목은 거래대금 동률을 만들기 위해 앞 종목 복사
+        assert_eq!(a[50], a[49]);
+        assert!(a.iter().flatten().all(|&(_, o, h, l, c, _)| l >= 1 && l <= o.min(c) && h >= o.max(c)));
+
+        let day = DayData::from_tickers(20250430, infos.iter().zip(a)
+            .map(|(info, rows)| TickerDay::from_rows(&format!("A{}", info.code), rows))
+            .collect());
+        let params = DParams::default();
+        let mut graph = FeatureGraph::with_infos(&day, infos.clone());
+        let d_codes = graph.get_with(FeatureKind::DCodes, 1500, &params);
+        assert!(!d_codes.indices().is_empty());
+    }
+
+    #[test]
+    fn test_compare_reports_each_stage() {
+        let reference = Outcome {
+            top: vec!["A1".into(), "A2".into()],
+            d_codes: vec!["A1".into()],
+            leaders: vec!["1".into()],
+            rates: vec![6.0],
+        };
+        assert!(compare(&reference, &reference).is_empty());
+
+        let mut fast = reference.clone();
+        fast.rates = vec![6.5];
+        assert_eq!(compare(&reference, &fast), vec![("rates", "6.000000".to_string(), "6.500000".to_string())]);
+
+        fast.top.reverse();
+        fast.leaders = vec!["2".into()];
+        let fields: Vec<&str> = compare(&reference, &fast).into_iter().map(|d| d.0).collect();
+        assert_eq!(fields, vec!["top", "leaders"]);
+    }
+}
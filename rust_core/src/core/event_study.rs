@@ -0,0 +1,226 @@
+// D 신호 이벤트 스터디
+// 백테스트에서 나온 (날짜, 신호 시각, 종목) 이벤트 전체에 대해 여러 구간의 누적 수익률 경로를 계산하고,
+// 신호 시각/업종별로 평균·중앙값 경로와 적중률 곡선을 요약합니다.
+// 날짜마다 하루치 데이터를 캐시에서 한 번만 읽고(다음 날짜는 프리페치), 종목당 봉을 한 번 훑어 모든 구간을 채웁니다.
+// 수익률 정의는 선행 수익률 행렬과 같습니다: [신호 시각, 신호 시각+구간] 첫 봉 시가 대비 마지막 봉 종가.
+
+use std::collections::{BTreeMap, HashMap};
+use log::info;
+use crate::core::day_data::DayData;
+use crate::core::forward_returns::{fill_ticker, Horizon};
+use crate::core::prefetch::{PrefetchConfig, Prefetcher};
+use crate::features::stock_info::STOCK_INFO_MANAGER;
+
+/// 이벤트 스터디 기본 구간: 5, 15, 30, 60분, 장 마감
+pub fn event_horizons() -> Vec<Horizon> {
+    vec![Horizon::Minutes(5), Horizon::Minutes(15), Horizon::Minutes(30), Horizon::Minutes(60), Horizon::Close]
+}
+
+/// 신호 하나
+#[derive(Debug, Clone, PartialEq)]
+pub struct Event {
+    /// YYYYMMDD
+    pub date_num: i64,
+    /// 신호 시각 (HHMM)
+    pub time: i64,
+    /// 테이블명 (A + 종목코드)
+    pub table: String,
+}
+
+#[derive(Debug, Clone, Copy, PartialEq)]
+pub enum GroupBy {
+    All,
+    Interval,
+    Sector,
+    IntervalSector,
+}
+
+impl GroupBy {
+    pub fn parse(s: &str) -> Result<Self, String> {
+        match s {
+            "all" => Ok(GroupBy::All),
+            "interval" => Ok(GroupBy::Interval),
+            "sector" => Ok(GroupBy::Sector),
+            "interval_sector" => Ok(GroupBy::IntervalSector),
+            _ => Err(format!("지원하지 않는 그룹 기준입니다: {} (all, interval, sector, interval_sector)", s)),
+        }
+    }
+
+    fn key(&self, event: &Event, sector: &str) -> String {
+        match self {
+            GroupBy::All => "all".to_string(),
+            GroupBy::Interval => format!("{:04}", event.time),
+            GroupBy::Sector => sector.to_string(),
+            GroupBy::IntervalSector => format!("{:04}|{}", event.time, sector),
+        }
+    }
+}
+
+/// 그룹 하나의 구간별 요약 (값이 없는 이벤트는 구간마다 제외)
+#[derive(Debug, Clone)]
+pub struct GroupStats {
+    pub key: String,
+    pub events: usize,
+    pub count: Vec<usize>,
+    pub mean: Vec<f64>,
+    pub median: Vec<f64>,
+    /// 수익률 > hit_threshold 인 비율
+    pub hit_rate: Vec<f64>,
+}
+
+#[derive(Debug, Clone)]
+pub struct EventStudy {
+    pub horizons: Vec<Horizon>,
+    /// [이벤트, 구간] 행 우선 누적 수익률 (%), 봉이 없으면 NaN
+    pub paths: Vec<f64>,
+    /// 그룹 기준별 요약 (run_event_study 에 넘긴 group_bys 순서)
+    pub summaries: Vec<Vec<GroupStats>>,
+}
+
+/// 이벤트별 구간 수익률 경로 (날짜 단위로 묶어 하루치 데이터를 한 번씩만 사용)
+pub fn event_paths(
+    db_path: &str,
+    events: &[Event],
+    horizons: &[Horizon],
+    prefetch_depth: usize
+) -> Result<Vec<f64>, Box<dyn std::error::Error>> {
+    let n_h = horizons.len();
+    let mut paths = vec![f64::NAN; events.len() * n_h];
+    let mut by_date: BTreeMap<i64, Vec<usize>> = BTreeMap::new();
+    for (i, event) in events.iter().enumerate() {
+        by_date.entry(event.date_num).or_default().push(i);
+    }
+
+    let dates: Vec<i64> = by_date.keys().copied().collect();
+    let prefetcher = Prefetcher::start(db_path, &dates, PrefetchConfig { depth: prefetch_depth, ..Default::default() });
+    for (idx, (&date_num, indices)) in by_date.iter().enumerate() {
+        prefetcher.advance(idx);
+        let day = DayData::cached(db_path, date_num)?;
+        fill_day(&day, events, indices, horizons, &mut paths);
+    }
+    Ok(paths)
+}
+
+fn fill_day(day: &DayData, events: &[Event], indices: &[usize], horizons: &[Horizon], paths: &mut [f64]) {
+    let n_h = horizons.len();
+    let positions: HashMap<&str, usize> = day.tickers.iter().enumerate().map(|(i, t)| (t.table.as_str(), i)).collect();
+    for &i in indices {
+        let event = &events[i];
+        if let Some(&t) = positions.get(event.table.as_str()) {
+            fill_ticker(&day.tickers[t], day, &[event.time], horizons, &mut paths[i * n_h..(i + 1) * n_h]);
+        }
+    }
+}
+
+fn median(values: &mut [f64]) -> f64 {
+    if values.is_empty() {
+        return f64::NAN;
+    }
+    values.sort_by(f64::total_cmp);
+    let mid = values.len() / 2;
+    if values.len() % 2 == 1 { values[mid] } else { (values[mid - 1] + values[mid]) / 2.0 }
+}
+
+/// 그룹별 평균/중앙값 경로와 적중률 곡선 (그룹 키 오름차순)
+pub fn summarize(
+    events: &[Event],
+    sectors: &[String],
+    paths: &[f64],
+    n_h: usize,
+    group_by: GroupBy,
+    hit_threshold: f64
+) -> Vec<GroupStats> {
+    let mut members: BTreeMap<String, Vec<usize>> = BTreeMap::new();
+    for (i, event) in events.iter().enumerate() {
+        members.entry(group_by.key(event, &sectors[i])).or_default().push(i);
+    }
+
+    members.into_iter()
+        .map(|(key, indices)| {
+            let mut stats = GroupStats {
+                key,
+                events: indices.len(),
+                count: Vec::with_capacity(n_h),
+                mean: Vec::with_capacity(n_h),
+                median: Vec::with_capacity(n_h),
+                hit_rate: Vec::with_capacity(n_h),
+            };
+            for h in 0..n_h {
+                let mut values: Vec<f64> = indices.iter().map(|&i| paths[i * n_h + h]).filter(|v| !v.is_nan()).collect();
+                let n = values.len();
+                stats.count.push(n);
+                if n == 0 {
+                    stats.mean.push(f64::NAN);
+                    stats.hit_rate.push(f64::NAN);
+                } else {
+                    stats.mean.push(values.iter().sum::<f64>() / n as f64);
+                    stats.hit_rate.push(values.iter().filter(|&&v| v > hit_threshold).count() as f64 / n as f64);
+                }
+                stats.median.push(median(&mut values));
+            }
+            stats
+        })
+        .collect()
+}
+
+/// 이벤트 경로 계산 + 그룹 기준별 요약 (경로는 한 번만 계산해 모든 그룹 기준에 재사용, 업종은 업종 표에서 조회)
+pub fn run_event_study(
+    db_path: &str,
+    events: &[Event],
+    horizons: &[Horizon],
+    group_bys: &[GroupBy],
+    hit_threshold: f64,
+    prefetch_depth: usize
+) -> Result<EventStudy, Box<dyn std::error::Error>> {
+    let paths = event_paths(db_path, events, horizons, prefetch_depth)?;
+    let sectors: Vec<String> = {
+        let manager = STOCK_INFO_MANAGER.lock().unwrap();
+        events.iter().map(|e| manager.get_stock_info(&e.table).sector).collect()
+    };
+    let summaries: Vec<Vec<GroupStats>> = group_bys.iter()
+        .map(|&group_by| summarize(events, &sectors, &paths, horizons.len(), group_by, hit_threshold))
+        .collect();
+    info!("🔭 이벤트 스터디 완료: 이벤트 {}개, 구간 {}개, 그룹 기준 {}개 (그룹 {}개)",
+          events.len(), horizons.len(), summaries.len(), summaries.iter().map(Vec::len).sum::<usize>());
+    Ok(EventStudy { horizons: horizons.to_vec(), paths, summaries })
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::core::day_data::TickerDay;
+
+    #[test]
+    fn test_event_paths_and_summary() {
+        let bars = [(1000, 1000, 1010), (1005, 1010, 1020), (1015, 1020, 1050), (1030, 1050, 1100), (1530, 1100, 990)];
+        let rows = bars.iter()
+            .map(|&(hhmm, open, close)| (20250430_0000 + hhmm, open, open.max(close), open.min(close), close, 10))
+            .collect();
+        let day = DayData::from_tickers(20250430, vec![TickerDay::from_rows("A000001", rows), TickerDay::from_rows("A000002", vec![])]);
+        let events = vec![
+            Event { date_num: 20250430, time: 1000, table: "A000001".into() },
+            Event { date_num: 20250430, time: 1030, table: "A000001".into() },
+            Event { date_num: 20250430, time: 1000, table: "A000002".into() },
+            Event { date_num: 20250430, time: 1000, table: "A999999".into() },
+        ];
+        let horizons = event_horizons();
+        let mut paths = vec![f64::NAN; events.len() * horizons.len()];
+        fill_day(&day, &events, &[0, 1, 2, 3], &horizons, &mut paths);
+
+        // 10:00 신호: 5분 → 1020, 15분 → 1050, 30분 → 1100, 장 마감 → 990 (시가 1000 기준)
+        assert_eq!(&paths[..5], &[2.0, 5.0, 10.0, 10.0, -1.0]);
+        assert!(paths[10..].iter().all(|v| v.is_nan()));
+
+        let sectors = vec!["반도체".to_string(), "반도체".to_string(), "기타".to_string(), "기타".to_string()];
+        let groups = summarize(&events, &sectors, &paths, horizons.len(), GroupBy::Interval, 0.0);
+        assert_eq!(groups.iter().map(|g| g.key.as_str()).collect::<Vec<_>>(), vec!["1000", "1030"]);
+        assert_eq!((groups[0].events, groups[0].count[0]), (3, 1));
+        assert_eq!(groups[0].hit_rate[4], 0.0);
+
+        let all = summarize(&events, &sectors, &paths, horizons.len(), GroupBy::All, 0.0);
+        // 장 마감: 10:00 신호 -1%, 10:30 신호 (1050 → 990) -5.71%
+        assert_eq!(all[0].count[4], 2);
+        assert!((all[0].median[4] - (-1.0 + (990.0 - 1050.0) / 1050.0 * 100.0) / 2.0).abs() < 1e-9);
+        assert!(GroupBy::parse("week").is_err());
+    }
+}
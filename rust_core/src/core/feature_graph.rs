@@ -0,0 +1,493 @@
+use std::collections::{HashMap, HashSet};
+use std::sync::Arc;
+use log::debug;
+use crate::core::bar_time;
+use crate::core::day_data::DayData;
+use crate::core::cache::Pinned;
+use crate::core::d_logic::DStock;
+use crate::core::daily_context::DailyContext;
+use crate::core::sector_index::{SectorIndex, SectorMap};
+use crate::features::stock_info::{StockInfo, STOCK_INFO_MANAGER};
+
+/// D 조건: 09:00~기준시각 상승률 하한 (%)
+pub const D_MIN_RATE: f64 = 5.0;
+/// D 조건: 장대양봉 판정 시 (종가 - 시가) > 시가 / LONG_BULL_DIVISOR
+pub const LONG_BULL_DIVISOR: i64 = 30;
+/// 거래대금 상위 종목 수
+pub const TOP_N: usize = 30;
+/// 업종 필터: 이전 시간대 포함 D 종목 수 하한
+pub const MIN_SECTOR_COUNT: usize = 3;
+/// 장 시작 시각 (HHMM)
+pub const SESSION_OPEN: i64 = 900;
+/// 하루에 평가할 기준시각이 이 개수 이상이면 업종 필터를 하루치 업종 인덱스로 처리
+pub const SECTOR_INDEX_MIN_CUTOFFS: usize = 8;
+
+/// 피처 그래프에 선언된 피처 종류
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Hash)]
+pub enum FeatureKind {
+    /// 09:00~기준시각 거래대금 합 (종목별)
+    TradeValue,
+    /// 09:00~기준시각 첫 시가 / 마지막 종가 (종목별)
+    WindowOpenClose,
+    /// 09:00~기준시각 상승률 (종목별)
+    WindowReturn,
+    /// 장대양봉 여부 (종목별)
+    LongBull,
+    /// 거래대금이 0보다 큰 전 종목의 내림차순 순위 (종목 인덱스)
+    TradeValueRank,
+    /// 거래대금 상위 top_n 종목 인덱스
+    TopTradeValue,
+    /// D 조건 만족 여부 (종목별)
+    DFlag,
+    /// 거래대금 상위 종목 중 D 조건 만족 종목 인덱스
+    DCodes,
+    /// 09:30부터 기준시각까지 30분 간격 D 종목 합집합
+    DBefore,
+    /// DBefore 종목의 업종별 개수 (업종 번호 순서)
+    SectorCounts,
+    /// 전일 종가 대비 09:00 시가 갭 (%, 일봉 컨텍스트 필요)
+    PriorGap,
+    /// 최근 20거래일 고가 대비 기준시각 종가 거리 (%, 일봉 컨텍스트 필요)
+    HighDistance,
+    /// 전일 일봉 거래대금 (일봉 컨텍스트 필요)
+    PriorTradeValue,
+}
+
+/// D 규칙의 임계값 묶음 (기본값은 기존 하드코딩 값과 동일)
+#[derive(Debug, Clone, Copy, PartialEq)]
+pub struct DParams {
+    pub min_rate: f64,
+    pub long_bull_divisor: i64,
+    pub top_n: usize,
+    pub min_sector_count: usize,
+}
+
+impl Default for DParams {
+    fn default() -> Self {
+        Self {
+            min_rate: D_MIN_RATE,
+            long_bull_divisor: LONG_BULL_DIVISOR,
+            top_n: TOP_N,
+            min_sector_count: MIN_SECTOR_COUNT,
+        }
+    }
+}
+
+/// 캐시 키에 들어가는 파라미터 (피처가 의존하지 않는 값은 0으로 정규화)
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Hash, Default)]
+struct ParamKey {
+    min_rate_bits: u64,
+    long_bull_divisor: i64,
+    top_n: usize,
+}
+
+impl DParams {
+    fn key_for(&self, kind: FeatureKind) -> ParamKey {
+        use FeatureKind::*;
+        match kind {
+            TradeValue | WindowOpenClose | WindowReturn | TradeValueRank
+            | PriorGap | HighDistance | PriorTradeValue => ParamKey::default(),
+            LongBull => ParamKey { long_bull_divisor: self.long_bull_divisor, ..ParamKey::default() },
+            DFlag => ParamKey {
+                min_rate_bits: self.min_rate.to_bits(),
+                long_bull_divisor: self.long_bull_divisor,
+                top_n: 0,
+            },
+            TopTradeValue => ParamKey { top_n: self.top_n, ..ParamKey::default() },
+            DCodes | DBefore | SectorCounts => ParamKey {
+                min_rate_bits: self.min_rate.to_bits(),
+                long_bull_divisor: self.long_bull_divisor,
+                top_n: self.top_n,
+            },
+        }
+    }
+}
+
+/// 계산된 피처 값
+#[derive(Debug, Clone)]
+pub enum FeatureValue {
+    Values(Vec<Option<i64>>),
+    OpenClose(Vec<Option<(i64, i64)>>),
+    Rates(Vec<Option<f64>>),
+    Flags(Vec<bool>),
+    Indices(Vec<usize>),
+    Counts(Vec<usize>),
+}
+
+impl FeatureValue {
+    pub fn values(&self) -> &[Option<i64>] {
+        match self { FeatureValue::Values(v) => v, _ => &[] }
+    }
+
+    pub fn open_close(&self) -> &[Option<(i64, i64)>] {
+        match self { FeatureValue::OpenClose(v) => v, _ => &[] }
+    }
+
+    pub fn rates(&self) -> &[Option<f64>] {
+        match self { FeatureValue::Rates(v) => v, _ => &[] }
+    }
+
+    pub fn flags(&self) -> &[bool] {
+        match self { FeatureValue::Flags(v) => v, _ => &[] }
+    }
+
+    pub fn indices(&self) -> &[usize] {
+        match self { FeatureValue::Indices(v) => v, _ => &[] }
+    }
+
+    pub fn counts(&self) -> &[usize] {
+        match self { FeatureValue::Counts(v) => v, _ => &[] }
+    }
+}
+
+/// 하루치 데이터 위에서 피처를 (피처, 기준시각, 파라미터) 단위로 한 번만 계산하고 캐시하는 실행기
+///
+/// 파라미터에 의존하지 않는 피처(거래대금, 구간 시가/종가 등)는 파라미터 조합과 무관하게 공유됩니다.
+pub struct FeatureGraph<'a> {
+    day: &'a DayData,
+    infos: Vec<StockInfo>,
+    sectors: SectorMap,
+    cache: HashMap<(FeatureKind, i64, ParamKey), Arc<FeatureValue>>,
+    sector_indexes: HashMap<ParamKey, Arc<SectorIndex>>,
+    use_sector_index: bool,
+    /// 일봉 컨텍스트와 day.tickers 인덱스 → 컨텍스트 인덱스
+    context: Option<(Pinned<DailyContext>, Vec<Option<usize>>)>,
+    computed: usize,
+    hits: usize,
+}
+
+impl<'a> FeatureGraph<'a> {
+    /// 종목 정보는 STOCK_INFO_MANAGER 에서 매핑
+    pub fn new(day: &'a DayData) -> Self {
+        let infos = {
+            let stock_manager = STOCK_INFO_MANAGER.lock().unwrap();
+            day.tickers.iter().map(|t| stock_manager.get_stock_info(&t.table)).collect()
+        };
+        Self::with_infos(day, infos)
+    }
+
+    /// 종목 정보를 직접 지정 (day.tickers 와 같은 순서)
+    pub fn with_infos(day: &'a DayData, infos: Vec<StockInfo>) -> Self {
+        let sectors = SectorMap::from_infos(&infos);
+        Self {
+            day,
+            infos,
+            sectors,
+            cache: HashMap::new(),
+            sector_indexes: HashMap::new(),
+            use_sector_index: false,
+            context: None,
+            computed: 0,
+            hits: 0,
+        }
+    }
+
+    pub fn day(&self) -> &'a DayData {
+        self.day
+    }
+
+    /// 업종 번호 매핑 (업종 이름순)
+    pub fn sectors(&self) -> &SectorMap {
+        &self.sectors
+    }
+
+    /// 하루 전체 업종 × 기준시각 집계 (파라미터별로 한 번만 생성)
+    pub fn sector_index(&mut self, params: &DParams) -> Arc<SectorIndex> {
+        let key = params.key_for(FeatureKind::SectorCounts);
+        if let Some(index) = self.sector_indexes.get(&key) {
+            self.hits += 1;
+            return index.clone();
+        }
+        let index = Arc::new(SectorIndex::build(self.day, &self.sectors, params));
+        self.computed += 1;
+        self.sector_indexes.insert(key, index.clone());
+        index
+    }
+
+    /// 켜면 SectorCounts 를 기준시각별 D 합집합 대신 업종 인덱스의 열에서 바로 읽음
+    /// (기준시각이 많을 때 유리, 5분 경계가 아닌 기준시각은 기존 경로로 계산)
+    pub fn set_use_sector_index(&mut self, enabled: bool) {
+        self.use_sector_index = enabled;
+    }
+
+    /// 전일 일봉 컨텍스트 연결 (PriorGap / HighDistance / PriorTradeValue 계산용, 없으면 해당 피처는 None)
+    pub fn attach_context(&mut self, context: Pinned<DailyContext>) {
+        let aligned = context.aligned_to(self.day);
+        self.context = Some((context, aligned));
+        self.cache.retain(|(kind, _, _), _| !matches!(kind, FeatureKind::PriorGap | FeatureKind::HighDistance | FeatureKind::PriorTradeValue));
+    }
+
+    /// 종목별 전일 컨텍스트 값 (컨텍스트가 없거나 값이 0이면 None)
+    pub fn context_values(&self, column: impl Fn(&DailyContext) -> &[i64]) -> Vec<Option<i64>> {
+        match &self.context {
+            Some((context, aligned)) => {
+                let values = column(context);
+                aligned.iter().map(|c| c.map(|i| values[i]).filter(|&v| v > 0)).collect()
+            },
+            None => vec![None; self.day.tickers.len()],
+        }
+    }
+
+    pub fn stock(&self, idx: usize) -> DStock {
+        let info = &self.infos[idx];
+        DStock {
+            code: info.code.clone(),
+            name: info.name.clone(),
+            sector: info.sector.clone(),
+        }
+    }
+
+    /// (계산 횟수, 캐시 적중 횟수)
+    pub fn stats(&self) -> (usize, usize) {
+        (self.computed, self.hits)
+    }
+
+    /// 기본 파라미터로 피처 값을 가져오기
+    #[cfg(test)]
+    pub fn get(&mut self, kind: FeatureKind, cutoff: i64) -> Arc<FeatureValue> {
+        self.get_with(kind, cutoff, &DParams::default())
+    }
+
+    /// 피처 값을 가져오기 (없으면 의존 피처부터 계산 후 캐시)
+    pub fn get_with(&mut self, kind: FeatureKind, cutoff: i64, params: &DParams) -> Arc<FeatureValue> {
+        let key = (kind, cutoff, params.key_for(kind));
+        if let Some(value) = self.cache.get(&key) {
+            self.hits += 1;
+            return value.clone();
+        }
+
+        let value = Arc::new(self.compute(kind, cutoff, params));
+        self.computed += 1;
+        self.cache.insert(key, value.clone());
+        value
+    }
+
+    fn compute(&mut self, kind: FeatureKind, cutoff: i64, params: &DParams) -> FeatureValue {
+        let from = self.day.at(SESSION_OPEN);
+        let to = self.day.at(cutoff);
+
+        match kind {
+            FeatureKind::TradeValue => FeatureValue::Values(
+                self.day.tickers.iter().map(|t| t.trade_value_between(from, to)).collect()
+            ),
+            FeatureKind::WindowOpenClose => FeatureValue::OpenClose(
+                self.day.tickers.iter().map(|t| t.open_close_between(from, to)).collect()
+            ),
+            FeatureKind::WindowReturn => {
+                let oc = self.get_with(FeatureKind::WindowOpenClose, cutoff, params);
+                FeatureValue::Rates(
+                    oc.open_close().iter()
+                        .map(|x| x.map(|(open, close)| (close - open) as f64 / open as f64 * 100.0))
+                        .collect()
+                )
+            },
+            FeatureKind::LongBull => {
+                let oc = self.get_with(FeatureKind::WindowOpenClose, cutoff, params);
+                FeatureValue::Flags(
+                    oc.open_close().iter()
+                        .map(|x| match x {
+                            Some((open, close)) => is_long_bull(*open, *close, params.long_bull_divisor),
+                            None => false,
+                        })
+                        .collect()
+                )
+            },
+            FeatureKind::TradeValueRank => {
+                let tv = self.get_with(FeatureKind::TradeValue, cutoff, params);
+                FeatureValue::Indices(top_by_trade_value(tv.values(), usize::MAX))
+            },
+            FeatureKind::TopTradeValue => {
+                let rank = self.get_with(FeatureKind::TradeValueRank, cutoff, params);
+                FeatureValue::Indices(rank.indices().iter().copied().take(params.top_n).collect())
+            },
+            FeatureKind::DFlag => {
+                let rates = self.get_with(FeatureKind::WindowReturn, cutoff, params);
+                let long_bull = self.get_with(FeatureKind::LongBull, cutoff, params);
+                FeatureValue::Flags(
+                    rates.rates().iter().zip(long_bull.flags())
+                        .map(|(rate, bull)| matches!(rate, Some(r) if *r >= params.min_rate) && *bull)
+                        .collect()
+                )
+            },
+            FeatureKind::DCodes => {
+                let top = self.get_with(FeatureKind::TopTradeValue, cutoff, params);
+                let d_flag = self.get_with(FeatureKind::DFlag, cutoff, params);
+                FeatureValue::Indices(
+                    top.indices().iter().copied().filter(|&i| d_flag.flags()[i]).collect()
+                )
+            },
+            FeatureKind::DBefore => {
+                let mut union: HashSet<usize> = HashSet::new();
+                for interval in d_before_cutoffs(cutoff) {
+                    let d_codes = self.get_with(FeatureKind::DCodes, interval, params);
+                    union.extend(d_codes.indices().iter().copied());
+                }
+                let mut indices: Vec<usize> = union.into_iter().collect();
+                indices.sort_unstable();
+                FeatureValue::Indices(indices)
+            },
+            FeatureKind::SectorCounts => {
+                if self.use_sector_index {
+                    let index = self.sector_index(params);
+                    if let Some(column) = index.column(cutoff) {
+                        return FeatureValue::Counts(index.d_before_column(column));
+                    }
+                }
+                let before = self.get_with(FeatureKind::DBefore, cutoff, params);
+                let mut sector_count = vec![0usize; self.sectors.len()];
+                for &i in before.indices() {
+                    sector_count[self.sectors.ids[i]] += 1;
+                }
+                FeatureValue::Counts(sector_count)
+            },
+            FeatureKind::PriorGap => {
+                let oc = self.get_with(FeatureKind::WindowOpenClose, cutoff, params);
+                let prev_close = self.context_values(|c| &c.prev_close);
+                FeatureValue::Rates(
+                    oc.open_close().iter().zip(prev_close)
+                        .map(|(x, prev)| Some(((*x)?.0 - prev?) as f64 / prev? as f64 * 100.0))
+                        .collect()
+                )
+            },
+            FeatureKind::HighDistance => {
+                let oc = self.get_with(FeatureKind::WindowOpenClose, cutoff, params);
+                let high = self.context_values(|c| &c.high_20);
+                FeatureValue::Rates(
+                    oc.open_close().iter().zip(high)
+                        .map(|(x, high)| Some(((*x)?.1 - high?) as f64 / high? as f64 * 100.0))
+                        .collect()
+                )
+            },
+            FeatureKind::PriorTradeValue => FeatureValue::Values(self.context_values(|c| &c.prev_trade_value)),
+        }
+    }
+}
+
+/// 단순 장대양봉 판정 (정수 나눗셈은 is_d 와 동일)
+#[inline]
+pub fn is_long_bull(open: i64, close: i64, divisor: i64) -> bool {
+    close > open && (close - open) > (open / divisor)
+}
+
+/// 거래대금이 0보다 큰 종목을 내림차순(동률은 테이블 순서) 정렬해 상위 n개 인덱스 반환
+pub fn top_by_trade_value(values: &[Option<i64>], n: usize) -> Vec<usize> {
+    let mut scored: Vec<(usize, i64)> = values
+        .iter()
+        .enumerate()
+        .filter_map(|(i, v)| match v {
+            Some(sum) if *sum > 0 => Some((i, *sum)),
+            _ => None,
+        })
+        .collect();
+    scored.sort_by(|a, b| b.1.cmp(&a.1));
+    scored.into_iter().take(n).map(|x| x.0).collect()
+}
+
+/// 기준시각부터 30분씩 이전으로 09:30까지의 기준시각 목록 (시간순)
+pub fn d_before_cutoffs(cutoff: i64) -> Vec<i64> {
+    bar_time::cutoffs_back_to(cutoff, 930, 30)
+}
+
+/// 업종별 최고 상승률 종목을 상승률 내림차순으로 선정해 종목 인덱스로 반환
+/// (stock_filter 의 최종 단계와 동일한 규칙)
+pub fn select_sector_leaders(
+    graph: &mut FeatureGraph<'_>,
+    candidates: &[usize],
+    cutoff: i64,
+    params: &DParams
+) -> Vec<usize> {
+    let counts = graph.get_with(FeatureKind::SectorCounts, cutoff, params);
+    let rates = graph.get_with(FeatureKind::WindowReturn, cutoff, params);
+    let sector_ids = &graph.sectors().ids;
+
+    // 업종 번호로 바로 조회하므로 업종명 해시/비교 없이 업종 수 크기의 표만 사용
+    let mut leaders: Vec<(usize, f64)> = Vec::new();
+    let mut sector_slot: Vec<Option<usize>> = vec![None; counts.counts().len()];
+
+    for &i in candidates {
+        let sector = sector_ids[i];
+        if counts.counts()[sector] < params.min_sector_count {
+            continue;
+        }
+        let rate = rates.rates()[i].unwrap_or(0.0);
+        match sector_slot[sector] {
+            Some(slot) => {
+                if rate > leaders[slot].1 {
+                    leaders[slot] = (i, rate);
+                }
+            },
+            None => {
+                sector_slot[sector] = Some(leaders.len());
+                leaders.push((i, rate));
+            }
+        }
+    }
+
+    leaders.sort_by(|a, b| b.1.partial_cmp(&a.1).unwrap_or(std::cmp::Ordering::Equal));
+    debug!("🏆 {} 업종 대표 종목: {}개", cutoff, leaders.len());
+    leaders.into_iter().map(|(i, _)| i).collect()
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::core::day_data::TickerDay;
+
+    fn ticker(table: &str, bars: &[(i64, i64, i64, i64)]) -> TickerDay {
+        let rows = bars.iter()
+            .map(|&(hhmm, open, close, volume)| (20250430_0000 + hhmm, open, open.max(close), open.min(close), close, volume))
+            .collect();
+        TickerDay::from_rows(table, rows)
+    }
+
+    fn info(code: &str, sector: &str) -> StockInfo {
+        StockInfo { code: code.to_string(), name: code.to_string(), sector: sector.to_string() }
+    }
+
+    #[test]
+    fn test_d_before_cutoffs() {
+        assert_eq!(d_before_cutoffs(1030), vec![930, 1000, 1030]);
+        assert_eq!(d_before_cutoffs(945), vec![945]);
+        assert!(d_before_cutoffs(900).is_empty());
+    }
+
+    #[test]
+    fn test_feature_graph_d_pipeline() {
+        let day = DayData::from_tickers(20250430, vec![
+            ticker("A000001", &[(905, 1000, 1020, 100), (930, 1020, 1100, 100)]),
+            ticker("A000002", &[(905, 2000, 2050, 100), (930, 2050, 2200, 100)]),
+            ticker("A000003", &[(905, 3000, 3050, 100), (930, 3050, 3400, 100)]),
+            ticker("A000004", &[(905, 4000, 4010, 100), (930, 4010, 4020, 100)]),
+            ticker("A000005", &[]),
+        ]);
+        let infos = vec![
+            info("000001", "반도체"), info("000002", "반도체"), info("000003", "반도체"),
+            info("000004", "반도체"), info("000005", "기타"),
+        ];
+        let mut graph = FeatureGraph::with_infos(&day, infos);
+
+        let top = graph.get(FeatureKind::TopTradeValue, 930);
+        assert_eq!(top.indices(), &[3, 2, 1, 0]);
+
+        let d_codes = graph.get(FeatureKind::DCodes, 930);
+        assert_eq!(d_codes.indices(), &[2, 1, 0]);
+
+        let counts = graph.get(FeatureKind::SectorCounts, 930);
+        let semi = graph.sectors().names.iter().position(|s| s == "반도체").unwrap();
+        assert_eq!(counts.counts()[semi], 3);
+
+        let candidates = d_codes.indices().to_vec();
+        let leaders = select_sector_leaders(&mut graph, &candidates, 930, &DParams::default());
+        assert_eq!(leaders, vec![2]);
+        assert_eq!(graph.stock(leaders[0]).code, "000003");
+
+        // 업종 하한을 올리면 같은 피처로 선정 결과만 달라짐
+        let strict = DParams { min_sector_count: 4, ..DParams::default() };
+        assert!(select_sector_leaders(&mut graph, &candidates, 930, &strict).is_empty());
+
+        // 같은 (피처, 기준시각)은 다시 계산하지 않음
+        let (computed, _) = graph.stats();
+        graph.get(FeatureKind::DCodes, 930);
+        assert_eq!(graph.stats().0, computed);
+    }
+}
@@ -0,0 +1,229 @@
+use std::collections::HashMap;
+use log::debug;
+use crate::core::cache::{self, ByteReader, ByteWriter, CacheValue, Pinned};
+use crate::core::day_data::{DayData, TickerDay};
+use crate::core::bar_time::plus_minutes;
+use crate::features::db;
+
+/// 장 마감 시각 (HHMM)
+pub const SESSION_CLOSE: i64 = 1530;
+/// 기본 경계: 09:30 ~ 15:00, 30분 간격 (분석 스크립트의 시간대 목록과 동일)
+pub const DEFAULT_BOUNDARIES: [i64; 12] = [930, 1000, 1030, 1100, 1130, 1200, 1230, 1300, 1330, 1400, 1430, 1500];
+
+/// 경계 이후 수익률을 볼 구간 길이
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Hash)]
+pub enum Horizon {
+    Minutes(i64),
+    /// 장 마감까지
+    Close,
+}
+
+impl Horizon {
+    pub fn parse(s: &str) -> Result<Self, String> {
+        if s.eq_ignore_ascii_case("close") {
+            return Ok(Horizon::Close);
+        }
+        match s.parse::<i64>() {
+            Ok(m) if m > 0 => Ok(Horizon::Minutes(m)),
+            _ => Err(format!("지원하지 않는 구간입니다: {} (분 단위 양수 또는 \"close\")", s)),
+        }
+    }
+
+    pub fn label(&self) -> String {
+        match self {
+            Horizon::Minutes(m) => m.to_string(),
+            Horizon::Close => "close".to_string(),
+        }
+    }
+
+    /// 경계 boundary 에서 시작하는 구간의 끝 시각 (HHMM)
+    pub fn end(&self, boundary: i64) -> i64 {
+        match self {
+            Horizon::Minutes(m) => plus_minutes(boundary, *m),
+            Horizon::Close => SESSION_CLOSE,
+        }
+    }
+}
+
+pub fn default_horizons() -> Vec<Horizon> {
+    vec![Horizon::Minutes(5), Horizon::Minutes(10), Horizon::Minutes(30), Horizon::Minutes(60), Horizon::Close]
+}
+
+/// 하루치 종목 × 경계 × 구간 선행 수익률 (%)
+///
+/// 구간 [경계, 경계+구간] 첫 봉의 시가 대비 마지막 봉의 종가 상승률로,
+/// calculate_30min_increase_rate 와 같은 정의입니다. 구간에 봉이 없으면 NaN.
+#[derive(Debug, Clone)]
+pub struct ForwardReturns {
+    pub date_num: i64,
+    pub tables: Vec<String>,
+    pub boundaries: Vec<i64>,
+    pub horizons: Vec<Horizon>,
+    /// [종목, 경계, 구간] 행 우선 배열
+    pub values: Vec<f64>,
+    index: HashMap<String, usize>,
+}
+
+impl ForwardReturns {
+    /// 하루치 데이터에서 전 종목 행렬 계산 (종목마다 봉을 한 번 훑음)
+    pub fn compute(day: &DayData, boundaries: &[i64], horizons: &[Horizon]) -> Self {
+        let stride = boundaries.len() * horizons.len();
+        let mut values = vec![f64::NAN; day.tickers.len() * stride];
+
+        for (t, ticker) in day.tickers.iter().enumerate() {
+            fill_ticker(ticker, day, boundaries, horizons, &mut values[t * stride..(t + 1) * stride]);
+        }
+
+        let tables: Vec<String> = day.tickers.iter().map(|t| t.table.clone()).collect();
+        let index = tables.iter().enumerate().map(|(i, t)| (t.clone(), i)).collect();
+        Self {
+            date_num: day.date_num,
+            tables,
+            boundaries: boundaries.to_vec(),
+            horizons: horizons.to_vec(),
+            values,
+            index,
+        }
+    }
+
+    /// [종목 수, 경계 수, 구간 수]
+    pub fn shape(&self) -> [usize; 3] {
+        [self.tables.len(), self.boundaries.len(), self.horizons.len()]
+    }
+
+    /// 종목(테이블명), 경계, 구간으로 값 조회 (행렬에 없는 조합이면 None)
+    pub fn get(&self, table: &str, boundary: i64, horizon: Horizon) -> Option<f64> {
+        let t = *self.index.get(table)?;
+        let b = self.boundaries.iter().position(|&x| x == boundary)?;
+        let h = self.horizons.iter().position(|&x| x == horizon)?;
+        let [_, n_b, n_h] = self.shape();
+        Some(self.values[(t * n_b + b) * n_h + h])
+    }
+}
+
+/// 한 종목의 [경계, 구간] 값 채우기. 경계가 오름차순이면 시작 위치가 앞으로만 움직임
+pub fn fill_ticker(ticker: &TickerDay, day: &DayData, boundaries: &[i64], horizons: &[Horizon], out: &mut [f64]) {
+    if ticker.dates.is_empty() {
+        return;
+    }
+    let n_h = horizons.len();
+    let mut start = 0;
+
+    for (b, &boundary) in boundaries.iter().enumerate() {
+        let from = day.at(boundary);
+        if start > 0 && ticker.dates[start - 1] >= from {
+            start = 0;
+        }
+        start += ticker.dates[start..].partition_point(|&d| d < from);
+        if start >= ticker.dates.len() {
+            continue;
+        }
+        let open = ticker.open[start];
+
+        for (h, horizon) in horizons.iter().enumerate() {
+            let to = day.at(horizon.end(boundary));
+            let end = start + ticker.dates[start..].partition_point(|&d| d <= to);
+            if end > start {
+                out[b * n_h + h] = (ticker.close[end - 1] - open) as f64 / open as f64 * 100.0;
+            }
+        }
+    }
+}
+
+impl CacheValue for ForwardReturns {
+    fn size_bytes(&self) -> usize {
+        std::mem::size_of::<Self>()
+            + self.values.capacity() * 8
+            + self.boundaries.capacity() * 8
+            + self.horizons.capacity() * std::mem::size_of::<Horizon>()
+            // 테이블명은 tables 와 index 에 한 번씩
+            + self.tables.iter().map(|t| 2 * (t.capacity() + std::mem::size_of::<String>()) + 8).sum::<usize>()
+    }
+
+    fn encode(&self, out: &mut ByteWriter) {
+        out.i64(self.date_num);
+        out.u64(self.tables.len() as u64);
+        for table in &self.tables {
+            out.str(table);
+        }
+        out.i64s(&self.boundaries);
+        // 장 마감까지는 -1
+        let horizons: Vec<i64> = self.horizons.iter()
+            .map(|h| match h { Horizon::Minutes(m) => *m, Horizon::Close => -1 })
+            .collect();
+        out.i64s(&horizons);
+        out.f64s(&self.values);
+    }
+
+    fn decode(input: &mut ByteReader<'_>) -> Result<Self, String> {
+        let date_num = input.i64()?;
+        let n = input.u64()? as usize;
+        let tables = (0..n).map(|_| input.str()).collect::<Result<Vec<_>, _>>()?;
+        let boundaries = input.i64s()?;
+        let horizons = input.i64s()?.into_iter()
+            .map(|m| if m < 0 { Horizon::Close } else { Horizon::Minutes(m) })
+            .collect();
+        let values = input.f64s()?;
+        let index = tables.iter().enumerate().map(|(i, t)| (t.clone(), i)).collect();
+        Ok(Self { date_num, tables, boundaries, horizons, values, index })
+    }
+}
+
+/// 메모리 예산 캐시에 있으면 그대로, 없으면 하루치 5분봉(역시 캐시 경유)으로 계산 후 캐시
+pub fn forward_returns_for_date(
+    db_path: &str,
+    date_num: i64,
+    boundaries: &[i64],
+    horizons: &[Horizon]
+) -> Result<Pinned<ForwardReturns>, Box<dyn std::error::Error>> {
+    let labels: Vec<String> = horizons.iter().map(Horizon::label).collect();
+    let key = format!("forward:{}:{}:{}:{:?}:{}", db_path, db::modified_stamp(db_path), date_num, boundaries, labels.join(","));
+    cache::get_or_load(&key, date_num, || {
+        let day = DayData::cached(db_path, date_num)?;
+        let matrix = ForwardReturns::compute(&day, boundaries, horizons);
+        debug!("📈 {} 선행 수익률 행렬 계산: {:?}", date_num, matrix.shape());
+        Ok(matrix)
+    })
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_forward_returns_match_window_rate() {
+        let bars = [(930, 1000, 1010), (935, 1010, 1020), (1000, 1020, 1050), (1030, 1050, 1100), (1530, 1100, 990)];
+        let rows = bars.iter()
+            .map(|&(hhmm, open, close)| (20250430_0000 + hhmm, open, open.max(close), open.min(close), close, 10))
+            .collect();
+        let day = DayData::from_tickers(20250430, vec![
+            TickerDay::from_rows("A000001", rows),
+            TickerDay::from_rows("A000002", vec![]),
+        ]);
+
+        let horizons = default_horizons();
+        let fr = ForwardReturns::compute(&day, &[930, 1000, 1500], &horizons);
+        assert_eq!(fr.shape(), [2, 3, 5]);
+
+        // [0930, 1000] 첫 봉 시가 1000 → 마지막 봉 종가 1050
+        assert_eq!(fr.get("A000001", 930, Horizon::Minutes(30)), Some(5.0));
+        assert_eq!(fr.get("A000001", 930, Horizon::Minutes(5)), Some(2.0));
+        assert_eq!(fr.get("A000001", 1000, Horizon::Close), Some((990.0 - 1020.0) / 1020.0 * 100.0));
+        assert_eq!(fr.get("A000001", 930, Horizon::Minutes(15)), None);
+        assert!(fr.get("A000001", 1500, Horizon::Minutes(10)).unwrap().is_nan());
+        assert!(fr.get("A000002", 930, Horizon::Minutes(30)).unwrap().is_nan());
+
+        // 윈도우 정의와 동일한지 확인
+        let ticker = &day.tickers[0];
+        let expected = ticker.increase_rate_between(day.at(1000), day.at(1100)).unwrap();
+        assert_eq!(fr.get("A000001", 1000, Horizon::Minutes(60)), Some(expected));
+    }
+
+    #[test]
+    fn test_horizon_parse() {
+        assert_eq!(Horizon::parse("30"), Ok(Horizon::Minutes(30)));
+        assert_eq!(Horizon::parse("close"), Ok(Horizon::Close));
+        assert!(Horizon::parse("0").is_err());
+        assert!(Horizon::parse("abc").is_err());
+    }
+}
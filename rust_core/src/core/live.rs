@@ -0,0 +1,368 @@
+use std::collections::{HashMap, HashSet};
+use std::time::Instant;
+use log::{debug, info, warn};
+use crate::core::d_logic::DStock;
+use crate::core::quality;
+use crate::core::day_data::{DayData, bar_trade_value};
+use crate::core::feature_graph::{DParams, SESSION_OPEN, is_long_bull};
+use crate::core::replay::{DayCursor, MergedBars};
+use crate::features::stock_info::{StockInfo, STOCK_INFO_MANAGER};
+
+/// 첫 번째 30분 경계 (HHMM)
+pub const FIRST_BOUNDARY: i64 = 930;
+/// 마지막 30분 경계 (HHMM) - 분석 스크립트의 시간대 목록과 동일
+pub const LAST_BOUNDARY: i64 = 1500;
+
+/// 종목별 09:00 이후 누적 상태
+#[derive(Debug, Clone, Default)]
+struct TickerState {
+    first_open: Option<i64>,
+    last_close: i64,
+    trade_value: i64,
+    last_date: i64,
+}
+
+impl TickerState {
+    fn rate(&self) -> Option<f64> {
+        self.first_open.map(|open| (self.last_close - open) as f64 / open as f64 * 100.0)
+    }
+}
+
+/// 30분 경계 하나에서 확정된 선정 결과
+#[derive(Debug, Clone)]
+pub struct LiveSnapshot {
+    /// HHMM
+    pub cutoff: i64,
+    /// 업종별 최고 상승률 종목 (상승률 내림차순)
+    pub leaders: Vec<DStock>,
+    /// 거래대금 상위 top_n 종목 인덱스
+    pub top: Vec<usize>,
+    /// D 조건 만족 종목 인덱스
+    pub d_codes: Vec<usize>,
+    /// 경계 평가에 걸린 시간 (마이크로초)
+    pub eval_us: u64,
+}
+
+/// 5분봉이 들어올 때마다 종목별 상태를 갱신하고, 30분 경계마다 D 선정을 확정하는 실시간 엔진
+pub struct LiveDState {
+    date_num: i64,
+    params: DParams,
+    tables: Vec<String>,
+    index: HashMap<String, usize>,
+    /// 격리 목록에 있어 봉을 무시하는 종목
+    excluded: HashSet<String>,
+    infos: Vec<StockInfo>,
+    state: Vec<TickerState>,
+    next_boundary: i64,
+    d_union: HashSet<usize>,
+    sector_counts: HashMap<String, usize>,
+    snapshots: Vec<LiveSnapshot>,
+    latencies_us: Vec<u64>,
+    watermark: i64,
+    late_bars: usize,
+}
+
+impl LiveDState {
+    /// tables 순서가 거래대금 동률 시 우선순위가 됨 (DB 테이블 순서와 같게 주면 일괄 평가와 결과가 같음)
+    /// 격리된 종목은 일괄 평가와 똑같이 빠지며, 나중에 봉이 들어와도 무시합니다.
+    pub fn new(date_num: i64, tables: Vec<String>, params: DParams) -> Self {
+        let mut session = Self {
+            date_num,
+            params,
+            tables: Vec::with_capacity(tables.len()),
+            index: HashMap::with_capacity(tables.len()),
+            excluded: HashSet::new(),
+            infos: Vec::with_capacity(tables.len()),
+            state: Vec::with_capacity(tables.len()),
+            next_boundary: FIRST_BOUNDARY,
+            d_union: HashSet::new(),
+            sector_counts: HashMap::new(),
+            snapshots: Vec::new(),
+            latencies_us: Vec::new(),
+            watermark: 0,
+            late_bars: 0,
+        };
+        for table in tables {
+            session.ticker_index(&table);
+        }
+        session
+    }
+
+    pub fn date_num(&self) -> i64 {
+        self.date_num
+    }
+
+    pub fn tables(&self) -> &[String] {
+        &self.tables
+    }
+
+    /// 지금까지 들어온 봉 중 가장 늦은 date 값
+    pub fn watermark(&self) -> i64 {
+        self.watermark
+    }
+
+    /// 종목별 마지막으로 반영된 봉의 date 값
+    pub fn last_date(&self, idx: usize) -> i64 {
+        self.state[idx].last_date
+    }
+
+    pub fn snapshots(&self) -> &[LiveSnapshot] {
+        &self.snapshots
+    }
+
+    pub fn latencies_us(&self) -> &[u64] {
+        &self.latencies_us
+    }
+
+    pub fn late_bars(&self) -> usize {
+        self.late_bars
+    }
+
+    /// 종목 인덱스 (처음 보는 종목이면 추가, 격리된 종목이면 None)
+    fn ticker_index(&mut self, table: &str) -> Option<usize> {
+        if let Some(&idx) = self.index.get(table) {
+            return Some(idx);
+        }
+        if self.excluded.contains(table) {
+            return None;
+        }
+        if quality::QUARANTINE.read().unwrap().contains(table, self.date_num) {
+            debug!("🚫 {} 격리 종목 제외", table);
+            self.excluded.insert(table.to_string());
+            return None;
+        }
+        let idx = self.tables.len();
+        let info = STOCK_INFO_MANAGER.lock().unwrap().get_stock_info(table);
+        self.tables.push(table.to_string());
+        self.index.insert(table.to_string(), idx);
+        self.infos.push(info);
+        self.state.push(TickerState::default());
+        Some(idx)
+    }
+
+    /// 새 5분봉 반영. 이 봉으로 지나간 30분 경계가 있으면 먼저 확정하고, 새로 확정된 결과 개수를 반환
+    pub fn on_bar(&mut self, table: &str, date: i64, open: i64, close: i64, volume: i64) -> usize {
+        let started = Instant::now();
+        let hhmm = date - self.date_num * 10000;
+        if !(0..10000).contains(&hhmm) {
+            debug!("⚠️ {} 다른 날짜의 봉 무시: {}", table, date);
+            return 0;
+        }
+
+        // 경계 시각 이후의 봉이 들어왔다는 것은 그 경계까지의 봉이 모두 도착했다는 의미
+        let emitted = self.finalize_before(hhmm);
+
+        if hhmm >= SESSION_OPEN {
+            let idx = match self.ticker_index(table) {
+                Some(idx) => idx,
+                None => return emitted,
+            };
+            if hhmm <= self.last_finalized() {
+                self.late_bars += 1;
+                warn!("⚠️ {} 확정된 경계 이전의 봉 도착: {}", table, date);
+            }
+            let ticker = &mut self.state[idx];
+            if ticker.first_open.is_none() {
+                ticker.first_open = Some(open);
+            }
+            ticker.last_close = close;
+            ticker.trade_value += bar_trade_value(open, close, volume);
+            ticker.last_date = ticker.last_date.max(date);
+            self.watermark = self.watermark.max(date);
+        }
+
+        self.latencies_us.push(started.elapsed().as_micros() as u64);
+        emitted
+    }
+
+    /// hhmm 이하의 모든 경계를 확정 (장중 시계가 경계를 지났을 때 호출)
+    pub fn advance_to(&mut self, hhmm: i64) -> usize {
+        let mut emitted = 0;
+        while self.next_boundary <= LAST_BOUNDARY && self.next_boundary <= hhmm {
+            self.finalize_boundary();
+            emitted += 1;
+        }
+        emitted
+    }
+
+    /// 남은 경계를 모두 확정 (장 마감 또는 재생 종료 시)
+    pub fn finish(&mut self) -> usize {
+        self.advance_to(LAST_BOUNDARY)
+    }
+
+    fn finalize_before(&mut self, hhmm: i64) -> usize {
+        let mut emitted = 0;
+        while self.next_boundary <= LAST_BOUNDARY && self.next_boundary < hhmm {
+            self.finalize_boundary();
+            emitted += 1;
+        }
+        emitted
+    }
+
+    fn last_finalized(&self) -> i64 {
+        self.snapshots.last().map(|s| s.cutoff).unwrap_or(0)
+    }
+
+    fn finalize_boundary(&mut self) {
+        let started = Instant::now();
+        let cutoff = self.next_boundary;
+        let params = self.params;
+
+        // 1단계: 거래대금 상위 top_n (동률은 종목 등록 순서)
+        let mut scored: Vec<(usize, i64)> = self.state
+            .iter()
+            .enumerate()
+            .filter(|(_, t)| t.trade_value > 0)
+            .map(|(i, t)| (i, t.trade_value))
+            .collect();
+        scored.sort_by(|a, b| b.1.cmp(&a.1));
+        let top: Vec<usize> = scored.into_iter().take(params.top_n).map(|x| x.0).collect();
+
+        // 2단계: D 조건 만족 종목
+        let d_codes: Vec<usize> = top
+            .iter()
+            .copied()
+            .filter(|&i| {
+                let t = &self.state[i];
+                match (t.first_open, t.rate()) {
+                    (Some(open), Some(rate)) => rate >= params.min_rate
+                        && is_long_bull(open, t.last_close, params.long_bull_divisor),
+                    _ => false,
+                }
+            })
+            .collect();
+
+        // 3단계: 이전 경계 포함 D 종목 합집합의 업종별 개수 갱신
+        for &i in &d_codes {
+            if self.d_union.insert(i) {
+                *self.sector_counts.entry(self.infos[i].sector.clone()).or_insert(0) += 1;
+            }
+        }
+
+        // 4단계: 업종 필터 후 업종별 최고 상승률 종목
+        let mut leaders: Vec<(usize, f64)> = Vec::new();
+        let mut sector_slot: HashMap<&str, usize> = HashMap::new();
+        for &i in &d_codes {
+            let sector = self.infos[i].sector.as_str();
+            if self.sector_counts.get(sector).copied().unwrap_or(0) < params.min_sector_count {
+                continue;
+            }
+            let rate = self.state[i].rate().unwrap_or(0.0);
+            match sector_slot.get(sector) {
+                Some(&slot) => {
+                    if rate > leaders[slot].1 {
+                        leaders[slot] = (i, rate);
+                    }
+                },
+                None => {
+                    sector_slot.insert(sector, leaders.len());
+                    leaders.push((i, rate));
+                }
+            }
+        }
+        leaders.sort_by(|a, b| b.1.partial_cmp(&a.1).unwrap_or(std::cmp::Ordering::Equal));
+
+        let leaders: Vec<DStock> = leaders
+            .into_iter()
+            .map(|(i, _)| {
+                let info = &self.infos[i];
+                DStock { code: info.code.clone(), name: info.name.clone(), sector: info.sector.clone() }
+            })
+            .collect();
+
+        let eval_us = started.elapsed().as_micros() as u64;
+        debug!("⏱️ {:04} 경계 확정: 상위 {}개, D {}개, 대표 {}개 ({}µs)",
+               cutoff, top.len(), d_codes.len(), leaders.len(), eval_us);
+
+        self.snapshots.push(LiveSnapshot { cutoff, leaders, top, d_codes, eval_us });
+        self.next_boundary = next_boundary(cutoff);
+    }
+
+    /// 하루치 데이터를 시간순으로 재생 (같은 시각은 종목 순서대로)
+    pub fn replay_day(&mut self, day: &DayData) {
+        let mut cursors = Vec::with_capacity(day.tickers.len());
+        for ticker in &day.tickers {
+            self.ticker_index(&ticker.table);
+            cursors.push(DayCursor::new(ticker));
+        }
+
+        for (t, (date, open, _high, _low, close, volume)) in MergedBars::new(cursors) {
+            self.on_bar(&day.tickers[t].table, date, open, close, volume);
+        }
+        self.finish();
+        info!("🔁 {} 재생 완료: {}개 경계 확정", self.date_num, self.snapshots.len());
+    }
+}
+
+/// 다음 30분 경계 (HHMM)
+pub fn next_boundary(hhmm: i64) -> i64 {
+    if hhmm % 100 >= 30 {
+        (hhmm / 100 + 1) * 100
+    } else {
+        (hhmm / 100) * 100 + 30
+    }
+}
+
+/// 지연시간 통계 (건수, 평균, p50, p99, 최대) - 마이크로초
+pub fn latency_summary(latencies_us: &[u64]) -> (usize, f64, u64, u64, u64) {
+    if latencies_us.is_empty() {
+        return (0, 0.0, 0, 0, 0);
+    }
+    let mut sorted = latencies_us.to_vec();
+    sorted.sort_unstable();
+    let n = sorted.len();
+    let mean = sorted.iter().sum::<u64>() as f64 / n as f64;
+    let pct = |p: f64| sorted[((n - 1) as f64 * p).round() as usize];
+    (n, mean, pct(0.5), pct(0.99), sorted[n - 1])
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::core::day_data::TickerDay;
+    use crate::core::feature_graph::{FeatureGraph, FeatureKind, select_sector_leaders};
+
+    fn ticker(table: &str, bars: &[(i64, i64, i64, i64)]) -> TickerDay {
+        let rows = bars.iter()
+            .map(|&(hhmm, open, close, volume)| (20250430_0000 + hhmm, open, open.max(close), open.min(close), close, volume))
+            .collect();
+        TickerDay::from_rows(table, rows)
+    }
+
+    #[test]
+    fn test_next_boundary() {
+        assert_eq!(next_boundary(930), 1000);
+        assert_eq!(next_boundary(1000), 1030);
+        assert_eq!(next_boundary(1455), 1500);
+    }
+
+    #[test]
+    fn test_live_matches_batch_top_and_d_codes() {
+        let day = DayData::from_tickers(20250430, vec![
+            ticker("A000001", &[(905, 1000, 1020, 100), (930, 1020, 1100, 100), (1000, 1100, 1050, 300)]),
+            ticker("A000002", &[(905, 2000, 2050, 100), (930, 2050, 2200, 100), (1000, 2200, 2300, 50)]),
+            ticker("A000003", &[(905, 3000, 3050, 100), (930, 3050, 3400, 100), (955, 3400, 3300, 80)]),
+            ticker("A000004", &[(900, 4000, 4010, 100), (930, 4010, 4020, 100)]),
+        ]);
+
+        let tables: Vec<String> = day.tickers.iter().map(|t| t.table.clone()).collect();
+        let mut live = LiveDState::new(day.date_num, tables, DParams::default());
+        live.replay_day(&day);
+
+        let mut graph = FeatureGraph::with_infos(&day, live.infos.clone());
+        for snapshot in live.snapshots() {
+            let top = graph.get(FeatureKind::TopTradeValue, snapshot.cutoff);
+            let d_codes = graph.get(FeatureKind::DCodes, snapshot.cutoff);
+            assert_eq!(snapshot.top, top.indices(), "{} 거래대금 상위", snapshot.cutoff);
+            assert_eq!(snapshot.d_codes, d_codes.indices(), "{} D 종목", snapshot.cutoff);
+
+            let candidates = d_codes.indices().to_vec();
+            let leaders = select_sector_leaders(&mut graph, &candidates, snapshot.cutoff, &DParams::default());
+            let codes: Vec<String> = leaders.iter().map(|&i| graph.stock(i).code).collect();
+            let live_codes: Vec<String> = snapshot.leaders.iter().map(|s| s.code.clone()).collect();
+            assert_eq!(live_codes, codes, "{} 업종 대표", snapshot.cutoff);
+        }
+        assert_eq!(live.snapshots().len(), 12);
+        assert_eq!(live.latencies_us().len(), 11);
+    }
+}
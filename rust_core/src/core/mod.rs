@@ -1 +1,22 @@
-pub mod d_logic; 
\ No newline at end of file
+pub mod archive;
+pub mod bar_time;
+pub mod cache;
+pub mod coverage;
+pub mod d_logic;
+pub mod daemon;
+pub mod daily_context;
+pub mod day_data;
+pub mod differential;
+pub mod event_study;
+pub mod feature_graph;
+pub mod forward_returns;
+pub mod live;
+pub mod prefetch;
+pub mod quality;
+pub mod replay;
+pub mod resample;
+pub mod screen;
+pub mod sector_index;
+pub mod snapshot;
+pub mod sweep;
+pub mod trace;
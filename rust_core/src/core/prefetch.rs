@@ -0,0 +1,309 @@
+// 배치 실행용 일별 데이터 프리페치
+// 드라이버가 날짜 순서대로 처리하는 동안 백그라운드 스레드가 다음 K일의 5분봉(과 선택적으로 선행 수익률)을
+// 메모리 예산 캐시에 미리 올려 두어, 날짜가 바뀔 때마다 I/O 를 기다리지 않게 합니다.
+// 미리 올린 날짜는 드라이버가 지나갈 때까지 고정하고, 깊이는 캐시 예산과 하루치 크기로 제한합니다.
+
+use std::collections::{HashMap, HashSet};
+use std::sync::{Arc, Condvar, Mutex};
+use std::thread::{self, JoinHandle};
+use std::time::Instant;
+use log::{debug, info, warn};
+use crate::core::cache::{self, CacheValue, Pinned};
+use crate::core::day_data::DayData;
+use crate::core::forward_returns::{default_horizons, forward_returns_for_date, ForwardReturns, DEFAULT_BOUNDARIES};
+
+/// 미리 올린 날짜가 쓸 수 있는 캐시 예산 비율 (나머지는 현재 날짜와 파생 배열 몫)
+const BUDGET_SHARE: f64 = 0.5;
+pub const DEFAULT_DEPTH: usize = 2;
+pub const DEFAULT_THREADS: usize = 2;
+
+#[derive(Debug, Clone)]
+pub struct PrefetchConfig {
+    /// 최대 몇 일 앞까지 가져올지 (예산이 부족하면 더 얕아짐)
+    pub depth: usize,
+    pub threads: usize,
+    /// 기본 경계/구간 선행 수익률 행렬도 미리 계산
+    pub forward: bool,
+}
+
+impl Default for PrefetchConfig {
+    fn default() -> Self {
+        Self { depth: DEFAULT_DEPTH, threads: DEFAULT_THREADS, forward: false }
+    }
+}
+
+#[derive(Debug, Clone, Copy, Default)]
+pub struct PrefetchStats {
+    /// 백그라운드에서 가져온 날짜 수
+    pub loaded: usize,
+    /// 드라이버가 도착했을 때 이미 준비된 날짜 수
+    pub ready_hits: usize,
+    /// 드라이버가 직접 읽어야 했던 날짜 수
+    pub misses: usize,
+    pub failed: usize,
+    /// 드라이버가 읽는 중인 날짜를 기다린 시간
+    pub wait_seconds: f64,
+    /// 관측한 하루치 최대 크기
+    pub day_bytes: usize,
+}
+
+/// 미리 올려 둔 하루치 (고정 유지용)
+struct Loaded {
+    day: Pinned<DayData>,
+    forward: Option<Pinned<ForwardReturns>>,
+}
+
+struct State {
+    /// 드라이버가 처리 중인 dates 인덱스
+    current: usize,
+    /// 다음에 가져올 dates 인덱스
+    next: usize,
+    loading: HashSet<usize>,
+    ready: HashMap<usize, Loaded>,
+    stop: bool,
+    stats: PrefetchStats,
+}
+
+struct Shared {
+    db_path: String,
+    dates: Vec<i64>,
+    config: PrefetchConfig,
+    state: Mutex<State>,
+    changed: Condvar,
+}
+
+impl Shared {
+    /// 현재 허용 깊이: 하루치 크기를 모르면 1일, 알면 예산 비율 안에서 config.depth 까지
+    fn depth(&self, state: &State) -> usize {
+        if state.stats.day_bytes == 0 {
+            return self.config.depth.min(1);
+        }
+        let budget = cache::CACHE.lock().unwrap().stats().budget_bytes as f64 * BUDGET_SHARE;
+        let fits = (budget / state.stats.day_bytes as f64) as usize;
+        self.config.depth.min(fits.max(1))
+    }
+
+    fn load(&self, date_num: i64) -> Result<Loaded, Box<dyn std::error::Error>> {
+        let day = DayData::cached(&self.db_path, date_num)?;
+        let forward = if self.config.forward {
+            Some(forward_returns_for_date(&self.db_path, date_num, &DEFAULT_BOUNDARIES, &default_horizons())?)
+        } else {
+            None
+        };
+        Ok(Loaded { day, forward })
+    }
+
+    fn worker(&self) {
+        loop {
+            let (idx, date_num) = {
+                let mut state = self.state.lock().unwrap();
+                loop {
+                    if state.stop {
+                        return;
+                    }
+                    let limit = state.current + self.depth(&state);
+                    if state.next < self.dates.len() && state.next <= limit {
+                        break;
+                    }
+                    state = self.changed.wait(state).unwrap();
+                }
+                let idx = state.next;
+                state.next += 1;
+                state.loading.insert(idx);
+                (idx, self.dates[idx])
+            };
+
+            let started = Instant::now();
+            let result = self.load(date_num);
+            let bytes = match &result {
+                Ok(loaded) => loaded.day.size_bytes() + loaded.forward.as_ref().map_or(0, |f| f.size_bytes()),
+                Err(_) => 0,
+            };
+
+            // 드라이버가 이미 지나간 날짜는 고정을 바로 풀도록 잠금 밖에서 drop
+            let stale = {
+                let mut state = self.state.lock().unwrap();
+                state.loading.remove(&idx);
+                let stale = match result {
+                    Ok(loaded) => {
+                        state.stats.loaded += 1;
+                        state.stats.day_bytes = state.stats.day_bytes.max(bytes);
+                        debug!("🚚 {} 프리페치 완료 ({:.2}초, {}바이트)", date_num, started.elapsed().as_secs_f64(), bytes);
+                        if idx >= state.current {
+                            state.ready.insert(idx, loaded);
+                            None
+                        } else {
+                            Some(loaded)
+                        }
+                    },
+                    Err(e) => {
+                        state.stats.failed += 1;
+                        warn!("⚠️ {} 프리페치 실패: {}", date_num, e);
+                        None
+                    },
+                };
+                self.changed.notify_all();
+                stale
+            };
+            drop(stale);
+        }
+    }
+}
+
+/// 날짜 목록을 따라가며 앞의 날짜를 미리 읽는 프리페처 (drop 시 스레드 종료)
+///
+/// 드라이버는 날짜마다 처리 전에 advance(i) 를 부른 뒤 평소처럼 DayData::cached 로 읽으면 됩니다.
+pub struct Prefetcher {
+    shared: Arc<Shared>,
+    workers: Vec<JoinHandle<()>>,
+}
+
+impl Prefetcher {
+    pub fn start(db_path: &str, dates: &[i64], config: PrefetchConfig) -> Self {
+        let threads = if config.depth == 0 { 0 } else { config.threads.max(1) };
+        let shared = Arc::new(Shared {
+            db_path: db_path.to_string(),
+            dates: dates.to_vec(),
+            config,
+            state: Mutex::new(State {
+                current: 0,
+                next: 0,
+                loading: HashSet::new(),
+                ready: HashMap::new(),
+                stop: false,
+                stats: PrefetchStats::default(),
+            }),
+            changed: Condvar::new(),
+        });
+        let workers = (0..threads)
+            .map(|_| {
+                let shared = shared.clone();
+                thread::spawn(move || shared.worker())
+            })
+            .collect();
+        Self { shared, workers }
+    }
+
+    /// 드라이버가 dates[idx] 처리를 시작함을 알림
+    ///
+    /// 지나간 날짜의 고정을 풀고, idx 를 백그라운드에서 읽는 중이면 끝날 때까지 기다려 같은 날짜를 두 번 읽지 않습니다.
+    pub fn advance(&self, idx: usize) {
+        let released: Vec<Loaded> = {
+            let mut state = self.shared.state.lock().unwrap();
+            state.current = idx;
+            // 드라이버가 앞질렀으면 그 사이 날짜는 건너뜀
+            state.next = state.next.max(idx);
+            let waited = Instant::now();
+            while state.loading.contains(&idx) {
+                state = self.shared.changed.wait(state).unwrap();
+            }
+            state.stats.wait_seconds += waited.elapsed().as_secs_f64();
+            if state.ready.contains_key(&idx) {
+                state.stats.ready_hits += 1;
+            } else if idx < self.shared.dates.len() {
+                state.stats.misses += 1;
+                state.next = state.next.max(idx + 1);
+            }
+            let passed: Vec<usize> = state.ready.keys().copied().filter(|&i| i < idx).collect();
+            let released = passed.into_iter().filter_map(|i| state.ready.remove(&i)).collect();
+            self.shared.changed.notify_all();
+            released
+        };
+        drop(released);
+    }
+
+    pub fn stats(&self) -> PrefetchStats {
+        self.shared.state.lock().unwrap().stats
+    }
+
+    /// 현재 허용 깊이 (하루치 크기를 관측한 뒤에는 예산에 따라 정해짐)
+    pub fn depth(&self) -> usize {
+        let state = self.shared.state.lock().unwrap();
+        self.shared.depth(&state)
+    }
+}
+
+impl Drop for Prefetcher {
+    fn drop(&mut self) {
+        self.shared.state.lock().unwrap().stop = true;
+        self.shared.changed.notify_all();
+        for worker in self.workers.drain(..) {
+            let _ = worker.join();
+        }
+        let ready: Vec<Loaded> = self.shared.state.lock().unwrap().ready.drain().map(|(_, v)| v).collect();
+        drop(ready);
+        let stats = self.stats();
+        if stats.loaded + stats.misses > 0 {
+            info!("🚚 프리페치 종료: 미리 읽음 {}일, 준비됨 {}일 / 직접 읽음 {}일, 대기 {:.2}초",
+                  stats.loaded, stats.ready_hits, stats.misses, stats.wait_seconds);
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::time::Duration;
+    use crate::core::archive::{ArchiveWriter, ARCHIVE_EXTENSION};
+    use crate::core::day_data::TickerDay;
+
+    /// 조건이 참이 될 때까지 최대 5초 대기
+    fn wait_until(mut done: impl FnMut() -> bool) {
+        let deadline = Instant::now() + Duration::from_secs(5);
+        while !done() {
+            assert!(Instant::now() < deadline, "프리페치 대기 시간 초과");
+            thread::sleep(Duration::from_millis(5));
+        }
+    }
+
+    #[test]
+    fn test_prefetch_ready_days_and_unpin() {
+        // 다른 테스트와 캐시 날짜가 겹치지 않도록 먼 미래 날짜로 작은 아카이브를 만듦
+        let path = std::env::temp_dir().join(format!("rust_core_prefetch_test_{}{}", std::process::id(), ARCHIVE_EXTENSION));
+        let path = path.to_str().unwrap();
+        let dates = [20990105, 20990106, 20990107, 20990108];
+        let mut writer = ArchiveWriter::create(path, vec!["A000001".to_string()]).unwrap();
+        for &date in &dates {
+            let bars = vec![(date * 10000 + 905, 100, 103, 99, 102, 10), (date * 10000 + 910, 102, 104, 101, 103, 7)];
+            writer.write_day(&DayData::from_tickers(date, vec![TickerDay::from_rows("A000001", bars)])).unwrap();
+        }
+        writer.finish().unwrap();
+
+        let prefetcher = Prefetcher::start(path, &dates, PrefetchConfig { depth: 2, threads: 1, forward: false });
+        for idx in 0..dates.len() {
+            // 백그라운드가 idx 를 올릴 때까지 기다린 뒤 진행 → 드라이버는 항상 준비된 날짜에 도착
+            wait_until(|| prefetcher.stats().loaded > idx);
+            prefetcher.advance(idx);
+            let cache = cache::CACHE.lock().unwrap();
+            assert!(cache.is_pinned(dates[idx]));
+            assert!(dates[..idx].iter().all(|&d| !cache.is_pinned(d)));
+        }
+        // 하루치 크기를 관측한 뒤에는 기본 예산 안에서 설정 깊이까지 허용
+        assert_eq!(prefetcher.depth(), 2);
+        let stats = prefetcher.stats();
+        assert_eq!((stats.loaded, stats.ready_hits, stats.misses, stats.failed), (dates.len(), dates.len(), 0, 0));
+        assert!(stats.day_bytes > 0);
+
+        drop(prefetcher);
+        assert!(dates.iter().all(|&d| !cache::CACHE.lock().unwrap().is_pinned(d)));
+        let _ = std::fs::remove_file(path);
+    }
+
+    #[test]
+    fn test_prefetch_missing_source() {
+        // 존재하지 않는 아카이브 경로 → 모든 날짜 로드 실패, 드라이버는 직접 읽은 것으로 집계
+        let dates = [20250102, 20250103, 20250106];
+        let prefetcher = Prefetcher::start("/nonexistent/prefetch_test.rca", &dates, PrefetchConfig { depth: 2, threads: 2, forward: false });
+        for idx in 0..dates.len() {
+            prefetcher.advance(idx);
+        }
+        assert_eq!(prefetcher.depth(), 1);
+        let stats = prefetcher.stats();
+        assert_eq!((stats.loaded, stats.ready_hits, stats.misses), (0, 0, dates.len()));
+
+        let off = Prefetcher::start("/nonexistent/prefetch_test.rca", &dates, PrefetchConfig { depth: 0, ..Default::default() });
+        off.advance(0);
+        assert!(off.workers.is_empty());
+        assert_eq!(off.stats().loaded, 0);
+    }
+}
@@ -0,0 +1,337 @@
+use std::cmp::Reverse;
+use std::collections::{BinaryHeap, VecDeque};
+use std::thread;
+use std::time::{Duration, Instant};
+use rusqlite::Connection;
+use log::{debug, info, warn};
+use crate::core::bar_time::{self, BarTime, SLOT_MINUTES};
+use crate::core::d_logic::DStock;
+use crate::core::day_data::{BarRow, TickerDay};
+use crate::core::feature_graph::DParams;
+use crate::core::live::LiveDState;
+use crate::core::quality;
+use crate::features::db;
+
+/// 종목 하나의 5분봉을 시간순으로 하나씩 꺼내는 커서
+pub trait BarCursor {
+    /// 다음 봉 (더 이상 없거나 읽기 실패 시 None)
+    fn next_bar(&mut self) -> Option<BarRow>;
+}
+
+/// DB 테이블을 chunk_size 개씩 나눠 읽는 커서 (종목당 메모리는 chunk_size 봉으로 제한)
+pub struct SqlCursor<'c> {
+    conn: &'c Connection,
+    query: String,
+    day_end: i64,
+    chunk_size: usize,
+    buffer: VecDeque<BarRow>,
+    last_date: i64,
+    exhausted: bool,
+}
+
+impl<'c> SqlCursor<'c> {
+    pub fn new(conn: &'c Connection, table: &str, date_num: i64, chunk_size: usize) -> Self {
+        Self {
+            conn,
+            query: format!(
+                "SELECT date, open, high, low, close, volume FROM {} WHERE date > ?1 AND date <= ?2 ORDER BY date LIMIT ?3",
+                table
+            ),
+            day_end: bar_time::day_range(date_num).1,
+            chunk_size: chunk_size.max(1),
+            buffer: VecDeque::new(),
+            last_date: bar_time::day_range(date_num).0 - 1,
+            exhausted: false,
+        }
+    }
+
+    fn fill(&mut self) -> Result<(), rusqlite::Error> {
+        let mut stmt = self.conn.prepare_cached(&self.query)?;
+        let rows = stmt
+            .query_map([self.last_date, self.day_end, self.chunk_size as i64], |row| {
+                Ok((row.get(0)?, row.get(1)?, row.get(2)?, row.get(3)?, row.get(4)?, row.get(5)?))
+            })?
+            .collect::<Result<Vec<BarRow>, _>>()?;
+
+        if rows.len() < self.chunk_size {
+            self.exhausted = true;
+        }
+        if let Some(last) = rows.last() {
+            self.last_date = last.0;
+        }
+        self.buffer.extend(rows);
+        Ok(())
+    }
+}
+
+impl BarCursor for SqlCursor<'_> {
+    fn next_bar(&mut self) -> Option<BarRow> {
+        if self.buffer.is_empty() && !self.exhausted {
+            if let Err(e) = self.fill() {
+                // 일괄 평가와 동일하게 읽기 실패한 종목은 데이터 없음으로 처리
+                debug!("❌ 커서 읽기 에러: {}", e);
+                self.exhausted = true;
+            }
+        }
+        self.buffer.pop_front()
+    }
+}
+
+/// 메모리에 올라온 하루치 종목 데이터를 순회하는 커서
+pub struct DayCursor<'d> {
+    ticker: &'d TickerDay,
+    pos: usize,
+}
+
+impl<'d> DayCursor<'d> {
+    pub fn new(ticker: &'d TickerDay) -> Self {
+        Self { ticker, pos: 0 }
+    }
+}
+
+impl BarCursor for DayCursor<'_> {
+    fn next_bar(&mut self) -> Option<BarRow> {
+        let t = self.ticker;
+        let i = self.pos;
+        if i >= t.dates.len() {
+            return None;
+        }
+        self.pos += 1;
+        Some((t.dates[i], t.open[i], t.high[i], t.low[i], t.close[i], t.volume[i]))
+    }
+}
+
+/// 종목별 커서를 date 기준으로 k-way 병합 (같은 시각은 종목 인덱스 순)
+pub struct MergedBars<C: BarCursor> {
+    cursors: Vec<C>,
+    heads: Vec<Option<BarRow>>,
+    heap: BinaryHeap<Reverse<(i64, usize)>>,
+}
+
+impl<C: BarCursor> MergedBars<C> {
+    pub fn new(mut cursors: Vec<C>) -> Self {
+        let mut heads = Vec::with_capacity(cursors.len());
+        let mut heap = BinaryHeap::with_capacity(cursors.len());
+        for (idx, cursor) in cursors.iter_mut().enumerate() {
+            let head = cursor.next_bar();
+            if let Some(bar) = head {
+                heap.push(Reverse((bar.0, idx)));
+            }
+            heads.push(head);
+        }
+        Self { cursors, heads, heap }
+    }
+}
+
+impl<C: BarCursor> Iterator for MergedBars<C> {
+    /// (종목 인덱스, 봉)
+    type Item = (usize, BarRow);
+
+    fn next(&mut self) -> Option<Self::Item> {
+        let Reverse((_, idx)) = self.heap.pop()?;
+        let bar = self.heads[idx].take()?;
+
+        let next = self.cursors[idx].next_bar();
+        if let Some(next_bar) = next {
+            if next_bar.0 < bar.0 {
+                warn!("⚠️ 종목 {} 봉 순서 역전: {} → {}", idx, bar.0, next_bar.0);
+            }
+            self.heap.push(Reverse((next_bar.0, idx)));
+        }
+        self.heads[idx] = next;
+
+        Some((idx, bar))
+    }
+}
+
+/// 재생 설정
+#[derive(Debug, Clone, Copy)]
+pub struct ReplayConfig {
+    /// 장중 시간 대비 재생 배속 (0 이하면 대기 없이 최대 속도)
+    pub speed: f64,
+    /// 종목별 커서가 한 번에 읽는 봉 개수
+    pub chunk_size: usize,
+}
+
+impl Default for ReplayConfig {
+    fn default() -> Self {
+        Self { speed: 0.0, chunk_size: 64 }
+    }
+}
+
+/// 재생 결과 요약
+#[derive(Debug, Clone, Copy, Default)]
+pub struct ReplayStats {
+    pub bars: usize,
+    /// 배속 대기를 포함한 전체 소요 시간 (마이크로초)
+    pub wall_us: u64,
+    /// 배속 대기 시간 합 (마이크로초)
+    pub sleep_us: u64,
+}
+
+/// 병합된 봉을 시간순으로 실시간 엔진에 공급
+///
+/// 커서 인덱스는 state 의 종목 순서와 같아야 합니다.
+pub fn replay_merged<C: BarCursor>(
+    state: &mut LiveDState,
+    merged: MergedBars<C>,
+    config: &ReplayConfig
+) -> ReplayStats {
+    let started = Instant::now();
+    let tables: Vec<String> = state.tables().to_vec();
+    let mut stats = ReplayStats::default();
+    let mut clock: Option<BarTime> = None;
+
+    for (idx, (date, open, _high, _low, close, volume)) in merged {
+        // 장중 시각이 넘어갈 때 배속에 맞춰 대기
+        if let (true, Some(now)) = (config.speed > 0.0, BarTime::from_db(date)) {
+            if let Some(prev) = clock {
+                let slots = (now.slot - prev.slot) as i64;
+                if slots > 0 {
+                    let wait = Duration::from_secs_f64((slots * SLOT_MINUTES) as f64 * 60.0 / config.speed);
+                    thread::sleep(wait);
+                    stats.sleep_us += wait.as_micros() as u64;
+                }
+            }
+            clock = Some(clock.map_or(now, |prev| prev.max(now)));
+        }
+
+        state.on_bar(&tables[idx], date, open, close, volume);
+        stats.bars += 1;
+    }
+    state.finish();
+
+    stats.wall_us = started.elapsed().as_micros() as u64;
+    stats
+}
+
+/// 5분봉 DB의 하루를 종목별 커서 k-way 병합으로 재생 (격리 종목은 일괄 평가와 같이 제외)
+pub fn replay_day_from_db(
+    db_path: &str,
+    date_num: i64,
+    config: &ReplayConfig
+) -> Result<(LiveDState, ReplayStats), Box<dyn std::error::Error>> {
+    let conn = db::open(db_path)?;
+    let tables = quality::without_quarantined(&db::get_all_tables(&conn)?, date_num);
+
+    let cursors: Vec<SqlCursor> = tables
+        .iter()
+        .map(|table| SqlCursor::new(&conn, table, date_num, config.chunk_size))
+        .collect();
+    let mut state = LiveDState::new(date_num, tables, DParams::default());
+    let stats = replay_merged(&mut state, MergedBars::new(cursors), config);
+
+    info!("🔁 {} 재생 완료: {}개 봉, {}개 경계 ({}ms, 대기 {}ms)",
+          date_num, stats.bars, state.snapshots().len(), stats.wall_us / 1000, stats.sleep_us / 1000);
+    Ok((state, stats))
+}
+
+/// 실시간 엔진과 기준 평가의 경계별 불일치
+#[derive(Debug, Clone)]
+pub struct ReplayMismatch {
+    pub cutoff: i64,
+    pub live: Vec<String>,
+    pub reference: Vec<String>,
+}
+
+/// 확정된 모든 경계를 기준 평가(reference)와 비교해 종목코드 목록이 다른 경계를 반환
+pub fn verify_snapshots<F>(
+    state: &LiveDState,
+    mut reference: F
+) -> Result<Vec<ReplayMismatch>, Box<dyn std::error::Error>>
+where
+    F: FnMut(i64) -> Result<Vec<DStock>, Box<dyn std::error::Error>>,
+{
+    let mut mismatches = Vec::new();
+    for snapshot in state.snapshots() {
+        let live: Vec<String> = snapshot.leaders.iter().map(|s| s.code.clone()).collect();
+        let reference: Vec<String> = reference(snapshot.cutoff)?.into_iter().map(|s| s.code).collect();
+        if live != reference {
+            warn!("❌ {:04} 선정 불일치: 실시간={:?}, 기준={:?}", snapshot.cutoff, live, reference);
+            mismatches.push(ReplayMismatch { cutoff: snapshot.cutoff, live, reference });
+        }
+    }
+    Ok(mismatches)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::core::day_data::DayData;
+    use crate::core::feature_graph::{FeatureGraph, FeatureKind, select_sector_leaders};
+
+    fn ticker(table: &str, bars: &[(i64, i64, i64, i64)]) -> TickerDay {
+        let rows = bars.iter()
+            .map(|&(hhmm, open, close, volume)| (20250430_0000 + hhmm, open, open.max(close), open.min(close), close, volume))
+            .collect();
+        TickerDay::from_rows(table, rows)
+    }
+
+    fn sample_day() -> DayData {
+        DayData::from_tickers(20250430, vec![
+            ticker("A000001", &[(905, 1000, 1020, 100), (930, 1020, 1100, 100), (1000, 1100, 1050, 300)]),
+            ticker("A000002", &[(905, 2000, 2050, 100), (930, 2050, 2200, 100), (1000, 2200, 2300, 50)]),
+            ticker("A000003", &[(905, 3000, 3050, 100), (930, 3050, 3400, 100), (955, 3400, 3300, 80)]),
+            ticker("A000004", &[(900, 4000, 4010, 100), (930, 4010, 4020, 100)]),
+        ])
+    }
+
+    #[test]
+    fn test_merged_bars_in_time_order() {
+        let day = sample_day();
+        let cursors: Vec<DayCursor> = day.tickers.iter().map(DayCursor::new).collect();
+        let merged: Vec<(i64, usize)> = MergedBars::new(cursors).map(|(idx, bar)| (bar.0, idx)).collect();
+
+        let mut expected = merged.clone();
+        expected.sort_unstable();
+        assert_eq!(merged, expected);
+        assert_eq!(merged.len(), 11);
+    }
+
+    #[test]
+    fn test_replay_matches_batch_leaders() {
+        let day = sample_day();
+        let tables: Vec<String> = day.tickers.iter().map(|t| t.table.clone()).collect();
+        let cursors: Vec<DayCursor> = day.tickers.iter().map(DayCursor::new).collect();
+
+        let mut state = LiveDState::new(day.date_num, tables, DParams::default());
+        let stats = replay_merged(&mut state, MergedBars::new(cursors), &ReplayConfig::default());
+        assert_eq!(stats.bars, 11);
+        assert_eq!(state.snapshots().len(), 12);
+
+        let mut graph = FeatureGraph::new(&day);
+        let mismatches = verify_snapshots(&state, |cutoff| {
+            let d_codes = graph.get(FeatureKind::DCodes, cutoff);
+            let leaders = select_sector_leaders(&mut graph, d_codes.indices(), cutoff, &DParams::default());
+            Ok(leaders.into_iter().map(|i| graph.stock(i)).collect())
+        }).unwrap();
+        assert!(mismatches.is_empty(), "{:?}", mismatches);
+    }
+
+    #[test]
+    fn test_replay_skips_quarantined_ticker() {
+        // 격리 종목은 다른 테스트와 겹치지 않는 테이블명으로 전역 목록에 추가
+        quality::QUARANTINE.write().unwrap().insert("A000099", 20250430);
+        let reference_day = sample_day();
+        let mut tickers = sample_day().tickers;
+        tickers.insert(0, ticker("A000099", &[(905, 500, 520, 100000), (930, 520, 700, 100000), (1000, 700, 800, 100000)]));
+        let day = DayData::from_tickers(20250430, tickers);
+
+        let mut state = LiveDState::new(day.date_num, vec!["A000099".to_string()], DParams::default());
+        state.replay_day(&day);
+        assert!(!state.tables().iter().any(|t| t == "A000099"));
+
+        // 기준은 DayData::load 처럼 격리 종목이 빠진 하루치
+        let mut graph = FeatureGraph::new(&reference_day);
+        let mismatches = verify_snapshots(&state, |cutoff| {
+            let d_codes = graph.get(FeatureKind::DCodes, cutoff);
+            let leaders = select_sector_leaders(&mut graph, d_codes.indices(), cutoff, &DParams::default());
+            Ok(leaders.into_iter().map(|i| graph.stock(i)).collect())
+        }).unwrap();
+        assert!(mismatches.is_empty(), "{:?}", mismatches);
+
+        // 격리하지 않았다면 거래대금 1위로 상위 목록에 들어가는 종목
+        let mut unfiltered = FeatureGraph::new(&day);
+        assert_eq!(unfiltered.get(FeatureKind::TopTradeValue, 930).indices().first(), Some(&0));
+    }
+}
@@ -0,0 +1,267 @@
+use rusqlite::Connection;
+use log::{debug, info};
+use crate::core::bar_time::{self, hhmm_to_minutes, minutes_to_hhmm, SESSION_OPEN_MINUTES};
+use crate::core::day_data::{DayData, TickerDay};
+use crate::features::db;
+
+/// 원본 봉 간격 (분)
+pub const BASE_MINUTES: i64 = 5;
+/// 캐시 DB에 리샘플링 완료된 (날짜, 간격)과 원본 정보를 기록하는 테이블
+/// (이전 형식인 _resampled_days 는 간격/원본을 구분하지 않아 새 이름으로 분리)
+const DAYS_TABLE: &str = "_resampled_days_v2";
+
+/// 리샘플링 간격 검증 (5분의 양의 배수)
+pub fn validate_minutes(minutes: i64) -> Result<(), String> {
+    if minutes <= 0 || minutes % BASE_MINUTES != 0 {
+        return Err(format!("리샘플링 간격은 {}분의 양의 배수여야 합니다: {}", BASE_MINUTES, minutes));
+    }
+    Ok(())
+}
+
+/// 봉 시각(HHMM, 구간 끝 기준)이 속하는 minutes 간격 봉의 시각
+///
+/// 5분봉 0905 는 09:00~09:05 구간이므로, 09:00 기준으로 정렬한 구간 끝으로 올림합니다.
+/// (30분봉 0930 = 5분봉 0905 ~ 0930, 09:00 봉은 그대로 0900)
+pub fn bucket_label(hhmm: i64, minutes: i64) -> i64 {
+    let offset = hhmm_to_minutes(hhmm) - SESSION_OPEN_MINUTES;
+    let end = SESSION_OPEN_MINUTES + offset.div_euclid(minutes) * minutes
+        + if offset.rem_euclid(minutes) == 0 { 0 } else { minutes };
+    minutes_to_hhmm(end)
+}
+
+/// 한 종목의 봉을 minutes 간격으로 합침 (OHLCV + 5분봉 거래대금 합)
+pub fn resample_ticker(ticker: &TickerDay, minutes: i64) -> TickerDay {
+    let mut out = TickerDay::from_rows(&ticker.table, vec![]);
+    let mut i = 0;
+    while i < ticker.len() {
+        let day_base = ticker.dates[i] / 10000 * 10000;
+        let label = day_base + bucket_label(ticker.dates[i] % 10000, minutes);
+
+        let (open, mut high, mut low) = (ticker.open[i], ticker.high[i], ticker.low[i]);
+        let (mut close, mut volume, mut trade_value) = (ticker.close[i], ticker.volume[i], ticker.trade_value_at(i));
+        i += 1;
+        while i < ticker.len() && ticker.dates[i] <= label && ticker.dates[i] / 10000 * 10000 == day_base {
+            high = high.max(ticker.high[i]);
+            low = low.min(ticker.low[i]);
+            close = ticker.close[i];
+            volume += ticker.volume[i];
+            trade_value += ticker.trade_value_at(i);
+            i += 1;
+        }
+        out.push_bar_with_value(label, open, high, low, close, volume, trade_value);
+    }
+    out
+}
+
+/// 하루치 전 종목 리샘플링 (종목 순서 유지)
+pub fn resample_day(day: &DayData, minutes: i64) -> DayData {
+    let tickers = day.tickers.iter().map(|t| resample_ticker(t, minutes)).collect();
+    DayData { date_num: day.date_num, tickers }
+}
+
+/// 간격별 캐시 DB 기본 경로 (원본 5분봉 DB와 같은 폴더, 원본 DB 이름과 겹치지 않도록 _resampled 접미사)
+pub fn resampled_db_path(minutes: i64) -> String {
+    format!("D:/db/stock_price({}min)_resampled.db", minutes)
+}
+
+fn same_path(a: &str, b: &str) -> bool {
+    match (std::fs::canonicalize(a), std::fs::canonicalize(b)) {
+        (Ok(a), Ok(b)) => a == b,
+        _ => std::path::Path::new(a) == std::path::Path::new(b),
+    }
+}
+
+/// 캐시 DB 검증: 5분봉은 원본 그대로라 캐시하지 않고, 원본 DB에 캐시 테이블을 쓰는 것도 막습니다
+pub fn validate_cache(db_path: &str, cache_path: &str, minutes: i64) -> Result<(), String> {
+    if minutes == BASE_MINUTES {
+        return Err(format!("{}분봉은 원본 DB 그대로이므로 캐시할 수 없습니다", BASE_MINUTES));
+    }
+    if same_path(db_path, cache_path) {
+        return Err(format!("캐시 DB가 원본 DB와 같습니다: {}", cache_path));
+    }
+    Ok(())
+}
+
+fn ensure_days_table(conn: &Connection) -> Result<(), rusqlite::Error> {
+    conn.execute_batch(&format!(
+        "CREATE TABLE IF NOT EXISTS {} (
+            date INTEGER NOT NULL, minutes INTEGER NOT NULL, source TEXT NOT NULL, source_stamp INTEGER NOT NULL,
+            bars INTEGER NOT NULL, PRIMARY KEY (date, minutes)
+        )",
+        DAYS_TABLE
+    ))
+}
+
+/// 간격별 캐시 테이블명 (같은 캐시 DB를 여러 간격이 함께 써도 섞이지 않도록 간격 접미사)
+fn cache_table(table: &str, minutes: i64) -> String {
+    format!("{}_{}m", table, minutes)
+}
+
+/// 캐시 DB에 해당 날짜의 minutes 간격 결과가 같은 원본(경로, 수정 시각)으로 저장되어 있는지
+///
+/// 원본이 다르거나 저장 뒤 갱신되었으면 (장중에 일부만 적재된 날짜 포함) 캐시가 없는 것으로 보고 다시 만듭니다.
+pub fn is_cached(conn: &Connection, date_num: i64, minutes: i64, source: &str, source_stamp: u64) -> Result<bool, rusqlite::Error> {
+    ensure_days_table(conn)?;
+    let mut stmt = conn.prepare(&format!(
+        "SELECT 1 FROM {} WHERE date = ?1 AND minutes = ?2 AND source = ?3 AND source_stamp = ?4",
+        DAYS_TABLE
+    ))?;
+    stmt.exists(rusqlite::params![date_num, minutes, source, source_stamp as i64])
+}
+
+/// 리샘플링 결과를 캐시 DB에 저장 (테이블 구조는 5분봉 DB + trade_value 컬럼, 테이블명은 cache_table)
+pub fn store_resampled(
+    conn: &mut Connection,
+    day: &DayData,
+    minutes: i64,
+    source: &str,
+    source_stamp: u64
+) -> Result<(), Box<dyn std::error::Error>> {
+    ensure_days_table(conn)?;
+    let (day_start, day_end) = bar_time::day_range(day.date_num);
+    let mut bars = 0i64;
+
+    let tx = conn.transaction()?;
+    for ticker in &day.tickers {
+        let table = cache_table(&ticker.table, minutes);
+        tx.execute_batch(&format!(
+            "CREATE TABLE IF NOT EXISTS {} (
+                date INTEGER PRIMARY KEY, open INTEGER, high INTEGER, low INTEGER,
+                close INTEGER, volume INTEGER, trade_value INTEGER
+            )",
+            table
+        ))?;
+        tx.execute(&format!("DELETE FROM {} WHERE date BETWEEN ?1 AND ?2", table), [day_start, day_end])?;
+
+        let mut stmt = tx.prepare_cached(&format!(
+            "INSERT INTO {} (date, open, high, low, close, volume, trade_value) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7)",
+            table
+        ))?;
+        for i in 0..ticker.len() {
+            stmt.execute([
+                ticker.dates[i], ticker.open[i], ticker.high[i], ticker.low[i],
+                ticker.close[i], ticker.volume[i], ticker.trade_value_at(i),
+            ])?;
+            bars += 1;
+        }
+    }
+    tx.execute(
+        &format!("INSERT OR REPLACE INTO {} (date, minutes, source, source_stamp, bars) VALUES (?1, ?2, ?3, ?4, ?5)", DAYS_TABLE),
+        rusqlite::params![day.date_num, minutes, source, source_stamp as i64, bars],
+    )?;
+    tx.commit()?;
+    Ok(())
+}
+
+/// 캐시 DB에서 하루치 minutes 간격 결과 읽기 (테이블이 없는 종목은 빈 데이터)
+pub fn load_resampled(
+    conn: &Connection,
+    tables: &[String],
+    date_num: i64,
+    minutes: i64
+) -> Result<DayData, Box<dyn std::error::Error>> {
+    let (day_start, day_end) = bar_time::day_range(date_num);
+    let mut tickers = Vec::with_capacity(tables.len());
+
+    for table in tables {
+        let query = format!(
+            "SELECT date, open, high, low, close, volume, trade_value FROM {} WHERE date BETWEEN ?1 AND ?2 ORDER BY date",
+            cache_table(table, minutes)
+        );
+        let mut ticker = TickerDay::from_rows(table, vec![]);
+        if let Ok(mut stmt) = conn.prepare(&query) {
+            let rows = stmt.query_map([day_start, day_end], |row| {
+                Ok((row.get(0)?, row.get(1)?, row.get(2)?, row.get(3)?, row.get(4)?, row.get(5)?, row.get(6)?))
+            })?;
+            for row in rows {
+                let (date, open, high, low, close, volume, trade_value) = row?;
+                ticker.push_bar_with_value(date, open, high, low, close, volume, trade_value);
+            }
+        }
+        tickers.push(ticker);
+    }
+    Ok(DayData { date_num, tickers })
+}
+
+/// minutes 간격 하루치 데이터. cache_path 가 있으면 캐시를 먼저 읽고, 없으면 5분봉에서 만들어 저장
+pub fn resampled_day(
+    db_path: &str,
+    cache_path: Option<&str>,
+    date_num: i64,
+    minutes: i64
+) -> Result<DayData, Box<dyn std::error::Error>> {
+    validate_minutes(minutes)?;
+    if let Some(path) = cache_path {
+        validate_cache(db_path, path, minutes)?;
+    }
+    // 원본을 읽기 전에 수정 시각을 재어, 읽는 도중 갱신되면 다음 호출에서 다시 만들도록 함
+    let source_stamp = db::modified_stamp(db_path);
+    let conn = db::open(db_path)?;
+    let tables = db::get_all_tables(&conn)?;
+
+    let mut cache = match cache_path {
+        Some(path) => Some(db::open(path)?),
+        None => None,
+    };
+    if let Some(cache_conn) = &cache {
+        if is_cached(cache_conn, date_num, minutes, db_path, source_stamp)? {
+            debug!("📦 {} {}분봉 캐시 사용", date_num, minutes);
+            return load_resampled(cache_conn, &tables, date_num, minutes);
+        }
+    }
+
+    let day = DayData::cached(db_path, date_num)?;
+    let resampled = if minutes == BASE_MINUTES { (*day).clone() } else { resample_day(&day, minutes) };
+
+    if let Some(cache_conn) = cache.as_mut() {
+        store_resampled(cache_conn, &resampled, minutes, db_path, source_stamp)?;
+        info!("💾 {} {}분봉 캐시 저장", date_num, minutes);
+    }
+    Ok(resampled)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::core::day_data::bar_trade_value;
+
+    #[test]
+    fn test_bucket_label() {
+        assert_eq!(bucket_label(905, 30), 930);
+        assert_eq!(bucket_label(930, 30), 930);
+        assert_eq!(bucket_label(935, 30), 1000);
+        assert_eq!(bucket_label(900, 30), 900);
+        assert_eq!(bucket_label(1005, 60), 1100);
+        assert_eq!(bucket_label(1530, 15), 1530);
+        assert_eq!(bucket_label(905, 5), 905);
+    }
+
+    #[test]
+    fn test_resample_preserves_window_aggregates() {
+        let bars = [(905, 100, 103, 99, 102, 10), (910, 102, 108, 101, 107, 20), (930, 107, 107, 95, 96, 30),
+                    (935, 96, 99, 96, 98, 5), (1000, 98, 100, 97, 99, 7)];
+        let rows = bars.iter().map(|&(t, o, h, l, c, v)| (20250430_0000 + t, o, h, l, c, v)).collect();
+        let ticker = TickerDay::from_rows("A000001", rows);
+
+        let r = resample_ticker(&ticker, 30);
+        assert_eq!(r.dates, vec![20250430_0930, 20250430_1000]);
+        assert_eq!((r.open[0], r.high[0], r.low[0], r.close[0], r.volume[0]), (100, 108, 95, 96, 60));
+        assert_eq!(r.trade_value_at(0),
+                   bar_trade_value(100, 102, 10) + bar_trade_value(102, 107, 20) + bar_trade_value(107, 96, 30));
+
+        // 30분 경계까지의 누적 거래대금과 구간 수익률은 5분봉과 같아야 함
+        let (from, to) = (20250430_0900, 20250430_1000);
+        assert_eq!(r.trade_value_between(from, to), ticker.trade_value_between(from, to));
+        assert_eq!(r.open_close_between(from, to), ticker.open_close_between(from, to));
+        assert!(validate_minutes(12).is_err());
+    }
+
+    #[test]
+    fn test_cache_never_targets_source_db() {
+        assert_ne!(resampled_db_path(BASE_MINUTES), db::MIN5_DB_PATH);
+        assert!(validate_cache(db::MIN5_DB_PATH, &resampled_db_path(5), 5).is_err());
+        assert!(validate_cache(db::MIN5_DB_PATH, db::MIN5_DB_PATH, 30).is_err());
+        assert!(validate_cache(db::MIN5_DB_PATH, &resampled_db_path(30), 30).is_ok());
+        assert!(resampled_day(db::MIN5_DB_PATH, Some(db::MIN5_DB_PATH), 20250430, 30).is_err());
+    }
+}
@@ -0,0 +1,674 @@
+// 횡단면 스크리닝: 하루치 전 종목 스냅샷 위에서 컬럼 수식을 한 번에 평가해 필터/정렬/상위 K 선정
+//
+// 수식 예: "top(trade_value, 50) and ret > 3 and tv_ratio > 2"
+// 모든 값은 종목 수 길이의 f64 열로 계산합니다. 값이 없으면 NaN 이고, 비교/논리 연산에서 NaN 은 거짓입니다.
+// 참/거짓은 1.0 / 0.0 으로 표현하므로 sector_count(ret > 5) 처럼 조건을 그대로 집계에 넣을 수 있습니다.
+
+use std::collections::HashMap;
+use std::sync::Arc;
+use crate::core::bar_time;
+use crate::core::day_data::TickerDay;
+use crate::core::feature_graph::{DParams, FeatureGraph, FeatureKind, FeatureValue, SESSION_OPEN};
+
+/// 수식에서 쓸 수 있는 종목별 컬럼 (모두 09:00 ~ 기준시각 구간 기준)
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Hash)]
+pub enum Column {
+    /// 구간 첫 시가
+    Open,
+    /// 기준시각 종가
+    Close,
+    High,
+    Low,
+    /// 구간 거래량 합
+    Volume,
+    /// 구간 거래대금 합
+    TradeValue,
+    /// 구간 상승률 (%)
+    Ret,
+    /// 기준시각 직전 30분 상승률 (%)
+    Ret30m,
+    /// 구간 봉 개수
+    Bars,
+    /// D 조건 만족 (1/0)
+    D,
+    /// 단순 장대양봉 (1/0)
+    LongBull,
+    /// 업종 번호 (업종 이름순)
+    Sector,
+    /// 전일 종가 (일봉 컨텍스트)
+    PrevClose,
+    /// 최근 20거래일 고가 (일봉 컨텍스트)
+    High20,
+    /// 전일 일봉 거래대금 (일봉 컨텍스트)
+    PrevTradeValue,
+    /// 전일 종가 대비 시가 갭 (%)
+    Gap,
+    /// 20일 고가 대비 기준시각 종가 거리 (%)
+    HighDistance,
+    /// 구간 거래대금 / 전일 거래대금
+    TvRatio,
+}
+
+impl Column {
+    pub const ALL: [Column; 18] = [
+        Column::Open, Column::Close, Column::High, Column::Low, Column::Volume, Column::TradeValue,
+        Column::Ret, Column::Ret30m, Column::Bars, Column::D, Column::LongBull, Column::Sector,
+        Column::PrevClose, Column::High20, Column::PrevTradeValue, Column::Gap, Column::HighDistance, Column::TvRatio,
+    ];
+
+    pub fn name(&self) -> &'static str {
+        match self {
+            Column::Open => "open",
+            Column::Close => "close",
+            Column::High => "high",
+            Column::Low => "low",
+            Column::Volume => "volume",
+            Column::TradeValue => "trade_value",
+            Column::Ret => "ret",
+            Column::Ret30m => "ret_30m",
+            Column::Bars => "bars",
+            Column::D => "d",
+            Column::LongBull => "long_bull",
+            Column::Sector => "sector",
+            Column::PrevClose => "prev_close",
+            Column::High20 => "high_20",
+            Column::PrevTradeValue => "prev_trade_value",
+            Column::Gap => "gap",
+            Column::HighDistance => "high_distance",
+            Column::TvRatio => "tv_ratio",
+        }
+    }
+
+    pub fn from_name(name: &str) -> Option<Self> {
+        Self::ALL.iter().copied().find(|c| c.name() == name)
+    }
+
+    /// 전일 일봉 컨텍스트가 있어야 계산되는 컬럼
+    pub fn needs_context(&self) -> bool {
+        matches!(self, Column::PrevClose | Column::High20 | Column::PrevTradeValue | Column::Gap | Column::HighDistance | Column::TvRatio)
+    }
+}
+
+#[derive(Debug, Clone, Copy, PartialEq)]
+pub enum BinOp {
+    Add, Sub, Mul, Div,
+    Gt, Ge, Lt, Le, Eq, Ne,
+    And, Or,
+}
+
+#[derive(Debug, Clone, Copy, PartialEq)]
+pub enum Func {
+    Abs,
+    /// 내림차순 순위 (1 = 최댓값, 동률은 종목 순서)
+    Rank,
+    /// 내림차순 상위 k 개면 1
+    Top,
+    /// 업종 안에서의 내림차순 순위
+    SectorRank,
+    /// 업종 평균 (NaN 제외)
+    SectorMean,
+    /// 업종 안에서 참인 종목 수
+    SectorCount,
+}
+
+impl Func {
+    fn from_name(name: &str) -> Option<(Self, usize)> {
+        match name {
+            "abs" => Some((Func::Abs, 1)),
+            "rank" => Some((Func::Rank, 1)),
+            "top" => Some((Func::Top, 2)),
+            "sector_rank" => Some((Func::SectorRank, 1)),
+            "sector_mean" => Some((Func::SectorMean, 1)),
+            "sector_count" => Some((Func::SectorCount, 1)),
+            _ => None,
+        }
+    }
+}
+
+/// 파싱된 수식
+#[derive(Debug, Clone, PartialEq)]
+pub enum Expr {
+    Num(f64),
+    Column(Column),
+    Neg(Box<Expr>),
+    Not(Box<Expr>),
+    Binary(BinOp, Box<Expr>, Box<Expr>),
+    Call(Func, Vec<Expr>),
+}
+
+#[derive(Debug, Clone, PartialEq)]
+enum Token {
+    Num(f64),
+    Ident(String),
+    Op(&'static str),
+    LParen,
+    RParen,
+    Comma,
+}
+
+fn tokenize(source: &str) -> Result<Vec<Token>, String> {
+    const OPS: [&str; 13] = [">=", "<=", "==", "!=", "&&", "||", ">", "<", "+", "-", "*", "/", "!"];
+    let chars: Vec<char> = source.chars().collect();
+    let mut tokens = Vec::new();
+    let mut i = 0;
+    'outer: while i < chars.len() {
+        let c = chars[i];
+        if c.is_whitespace() {
+            i += 1;
+            continue;
+        }
+        if c.is_ascii_digit() || (c == '.' && chars.get(i + 1).map_or(false, |d| d.is_ascii_digit())) {
+            let start = i;
+            while i < chars.len() && (chars[i].is_ascii_alphanumeric() || chars[i] == '.' || chars[i] == '_'
+                || ((chars[i] == '+' || chars[i] == '-') && matches!(chars[i - 1], 'e' | 'E')))
+            {
+                i += 1;
+            }
+            let text: String = chars[start..i].iter().filter(|&&c| c != '_').collect();
+            let value = text.parse::<f64>().map_err(|_| format!("숫자를 해석할 수 없습니다: {}", text))?;
+            tokens.push(Token::Num(value));
+            continue;
+        }
+        if c.is_alphabetic() || c == '_' {
+            let start = i;
+            while i < chars.len() && (chars[i].is_alphanumeric() || chars[i] == '_') {
+                i += 1;
+            }
+            tokens.push(Token::Ident(chars[start..i].iter().collect()));
+            continue;
+        }
+        match c {
+            '(' => tokens.push(Token::LParen),
+            ')' => tokens.push(Token::RParen),
+            ',' => tokens.push(Token::Comma),
+            _ => {
+                for op in OPS {
+                    if chars[i..].iter().take(op.len()).copied().eq(op.chars()) {
+                        tokens.push(Token::Op(op));
+                        i += op.len();
+                        continue 'outer;
+                    }
+                }
+                return Err(format!("알 수 없는 문자입니다: '{}' (위치 {})", c, i));
+            }
+        }
+        i += 1;
+    }
+    Ok(tokens)
+}
+
+/// 재귀 하강 파서 (우선순위: or < and < not < 비교 < +,- < *,/ < 단항 -)
+struct Parser {
+    tokens: Vec<Token>,
+    pos: usize,
+}
+
+impl Parser {
+    fn peek(&self) -> Option<&Token> {
+        self.tokens.get(self.pos)
+    }
+
+    fn next(&mut self) -> Option<Token> {
+        let token = self.tokens.get(self.pos).cloned();
+        self.pos += 1;
+        token
+    }
+
+    fn is_word(&self, word: &str) -> bool {
+        matches!(self.peek(), Some(Token::Ident(w)) if w == word)
+    }
+
+    fn is_op(&self, ops: &[&str]) -> Option<&'static str> {
+        match self.peek() {
+            Some(Token::Op(op)) if ops.contains(op) => Some(op),
+            _ => None,
+        }
+    }
+
+    fn or(&mut self) -> Result<Expr, String> {
+        let mut left = self.and()?;
+        while self.is_word("or") || self.is_op(&["||"]).is_some() {
+            self.pos += 1;
+            left = Expr::Binary(BinOp::Or, Box::new(left), Box::new(self.and()?));
+        }
+        Ok(left)
+    }
+
+    fn and(&mut self) -> Result<Expr, String> {
+        let mut left = self.not()?;
+        while self.is_word("and") || self.is_op(&["&&"]).is_some() {
+            self.pos += 1;
+            left = Expr::Binary(BinOp::And, Box::new(left), Box::new(self.not()?));
+        }
+        Ok(left)
+    }
+
+    fn not(&mut self) -> Result<Expr, String> {
+        if self.is_word("not") || self.is_op(&["!"]).is_some() {
+            self.pos += 1;
+            return Ok(Expr::Not(Box::new(self.not()?)));
+        }
+        self.comparison()
+    }
+
+    fn comparison(&mut self) -> Result<Expr, String> {
+        let left = self.additive()?;
+        let op = match self.is_op(&[">", ">=", "<", "<=", "==", "!="]) {
+            Some(">") => BinOp::Gt,
+            Some(">=") => BinOp::Ge,
+            Some("<") => BinOp::Lt,
+            Some("<=") => BinOp::Le,
+            Some("==") => BinOp::Eq,
+            Some(_) => BinOp::Ne,
+            None => return Ok(left),
+        };
+        self.pos += 1;
+        Ok(Expr::Binary(op, Box::new(left), Box::new(self.additive()?)))
+    }
+
+    fn additive(&mut self) -> Result<Expr, String> {
+        let mut left = self.multiplicative()?;
+        while let Some(op) = self.is_op(&["+", "-"]) {
+            self.pos += 1;
+            let op = if op == "+" { BinOp::Add } else { BinOp::Sub };
+            left = Expr::Binary(op, Box::new(left), Box::new(self.multiplicative()?));
+        }
+        Ok(left)
+    }
+
+    fn multiplicative(&mut self) -> Result<Expr, String> {
+        let mut left = self.unary()?;
+        while let Some(op) = self.is_op(&["*", "/"]) {
+            self.pos += 1;
+            let op = if op == "*" { BinOp::Mul } else { BinOp::Div };
+            left = Expr::Binary(op, Box::new(left), Box::new(self.unary()?));
+        }
+        Ok(left)
+    }
+
+    fn unary(&mut self) -> Result<Expr, String> {
+        if self.is_op(&["-"]).is_some() {
+            self.pos += 1;
+            return Ok(Expr::Neg(Box::new(self.unary()?)));
+        }
+        self.primary()
+    }
+
+    fn primary(&mut self) -> Result<Expr, String> {
+        match self.next() {
+            Some(Token::Num(v)) => Ok(Expr::Num(v)),
+            Some(Token::LParen) => {
+                let inner = self.or()?;
+                match self.next() {
+                    Some(Token::RParen) => Ok(inner),
+                    _ => Err("닫는 괄호가 없습니다".to_string()),
+                }
+            },
+            Some(Token::Ident(name)) => {
+                if self.peek() != Some(&Token::LParen) {
+                    return Column::from_name(&name)
+                        .map(Expr::Column)
+                        .ok_or_else(|| format!("알 수 없는 컬럼입니다: {} (사용 가능: {})", name,
+                            Column::ALL.iter().map(|c| c.name()).collect::<Vec<_>>().join(", ")));
+                }
+                let (func, arity) = Func::from_name(&name).ok_or_else(|| format!("알 수 없는 함수입니다: {}", name))?;
+                self.pos += 1;
+                let mut args = Vec::new();
+                if self.peek() != Some(&Token::RParen) {
+                    loop {
+                        args.push(self.or()?);
+                        if self.peek() == Some(&Token::Comma) {
+                            self.pos += 1;
+                        } else {
+                            break;
+                        }
+                    }
+                }
+                if self.next() != Some(Token::RParen) {
+                    return Err(format!("{} 함수의 닫는 괄호가 없습니다", name));
+                }
+                if args.len() != arity {
+                    return Err(format!("{} 함수는 인자 {}개가 필요합니다 ({}개 받음)", name, arity, args.len()));
+                }
+                if func == Func::Top && !matches!(args[1], Expr::Num(k) if k >= 0.0) {
+                    return Err("top 함수의 두 번째 인자는 0 이상의 숫자여야 합니다".to_string());
+                }
+                Ok(Expr::Call(func, args))
+            },
+            Some(token) => Err(format!("수식이 올바르지 않습니다: {:?} 에서 값이 필요합니다", token)),
+            None => Err("수식이 중간에 끝났습니다".to_string()),
+        }
+    }
+}
+
+impl Expr {
+    pub fn parse(source: &str) -> Result<Self, String> {
+        let mut parser = Parser { tokens: tokenize(source)?, pos: 0 };
+        let expr = parser.or()?;
+        match parser.peek() {
+            None => Ok(expr),
+            Some(token) => Err(format!("수식 끝에 해석하지 못한 토큰이 있습니다: {:?}", token)),
+        }
+    }
+
+    /// 수식이 참조하는 컬럼 중 하나라도 일봉 컨텍스트가 필요한지
+    pub fn needs_context(&self) -> bool {
+        match self {
+            Expr::Num(_) => false,
+            Expr::Column(c) => c.needs_context(),
+            Expr::Neg(e) | Expr::Not(e) => e.needs_context(),
+            Expr::Binary(_, a, b) => a.needs_context() || b.needs_context(),
+            Expr::Call(_, args) => args.iter().any(|a| a.needs_context()),
+        }
+    }
+}
+
+#[inline]
+fn truthy(v: f64) -> bool {
+    !v.is_nan() && v != 0.0
+}
+
+#[inline]
+fn flag(b: bool) -> f64 {
+    if b { 1.0 } else { 0.0 }
+}
+
+/// 내림차순 순위 (NaN 은 NaN), groups 를 주면 그룹 안에서의 순위
+fn rank_desc(values: &[f64], groups: Option<&[usize]>) -> Vec<f64> {
+    let mut order: Vec<usize> = (0..values.len()).filter(|&i| !values[i].is_nan()).collect();
+    order.sort_by(|&a, &b| values[b].partial_cmp(&values[a]).unwrap_or(std::cmp::Ordering::Equal));
+    let mut ranks = vec![f64::NAN; values.len()];
+    let mut next_rank: HashMap<usize, usize> = HashMap::new();
+    for i in order {
+        let group = groups.map_or(0, |g| g[i]);
+        let rank = next_rank.entry(group).or_insert(0);
+        *rank += 1;
+        ranks[i] = *rank as f64;
+    }
+    ranks
+}
+
+/// 업종별 (합, 개수)를 모아 종목마다 펼치기
+fn sector_broadcast(values: &[f64], sectors: &[usize], n_sectors: usize, mean: bool) -> Vec<f64> {
+    let mut sum = vec![0.0; n_sectors];
+    let mut count = vec![0usize; n_sectors];
+    for (&v, &s) in values.iter().zip(sectors) {
+        if mean && !v.is_nan() {
+            sum[s] += v;
+            count[s] += 1;
+        } else if !mean && truthy(v) {
+            count[s] += 1;
+        }
+    }
+    sectors.iter().map(|&s| match (mean, count[s]) {
+        (true, 0) => f64::NAN,
+        (true, n) => sum[s] / n as f64,
+        (false, n) => n as f64,
+    }).collect()
+}
+
+fn rates_column(value: &FeatureValue) -> Vec<f64> {
+    value.rates().iter().map(|r| r.filter(|r| r.is_finite()).unwrap_or(f64::NAN)).collect()
+}
+
+fn values_column(value: &FeatureValue) -> Vec<f64> {
+    value.values().iter().map(|v| v.map_or(f64::NAN, |v| v as f64)).collect()
+}
+
+/// 한 기준시각의 스크리닝 실행기 (컬럼은 한 번만 계산해 수식 간 공유)
+pub struct Screener<'g, 'a> {
+    graph: &'g mut FeatureGraph<'a>,
+    cutoff: i64,
+    params: DParams,
+    columns: HashMap<Column, Arc<Vec<f64>>>,
+}
+
+impl<'g, 'a> Screener<'g, 'a> {
+    pub fn new(graph: &'g mut FeatureGraph<'a>, cutoff: i64) -> Self {
+        Self { graph, cutoff, params: DParams::default(), columns: HashMap::new() }
+    }
+
+    pub fn len(&self) -> usize {
+        self.graph.day().tickers.len()
+    }
+
+    pub fn column(&mut self, column: Column) -> Arc<Vec<f64>> {
+        if let Some(values) = self.columns.get(&column) {
+            return values.clone();
+        }
+        let values = Arc::new(self.compute_column(column));
+        self.columns.insert(column, values.clone());
+        values
+    }
+
+    fn compute_column(&mut self, column: Column) -> Vec<f64> {
+        let (cutoff, params) = (self.cutoff, self.params);
+        let day = self.graph.day();
+        let (from, to) = (day.at(SESSION_OPEN), day.at(cutoff));
+        let window = |f: &dyn Fn(&TickerDay, usize, usize) -> f64| -> Vec<f64> {
+            day.tickers.iter().map(|t| {
+                let (start, end) = t.range(from, to);
+                if start == end { f64::NAN } else { f(t, start, end) }
+            }).collect()
+        };
+
+        match column {
+            Column::Open | Column::Close => {
+                let oc = self.graph.get_with(FeatureKind::WindowOpenClose, cutoff, &params);
+                oc.open_close().iter()
+                    .map(|x| x.map_or(f64::NAN, |(open, close)| if column == Column::Open { open as f64 } else { close as f64 }))
+                    .collect()
+            },
+            Column::High => window(&|t, s, e| t.high[s..e].iter().copied().max().unwrap() as f64),
+            Column::Low => window(&|t, s, e| t.low[s..e].iter().copied().min().unwrap() as f64),
+            Column::Volume => window(&|t, s, e| t.volume[s..e].iter().sum::<i64>() as f64),
+            Column::Bars => day.tickers.iter().map(|t| { let (s, e) = t.range(from, to); (e - s) as f64 }).collect(),
+            Column::TradeValue => values_column(&self.graph.get_with(FeatureKind::TradeValue, cutoff, &params)),
+            Column::Ret => rates_column(&self.graph.get_with(FeatureKind::WindowReturn, cutoff, &params)),
+            Column::Ret30m => {
+                let start = day.at(bar_time::plus_minutes(cutoff, -25));
+                day.tickers.iter()
+                    .map(|t| t.open_close_between(start, to)
+                        .filter(|(open, _)| *open > 0)
+                        .map_or(f64::NAN, |(open, close)| (close - open) as f64 / open as f64 * 100.0))
+                    .collect()
+            },
+            Column::D => self.graph.get_with(FeatureKind::DFlag, cutoff, &params).flags().iter().map(|&b| flag(b)).collect(),
+            Column::LongBull => self.graph.get_with(FeatureKind::LongBull, cutoff, &params).flags().iter().map(|&b| flag(b)).collect(),
+            Column::Sector => self.graph.sectors().ids.iter().map(|&s| s as f64).collect(),
+            Column::PrevClose => self.graph.context_values(|c| &c.prev_close).iter().map(|v| v.map_or(f64::NAN, |v| v as f64)).collect(),
+            Column::High20 => self.graph.context_values(|c| &c.high_20).iter().map(|v| v.map_or(f64::NAN, |v| v as f64)).collect(),
+            Column::PrevTradeValue => values_column(&self.graph.get_with(FeatureKind::PriorTradeValue, cutoff, &params)),
+            Column::Gap => rates_column(&self.graph.get_with(FeatureKind::PriorGap, cutoff, &params)),
+            Column::HighDistance => rates_column(&self.graph.get_with(FeatureKind::HighDistance, cutoff, &params)),
+            Column::TvRatio => {
+                let tv = self.column(Column::TradeValue);
+                let prev = self.column(Column::PrevTradeValue);
+                tv.iter().zip(prev.iter()).map(|(a, b)| a / b).collect()
+            },
+        }
+    }
+
+    /// 수식을 전 종목에 대해 평가
+    pub fn eval(&mut self, expr: &Expr) -> Vec<f64> {
+        let n = self.len();
+        match expr {
+            Expr::Num(v) => vec![*v; n],
+            Expr::Column(c) => self.column(*c).as_ref().clone(),
+            Expr::Neg(e) => self.eval(e).into_iter().map(|v| -v).collect(),
+            Expr::Not(e) => self.eval(e).into_iter().map(|v| flag(!truthy(v))).collect(),
+            Expr::Binary(op, a, b) => {
+                let (a, b) = (self.eval(a), self.eval(b));
+                a.iter().zip(&b).map(|(&x, &y)| match op {
+                    BinOp::Add => x + y,
+                    BinOp::Sub => x - y,
+                    BinOp::Mul => x * y,
+                    BinOp::Div => if y == 0.0 { f64::NAN } else { x / y },
+                    BinOp::Gt => flag(x > y),
+                    BinOp::Ge => flag(x >= y),
+                    BinOp::Lt => flag(x < y),
+                    BinOp::Le => flag(x <= y),
+                    BinOp::Eq => flag(x == y),
+                    BinOp::Ne => flag(!x.is_nan() && !y.is_nan() && x != y),
+                    BinOp::And => flag(truthy(x) && truthy(y)),
+                    BinOp::Or => flag(truthy(x) || truthy(y)),
+                }).collect()
+            },
+            Expr::Call(func, args) => {
+                let values = self.eval(&args[0]);
+                let sectors = &self.graph.sectors().ids;
+                let n_sectors = self.graph.sectors().len();
+                match func {
+                    Func::Abs => values.into_iter().map(f64::abs).collect(),
+                    Func::Rank => rank_desc(&values, None),
+                    Func::Top => {
+                        let k = match args[1] { Expr::Num(k) => k, _ => 0.0 };
+                        rank_desc(&values, None).into_iter().map(|r| flag(r <= k)).collect()
+                    },
+                    Func::SectorRank => rank_desc(&values, Some(sectors)),
+                    Func::SectorMean => sector_broadcast(&values, sectors, n_sectors, true),
+                    Func::SectorCount => sector_broadcast(&values, sectors, n_sectors, false),
+                }
+            },
+        }
+    }
+}
+
+/// 스크리닝 요청
+#[derive(Debug, Clone, Default)]
+pub struct ScreenSpec {
+    /// 통과 조건 (없으면 전 종목)
+    pub filter: Option<Expr>,
+    /// 정렬 기준 (없으면 종목 순서)
+    pub order_by: Option<Expr>,
+    pub ascending: bool,
+    /// 업종별 최대 종목 수
+    pub per_sector: Option<usize>,
+    pub limit: Option<usize>,
+}
+
+impl ScreenSpec {
+    pub fn needs_context(&self) -> bool {
+        self.filter.as_ref().map_or(false, |e| e.needs_context()) || self.order_by.as_ref().map_or(false, |e| e.needs_context())
+    }
+}
+
+/// 스크리닝 결과: 선정된 종목 인덱스(순서대로)와 정렬 점수
+#[derive(Debug, Clone, Default)]
+pub struct ScreenResult {
+    pub indices: Vec<usize>,
+    pub scores: Vec<f64>,
+}
+
+/// 조건 → 정렬(NaN 은 뒤로) → 업종별 제한 → 상위 limit
+pub fn run_screen(screener: &mut Screener<'_, '_>, spec: &ScreenSpec) -> ScreenResult {
+    let n = screener.len();
+    let mut indices: Vec<usize> = match &spec.filter {
+        Some(filter) => screener.eval(filter).iter().enumerate().filter(|(_, &v)| truthy(v)).map(|(i, _)| i).collect(),
+        None => (0..n).collect(),
+    };
+    let scores = match &spec.order_by {
+        Some(order_by) => screener.eval(order_by),
+        None => vec![f64::NAN; n],
+    };
+    if spec.order_by.is_some() {
+        indices.sort_by(|&a, &b| {
+            let (x, y) = (scores[a], scores[b]);
+            match (x.is_nan(), y.is_nan()) {
+                (true, true) => std::cmp::Ordering::Equal,
+                (true, false) => std::cmp::Ordering::Greater,
+                (false, true) => std::cmp::Ordering::Less,
+                _ if spec.ascending => x.partial_cmp(&y).unwrap(),
+                _ => y.partial_cmp(&x).unwrap(),
+            }
+        });
+    }
+    if let Some(per_sector) = spec.per_sector {
+        let sectors = &screener.graph.sectors().ids;
+        let mut taken = vec![0usize; screener.graph.sectors().len()];
+        indices.retain(|&i| {
+            taken[sectors[i]] += 1;
+            taken[sectors[i]] <= per_sector
+        });
+    }
+    if let Some(limit) = spec.limit {
+        indices.truncate(limit);
+    }
+    let scores = indices.iter().map(|&i| scores[i]).collect();
+    ScreenResult { indices, scores }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::core::day_data::DayData;
+    use crate::features::stock_info::StockInfo;
+
+    fn ticker(table: &str, bars: &[(i64, i64, i64, i64)]) -> TickerDay {
+        let rows = bars.iter()
+            .map(|&(hhmm, open, close, volume)| (20250430_0000 + hhmm, open, open.max(close), open.min(close), close, volume))
+            .collect();
+        TickerDay::from_rows(table, rows)
+    }
+
+    fn info(code: &str, sector: &str) -> StockInfo {
+        StockInfo { code: code.to_string(), name: code.to_string(), sector: sector.to_string() }
+    }
+
+    #[test]
+    fn test_parse_precedence_and_errors() {
+        let expr = Expr::parse("ret > 1 + 2 * 3 and not d or trade_value >= 1e9").unwrap();
+        let Expr::Binary(BinOp::Or, left, _) = expr else { panic!("or 가 최상위여야 합니다") };
+        let Expr::Binary(BinOp::And, cmp, _) = *left else { panic!("and 가 or 아래여야 합니다") };
+        assert_eq!(*cmp, Expr::Binary(BinOp::Gt, Box::new(Expr::Column(Column::Ret)), Box::new(Expr::Binary(
+            BinOp::Add, Box::new(Expr::Num(1.0)), Box::new(Expr::Binary(BinOp::Mul, Box::new(Expr::Num(2.0)), Box::new(Expr::Num(3.0))))
+        ))));
+        assert!(Expr::parse("tv_ratio > 2").unwrap().needs_context());
+        assert!(!Expr::parse("top(trade_value, 1_000)").unwrap().needs_context());
+
+        assert!(Expr::parse("foo > 1").is_err());
+        assert!(Expr::parse("top(ret)").is_err());
+        assert!(Expr::parse("top(ret, ret)").is_err());
+        assert!(Expr::parse("(ret > 1").is_err());
+        assert!(Expr::parse("ret > 1 )").is_err());
+        assert!(Expr::parse("ret >").is_err());
+    }
+
+    #[test]
+    fn test_screen_top_rank_and_sector_ops() {
+        let day = DayData::from_tickers(20250430, vec![
+            ticker("A000001", &[(905, 1000, 1020, 100), (1030, 1020, 1100, 100)]),
+            ticker("A000002", &[(905, 2000, 2050, 100), (1030, 2050, 2200, 100)]),
+            ticker("A000003", &[(905, 3000, 3000, 100), (1030, 3000, 2900, 100)]),
+            ticker("A000004", &[(905, 500, 520, 10), (1030, 520, 600, 10)]),
+            ticker("A000005", &[]),
+        ]);
+        let infos = vec![info("000001", "반도체"), info("000002", "반도체"), info("000003", "반도체"), info("000004", "은행"), info("000005", "은행")];
+        let mut graph = FeatureGraph::with_infos(&day, infos);
+        let mut screener = Screener::new(&mut graph, 1030);
+
+        let ret = screener.column(Column::Ret);
+        assert_eq!(ret[0], 10.0);
+        assert!(ret[4].is_nan());
+        assert_eq!(screener.eval(&Expr::parse("rank(trade_value)").unwrap())[..4], [3.0, 2.0, 1.0, 4.0]);
+        assert_eq!(screener.eval(&Expr::parse("sector_rank(ret)").unwrap())[..4], [1.0, 2.0, 3.0, 1.0]);
+        assert_eq!(screener.eval(&Expr::parse("sector_count(ret > 5)").unwrap()), vec![2.0, 2.0, 2.0, 1.0, 1.0]);
+        // 컨텍스트가 없으면 전일 값은 NaN 이므로 비교가 모두 거짓
+        assert!(screener.eval(&Expr::parse("tv_ratio > 0").unwrap()).iter().all(|&v| v == 0.0));
+
+        let spec = ScreenSpec {
+            filter: Some(Expr::parse("top(trade_value, 3) and ret > 3").unwrap()),
+            order_by: Some(Expr::parse("ret").unwrap()),
+            ..ScreenSpec::default()
+        };
+        let result = run_screen(&mut screener, &spec);
+        assert_eq!(result.indices, vec![0, 1]);
+        assert_eq!(result.scores, vec![10.0, 10.0]);
+
+        let spec = ScreenSpec { order_by: Some(Expr::parse("ret").unwrap()), per_sector: Some(1), ..ScreenSpec::default() };
+        // 정렬 값이 NaN 인 종목은 맨 뒤라서 은행 업종 두 번째 종목으로 빠짐
+        assert_eq!(run_screen(&mut screener, &spec).indices, vec![3, 0]);
+        let spec = ScreenSpec { limit: Some(1), ascending: true, ..spec };
+        assert_eq!(run_screen(&mut screener, &spec).indices, vec![2]);
+    }
+}
@@ -0,0 +1,296 @@
+use std::collections::BTreeSet;
+use log::debug;
+use crate::core::{bar_time, trace};
+use crate::core::day_data::DayData;
+use crate::core::feature_graph::{DParams, SESSION_OPEN, is_long_bull, top_by_trade_value};
+use crate::core::forward_returns::SESSION_CLOSE;
+use crate::features::stock_info::{StockInfo, STOCK_INFO_MANAGER};
+
+// 업종 × 기준시각 집계 인덱스
+// 하루치 전 종목을 기준시각 순서대로 한 번만 훑어 업종별 거래대금, 상승 종목 수, 평균 상승률,
+// D 종목 수를 (업종, 슬롯) 행렬에 담습니다. 업종 필터는 업종 수만큼의 조회로 끝납니다.
+
+/// 거래일 종목 → 업종 번호 매핑 (업종명은 이름순)
+#[derive(Debug, Clone, Default)]
+pub struct SectorMap {
+    pub names: Vec<String>,
+    /// day.tickers 와 같은 순서의 업종 번호
+    pub ids: Vec<usize>,
+}
+
+impl SectorMap {
+    /// 종목 정보 목록(day.tickers 와 같은 순서)으로 매핑 생성
+    pub fn from_infos(infos: &[StockInfo]) -> Self {
+        let names: Vec<String> = infos.iter()
+            .map(|info| info.sector.clone())
+            .collect::<BTreeSet<_>>()
+            .into_iter()
+            .collect();
+        let ids = infos.iter()
+            .map(|info| names.binary_search(&info.sector).unwrap_or(0))
+            .collect();
+        Self { names, ids }
+    }
+
+    /// 업종 정보는 STOCK_INFO_MANAGER(sector_utf8.csv)에서 매핑
+    pub fn for_day(day: &DayData) -> Self {
+        let infos: Vec<StockInfo> = {
+            let stock_manager = STOCK_INFO_MANAGER.lock().unwrap();
+            day.tickers.iter().map(|t| stock_manager.get_stock_info(&t.table)).collect()
+        };
+        Self::from_infos(&infos)
+    }
+
+    pub fn len(&self) -> usize {
+        self.names.len()
+    }
+}
+
+/// 하루치 업종 × 기준시각 집계 (행 우선: index = 업종 * 기준시각 수 + 기준시각)
+#[derive(Debug, Clone)]
+pub struct SectorIndex {
+    pub date_num: i64,
+    pub sectors: Vec<String>,
+    /// 09:00 ~ 15:30, 5분 간격 기준시각 (HHMM)
+    pub cutoffs: Vec<i64>,
+    /// 09:00~기준시각 거래대금 합
+    pub trade_value: Vec<i64>,
+    /// 09:00~기준시각 봉이 있고 시가가 0보다 큰 종목 수
+    pub active: Vec<u32>,
+    /// 09:00 시가 대비 기준시각 종가가 오른 종목 수
+    pub advancers: Vec<u32>,
+    /// 09:00~기준시각 상승률 합 (%) - 평균은 mean_return
+    pub rate_sum: Vec<f64>,
+    /// D 조건(상승률 + 장대양봉) 만족 종목 수 (거래대금 순위 무관)
+    pub d_flags: Vec<u32>,
+    /// 거래대금 상위 top_n 중 D 조건 만족 종목 수
+    pub d_top: Vec<u32>,
+    /// 09:30부터 기준시각까지 30분 간격 D 종목 합집합의 종목 수 (업종 필터가 보는 값)
+    pub d_before: Vec<u32>,
+}
+
+impl SectorIndex {
+    /// 기준시각 순서대로 종목별 커서를 한 칸씩 전진시키며 한 번에 집계
+    pub fn build(day: &DayData, sectors: &SectorMap, params: &DParams) -> Self {
+        let _span = trace::span("sector.build");
+        let cutoffs = index_cutoffs();
+        let (sector_count, cutoff_count) = (sectors.len(), cutoffs.len());
+        let cells = sector_count * cutoff_count;
+
+        let mut index = Self {
+            date_num: day.date_num,
+            sectors: sectors.names.clone(),
+            cutoffs: cutoffs.clone(),
+            trade_value: vec![0; cells],
+            active: vec![0; cells],
+            advancers: vec![0; cells],
+            rate_sum: vec![0.0; cells],
+            d_flags: vec![0; cells],
+            d_top: vec![0; cells],
+            d_before: vec![0; cells],
+        };
+
+        let from = day.at(SESSION_OPEN);
+        let starts: Vec<usize> = day.tickers.iter().map(|t| t.dates.partition_point(|&d| d < from)).collect();
+        let mut ends = starts.clone();
+        let mut values: Vec<Option<i64>> = vec![None; day.tickers.len()];
+        let mut d_flag = vec![false; day.tickers.len()];
+
+        // D 합집합은 30분 간격 사슬이므로 5분 슬롯의 30분 내 위치별로 따로 누적
+        let chains = (30 / bar_time::SLOT_MINUTES) as usize;
+        let mut seen = vec![vec![false; day.tickers.len()]; chains];
+        let mut chain_counts = vec![vec![0u32; sector_count]; chains];
+
+        for (c, &cutoff) in cutoffs.iter().enumerate() {
+            let to = day.at(cutoff);
+            for (i, ticker) in day.tickers.iter().enumerate() {
+                while ends[i] < ticker.len() && ticker.dates[ends[i]] <= to {
+                    ends[i] += 1;
+                }
+                let (start, end) = (starts[i], ends[i]);
+                if start == end {
+                    continue;
+                }
+
+                let cell = sectors.ids[i] * cutoff_count + c;
+                let sum = ticker.tv_prefix[end] - ticker.tv_prefix[start];
+                let (open, close) = (ticker.open[start], ticker.close[end - 1]);
+                values[i] = Some(sum);
+                index.trade_value[cell] += sum;
+
+                let rate = (close - open) as f64 / open as f64 * 100.0;
+                d_flag[i] = rate >= params.min_rate && is_long_bull(open, close, params.long_bull_divisor);
+                if d_flag[i] {
+                    index.d_flags[cell] += 1;
+                }
+                if open > 0 {
+                    index.active[cell] += 1;
+                    index.rate_sum[cell] += rate;
+                    if close > open {
+                        index.advancers[cell] += 1;
+                    }
+                }
+            }
+
+            let chain = (bar_time::slot_of(cutoff).unwrap_or(0) as usize) % chains;
+            for i in top_by_trade_value(&values, params.top_n) {
+                if !d_flag[i] {
+                    continue;
+                }
+                let sector = sectors.ids[i];
+                index.d_top[sector * cutoff_count + c] += 1;
+                if cutoff >= 930 && !seen[chain][i] {
+                    seen[chain][i] = true;
+                    chain_counts[chain][sector] += 1;
+                }
+            }
+            if cutoff >= 930 {
+                for (sector, &count) in chain_counts[chain].iter().enumerate() {
+                    index.d_before[sector * cutoff_count + c] = count;
+                }
+            }
+        }
+
+        debug!("🗂️ {} 업종 인덱스 생성: {}개 업종 x {}개 시간대", day.date_num, sector_count, cutoff_count);
+        index
+    }
+
+    /// STOCK_INFO_MANAGER 업종 매핑으로 생성
+    pub fn for_day(day: &DayData, params: &DParams) -> Self {
+        Self::build(day, &SectorMap::for_day(day), params)
+    }
+
+    pub fn shape(&self) -> [usize; 2] {
+        [self.sectors.len(), self.cutoffs.len()]
+    }
+
+    /// 기준시각(HHMM)의 열 번호 (5분 경계가 아니거나 범위 밖이면 None)
+    pub fn column(&self, cutoff: i64) -> Option<usize> {
+        let slot = bar_time::slot_of(cutoff)?;
+        usize::try_from(slot).ok().filter(|&c| c < self.cutoffs.len())
+    }
+
+    #[inline]
+    fn cell(&self, sector: usize, column: usize) -> usize {
+        sector * self.cutoffs.len() + column
+    }
+
+    /// 업종 평균 상승률 (%), 집계 종목이 없으면 NaN
+    pub fn mean_return(&self, sector: usize, column: usize) -> f64 {
+        let cell = self.cell(sector, column);
+        match self.active[cell] {
+            0 => f64::NAN,
+            n => self.rate_sum[cell] / n as f64,
+        }
+    }
+
+    /// 한 기준시각 열의 업종별 D 합집합 종목 수 (업종 번호 순서)
+    pub fn d_before_column(&self, column: usize) -> Vec<usize> {
+        (0..self.sectors.len())
+            .map(|s| self.d_before[self.cell(s, column)] as usize)
+            .collect()
+    }
+
+    /// 업종 필터: 기준시각까지 D 종목 합집합이 min_count 이상인 업종 번호
+    pub fn sectors_with_min_d(&self, cutoff: i64, min_count: usize) -> Vec<usize> {
+        let Some(column) = self.column(cutoff) else {
+            return Vec::new();
+        };
+        (0..self.sectors.len())
+            .filter(|&s| self.d_before[self.cell(s, column)] as usize >= min_count)
+            .collect()
+    }
+}
+
+/// 인덱스 열이 되는 기준시각 (09:00 ~ 15:30, 5분 간격)
+pub fn index_cutoffs() -> Vec<i64> {
+    let last = bar_time::slot_of(SESSION_CLOSE).unwrap_or(0);
+    (0..=last).map(bar_time::slot_hhmm).collect()
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::collections::HashMap;
+    use crate::core::day_data::TickerDay;
+    use crate::core::feature_graph::{FeatureGraph, FeatureKind};
+
+    fn ticker(table: &str, bars: &[(i64, i64, i64, i64)]) -> TickerDay {
+        let rows = bars.iter()
+            .map(|&(hhmm, open, close, volume)| (20250430_0000 + hhmm, open, open.max(close), open.min(close), close, volume))
+            .collect();
+        TickerDay::from_rows(table, rows)
+    }
+
+    fn sector_id(sectors: &SectorMap, name: &str) -> usize {
+        sectors.names.iter().position(|s| s == name).unwrap()
+    }
+
+    fn info(code: &str, sector: &str) -> StockInfo {
+        StockInfo { code: code.to_string(), name: code.to_string(), sector: sector.to_string() }
+    }
+
+    #[test]
+    fn test_sector_index_matches_feature_graph() {
+        let day = DayData::from_tickers(20250430, vec![
+            ticker("A000001", &[(905, 1000, 1020, 100), (930, 1020, 1100, 100), (1000, 1100, 1000, 50)]),
+            ticker("A000002", &[(905, 2000, 2050, 100), (930, 2050, 2200, 100)]),
+            ticker("A000003", &[(855, 2900, 3000, 10), (905, 3000, 3050, 100), (1000, 3050, 3400, 100)]),
+            ticker("A000004", &[(905, 4000, 4010, 100), (930, 4010, 4020, 100)]),
+            ticker("A000005", &[(935, 500, 600, 1000)]),
+            ticker("A000006", &[]),
+        ]);
+        let infos = vec![
+            info("000001", "반도체"), info("000002", "반도체"), info("000003", "반도체"),
+            info("000004", "반도체"), info("000005", "화학"), info("000006", "기타"),
+        ];
+        let sectors = SectorMap::from_infos(&infos);
+        assert_eq!(sectors.names, vec!["기타", "반도체", "화학"]);
+
+        let params = DParams::default();
+        let index = SectorIndex::build(&day, &sectors, &params);
+        assert_eq!(index.shape(), [3, 79]);
+
+        let mut graph = FeatureGraph::with_infos(&day, infos.clone());
+        for &cutoff in &index.cutoffs {
+            let column = index.column(cutoff).unwrap();
+            let tv = graph.get_with(FeatureKind::TradeValue, cutoff, &params);
+            let before = graph.get_with(FeatureKind::DBefore, cutoff, &params);
+
+            let mut expected_tv: HashMap<usize, i64> = HashMap::new();
+            let mut expected_before: HashMap<usize, u32> = HashMap::new();
+            for (i, value) in tv.values().iter().enumerate() {
+                *expected_tv.entry(sectors.ids[i]).or_insert(0) += value.unwrap_or(0);
+            }
+            for &i in before.indices() {
+                *expected_before.entry(sectors.ids[i]).or_insert(0) += 1;
+            }
+            for s in 0..sectors.len() {
+                let cell = s * index.cutoffs.len() + column;
+                assert_eq!(index.trade_value[cell], expected_tv.get(&s).copied().unwrap_or(0), "{} {}", s, cutoff);
+                assert_eq!(index.d_before[cell], expected_before.get(&s).copied().unwrap_or(0), "{} {}", s, cutoff);
+            }
+        }
+
+        // 업종 인덱스를 쓰는 그래프도 업종 필터 결과가 같아야 함
+        let mut indexed = FeatureGraph::with_infos(&day, infos);
+        indexed.set_use_sector_index(true);
+        for &cutoff in &[930, 1000, 1005, 1030] {
+            let expected = graph.get_with(FeatureKind::SectorCounts, cutoff, &params);
+            let actual = indexed.get_with(FeatureKind::SectorCounts, cutoff, &params);
+            assert_eq!(actual.counts(), expected.counts(), "{}", cutoff);
+        }
+
+        let semi = sector_id(&sectors, "반도체");
+        // 1000 기준: 000001 은 음봉으로 전환되어 D 가 아니지만 0930 에 D 였으므로 합집합에 남음
+        assert_eq!(index.sectors_with_min_d(1000, 3), vec![semi]);
+        assert_eq!(index.sectors_with_min_d(1005, 3), vec![semi]);
+        assert!(index.sectors_with_min_d(935, 3).is_empty());
+        assert!(index.sectors_with_min_d(1001, 1).is_empty());
+
+        let column = index.column(1000).unwrap();
+        assert_eq!(index.active[semi * 79 + column], 4);
+        assert_eq!(index.advancers[semi * 79 + column], 3);
+        assert!(index.mean_return(sector_id(&sectors, "기타"), column).is_nan());
+    }
+}
@@ -0,0 +1,431 @@
+// 프로세스 간 공유 일별 스냅샷
+// 하루치 전 종목 봉과 파생 배열(거래대금 누적합, 선행 수익률)을 불변 파일 하나로 발행하고,
+// 다른 프로세스는 파일을 읽기 전용으로 붙여 씁니다 (파이썬은 numpy.memmap 으로 복사 없이, 러스트는 캐시 로드 대신).
+// 리눅스에서는 기본 폴더가 /dev/shm 이라 스냅샷이 공유 메모리에 있고, numpy.memmap 으로 붙은 N개 워커가 같은 페이지를 공유합니다.
+// 러스트 쪽(read_day)은 스냅샷을 프로세스 힙으로 복사하므로 SQLite 를 다시 읽지 않을 뿐, 메모리는 워커마다 한 벌씩 씁니다.
+// 헤더에 원본의 수정 시각을 기록해 두고, 원본이 갱신되면 스냅샷을 오래된 것으로 보고 다시 발행합니다.
+//
+// 레이아웃 (리틀 엔디언, 모든 컬럼은 8바이트 정렬):
+//   [MAGIC 8][버전 u64][헤더 길이 u64][헤더][패딩][컬럼 데이터 ...]
+// 헤더: 날짜, 원본 DB, 원본 수정 시각(ms), 종목 목록, 선행 수익률 경계/구간, 컬럼 목록(이름, dtype, 파일 오프셋, shape)
+//
+// 컬럼:
+//   offsets          int64 [종목 수 + 1]   종목 i 의 봉은 offsets[i]:offsets[i+1]
+//   date/open/high/low/close/volume  int64 [봉 수]
+//   tv_prefix        int64 [봉 수 + 종목 수]  종목 i 의 누적합은 offsets[i]+i : offsets[i+1]+i+1
+//   forward          float64 [종목, 경계, 구간]  (발행 시 선택)
+
+use std::fs::File;
+use std::io::{BufWriter, Read, Seek, SeekFrom, Write};
+use std::path::{Path, PathBuf};
+use std::sync::RwLock;
+use log::{debug, info};
+use once_cell::sync::Lazy;
+use crate::core::cache::{ByteReader, ByteWriter};
+use crate::core::day_data::{DayData, TickerDay};
+use crate::core::forward_returns::{default_horizons, ForwardReturns, Horizon, DEFAULT_BOUNDARIES};
+use crate::features::db;
+
+pub const SNAPSHOT_EXTENSION: &str = "rcs";
+/// 스냅샷 폴더 환경 변수
+pub const SNAPSHOT_DIR_ENV: &str = "RUST_CORE_SNAPSHOT_DIR";
+const MAGIC: &[u8; 8] = b"RCSNAP\0\0";
+const VERSION: u64 = 2;
+const PREAMBLE_BYTES: u64 = 24;
+
+/// 컬럼 하나의 위치 (dtype 은 numpy 이름)
+#[derive(Debug, Clone, PartialEq)]
+pub struct ColumnInfo {
+    pub name: String,
+    pub dtype: String,
+    pub offset: u64,
+    pub shape: Vec<u64>,
+}
+
+impl ColumnInfo {
+    pub fn len(&self) -> u64 {
+        self.shape.iter().product()
+    }
+}
+
+#[derive(Debug, Clone)]
+pub struct SnapshotInfo {
+    pub path: PathBuf,
+    pub date_num: i64,
+    /// 스냅샷을 만든 원본 DB/아카이브 경로
+    pub source: String,
+    /// 발행 시점 원본의 수정 시각 (db::modified_stamp)
+    pub source_stamp: u64,
+    pub tables: Vec<String>,
+    pub boundaries: Vec<i64>,
+    pub horizons: Vec<String>,
+    pub columns: Vec<ColumnInfo>,
+    pub bytes: u64,
+}
+
+impl SnapshotInfo {
+    pub fn column(&self, name: &str) -> Option<&ColumnInfo> {
+        self.columns.iter().find(|c| c.name == name)
+    }
+
+    pub fn bars(&self) -> u64 {
+        self.column("date").map_or(0, ColumnInfo::len)
+    }
+
+    /// 발행 뒤 원본 DB/아카이브가 갱신되었는지
+    pub fn is_stale(&self) -> bool {
+        db::modified_stamp(&self.source) != self.source_stamp
+    }
+
+    fn encode_header(&self) -> Vec<u8> {
+        let mut out = ByteWriter::default();
+        out.i64(self.date_num);
+        out.str(&self.source);
+        out.u64(self.source_stamp);
+        out.u64(self.tables.len() as u64);
+        for t in &self.tables {
+            out.str(t);
+        }
+        out.i64s(&self.boundaries);
+        out.u64(self.horizons.len() as u64);
+        for h in &self.horizons {
+            out.str(h);
+        }
+        out.u64(self.columns.len() as u64);
+        for c in &self.columns {
+            out.str(&c.name);
+            out.str(&c.dtype);
+            out.u64(c.offset);
+            out.i64s(&c.shape.iter().map(|&s| s as i64).collect::<Vec<_>>());
+        }
+        out.buf
+    }
+
+    fn decode_header(path: &Path, bytes: u64, header: &[u8]) -> Result<Self, String> {
+        let mut input = ByteReader::new(header);
+        let date_num = input.i64()?;
+        let source = input.str()?;
+        let source_stamp = input.u64()?;
+        let tables = (0..input.u64()?).map(|_| input.str()).collect::<Result<_, _>>()?;
+        let boundaries = input.i64s()?;
+        let horizons = (0..input.u64()?).map(|_| input.str()).collect::<Result<_, _>>()?;
+        let columns = (0..input.u64()?)
+            .map(|_| Ok(ColumnInfo {
+                name: input.str()?,
+                dtype: input.str()?,
+                offset: input.u64()?,
+                shape: input.i64s()?.into_iter().map(|s| s as u64).collect(),
+            }))
+            .collect::<Result<_, String>>()?;
+        Ok(Self { path: path.to_path_buf(), date_num, source, source_stamp, tables, boundaries, horizons, columns, bytes })
+    }
+}
+
+fn align8(n: u64) -> u64 {
+    (n + 7) & !7
+}
+
+fn i64_bytes(values: &[i64]) -> Vec<u8> {
+    values.iter().flat_map(|v| v.to_le_bytes()).collect()
+}
+
+/// 하루치 데이터를 스냅샷 파일로 저장 (임시 파일에 쓴 뒤 이름 변경이라 읽는 쪽은 완성된 파일만 봄)
+/// source_stamp 는 day 를 읽기 전에 잰 원본 수정 시각입니다.
+pub fn write_snapshot(
+    path: &Path,
+    source: &str,
+    source_stamp: u64,
+    day: &DayData,
+    forward: Option<&ForwardReturns>
+) -> Result<SnapshotInfo, Box<dyn std::error::Error>> {
+    let bars: usize = day.tickers.iter().map(TickerDay::len).sum();
+    let mut offsets = Vec::with_capacity(day.tickers.len() + 1);
+    offsets.push(0i64);
+    let mut columns: [Vec<i64>; 7] = Default::default();
+    for ticker in &day.tickers {
+        columns[0].extend_from_slice(&ticker.dates);
+        columns[1].extend_from_slice(&ticker.open);
+        columns[2].extend_from_slice(&ticker.high);
+        columns[3].extend_from_slice(&ticker.low);
+        columns[4].extend_from_slice(&ticker.close);
+        columns[5].extend_from_slice(&ticker.volume);
+        if ticker.tv_prefix.is_empty() {
+            columns[6].push(0);
+        } else {
+            columns[6].extend_from_slice(&ticker.tv_prefix);
+        }
+        offsets.push(columns[0].len() as i64);
+    }
+
+    let mut data: Vec<(ColumnInfo, Vec<u8>)> = Vec::new();
+    let mut push = |name: &str, dtype: &str, shape: Vec<u64>, bytes: Vec<u8>| {
+        data.push((ColumnInfo { name: name.to_string(), dtype: dtype.to_string(), offset: 0, shape }, bytes));
+    };
+    push("offsets", "int64", vec![offsets.len() as u64], i64_bytes(&offsets));
+    for (name, column) in ["date", "open", "high", "low", "close", "volume"].iter().zip(&columns[..6]) {
+        push(name, "int64", vec![bars as u64], i64_bytes(column));
+    }
+    push("tv_prefix", "int64", vec![columns[6].len() as u64], i64_bytes(&columns[6]));
+    if let Some(f) = forward {
+        let shape = f.shape().iter().map(|&s| s as u64).collect();
+        push("forward", "float64", shape, f.values.iter().flat_map(|v| v.to_le_bytes()).collect());
+    }
+
+    let mut info = SnapshotInfo {
+        path: path.to_path_buf(),
+        date_num: day.date_num,
+        source: source.to_string(),
+        source_stamp,
+        tables: day.tickers.iter().map(|t| t.table.clone()).collect(),
+        boundaries: forward.map(|f| f.boundaries.clone()).unwrap_or_default(),
+        horizons: forward.map(|f| f.horizons.iter().map(Horizon::label).collect()).unwrap_or_default(),
+        columns: data.iter().map(|(c, _)| c.clone()).collect(),
+        bytes: 0,
+    };
+    // 오프셋은 고정 길이(u64)라 헤더 길이는 오프셋 값과 무관
+    let header_len = info.encode_header().len() as u64;
+    let mut offset = align8(PREAMBLE_BYTES + header_len);
+    for (column, (_, bytes)) in info.columns.iter_mut().zip(&data) {
+        column.offset = offset;
+        offset = align8(offset + bytes.len() as u64);
+    }
+    info.bytes = offset;
+    let header = info.encode_header();
+
+    if let Some(dir) = path.parent() {
+        std::fs::create_dir_all(dir)?;
+    }
+    let tmp = path.with_extension(format!("{}.{}.tmp", SNAPSHOT_EXTENSION, std::process::id()));
+    {
+        let mut out = BufWriter::new(File::create(&tmp)?);
+        out.write_all(MAGIC)?;
+        out.write_all(&VERSION.to_le_bytes())?;
+        out.write_all(&header_len.to_le_bytes())?;
+        out.write_all(&header)?;
+        let mut written = PREAMBLE_BYTES + header_len;
+        for (column, (_, bytes)) in info.columns.iter().zip(&data) {
+            out.write_all(&vec![0u8; (column.offset - written) as usize])?;
+            out.write_all(bytes)?;
+            written = column.offset + bytes.len() as u64;
+        }
+        out.write_all(&vec![0u8; (info.bytes - written) as usize])?;
+        out.flush()?;
+    }
+    std::fs::rename(&tmp, path)?;
+    debug!("🧊 {} 스냅샷 저장: {}개 종목, {}개 봉, {}바이트", day.date_num, day.tickers.len(), bars, info.bytes);
+    Ok(info)
+}
+
+/// 스냅샷 헤더만 읽기 (컬럼 데이터는 읽지 않음)
+pub fn read_info(path: &Path) -> Result<SnapshotInfo, Box<dyn std::error::Error>> {
+    let mut file = File::open(path)?;
+    let bytes = file.metadata()?.len();
+    let mut preamble = [0u8; PREAMBLE_BYTES as usize];
+    file.read_exact(&mut preamble)?;
+    if &preamble[..8] != MAGIC {
+        return Err(format!("스냅샷 파일이 아닙니다: {}", path.display()).into());
+    }
+    let version = u64::from_le_bytes(preamble[8..16].try_into().unwrap());
+    if version != VERSION {
+        return Err(format!("지원하지 않는 스냅샷 버전입니다: {} ({})", version, path.display()).into());
+    }
+    let header_len = u64::from_le_bytes(preamble[16..24].try_into().unwrap());
+    if PREAMBLE_BYTES + header_len > bytes {
+        return Err(format!("스냅샷 헤더가 잘렸습니다: {}", path.display()).into());
+    }
+    let mut header = vec![0u8; header_len as usize];
+    file.read_exact(&mut header)?;
+    let info = SnapshotInfo::decode_header(path, bytes, &header)?;
+    if info.columns.iter().any(|c| c.offset + c.len() * 8 > bytes) {
+        return Err(format!("스냅샷 컬럼이 파일 범위를 벗어납니다: {}", path.display()).into());
+    }
+    Ok(info)
+}
+
+fn read_column(file: &mut File, column: &ColumnInfo) -> Result<Vec<i64>, Box<dyn std::error::Error>> {
+    let mut bytes = vec![0u8; (column.len() * 8) as usize];
+    file.seek(SeekFrom::Start(column.offset))?;
+    file.read_exact(&mut bytes)?;
+    Ok(bytes.chunks_exact(8).map(|b| i64::from_le_bytes(b.try_into().unwrap())).collect())
+}
+
+/// 스냅샷에서 하루치 데이터 복원 (누적합도 다시 계산하지 않고 그대로 사용)
+/// 컬럼을 프로세스 힙으로 복사하므로 복사 없는 공유는 attach_day_snapshot(numpy.memmap) 에만 해당합니다.
+pub fn read_day(info: &SnapshotInfo) -> Result<DayData, Box<dyn std::error::Error>> {
+    let mut file = File::open(&info.path)?;
+    let mut column = |name: &str| -> Result<Vec<i64>, Box<dyn std::error::Error>> {
+        let c = info.column(name).ok_or_else(|| format!("스냅샷에 {} 컬럼이 없습니다: {}", name, info.path.display()))?;
+        read_column(&mut file, c)
+    };
+    let offsets = column("offsets")?;
+    let [dates, open, high, low, close, volume, tv_prefix] =
+        ["date", "open", "high", "low", "close", "volume", "tv_prefix"].map(|name| column(name));
+    let (dates, open, high, low, close, volume, tv_prefix) = (dates?, open?, high?, low?, close?, volume?, tv_prefix?);
+    if offsets.len() != info.tables.len() + 1 || tv_prefix.len() != dates.len() + info.tables.len() {
+        return Err(format!("스냅샷 컬럼 길이가 맞지 않습니다: {}", info.path.display()).into());
+    }
+
+    let tickers = info.tables.iter().enumerate()
+        .map(|(i, table)| {
+            let (from, to) = (offsets[i] as usize, offsets[i + 1] as usize);
+            TickerDay {
+                table: table.clone(),
+                dates: dates[from..to].to_vec(),
+                open: open[from..to].to_vec(),
+                high: high[from..to].to_vec(),
+                low: low[from..to].to_vec(),
+                close: close[from..to].to_vec(),
+                volume: volume[from..to].to_vec(),
+                tv_prefix: tv_prefix[from + i..to + i + 1].to_vec(),
+            }
+        })
+        .collect();
+    Ok(DayData::from_tickers(info.date_num, tickers))
+}
+
+/// 원본 경로별로 구분하기 위한 짧은 해시 (FNV-1a)
+fn source_tag(source: &str) -> String {
+    let hash = source.bytes().fold(0xcbf29ce484222325u64, |h, b| (h ^ b as u64).wrapping_mul(0x100000001b3));
+    format!("{:016x}", hash)
+}
+
+/// 프로세스 기본 스냅샷 폴더 (set_default_dir 로 지정, DayData::cached 가 찾는 폴더)
+static DEFAULT_DIR: Lazy<RwLock<Option<String>>> = Lazy::new(|| RwLock::new(None));
+
+/// SnapshotRegistry::new(None) 이 쓸 폴더 지정 (None 이면 환경 변수/기본 폴더로 되돌림)
+pub fn set_default_dir(dir: Option<&str>) {
+    let mut current = DEFAULT_DIR.write().unwrap();
+    if current.as_deref() != dir {
+        debug!("🧊 스냅샷 폴더 지정: {}", dir.unwrap_or("(기본)"));
+        *current = dir.map(str::to_string);
+    }
+}
+
+/// 스냅샷 폴더 = 레지스트리 (파일 이름이 곧 키: day_YYYYMMDD_원본해시.rcs)
+pub struct SnapshotRegistry {
+    dir: PathBuf,
+}
+
+impl SnapshotRegistry {
+    /// dir 이 없으면 set_default_dir 로 지정한 폴더, RUST_CORE_SNAPSHOT_DIR,
+    /// 그것도 없으면 /dev/shm (없으면 임시 폴더) 아래 rust_core_snapshots
+    pub fn new(dir: Option<&str>) -> Self {
+        let configured = || DEFAULT_DIR.read().unwrap().clone();
+        let dir = match dir.map(str::to_string).or_else(configured).or_else(|| std::env::var(SNAPSHOT_DIR_ENV).ok()) {
+            Some(dir) => PathBuf::from(dir),
+            None => {
+                let shm = Path::new("/dev/shm");
+                let base = if shm.is_dir() { shm.to_path_buf() } else { std::env::temp_dir() };
+                base.join("rust_core_snapshots")
+            },
+        };
+        Self { dir }
+    }
+
+    pub fn path_for(&self, source: &str, date_num: i64) -> PathBuf {
+        self.dir.join(format!("day_{}_{}.{}", date_num, source_tag(source), SNAPSHOT_EXTENSION))
+    }
+
+    /// 발행된 스냅샷이 있으면 헤더 정보 (원본이 발행 뒤 갱신되었으면 None 이라 다시 발행/로드됨)
+    pub fn find(&self, source: &str, date_num: i64) -> Option<SnapshotInfo> {
+        let path = self.path_for(source, date_num);
+        if !path.is_file() {
+            return None;
+        }
+        let info = read_info(&path).ok()?;
+        if info.is_stale() {
+            debug!("🧊 {} 스냅샷이 원본보다 오래되어 무시: {}", date_num, path.display());
+            return None;
+        }
+        Some(info)
+    }
+
+    /// 스냅샷 발행 (이미 있으면 그대로 사용). 반환: (정보, 새로 만들었는지)
+    ///
+    /// 봉은 일별 캐시(DayData::cached)를 거쳐 읽고, with_forward 면 기본 경계/구간 선행 수익률도 함께 저장합니다.
+    pub fn publish(&self, source: &str, date_num: i64, with_forward: bool) -> Result<(SnapshotInfo, bool), Box<dyn std::error::Error>> {
+        if let Some(info) = self.find(source, date_num) {
+            if !with_forward || info.column("forward").is_some() {
+                return Ok((info, false));
+            }
+        }
+        let stamp = db::modified_stamp(source);
+        let day = DayData::cached(source, date_num)?;
+        let forward = with_forward.then(|| ForwardReturns::compute(&day, &DEFAULT_BOUNDARIES, &default_horizons()));
+        let info = write_snapshot(&self.path_for(source, date_num), source, stamp, &day, forward.as_ref())?;
+        info!("🧊 {} 스냅샷 발행: {} ({:.1} MiB)", date_num, info.path.display(), info.bytes as f64 / (1 << 20) as f64);
+        Ok((info, true))
+    }
+
+    /// 폴더의 스냅샷 목록 (날짜 순, 읽을 수 없는 파일은 건너뜀)
+    pub fn list(&self) -> Result<Vec<SnapshotInfo>, Box<dyn std::error::Error>> {
+        if !self.dir.is_dir() {
+            return Ok(Vec::new());
+        }
+        let mut infos: Vec<SnapshotInfo> = std::fs::read_dir(&self.dir)?
+            .filter_map(|entry| entry.ok().map(|e| e.path()))
+            .filter(|path| path.extension().map_or(false, |ext| ext == SNAPSHOT_EXTENSION))
+            .filter_map(|path| read_info(&path).ok())
+            .collect();
+        infos.sort_by(|a, b| (a.date_num, &a.source).cmp(&(b.date_num, &b.source)));
+        Ok(infos)
+    }
+
+    /// 스냅샷 삭제 (date_num 이 없으면 전체). 이미 붙어 있는 프로세스의 매핑은 닫을 때까지 유지됩니다.
+    pub fn remove(&self, date_num: Option<i64>) -> Result<usize, Box<dyn std::error::Error>> {
+        let mut removed = 0;
+        for info in self.list()? {
+            if date_num.map_or(true, |d| d == info.date_num) {
+                std::fs::remove_file(&info.path)?;
+                removed += 1;
+            }
+        }
+        Ok(removed)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn sample_day() -> DayData {
+        DayData::from_tickers(20250430, vec![
+            TickerDay::from_rows("A000001", vec![(20250430_0905, 100, 103, 99, 102, 10), (20250430_0910, 102, 104, 101, 103, 7)]),
+            TickerDay::from_rows("A000002", vec![]),
+            TickerDay::from_rows("A000003", vec![(20250430_0905, 50, 51, 49, 51, 3)]),
+        ])
+    }
+
+    #[test]
+    fn test_snapshot_roundtrip() {
+        let dir = std::env::temp_dir().join(format!("rust_core_snapshot_test_{}", std::process::id()));
+        let registry = SnapshotRegistry::new(dir.to_str());
+        let day = sample_day();
+        let forward = ForwardReturns::compute(&day, &[905], &[Horizon::Minutes(5)]);
+        let path = registry.path_for("a.db", day.date_num);
+        // 없는 원본의 수정 시각은 0
+        let written = write_snapshot(&path, "a.db", 0, &day, Some(&forward)).unwrap();
+
+        let info = registry.find("a.db", 20250430).unwrap();
+        assert_eq!(info.columns, written.columns);
+        assert_eq!(info.bytes, std::fs::metadata(&path).unwrap().len());
+        assert!(info.columns.iter().all(|c| c.offset % 8 == 0));
+        assert_eq!(info.bars(), 3);
+        assert_eq!(info.column("forward").unwrap().shape, vec![3, 1, 1]);
+        assert!(registry.find("b.db", 20250430).is_none());
+
+        let restored = read_day(&info).unwrap();
+        for (a, b) in restored.tickers.iter().zip(&day.tickers) {
+            assert_eq!((&a.table, &a.dates, &a.close, &a.tv_prefix), (&b.table, &b.dates, &b.close, &b.tv_prefix));
+        }
+        // 원본이 발행 뒤 갱신되면 오래된 스냅샷은 찾지 않음
+        write_snapshot(&path, "a.db", 1, &day, None).unwrap();
+        assert!(registry.find("a.db", 20250430).is_none());
+        assert!(registry.list().unwrap()[0].is_stale());
+
+        assert_eq!(registry.list().unwrap().len(), 1);
+        assert_eq!(registry.remove(None).unwrap(), 1);
+        assert!(registry.list().unwrap().is_empty());
+        std::fs::remove_dir_all(&dir).unwrap();
+    }
+}
@@ -0,0 +1,235 @@
+use log::info;
+use crate::core::bar_time::plus_minutes;
+use crate::core::day_data::DayData;
+use crate::core::feature_graph::{FeatureGraph, FeatureKind, DParams, SECTOR_INDEX_MIN_CUTOFFS, select_sector_leaders};
+use crate::core::prefetch::{PrefetchConfig, Prefetcher};
+
+/// D 규칙 임계값 그리드 (각 축의 후보값)
+#[derive(Debug, Clone)]
+pub struct SweepGrid {
+    pub min_rates: Vec<f64>,
+    pub long_bull_divisors: Vec<i64>,
+    pub top_ns: Vec<usize>,
+    pub min_sector_counts: Vec<usize>,
+}
+
+impl SweepGrid {
+    /// [min_rates, long_bull_divisors, top_ns, min_sector_counts] 축 길이
+    pub fn shape(&self) -> [usize; 4] {
+        [self.min_rates.len(), self.long_bull_divisors.len(), self.top_ns.len(), self.min_sector_counts.len()]
+    }
+
+    pub fn len(&self) -> usize {
+        self.shape().iter().product()
+    }
+
+    /// 행 우선(마지막 축이 가장 빠르게 변함) 조합 인덱스를 파라미터로 변환
+    pub fn params_at(&self, idx: usize) -> DParams {
+        let [_, n_div, n_top, n_sector] = self.shape();
+        let sector = idx % n_sector;
+        let top = (idx / n_sector) % n_top;
+        let div = (idx / (n_sector * n_top)) % n_div;
+        let rate = idx / (n_sector * n_top * n_div);
+        DParams {
+            min_rate: self.min_rates[rate],
+            long_bull_divisor: self.long_bull_divisors[div],
+            top_n: self.top_ns[top],
+            min_sector_count: self.min_sector_counts[sector],
+        }
+    }
+
+    pub fn validate(&self) -> Result<(), String> {
+        if self.len() == 0 {
+            return Err("파라미터 그리드의 모든 축에 값이 하나 이상 있어야 합니다".to_string());
+        }
+        if self.long_bull_divisors.iter().any(|&d| d <= 0) {
+            return Err("long_bull_divisor 는 0보다 커야 합니다".to_string());
+        }
+        Ok(())
+    }
+}
+
+/// 파라미터 조합 하나의 누적 성과
+#[derive(Debug, Clone, Copy, Default)]
+pub struct SweepCell {
+    /// 평가한 (날짜, 시간대) 수
+    pub attempts: usize,
+    /// 종목이 선정된 횟수
+    pub selections: usize,
+    /// 수수료 기준을 넘은 횟수
+    pub wins: usize,
+    pub sum_return: f64,
+}
+
+impl SweepCell {
+    pub fn win_rate(&self) -> f64 {
+        if self.selections == 0 { 0.0 } else { self.wins as f64 / self.selections as f64 * 100.0 }
+    }
+
+    pub fn mean_return(&self) -> f64 {
+        if self.selections == 0 { 0.0 } else { self.sum_return / self.selections as f64 }
+    }
+}
+
+/// 파라미터 조합별 결과 큐브 (cells 는 SweepGrid::params_at 과 같은 순서)
+#[derive(Debug, Clone)]
+pub struct SweepResult {
+    pub shape: [usize; 4],
+    pub cells: Vec<SweepCell>,
+}
+
+impl SweepResult {
+    pub fn new(grid: &SweepGrid) -> Self {
+        Self {
+            shape: grid.shape(),
+            cells: vec![SweepCell::default(); grid.len()],
+        }
+    }
+}
+
+/// 하루치 피처 그래프 위에서 모든 파라미터 조합을 평가해 결과에 누적
+///
+/// 조합별로 업종별 최고 종목 중 첫 번째 종목의 다음 30분 상승률(analyze_3m_performance 와 동일 기준)을 집계합니다.
+pub fn sweep_day(
+    graph: &mut FeatureGraph<'_>,
+    grid: &SweepGrid,
+    cutoffs: &[i64],
+    commission_rate: f64,
+    result: &mut SweepResult
+) {
+    let day = graph.day();
+
+    for &cutoff in cutoffs {
+        let from = day.at(cutoff);
+        let to = day.at(plus_minutes(cutoff, 30));
+
+        for idx in 0..grid.len() {
+            let params = grid.params_at(idx);
+            let d_codes = graph.get_with(FeatureKind::DCodes, cutoff, &params);
+            let leaders = select_sector_leaders(graph, d_codes.indices(), cutoff, &params);
+
+            let cell = &mut result.cells[idx];
+            cell.attempts += 1;
+
+            if let Some(&best) = leaders.first() {
+                // 데이터가 없으면 0%로 처리 (calculate_30min_increase_rate 와 동일)
+                let rate = day.tickers[best].increase_rate_between(from, to).unwrap_or(0.0);
+                cell.selections += 1;
+                cell.sum_return += rate;
+                if rate > commission_rate {
+                    cell.wins += 1;
+                }
+            }
+        }
+    }
+}
+
+/// 날짜 범위 전체에 대해 파라미터 스윕 실행 (날짜마다 데이터는 한 번만 로드)
+///
+/// prefetch_depth > 0 이면 현재 날짜를 계산하는 동안 다음 날짜들을 백그라운드에서 읽어 둡니다.
+pub fn run_sweep(
+    db_path: &str,
+    date_nums: &[i64],
+    cutoffs: &[i64],
+    grid: &SweepGrid,
+    commission_rate: f64,
+    prefetch_depth: usize
+) -> Result<SweepResult, Box<dyn std::error::Error>> {
+    grid.validate()?;
+
+    let mut result = SweepResult::new(grid);
+    let prefetcher = Prefetcher::start(db_path, date_nums, PrefetchConfig { depth: prefetch_depth, ..Default::default() });
+
+    for (idx, &date_num) in date_nums.iter().enumerate() {
+        prefetcher.advance(idx);
+        let day = DayData::cached(db_path, date_num)?;
+        let mut graph = FeatureGraph::new(&day);
+        graph.set_use_sector_index(cutoffs.len() >= SECTOR_INDEX_MIN_CUTOFFS);
+        sweep_day(&mut graph, grid, cutoffs, commission_rate, &mut result);
+
+        let (computed, hits) = graph.stats();
+        info!("📐 {} 파라미터 스윕 완료: {}개 조합 x {}개 시간대 (피처 계산 {}회, 캐시 적중 {}회)",
+              date_num, grid.len(), cutoffs.len(), computed, hits);
+    }
+
+    Ok(result)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::core::day_data::TickerDay;
+    use crate::core::feature_graph::{D_MIN_RATE, LONG_BULL_DIVISOR, TOP_N, MIN_SECTOR_COUNT};
+    use crate::features::stock_info::StockInfo;
+    use crate::rules::d::DStrategy;
+    use crate::rules::strategy::Strategy;
+
+    fn ticker(table: &str, bars: &[(i64, i64, i64, i64)]) -> TickerDay {
+        let rows = bars.iter()
+            .map(|&(hhmm, open, close, volume)| (20250430_0000 + hhmm, open, open.max(close), open.min(close), close, volume))
+            .collect();
+        TickerDay::from_rows(table, rows)
+    }
+
+    fn info(code: &str, sector: &str) -> StockInfo {
+        StockInfo { code: code.to_string(), name: code.to_string(), sector: sector.to_string() }
+    }
+
+    #[test]
+    fn test_sweep_day_default_cell_matches_d_strategy() {
+        let day = DayData::from_tickers(20250430, vec![
+            ticker("A000001", &[(905, 1000, 1020, 100), (930, 1020, 1100, 100), (1000, 1100, 1080, 100)]),
+            ticker("A000002", &[(905, 2000, 2050, 100), (930, 2050, 2200, 100), (1000, 2200, 2300, 100)]),
+            ticker("A000003", &[(905, 3000, 3050, 100), (930, 3050, 3400, 100), (1000, 3400, 3500, 100)]),
+            ticker("A000004", &[(905, 4000, 4010, 100), (930, 4010, 4020, 100), (1000, 4020, 4000, 100)]),
+        ]);
+        let infos = vec![info("000001", "반도체"), info("000002", "반도체"), info("000003", "반도체"), info("000004", "반도체")];
+        // 업종 하한만 기본값(3)과 4 두 가지 → 0번 셀이 기본 파라미터
+        let grid = SweepGrid {
+            min_rates: vec![D_MIN_RATE],
+            long_bull_divisors: vec![LONG_BULL_DIVISOR],
+            top_ns: vec![TOP_N],
+            min_sector_counts: vec![MIN_SECTOR_COUNT, 4],
+        };
+        let (p, d) = (grid.params_at(0), DParams::default());
+        assert_eq!((p.min_rate, p.long_bull_divisor, p.top_n, p.min_sector_count),
+                   (d.min_rate, d.long_bull_divisor, d.top_n, d.min_sector_count));
+
+        let mut graph = FeatureGraph::with_infos(&day, infos.clone());
+        let mut result = SweepResult::new(&grid);
+        sweep_day(&mut graph, &grid, &[930], 0.3, &mut result);
+
+        // 기본 파라미터 셀은 DStrategy 가 고른 첫 종목의 다음 30분 상승률을 집계
+        let mut reference = FeatureGraph::with_infos(&day, infos);
+        let picks = DStrategy::default().select(&mut reference, 930).unwrap();
+        assert_eq!(picks.iter().map(|s| s.code.as_str()).collect::<Vec<_>>(), vec!["000003"]);
+        let expected = (3500 - 3050) as f64 / 3050.0 * 100.0;
+
+        let cell = result.cells[0];
+        assert_eq!((cell.attempts, cell.selections, cell.wins), (1, 1, 1));
+        assert!((cell.mean_return() - expected).abs() < 1e-9);
+        assert_eq!(cell.win_rate(), 100.0);
+
+        // 업종 하한 4 에서는 선정 종목이 없음
+        let strict = result.cells[1];
+        assert_eq!((strict.attempts, strict.selections, strict.wins), (1, 0, 0));
+        assert_eq!((strict.win_rate(), strict.mean_return()), (0.0, 0.0));
+    }
+
+    #[test]
+    fn test_params_at_row_major() {
+        let grid = SweepGrid {
+            min_rates: vec![3.0, 5.0],
+            long_bull_divisors: vec![20, 30],
+            top_ns: vec![10, 20, 30],
+            min_sector_counts: vec![2, 3],
+        };
+        assert_eq!(grid.len(), 24);
+        let p = grid.params_at(0);
+        assert_eq!((p.min_rate, p.long_bull_divisor, p.top_n, p.min_sector_count), (3.0, 20, 10, 2));
+        let p = grid.params_at(1);
+        assert_eq!(p.min_sector_count, 3);
+        let p = grid.params_at(23);
+        assert_eq!((p.min_rate, p.long_bull_divisor, p.top_n, p.min_sector_count), (5.0, 30, 30, 3));
+    }
+}
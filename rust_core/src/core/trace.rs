@@ -0,0 +1,218 @@
+use std::borrow::Cow;
+use std::cell::{Cell, RefCell};
+use std::collections::HashMap;
+use std::fs::File;
+use std::io::{BufWriter, Write};
+use std::sync::Mutex;
+use std::sync::atomic::{AtomicBool, AtomicU64, Ordering};
+use std::time::{Instant, SystemTime, UNIX_EPOCH};
+use once_cell::sync::Lazy;
+
+// 구간 추적 (span tracing)
+// 꺼져 있으면 span() 은 원자 변수 하나만 읽고 돌아오므로 계측 지점에 그대로 두어도 됩니다.
+// 켜져 있으면 끝난 구간을 모아 Chrome trace-event JSON 또는 flamegraph 용 folded stack 으로 저장합니다.
+
+static ENABLED: AtomicBool = AtomicBool::new(false);
+static NEXT_THREAD_ID: AtomicU64 = AtomicU64::new(1);
+
+/// 끝난 구간 하나
+#[derive(Debug, Clone)]
+pub struct TraceEvent {
+    pub name: Cow<'static, str>,
+    /// 추적 시작 시각 기준이 아닌 UNIX 시각 (마이크로초) - 프로세스별 파일을 합쳐도 정렬됨
+    pub ts_us: u64,
+    pub dur_us: u64,
+    pub tid: u64,
+    /// YYYYMMDD / HHMM (없으면 0)
+    pub date_num: i64,
+    pub hhmm: i64,
+}
+
+struct TraceState {
+    origin: Instant,
+    origin_unix_us: u64,
+    events: Vec<TraceEvent>,
+    /// "바깥;안쪽" 호출 경로별 자기 시간 합 (마이크로초)
+    folded: HashMap<String, u64>,
+}
+
+impl TraceState {
+    fn new() -> Self {
+        let origin_unix_us = SystemTime::now().duration_since(UNIX_EPOCH).map(|d| d.as_micros() as u64).unwrap_or(0);
+        Self { origin: Instant::now(), origin_unix_us, events: Vec::new(), folded: HashMap::new() }
+    }
+}
+
+static STATE: Lazy<Mutex<TraceState>> = Lazy::new(|| Mutex::new(TraceState::new()));
+
+struct Frame {
+    name: Cow<'static, str>,
+    child_us: u64,
+}
+
+thread_local! {
+    static THREAD_ID: u64 = NEXT_THREAD_ID.fetch_add(1, Ordering::Relaxed);
+    static STACK: RefCell<Vec<Frame>> = const { RefCell::new(Vec::new()) };
+    static CONTEXT: Cell<(i64, i64)> = const { Cell::new((0, 0)) };
+}
+
+pub fn is_enabled() -> bool {
+    ENABLED.load(Ordering::Relaxed)
+}
+
+/// 이전 기록을 지우고 추적 시작
+pub fn start() {
+    *STATE.lock().unwrap() = TraceState::new();
+    ENABLED.store(true, Ordering::Relaxed);
+}
+
+/// 추적 중지, 모은 구간 수 반환 (기록은 다음 start 까지 유지)
+pub fn stop() -> usize {
+    ENABLED.store(false, Ordering::Relaxed);
+    STATE.lock().unwrap().events.len()
+}
+
+/// drop 될 때 끝나는 구간
+pub struct Span {
+    started: Option<Instant>,
+}
+
+/// 이름이 고정된 구간 시작 (추적이 꺼져 있으면 아무것도 하지 않음)
+#[inline]
+pub fn span(name: &'static str) -> Span {
+    span_named(Cow::Borrowed(name))
+}
+
+pub fn span_named(name: Cow<'static, str>) -> Span {
+    if !is_enabled() {
+        return Span { started: None };
+    }
+    STACK.with(|stack| stack.borrow_mut().push(Frame { name, child_us: 0 }));
+    Span { started: Some(Instant::now()) }
+}
+
+impl Drop for Span {
+    fn drop(&mut self) {
+        let Some(started) = self.started else {
+            return;
+        };
+        let dur_us = started.elapsed().as_micros() as u64;
+        let Some((name, path, self_us)) = STACK.with(|stack| {
+            let mut stack = stack.borrow_mut();
+            let path = stack.iter().map(|f| f.name.as_ref()).collect::<Vec<_>>().join(";");
+            let frame = stack.pop()?;
+            if let Some(parent) = stack.last_mut() {
+                parent.child_us += dur_us;
+            }
+            Some((frame.name, path, dur_us.saturating_sub(frame.child_us)))
+        }) else {
+            return;
+        };
+        let (date_num, hhmm) = CONTEXT.with(|c| c.get());
+        let tid = THREAD_ID.with(|id| *id);
+
+        let mut state = STATE.lock().unwrap();
+        let start_us = started.saturating_duration_since(state.origin).as_micros() as u64;
+        let ts_us = state.origin_unix_us + start_us;
+        state.events.push(TraceEvent { name, ts_us, dur_us, tid, date_num, hhmm });
+        *state.folded.entry(path).or_insert(0) += self_us;
+    }
+}
+
+/// 이 스레드에서 만들어지는 구간에 날짜/시간대 태그를 붙임 (drop 시 이전 값 복원)
+pub struct ContextGuard {
+    previous: (i64, i64),
+}
+
+pub fn context(date_num: i64, hhmm: i64) -> ContextGuard {
+    let previous = CONTEXT.with(|c| c.replace((date_num, hhmm)));
+    ContextGuard { previous }
+}
+
+impl Drop for ContextGuard {
+    fn drop(&mut self) {
+        CONTEXT.with(|c| c.set(self.previous));
+    }
+}
+
+fn escape_json(s: &str) -> String {
+    let mut out = String::with_capacity(s.len());
+    for ch in s.chars() {
+        match ch {
+            '"' => out.push_str("\\\""),
+            '\\' => out.push_str("\\\\"),
+            c if (c as u32) < 0x20 => out.push_str(&format!("\\u{:04x}", c as u32)),
+            c => out.push(c),
+        }
+    }
+    out
+}
+
+/// Chrome trace-event JSON (chrome://tracing, Perfetto 에서 열기)
+pub fn write_chrome(path: &str) -> Result<usize, std::io::Error> {
+    let state = STATE.lock().unwrap();
+    let pid = std::process::id();
+    let mut out = BufWriter::new(File::create(path)?);
+
+    writeln!(out, "{{\"displayTimeUnit\": \"ms\", \"traceEvents\": [")?;
+    for (i, event) in state.events.iter().enumerate() {
+        let mut args = Vec::new();
+        if event.date_num > 0 {
+            args.push(format!("\"date\": \"{}-{:02}-{:02}\"", event.date_num / 10000, event.date_num / 100 % 100, event.date_num % 100));
+        }
+        if event.hhmm > 0 {
+            args.push(format!("\"interval\": \"{:04}\"", event.hhmm));
+        }
+        write!(
+            out,
+            "{{\"name\": \"{}\", \"cat\": \"rust_core\", \"ph\": \"X\", \"ts\": {}, \"dur\": {}, \"pid\": {}, \"tid\": {}, \"args\": {{{}}}}}",
+            escape_json(&event.name), event.ts_us, event.dur_us, pid, event.tid, args.join(", ")
+        )?;
+        writeln!(out, "{}", if i + 1 < state.events.len() { "," } else { "" })?;
+    }
+    writeln!(out, "]}}")?;
+    out.flush()?;
+    Ok(state.events.len())
+}
+
+/// flamegraph.pl / inferno 입력용 folded stack ("바깥;안쪽 자기시간µs")
+pub fn write_folded(path: &str) -> Result<usize, std::io::Error> {
+    let state = STATE.lock().unwrap();
+    let mut stacks: Vec<(&String, &u64)> = state.folded.iter().collect();
+    stacks.sort();
+
+    let mut out = BufWriter::new(File::create(path)?);
+    for (stack, self_us) in &stacks {
+        writeln!(out, "{} {}", stack, self_us)?;
+    }
+    out.flush()?;
+    Ok(stacks.len())
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_spans_nest_and_export() {
+        start();
+        {
+            let _ctx = context(20250430, 930);
+            let _outer = span("outer");
+            {
+                let _inner = span("inner");
+                std::thread::sleep(std::time::Duration::from_millis(2));
+            }
+        }
+        assert!(stop() >= 2);
+
+        let state = STATE.lock().unwrap();
+        let inner = state.events.iter().find(|e| e.name == "inner").unwrap();
+        let outer = state.events.iter().find(|e| e.name == "outer").unwrap();
+        assert!(outer.dur_us >= inner.dur_us && inner.dur_us >= 2000);
+        assert_eq!((inner.date_num, inner.hhmm), (20250430, 930));
+        assert!(state.folded.contains_key("outer;inner"));
+        assert!(state.folded["outer"] <= outer.dur_us - inner.dur_us + 1);
+        assert_eq!(escape_json("a\"b"), "a\\\"b");
+    }
+}
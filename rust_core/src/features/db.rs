@@ -1,13 +1,36 @@
 use rusqlite::{Connection, Result};
+use crate::core::trace;
+
+/// 5분봉 DB 기본 경로
+pub const MIN5_DB_PATH: &str = "D:/db/stock_price(5min).db";
+/// 일봉 DB 기본 경로 (date 는 YYYYMMDD 정수)
+pub const DAY_DB_PATH: &str = "D:/db/stock_price(1day).db";
 
 pub fn open(path: &str) -> Result<Connection> {
+    let _span = trace::span("db.open");
     Connection::open(path)
 }
 
 pub fn get_all_tables(conn: &Connection) -> Result<Vec<String>> {
+    let _span = trace::span("db.tables");
     let mut stmt = conn.prepare("SELECT name FROM sqlite_master WHERE type='table'")?;
     let tables: Vec<String> = stmt.query_map((), |row| row.get(0))?
         .filter_map(Result::ok)
         .collect();
     Ok(tables)
 }
+
+/// DB 파일의 마지막 수정 시각 (밀리초, WAL 파일 포함). 파일이 없으면 0
+///
+/// 캐시 키에 넣어 DB가 갱신되면 (오늘 날짜에 봉이 추가되는 경우 포함) 이전에 읽어 둔 값을 쓰지 않게 합니다.
+pub fn modified_stamp(path: &str) -> u64 {
+    let modified = |p: &str| {
+        std::fs::metadata(p)
+            .and_then(|m| m.modified())
+            .ok()
+            .and_then(|t| t.duration_since(std::time::UNIX_EPOCH).ok())
+            .map(|d| d.as_millis() as u64)
+            .unwrap_or(0)
+    };
+    modified(path).max(modified(&format!("{}-wal", path)))
+}
@@ -2,11 +2,12 @@ use std::sync::Once;
 
 static INIT: Once = Once::new();
 
+/// 로거 초기화 (한 번만 실행, 이미 다른 로거가 등록되어 있으면 그대로 둠)
 pub fn init_logger() {
     INIT.call_once(|| {
-        env_logger::builder()
+        let _ = env_logger::builder()
             .format_target(false)
             .format_timestamp_millis()
-            .init();
+            .try_init();
     });
 } 
\ No newline at end of file
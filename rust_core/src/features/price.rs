@@ -1,14 +1,16 @@
 use rusqlite::Connection;
 use log::{debug, info};
+use crate::core::trace;
 
 pub fn is_d(
-    conn: &Connection, table: &str, from: &str, to: &str
+    conn: &Connection, table: &str, from: i64, to: i64
 ) -> Result<bool, rusqlite::Error> {
+    let _span = trace::span("d.is_d");
     let query = format!(
         "SELECT open, close, volume FROM {} WHERE date BETWEEN ?1 AND ?2", table
     );
     let mut stmt = conn.prepare(&query)?;
-    let mut rows = stmt.query(&[from, to])?;
+    let mut rows = stmt.query([from, to])?;
 
     let mut first_open = None;
     let mut last_close = None;
@@ -23,6 +25,10 @@ pub fn is_d(
     }
 
     if let (Some(open), Some(close)) = (first_open, last_close) {
+        if open <= 0 {
+            debug!("⚠️ {} 시가가 0 이하입니다: {}", table, open);
+            return Ok(false);
+        }
         let rate = (close - open) as f64 / open as f64 * 100.0;
         let long_bull = close > open && (close - open) > (open / 30); // 단순 장대양봉
         
@@ -1,6 +1,7 @@
 use rusqlite::Connection;
 use log::{info, debug};
 use std::collections::HashMap;
+use crate::core::{bar_time, trace};
 use crate::core::d_logic::{DStock, evaluate_d_logic_before};
 
 /// 업종별로 그룹화하여 3개 이상인 업종명을 찾는 함수
@@ -22,11 +23,12 @@ pub fn find_sectors_with_3_or_more(ds: &[DStock]) -> Vec<String> {
 pub fn calculate_d_period_increase_rate(
     conn: &Connection, 
     code: &str, 
-    date_num: &str,
-    to: &str
+    date_num: i64,
+    to: i64
 ) -> Result<f64, rusqlite::Error> {
-    let open_time = format!("{}0900", date_num);
-    let close_time = format!("{}{}", date_num, to);
+    let _span = trace::span("query.period_rate");
+    let open_time = bar_time::at(date_num, 900);
+    let close_time = bar_time::at(date_num, to);
     
     // 테이블명은 "A" + 종목코드 형태
     let table_name = format!("A{}", code);
@@ -36,7 +38,7 @@ pub fn calculate_d_period_increase_rate(
         table_name
     );
     let mut stmt = conn.prepare(&query)?;
-    let mut rows = stmt.query(&[&open_time, &close_time])?;
+    let mut rows = stmt.query([open_time, close_time])?;
 
     let mut open_0900 = None;
     let mut close_to = None;
@@ -51,25 +53,24 @@ pub fn calculate_d_period_increase_rate(
         close_to = Some(close);
     }
 
-    if let (Some(open), Some(close)) = (open_0900, close_to) {
-        let rate = (close - open) as f64 / open as f64 * 100.0;
-        Ok(rate)
-    } else {
-        Ok(0.0) // 데이터가 없으면 0% 반환
+    match (open_0900, close_to) {
+        (Some(open), Some(close)) if open > 0 => Ok((close - open) as f64 / open as f64 * 100.0),
+        _ => Ok(0.0), // 데이터가 없거나 시가가 0 이하이면 0% 반환
     }
 }
 
 /// 업종명 필터링과 상승률 기반 최종 선정을 수행하는 함수
 pub fn select_best_stock_by_increase_rate(
     conn: &Connection,
+    tables: &[String],
     ds: Vec<DStock>,
-    date_num: &str,
-    to: &str
+    date_num: i64,
+    to: i64
 ) -> Result<Vec<DStock>, Box<dyn std::error::Error>> {
+    let _span = trace::span("d.sector_filter");
 
     // 0단계: 이전 시간대의 D알고리즘으로 선별된 업종명 모으기
-    let ds_before = evaluate_d_logic_before(&format!("{}-{}-{}", 
-        &date_num[0..4], &date_num[4..6], &date_num[6..8]), to)?;
+    let ds_before = evaluate_d_logic_before(conn, tables, date_num, to)?;
     
     debug!("📊 이전 시간대 수집된 종목: {}개", ds_before.len());
 
@@ -101,7 +102,7 @@ pub fn select_best_stock_by_increase_rate(
     for stock in &ds_selected {
         match calculate_d_period_increase_rate(conn, &stock.code, date_num, to) {
             Ok(rate) => {
-                debug!("📈 {} ({}): 9:00~{} 상승률 {:.2}%", stock.name, stock.code, to, rate);
+                debug!("📈 {} ({}): 9:00~{:04} 상승률 {:.2}%", stock.name, stock.code, to, rate);
                 
                 let entry = sector_best_stocks.entry(stock.sector.clone()).or_insert_with(|| {
                     (stock.clone(), f64::NEG_INFINITY)
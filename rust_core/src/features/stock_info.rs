@@ -1,9 +1,8 @@
 use std::collections::HashMap;
-use std::fs::File;
-use std::io::{BufRead, BufReader};
 use std::path::Path;
 use once_cell::sync::Lazy;
 use std::sync::Mutex;
+use log::warn;
 
 #[derive(Debug, Clone)]
 pub struct StockInfo {
@@ -29,19 +28,17 @@ impl StockInfoManager {
             return Err(format!("CSV 파일이 존재하지 않습니다: {}", csv_path).into());
         }
 
-        let file = File::open(path)?;
-        let reader = BufReader::new(file);
-        let mut line_count = 0;
-
-        for line in reader.lines() {
-            let line = line?;
-            line_count += 1;
+        let text = std::fs::read_to_string(path)?;
+        self.load_from_str(&text);
+        Ok(())
+    }
 
-            // 첫 번째 줄은 헤더로 건너뛰기
-            if line_count == 1 {
-                continue;
-            }
+    /// CSV 본문 해석 (종목코드,종목명,업종명). 반환: 읽은 종목 수
+    pub fn load_from_str(&mut self, text: &str) -> usize {
+        let mut loaded = 0;
 
+        // 첫 번째 줄은 헤더로 건너뛰기
+        for line in text.lines().skip(1) {
             let parts: Vec<&str> = line.split(',').collect();
             if parts.len() >= 3 {
                 let code = parts[0].trim().to_string();
@@ -55,10 +52,22 @@ impl StockInfoManager {
                 };
 
                 self.stock_map.insert(code, stock_info);
+                loaded += 1;
             }
         }
 
-        Ok(())
+        loaded
+    }
+
+    /// 빌드 시 확장 모듈에 포함된 업종 표
+    pub fn embedded() -> Self {
+        let mut manager = Self::new();
+        manager.load_from_str(EMBEDDED_SECTOR_CSV);
+        manager
+    }
+
+    pub fn len(&self) -> usize {
+        self.stock_map.len()
     }
 
     pub fn get_stock_info(&self, code: &str) -> StockInfo {
@@ -73,6 +82,13 @@ impl StockInfoManager {
             }
         })
     }
+
+    /// 등록된 전체 종목 정보 (종목코드 오름차순)
+    pub fn all(&self) -> Vec<StockInfo> {
+        let mut infos: Vec<StockInfo> = self.stock_map.values().cloned().collect();
+        infos.sort_by(|a, b| a.code.cmp(&b.code));
+        infos
+    }
 }
 
 impl Default for StockInfoManager {
@@ -81,29 +97,54 @@ impl Default for StockInfoManager {
     }
 }
 
+/// 빌드 시 포함하는 업종 CSV (실행 위치와 무관하게 항상 사용 가능)
+const EMBEDDED_SECTOR_CSV: &str = include_str!("../../data/sector_utf8.csv");
+/// 포함된 표 대신 읽을 업종 CSV 경로 환경 변수
+pub const SECTOR_CSV_ENV: &str = "RUST_CORE_SECTOR_CSV";
+
+/// 업종 표를 읽은 출처 ("embedded" 또는 CSV 경로)
+pub static SECTOR_SOURCE: Lazy<Mutex<String>> = Lazy::new(|| Mutex::new("embedded".to_string()));
+
+/// 업종 정보 (처음 사용할 때 포함된 표로 초기화, RUST_CORE_SECTOR_CSV 가 있으면 그 파일을 우선)
+///
+/// 파일을 읽지 못하거나 종목이 하나도 없어도 패닉하지 않고 포함된 표로 진행합니다.
 pub static STOCK_INFO_MANAGER: Lazy<Mutex<StockInfoManager>> = Lazy::new(|| {
-    let mut manager = StockInfoManager::new();
-    
-    // 여러 가능한 경로를 순차적으로 시도
-    let possible_paths = [
-        "rust_core/data/sector_utf8.csv",
-        "data/sector_utf8.csv", 
-        "../rust_core/data/sector_utf8.csv",
-        "../../rust_core/data/sector_utf8.csv",
-    ];
-    
-    let mut csv_path = None;
-    for path_str in &possible_paths {
-        if std::path::Path::new(path_str).exists() {
-            csv_path = Some(path_str.to_string());
-            break;
+    if let Ok(path) = std::env::var(SECTOR_CSV_ENV) {
+        let mut manager = StockInfoManager::new();
+        match manager.load_from_csv(&path) {
+            Ok(()) if manager.len() == 0 => warn!("⚠️ 업종 CSV 에 종목이 없어 포함된 업종 표 사용: {}", path),
+            Ok(()) => {
+                *SECTOR_SOURCE.lock().unwrap() = path;
+                return Mutex::new(manager);
+            },
+            Err(e) => warn!("⚠️ 업종 CSV 로드 실패, 포함된 업종 표 사용: {} ({})", path, e),
         }
     }
-    
-    let csv_path = csv_path.unwrap_or_else(|| {
-        panic!("sector_utf8.csv 파일을 찾을 수 없습니다. 다음 경로들을 확인해주세요: {:?}", possible_paths);
-    });
-    
-    manager.load_from_csv(&csv_path).expect("업종 CSV 로드 실패");
-    Mutex::new(manager)
-}); 
\ No newline at end of file
+    Mutex::new(StockInfoManager::embedded())
+});
+
+/// 업종 표 교체 (명시적 초기화용). 실패하면 기존 표를 유지
+pub fn reload_from_csv(csv_path: &str) -> Result<usize, Box<dyn std::error::Error>> {
+    let mut manager = StockInfoManager::new();
+    manager.load_from_csv(csv_path)?;
+    if manager.len() == 0 {
+        return Err(format!("업종 CSV 에 종목이 없습니다: {}", csv_path).into());
+    }
+    let count = manager.len();
+    *STOCK_INFO_MANAGER.lock().unwrap() = manager;
+    *SECTOR_SOURCE.lock().unwrap() = csv_path.to_string();
+    Ok(count)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_embedded_sector_table() {
+        let manager = StockInfoManager::embedded();
+        assert!(manager.len() > 1000);
+        assert_eq!(manager.get_stock_info("A095570").sector, "일반서비스");
+        assert_eq!(manager.get_stock_info("A999999").sector, "기타");
+    }
+}
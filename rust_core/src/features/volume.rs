@@ -1,12 +1,15 @@
 use rusqlite::Connection;
+use crate::core::trace;
 
+/// 구간 거래대금 합 (구간에 봉이 없으면 SUM 이 NULL 이므로 0)
 pub fn trade_value_between(
-    conn: &Connection, table: &str, from: &str, to: &str
+    conn: &Connection, table: &str, from: i64, to: i64
 ) -> Result<i64, rusqlite::Error> {
+    let _span = trace::span("query.trade_value");
     let query = format!(
         "SELECT SUM(volume * (open + close) / 2) FROM {} WHERE date BETWEEN ?1 AND ?2", table
     );
     let mut stmt = conn.prepare(&query)?;
-    let sum: i64 = stmt.query_row(&[&from, &to], |row| row.get(0))?;
-    Ok(sum)
+    let sum: Option<i64> = stmt.query_row([from, to], |row| row.get(0))?;
+    Ok(sum.unwrap_or(0))
 }
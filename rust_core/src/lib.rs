@@ -4,15 +4,73 @@ mod core;
 mod utility;
 
 use pyo3::prelude::*;
-use crate::rules::d::evaluate_d_for_date_and_time;
-use crate::utility::price_calculator::{calculate_increase_rate, calculate_30min_increase_rate, calculate_increase_rates_batch, calculate_increase_rate_custom_period};
+use crate::rules::d::{evaluate_d_for_date_and_time, evaluate_strategies_for_date, sweep_d_parameters};
+use crate::rules::live::{LiveDSession, replay_d_session};
+use crate::utility::archive::{build_history_archive, archive_info};
+use crate::utility::cache::{configure_cache, cache_stats, clear_cache, pin_day, unpin_day, release_cache_spills};
+use crate::utility::coverage::PyCoverageIndex;
+use crate::utility::daemon::{run_query_daemon, query_daemon_status, stop_query_daemon};
+use crate::utility::daily_context::prior_day_context;
+use crate::utility::event_study::event_study;
+use crate::utility::differential::{differential_benchmark, generate_synthetic_db};
+use crate::utility::prefetch::PyDayPrefetcher;
+use crate::utility::quality::{scan_data_quality, load_quarantine, clear_quarantine, is_quarantined};
+use crate::utility::resample::resample_bars;
+use crate::utility::screen::{screen_market, screen_columns};
+use crate::utility::sector_index::sector_index_for_date;
+use crate::utility::startup::initialize;
+use crate::utility::snapshot::{publish_day_snapshot, attach_day_snapshot, list_day_snapshots, remove_day_snapshots};
+use crate::utility::trace::{start_trace, stop_trace, trace_enabled, write_trace, TraceSpan};
+use crate::utility::price_calculator::{calculate_increase_rate, calculate_30min_increase_rate, calculate_increase_rates_batch, calculate_increase_rate_custom_period, forward_return_matrix, forward_return};
 
 #[pymodule]
-fn rust_core(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
+fn rust_core(py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
+    m.add_function(wrap_pyfunction!(initialize, m)?)?;
     m.add_function(wrap_pyfunction!(evaluate_d_for_date_and_time, m)?)?;
+    m.add_function(wrap_pyfunction!(evaluate_strategies_for_date, m)?)?;
+    m.add_function(wrap_pyfunction!(sweep_d_parameters, m)?)?;
+    m.add_class::<LiveDSession>()?;
+    m.add_function(wrap_pyfunction!(replay_d_session, m)?)?;
+    m.add_class::<PyCoverageIndex>()?;
+    m.add_class::<PyDayPrefetcher>()?;
     m.add_function(wrap_pyfunction!(calculate_increase_rate, m)?)?;
     m.add_function(wrap_pyfunction!(calculate_30min_increase_rate, m)?)?;
     m.add_function(wrap_pyfunction!(calculate_increase_rates_batch, m)?)?;
     m.add_function(wrap_pyfunction!(calculate_increase_rate_custom_period, m)?)?;
+    m.add_function(wrap_pyfunction!(forward_return_matrix, m)?)?;
+    m.add_function(wrap_pyfunction!(forward_return, m)?)?;
+    m.add_function(wrap_pyfunction!(resample_bars, m)?)?;
+    m.add_function(wrap_pyfunction!(sector_index_for_date, m)?)?;
+    m.add_function(wrap_pyfunction!(configure_cache, m)?)?;
+    m.add_function(wrap_pyfunction!(cache_stats, m)?)?;
+    m.add_function(wrap_pyfunction!(clear_cache, m)?)?;
+    m.add_function(wrap_pyfunction!(pin_day, m)?)?;
+    m.add_function(wrap_pyfunction!(unpin_day, m)?)?;
+    m.add_function(wrap_pyfunction!(start_trace, m)?)?;
+    m.add_function(wrap_pyfunction!(stop_trace, m)?)?;
+    m.add_function(wrap_pyfunction!(trace_enabled, m)?)?;
+    m.add_function(wrap_pyfunction!(write_trace, m)?)?;
+    m.add_class::<TraceSpan>()?;
+    m.add_function(wrap_pyfunction!(scan_data_quality, m)?)?;
+    m.add_function(wrap_pyfunction!(load_quarantine, m)?)?;
+    m.add_function(wrap_pyfunction!(clear_quarantine, m)?)?;
+    m.add_function(wrap_pyfunction!(is_quarantined, m)?)?;
+    m.add_function(wrap_pyfunction!(prior_day_context, m)?)?;
+    m.add_function(wrap_pyfunction!(build_history_archive, m)?)?;
+    m.add_function(wrap_pyfunction!(archive_info, m)?)?;
+    m.add_function(wrap_pyfunction!(differential_benchmark, m)?)?;
+    m.add_function(wrap_pyfunction!(generate_synthetic_db, m)?)?;
+    m.add_function(wrap_pyfunction!(screen_market, m)?)?;
+    m.add_function(wrap_pyfunction!(screen_columns, m)?)?;
+    m.add_function(wrap_pyfunction!(run_query_daemon, m)?)?;
+    m.add_function(wrap_pyfunction!(query_daemon_status, m)?)?;
+    m.add_function(wrap_pyfunction!(stop_query_daemon, m)?)?;
+    m.add_function(wrap_pyfunction!(publish_day_snapshot, m)?)?;
+    m.add_function(wrap_pyfunction!(attach_day_snapshot, m)?)?;
+    m.add_function(wrap_pyfunction!(list_day_snapshots, m)?)?;
+    m.add_function(wrap_pyfunction!(remove_day_snapshots, m)?)?;
+    m.add_function(wrap_pyfunction!(event_study, m)?)?;
+    // 종료 시 이 프로세스의 스필 파일 정리 (정적 CACHE 는 drop 되지 않음)
+    py.import_bound("atexit")?.call_method1("register", (wrap_pyfunction!(release_cache_spills, m)?,))?;
     Ok(())
 }
@@ -1,8 +1,25 @@
 use pyo3::prelude::*;
-use crate::core::d_logic::evaluate_d_logic;
+use pyo3::types::PyDict;
+use std::collections::HashMap;
+use crate::core::{bar_time, daemon, trace};
+use crate::core::d_logic::{evaluate_d_logic, DStock};
+use crate::core::daily_context::DailyContext;
+use crate::core::day_data::DayData;
+use crate::core::feature_graph::{FeatureGraph, FeatureKind, DParams, select_sector_leaders};
+use crate::core::sweep::{SweepGrid, run_sweep};
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::strategy::{Strategy, strategy_by_name, evaluate_strategies};
 
 #[pyfunction]
-pub fn evaluate_d_for_date_and_time(date: &str, to: &str) -> PyResult<Vec<(String, String, String)>> {
+pub fn evaluate_d_for_date_and_time(py: Python<'_>, date: &str, to: &str) -> PyResult<Vec<(String, String, String)>> {
+    let _span = trace::span("ffi.evaluate_d_for_date_and_time");
+    // 쿼리 데몬이 떠 있으면 데몬의 캐시를 사용
+    let request = daemon::Request::EvaluateD { date: date.to_string(), time: to.to_string() };
+    let forwarded = py.allow_threads(|| daemon::forward(&request));
+    if let Some(result) = forwarded {
+        return result.and_then(|r| r.into_stocks()).map_err(pyo3::exceptions::PyRuntimeError::new_err);
+    }
     evaluate_d_logic(date, to)
         .map(|d_stocks| {
             d_stocks.into_iter()
@@ -10,4 +27,175 @@ pub fn evaluate_d_for_date_and_time(date: &str, to: &str) -> PyResult<Vec<(Strin
                 .collect()
         })
         .map_err(|e: Box<dyn std::error::Error + 'static>| pyo3::exceptions::PyRuntimeError::new_err(e.to_string()))
-} 
\ No newline at end of file
+}
+
+/// "YYYY-MM-DD" 또는 "YYYYMMDD" 를 정수 YYYYMMDD 로 변환 (bar_time::parse_date 를 파이썬 경계용 ValueError 로 감싼 것)
+pub fn parse_date_num(date: &str) -> PyResult<i64> {
+    bar_time::parse_date(date).map_err(pyo3::exceptions::PyValueError::new_err)
+}
+
+/// "HHMM" 을 정수 HHMM 으로 변환 (bar_time::parse_hhmm 을 파이썬 경계용 ValueError 로 감싼 것)
+pub fn parse_hhmm(time: &str) -> PyResult<i64> {
+    bar_time::parse_hhmm(time).map_err(pyo3::exceptions::PyValueError::new_err)
+}
+
+/// D 전략: 거래대금 상위 30 → D 조건 → 업종 3개 이상 필터 → 업종별 최고 상승률 종목
+#[derive(Debug, Clone, Default)]
+pub struct DStrategy {
+    pub params: DParams,
+}
+
+impl Strategy for DStrategy {
+    fn name(&self) -> &str {
+        "d"
+    }
+
+    fn select(&self, graph: &mut FeatureGraph<'_>, cutoff: i64) -> Result<Vec<DStock>, Box<dyn std::error::Error>> {
+        let d_codes = graph.get_with(FeatureKind::DCodes, cutoff, &self.params);
+        let leaders = select_sector_leaders(graph, d_codes.indices(), cutoff, &self.params);
+        Ok(leaders.into_iter().map(|i| graph.stock(i)).collect())
+    }
+}
+
+/// D 전략 + 전일 일봉 컨텍스트 필터
+///
+/// D 후보 중 기준시각 종가가 최근 20거래일 고가 대비 min_high_distance(%) 이상이고
+/// 전일 종가 대비 시가 갭이 max_gap(%) 이하, 전일 거래대금이 min_prior_trade_value 이상인 종목만 업종별 대표 선정에 넘깁니다 (컨텍스트가 없는 종목은 제외).
+#[derive(Debug, Clone)]
+pub struct DContextStrategy {
+    pub params: DParams,
+    pub min_high_distance: f64,
+    pub max_gap: f64,
+    pub min_prior_trade_value: i64,
+}
+
+impl Default for DContextStrategy {
+    fn default() -> Self {
+        Self { params: DParams::default(), min_high_distance: 0.0, max_gap: 10.0, min_prior_trade_value: 0 }
+    }
+}
+
+impl Strategy for DContextStrategy {
+    fn name(&self) -> &str {
+        "d_context"
+    }
+
+    fn needs_context(&self) -> bool {
+        true
+    }
+
+    fn select(&self, graph: &mut FeatureGraph<'_>, cutoff: i64) -> Result<Vec<DStock>, Box<dyn std::error::Error>> {
+        let d_codes = graph.get_with(FeatureKind::DCodes, cutoff, &self.params);
+        let gap = graph.get_with(FeatureKind::PriorGap, cutoff, &self.params);
+        let distance = graph.get_with(FeatureKind::HighDistance, cutoff, &self.params);
+        let prior_tv = graph.get_with(FeatureKind::PriorTradeValue, cutoff, &self.params);
+        let candidates: Vec<usize> = d_codes.indices().iter().copied()
+            .filter(|&i| matches!(distance.rates()[i], Some(d) if d >= self.min_high_distance))
+            .filter(|&i| matches!(gap.rates()[i], Some(g) if g <= self.max_gap))
+            .filter(|&i| matches!(prior_tv.values()[i], Some(v) if v >= self.min_prior_trade_value))
+            .collect();
+        let leaders = select_sector_leaders(graph, &candidates, cutoff, &self.params);
+        Ok(leaders.into_iter().map(|i| graph.stock(i)).collect())
+    }
+}
+
+/// 하루치 데이터를 한 번만 읽어 여러 전략/시간대를 평가
+/// 반환: {전략명: {시간대: [(종목코드, 종목명, 업종명)]}}
+#[pyfunction]
+#[pyo3(signature = (date, times, strategies=None))]
+pub fn evaluate_strategies_for_date(
+    date: &str,
+    times: Vec<String>,
+    strategies: Option<Vec<String>>
+) -> PyResult<HashMap<String, HashMap<String, Vec<(String, String, String)>>>> {
+    let _span = trace::span("ffi.evaluate_strategies_for_date");
+    init_logger();
+
+    let names = strategies.unwrap_or_else(|| vec!["d".to_string()]);
+    let mut selected: Vec<Box<dyn Strategy>> = Vec::with_capacity(names.len());
+    for name in &names {
+        let strategy = strategy_by_name(name)
+            .ok_or_else(|| pyo3::exceptions::PyValueError::new_err(format!("알 수 없는 전략입니다: {}", name)))?;
+        selected.push(strategy);
+    }
+
+    let cutoffs = times.iter()
+        .map(|t| parse_hhmm(t))
+        .collect::<PyResult<Vec<i64>>>()?;
+    let date_num = parse_date_num(date)?;
+
+    let day = DayData::cached(db::MIN5_DB_PATH, date_num)
+        .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("일중 데이터 로드 실패: {}", e)))?;
+
+    // 전일 컨텍스트가 필요한 전략이 있을 때만 일봉 DB를 읽음
+    let context = if selected.iter().any(|s| s.needs_context()) {
+        Some(DailyContext::cached(db::MIN5_DB_PATH, db::DAY_DB_PATH, date_num)
+            .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("일봉 컨텍스트 로드 실패: {}", e)))?)
+    } else {
+        None
+    };
+
+    let results = evaluate_strategies(&day, &selected, &cutoffs, context)
+        .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("전략 평가 실패: {}", e)))?;
+
+    let mut output: HashMap<String, HashMap<String, Vec<(String, String, String)>>> = HashMap::new();
+    for result in results {
+        output
+            .entry(result.strategy)
+            .or_default()
+            .insert(format!("{:04}", result.cutoff), result.stocks.into_iter()
+                .map(|stock| (stock.code, stock.name, stock.sector))
+                .collect());
+    }
+    Ok(output)
+}
+
+/// D 규칙 임계값 그리드 스윕
+/// 반환 dict: shape, 각 축 값, 그리고 행 우선으로 펼친 win_rate / mean_return / selections / attempts
+/// db_path 에 아카이브(.rca) 경로를 주면 SQLite 대신 아카이브에서 읽습니다.
+/// prefetch: 계산 중에 미리 읽어 둘 다음 날짜 수 (0 이면 끔, 캐시 예산에 따라 더 얕아질 수 있음)
+#[pyfunction]
+#[pyo3(signature = (dates, times, min_rates, long_bull_divisors, top_ns, min_sector_counts, commission_rate=0.249, db_path=None, prefetch=2))]
+pub fn sweep_d_parameters<'py>(
+    py: Python<'py>,
+    dates: Vec<String>,
+    times: Vec<String>,
+    min_rates: Vec<f64>,
+    long_bull_divisors: Vec<i64>,
+    top_ns: Vec<usize>,
+    min_sector_counts: Vec<usize>,
+    commission_rate: f64,
+    db_path: Option<String>,
+    prefetch: usize
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.sweep_d_parameters");
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+    init_logger();
+
+    let date_nums = dates.iter()
+        .map(|d| parse_date_num(d))
+        .collect::<PyResult<Vec<i64>>>()?;
+    let cutoffs = times.iter()
+        .map(|t| parse_hhmm(t))
+        .collect::<PyResult<Vec<i64>>>()?;
+
+    let grid = SweepGrid { min_rates, long_bull_divisors, top_ns, min_sector_counts };
+    grid.validate().map_err(pyo3::exceptions::PyValueError::new_err)?;
+
+    let result = py.allow_threads(|| {
+        run_sweep(&db_path, &date_nums, &cutoffs, &grid, commission_rate, prefetch)
+            .map_err(|e| e.to_string())
+    }).map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("파라미터 스윕 실패: {}", e)))?;
+
+    let dict = PyDict::new_bound(py);
+    dict.set_item("shape", result.shape.to_vec())?;
+    dict.set_item("min_rates", &grid.min_rates)?;
+    dict.set_item("long_bull_divisors", &grid.long_bull_divisors)?;
+    dict.set_item("top_ns", &grid.top_ns)?;
+    dict.set_item("min_sector_counts", &grid.min_sector_counts)?;
+    dict.set_item("win_rate", result.cells.iter().map(|c| c.win_rate()).collect::<Vec<f64>>())?;
+    dict.set_item("mean_return", result.cells.iter().map(|c| c.mean_return()).collect::<Vec<f64>>())?;
+    dict.set_item("selections", result.cells.iter().map(|c| c.selections).collect::<Vec<usize>>())?;
+    dict.set_item("attempts", result.cells.iter().map(|c| c.attempts).collect::<Vec<usize>>())?;
+    Ok(dict)
+}
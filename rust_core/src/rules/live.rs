@@ -0,0 +1,327 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use rusqlite::Connection;
+use std::collections::HashMap;
+use log::warn;
+use crate::core::{bar_time, quality};
+use crate::core::d_logic::evaluate_d_trace;
+use crate::core::day_data::DayData;
+use crate::core::feature_graph::DParams;
+use crate::core::live::{LiveDState, LiveSnapshot, latency_summary};
+use crate::core::replay::{ReplayConfig, replay_day_from_db, verify_snapshots};
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::d::{parse_date_num, parse_hhmm};
+
+/// 확정된 경계 하나 (시간대 "HHMM", [(종목코드, 종목명, 업종명)])
+type EmittedBoundary = (String, Vec<(String, String, String)>);
+
+/// 장중 5분봉을 받아 D 선정을 증분 갱신하는 세션
+#[pyclass]
+pub struct LiveDSession {
+    state: LiveDState,
+    db_path: String,
+    conn: Option<Connection>,
+    emitted: usize,
+}
+
+impl LiveDSession {
+    fn connection(&mut self) -> PyResult<&Connection> {
+        if self.conn.is_none() {
+            let conn = db::open(&self.db_path)
+                .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("DB 연결 실패: {}", e)))?;
+            self.conn = Some(conn);
+        }
+        Ok(self.conn.as_ref().unwrap())
+    }
+
+    /// 아직 파이썬으로 넘기지 않은 확정 결과
+    fn drain_emitted(&mut self) -> Vec<EmittedBoundary> {
+        let snapshots = &self.state.snapshots()[self.emitted..];
+        self.emitted += snapshots.len();
+        snapshots.iter().map(to_emitted).collect()
+    }
+
+    fn push_rows(&mut self, mut rows: Vec<(usize, i64, i64, i64, i64)>) {
+        // 시각 순, 같은 시각은 종목 순서대로 반영
+        rows.sort_unstable_by_key(|r| (r.1, r.0));
+        for (idx, date, open, close, volume) in rows {
+            let table = self.state.tables()[idx].clone();
+            self.state.on_bar(&table, date, open, close, volume);
+        }
+    }
+}
+
+fn to_emitted(snapshot: &LiveSnapshot) -> EmittedBoundary {
+    (
+        format!("{:04}", snapshot.cutoff),
+        snapshot.leaders.iter()
+            .map(|s| (s.code.clone(), s.name.clone(), s.sector.clone()))
+            .collect(),
+    )
+}
+
+#[pymethods]
+impl LiveDSession {
+    /// tables 를 주지 않고 db_path 만 주면 DB 테이블 순서를 사용 (일괄 평가와 동률 순서가 같아짐)
+    #[new]
+    #[pyo3(signature = (date, tables=None, db_path=None))]
+    fn new(date: &str, tables: Option<Vec<String>>, db_path: Option<String>) -> PyResult<Self> {
+        init_logger();
+        let date_num = parse_date_num(date)?;
+
+        let mut conn = None;
+        let tables = match (tables, &db_path) {
+            (Some(tables), _) => tables,
+            (None, Some(path)) => {
+                let c = db::open(path)
+                    .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("DB 연결 실패: {}", e)))?;
+                let tables = db::get_all_tables(&c)
+                    .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("테이블 조회 실패: {}", e)))?;
+                conn = Some(c);
+                tables
+            },
+            (None, None) => vec![],
+        };
+
+        Ok(Self {
+            state: LiveDState::new(date_num, tables, DParams::default()),
+            db_path: db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string()),
+            conn,
+            emitted: 0,
+        })
+    }
+
+    /// 5분봉 하나 반영. 이 봉으로 확정된 경계들의 업종별 최고 종목을 반환
+    /// (D 조건은 시가/종가/거래량만 쓰므로 고가/저가는 받지 않음)
+    fn push_bar(&mut self, code: &str, date: i64, open: i64, close: i64, volume: i64) -> Vec<EmittedBoundary> {
+        let table = if code.starts_with('A') { code.to_string() } else { format!("A{}", code) };
+        self.state.on_bar(&table, date, open, close, volume);
+        self.drain_emitted()
+    }
+
+    /// 여러 봉을 순서대로 반영 [(code, date, open, close, volume)]
+    fn push_bars(&mut self, bars: Vec<(String, i64, i64, i64, i64)>) -> Vec<EmittedBoundary> {
+        for (code, date, open, close, volume) in bars {
+            let table = if code.starts_with('A') { code } else { format!("A{}", code) };
+            self.state.on_bar(&table, date, open, close, volume);
+        }
+        self.drain_emitted()
+    }
+
+    /// 장중 시계가 time(HHMM)을 지났을 때 그 이하의 경계를 확정
+    fn advance_to(&mut self, time: &str) -> PyResult<Vec<EmittedBoundary>> {
+        let hhmm = parse_hhmm(time)?;
+        self.state.advance_to(hhmm);
+        Ok(self.drain_emitted())
+    }
+
+    /// 남은 경계를 모두 확정
+    fn finish(&mut self) -> Vec<EmittedBoundary> {
+        self.state.finish();
+        self.drain_emitted()
+    }
+
+    /// feed() 가 None 을 반환할 때까지 봉 목록 [(code, date, open, close, volume)] 을 받아 반영하고, 경계가 확정될 때마다 on_emit(time, stocks) 호출
+    #[pyo3(signature = (feed, on_emit=None))]
+    fn run_feed(&mut self, py: Python<'_>, feed: PyObject, on_emit: Option<PyObject>) -> PyResult<usize> {
+        let mut total = 0;
+        loop {
+            let batch = feed.call0(py)?;
+            let finished = batch.is_none(py);
+            let emitted = if finished {
+                self.finish()
+            } else {
+                let bars: Vec<(String, i64, i64, i64, i64)> = batch.extract(py)?;
+                self.push_bars(bars)
+            };
+
+            total += emitted.len();
+            if let Some(callback) = &on_emit {
+                for (time, stocks) in emitted {
+                    callback.call1(py, (time, stocks))?;
+                }
+            }
+
+            if finished {
+                return Ok(total);
+            }
+            py.check_signals()?;
+        }
+    }
+
+    /// 5분봉 DB에서 종목별 워터마크 이후의 새 봉을 읽어 반영
+    fn poll_db(&mut self) -> PyResult<Vec<EmittedBoundary>> {
+        if self.state.tables().is_empty() {
+            let tables = db::get_all_tables(self.connection()?)
+                .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("테이블 조회 실패: {}", e)))?;
+            let date_num = self.state.date_num();
+            self.state = LiveDState::new(date_num, tables, DParams::default());
+            self.emitted = 0;
+        }
+
+        let (day_start, day_end) = bar_time::day_range(self.state.date_num());
+        let tables: Vec<String> = self.state.tables().to_vec();
+        let watermarks: Vec<i64> = (0..tables.len())
+            .map(|i| self.state.last_date(i).max(day_start - 1))
+            .collect();
+
+        let conn = self.connection()?;
+        let mut rows = Vec::new();
+        for (idx, table) in tables.iter().enumerate() {
+            let query = format!(
+                "SELECT date, open, close, volume FROM {} WHERE date > ?1 AND date <= ?2 ORDER BY date", table
+            );
+            let mut stmt = match conn.prepare(&query) {
+                Ok(stmt) => stmt,
+                Err(e) => {
+                    warn!("⚠️ {} 조회 준비 실패 - 이번 폴링에서 제외: {}", table, e);
+                    continue;
+                }
+            };
+            let mapped = match stmt.query_map([watermarks[idx], day_end], |row| {
+                Ok((idx, row.get::<_, i64>(0)?, row.get::<_, i64>(1)?, row.get::<_, i64>(2)?, row.get::<_, i64>(3)?))
+            }) {
+                Ok(mapped) => mapped,
+                Err(e) => {
+                    warn!("⚠️ {} 조회 실패 - 이번 폴링에서 제외: {}", table, e);
+                    continue;
+                }
+            };
+            let mut bad_rows = 0;
+            for row in mapped {
+                match row {
+                    Ok(row) => rows.push(row),
+                    Err(_) => bad_rows += 1,
+                }
+            }
+            if bad_rows > 0 {
+                warn!("⚠️ {} 읽지 못한 봉 {}개 건너뜀", table, bad_rows);
+            }
+        }
+
+        self.push_rows(rows);
+        Ok(self.drain_emitted())
+    }
+
+    /// 5분봉 DB에 기록된 하루를 처음부터 재생
+    fn replay_from_db(&mut self) -> PyResult<Vec<EmittedBoundary>> {
+        let date_num = self.state.date_num();
+        let conn = self.connection()?;
+        let tables = db::get_all_tables(conn)
+            .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("테이블 조회 실패: {}", e)))?;
+        let day = DayData::load(conn, &tables, date_num)
+            .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("일중 데이터 로드 실패: {}", e)))?;
+
+        self.state = LiveDState::new(date_num, tables, DParams::default());
+        self.emitted = 0;
+        self.state.replay_day(&day);
+        Ok(self.drain_emitted())
+    }
+
+    /// 확정된 경계의 중간 결과 {"top": 거래대금 상위 종목코드, "d_codes": D 조건 만족 종목코드,
+    /// "leaders": [(종목코드, 종목명, 업종명)], "eval_us": 확정에 걸린 시간}
+    fn boundary<'py>(&self, py: Python<'py>, time: &str) -> PyResult<Option<Bound<'py, PyDict>>> {
+        let hhmm = parse_hhmm(time)?;
+        let snapshot = match self.state.snapshots().iter().find(|s| s.cutoff == hhmm) {
+            Some(snapshot) => snapshot,
+            None => return Ok(None),
+        };
+        let codes = |indices: &[usize]| -> Vec<String> {
+            indices.iter().map(|&i| self.state.tables()[i].trim_start_matches('A').to_string()).collect()
+        };
+        let result = PyDict::new_bound(py);
+        result.set_item("top", codes(&snapshot.top))?;
+        result.set_item("d_codes", codes(&snapshot.d_codes))?;
+        result.set_item("leaders", to_emitted(snapshot).1)?;
+        result.set_item("eval_us", snapshot.eval_us)?;
+        Ok(Some(result))
+    }
+
+    /// 확정된 경계의 업종별 최고 종목
+    fn leaders(&self, time: &str) -> PyResult<Option<Vec<(String, String, String)>>> {
+        let hhmm = parse_hhmm(time)?;
+        Ok(self.state.snapshots().iter()
+            .find(|s| s.cutoff == hhmm)
+            .map(|s| to_emitted(s).1))
+    }
+
+    /// 봉당 처리 지연시간 통계 (마이크로초)
+    fn latency_stats(&self) -> HashMap<String, f64> {
+        let (count, mean, p50, p99, max) = latency_summary(self.state.latencies_us());
+        let eval: Vec<u64> = self.state.snapshots().iter().map(|s| s.eval_us).collect();
+        let (boundaries, boundary_mean, _, _, boundary_max) = latency_summary(&eval);
+
+        let mut stats = HashMap::new();
+        stats.insert("bars".to_string(), count as f64);
+        stats.insert("mean_us".to_string(), mean);
+        stats.insert("p50_us".to_string(), p50 as f64);
+        stats.insert("p99_us".to_string(), p99 as f64);
+        stats.insert("max_us".to_string(), max as f64);
+        stats.insert("boundaries".to_string(), boundaries as f64);
+        stats.insert("boundary_mean_us".to_string(), boundary_mean);
+        stats.insert("boundary_max_us".to_string(), boundary_max as f64);
+        stats.insert("late_bars".to_string(), self.state.late_bars() as f64);
+        stats
+    }
+
+    /// 지금까지 반영된 가장 늦은 봉의 date 값
+    #[getter]
+    fn watermark(&self) -> i64 {
+        self.state.watermark()
+    }
+}
+
+/// 과거 하루를 종목별 커서 k-way 병합으로 실시간 엔진에 재생하고, 경계마다 일괄 D 평가와 비교
+///
+/// speed 는 장중 시간 대비 배속 (0 이면 최대 속도).
+/// verify 시 기준 평가는 evaluate_d_for_date_and_time 과 같은 SQL 참조 구현(evaluate_d_trace)을
+/// 같은 db_path 의 격리 종목을 뺀 테이블에 대해 경계마다 실행합니다.
+#[pyfunction]
+#[pyo3(signature = (date, speed=0.0, chunk_size=64, verify=true, db_path=None))]
+pub fn replay_d_session<'py>(
+    py: Python<'py>,
+    date: &str,
+    speed: f64,
+    chunk_size: usize,
+    verify: bool,
+    db_path: Option<String>
+) -> PyResult<Bound<'py, PyDict>> {
+    init_logger();
+    let date_num = parse_date_num(date)?;
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+    let config = ReplayConfig { speed, chunk_size };
+
+    let (state, stats, mismatches) = py.allow_threads(|| {
+        let (state, stats) = replay_day_from_db(&db_path, date_num, &config).map_err(|e| e.to_string())?;
+        let mismatches = if verify {
+            let conn = db::open(&db_path).map_err(|e| e.to_string())?;
+            let tables = db::get_all_tables(&conn).map_err(|e| e.to_string())?;
+            let tables = quality::without_quarantined(&tables, date_num);
+            verify_snapshots(&state, |cutoff| Ok(evaluate_d_trace(&conn, &tables, date_num, cutoff)?.leaders))
+                .map_err(|e| e.to_string())?
+        } else {
+            vec![]
+        };
+        Ok::<_, String>((state, stats, mismatches))
+    }).map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("재생 실패: {}", e)))?;
+
+    let (count, mean, p50, p99, max) = latency_summary(state.latencies_us());
+    let leaders: Vec<EmittedBoundary> = state.snapshots().iter().map(to_emitted).collect();
+    let mismatches: Vec<(String, Vec<String>, Vec<String>)> = mismatches
+        .into_iter()
+        .map(|m| (format!("{:04}", m.cutoff), m.live, m.reference))
+        .collect();
+
+    let result = PyDict::new_bound(py);
+    result.set_item("bars", stats.bars)?;
+    result.set_item("wall_ms", stats.wall_us as f64 / 1000.0)?;
+    result.set_item("sleep_ms", stats.sleep_us as f64 / 1000.0)?;
+    result.set_item("latency_us", (count, mean, p50, p99, max))?;
+    result.set_item("latencies_us", state.latencies_us().to_vec())?;
+    result.set_item("late_bars", state.late_bars())?;
+    result.set_item("leaders", leaders)?;
+    result.set_item("verified", verify)?;
+    result.set_item("mismatches", mismatches)?;
+    Ok(result)
+}
@@ -1,3 +1,5 @@
 pub mod d;
 pub mod d1;
-pub mod d2; 
\ No newline at end of file
+pub mod d2;
+pub mod live;
+pub mod strategy;
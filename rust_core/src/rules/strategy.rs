@@ -0,0 +1,71 @@
+use log::{info, debug};
+use crate::core::cache::Pinned;
+use crate::core::d_logic::DStock;
+use crate::core::daily_context::DailyContext;
+use crate::core::day_data::DayData;
+use crate::core::feature_graph::{FeatureGraph, SECTOR_INDEX_MIN_CUTOFFS};
+use crate::rules::d::{DStrategy, DContextStrategy};
+
+/// 피처 그래프를 공유하는 종목 선정 전략
+pub trait Strategy {
+    fn name(&self) -> &str;
+
+    /// 기준시각(HHMM)까지의 데이터로 종목 선정
+    fn select(&self, graph: &mut FeatureGraph<'_>, cutoff: i64) -> Result<Vec<DStock>, Box<dyn std::error::Error>>;
+
+    /// 전일 일봉 컨텍스트 피처(PriorGap 등)를 쓰는 전략이면 true
+    fn needs_context(&self) -> bool {
+        false
+    }
+}
+
+/// 전략 한 개의 기준시각별 선정 결과
+#[derive(Debug, Clone)]
+pub struct StrategyResult {
+    pub strategy: String,
+    pub cutoff: i64,
+    pub stocks: Vec<DStock>,
+}
+
+/// 이름으로 전략 생성 (구현된 전략: "d", "d_context" / 알 수 없는 이름이면 None)
+pub fn strategy_by_name(name: &str) -> Option<Box<dyn Strategy>> {
+    match name {
+        "d" => Some(Box::new(DStrategy::default())),
+        "d_context" => Some(Box::new(DContextStrategy::default())),
+        _ => None,
+    }
+}
+
+/// 하루치 데이터 위에서 여러 전략을 여러 기준시각에 대해 한 번에 평가 (피처는 전략 간 공유)
+///
+/// context 는 needs_context 전략이 있을 때 넘기는 전일 일봉 컨텍스트
+pub fn evaluate_strategies(
+    day: &DayData,
+    strategies: &[Box<dyn Strategy>],
+    cutoffs: &[i64],
+    context: Option<Pinned<DailyContext>>
+) -> Result<Vec<StrategyResult>, Box<dyn std::error::Error>> {
+    let mut graph = FeatureGraph::new(day);
+    graph.set_use_sector_index(cutoffs.len() >= SECTOR_INDEX_MIN_CUTOFFS);
+    if let Some(context) = context {
+        graph.attach_context(context);
+    }
+    let mut results = Vec::with_capacity(strategies.len() * cutoffs.len());
+
+    for &cutoff in cutoffs {
+        for strategy in strategies {
+            let stocks = strategy.select(&mut graph, cutoff)?;
+            debug!("📋 {} 전략 {:04}: {}개 종목", strategy.name(), cutoff, stocks.len());
+            results.push(StrategyResult {
+                strategy: strategy.name().to_string(),
+                cutoff,
+                stocks,
+            });
+        }
+    }
+
+    let (computed, hits) = graph.stats();
+    info!("✅ {} 전략 평가 완료: {}개 전략 x {}개 시간대 (피처 계산 {}회, 캐시 적중 {}회)",
+          day.date_num, strategies.len(), cutoffs.len(), computed, hits);
+    Ok(results)
+}
@@ -0,0 +1,67 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use crate::core::archive::{self, ArchiveSummary, DEFAULT_ARCHIVE_PATH};
+use crate::core::trace;
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::d::parse_date_num;
+
+fn summary_dict<'py>(py: Python<'py>, path: &str, summary: &ArchiveSummary) -> PyResult<Bound<'py, PyDict>> {
+    let result = PyDict::new_bound(py);
+    result.set_item("path", path)?;
+    result.set_item("days", summary.days)?;
+    result.set_item("tables", summary.tables)?;
+    result.set_item("bars", summary.bars)?;
+    result.set_item("bytes", summary.bytes)?;
+    Ok(result)
+}
+
+/// 5분봉 DB의 start~end 구간을 압축 컬럼형 아카이브(output, 기본 "D:/db/stock_price(5min).rca")로 저장
+///
+/// 만든 아카이브 경로는 db_path 를 받는 함수(sweep_d_parameters, sector_index_for_date 등)에 그대로 넘길 수 있습니다.
+/// 반환: {"path", "days", "tables", "bars", "bytes", "source_bytes": 원본 DB 파일 크기}
+#[pyfunction]
+#[pyo3(signature = (start, end, output=None, db_path=None))]
+pub fn build_history_archive<'py>(
+    py: Python<'py>,
+    start: &str,
+    end: &str,
+    output: Option<String>,
+    db_path: Option<String>
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.build_history_archive");
+    init_logger();
+    let start = parse_date_num(start)?;
+    let end = parse_date_num(end)?;
+    if start > end {
+        return Err(pyo3::exceptions::PyValueError::new_err(format!("시작 날짜가 종료 날짜보다 늦습니다: {} > {}", start, end)));
+    }
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+    let output = output.unwrap_or_else(|| DEFAULT_ARCHIVE_PATH.to_string());
+    if !archive::is_archive_path(&output) {
+        return Err(pyo3::exceptions::PyValueError::new_err(format!("아카이브 경로는 {} 로 끝나야 합니다: {}", archive::ARCHIVE_EXTENSION, output)));
+    }
+
+    let summary = py.allow_threads(|| archive::build_archive(&db_path, &output, start, end).map_err(|e| e.to_string()))
+        .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("아카이브 생성 실패: {}", e)))?;
+
+    let result = summary_dict(py, &output, &summary)?;
+    result.set_item("source_bytes", std::fs::metadata(&db_path).map(|m| m.len()).unwrap_or(0))?;
+    Ok(result)
+}
+
+/// 아카이브 요약 (path 기본 "D:/db/stock_price(5min).rca")
+/// 반환: {"path", "days", "tables", "bars", "bytes", "first", "last"} (first/last 는 YYYYMMDD, 비어 있으면 None)
+#[pyfunction]
+#[pyo3(signature = (path=None))]
+pub fn archive_info<'py>(py: Python<'py>, path: Option<String>) -> PyResult<Bound<'py, PyDict>> {
+    init_logger();
+    let path = path.unwrap_or_else(|| DEFAULT_ARCHIVE_PATH.to_string());
+    let opened = archive::shared(&path)
+        .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("아카이브 열기 실패: {}", e)))?;
+    let result = summary_dict(py, &path, &opened.summary())?;
+    let dates = opened.dates();
+    result.set_item("first", dates.first())?;
+    result.set_item("last", dates.last())?;
+    Ok(result)
+}
@@ -0,0 +1,75 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use std::path::PathBuf;
+use crate::core::cache::CACHE;
+use crate::rules::d::parse_date_num;
+
+/// 메모리 예산 캐시 설정 변경
+///
+/// budget_mb: 메모리 예산 (MiB), spill_dir: 제거된 항목을 저장할 폴더 ("" 이면 스필 끄기)
+#[pyfunction]
+#[pyo3(signature = (budget_mb=None, spill_dir=None))]
+pub fn configure_cache(budget_mb: Option<f64>, spill_dir: Option<String>) -> PyResult<()> {
+    if let Some(mb) = budget_mb {
+        if !(mb >= 0.0) {
+            return Err(pyo3::exceptions::PyValueError::new_err(format!("캐시 예산은 0 이상이어야 합니다: {}", mb)));
+        }
+    }
+    let budget = budget_mb.map(|mb| (mb * 1024.0 * 1024.0) as usize);
+    let spill_dir = spill_dir.map(|dir| (!dir.is_empty()).then(|| PathBuf::from(dir)));
+    CACHE.lock().unwrap()
+        .configure(budget, spill_dir)
+        .map_err(pyo3::exceptions::PyRuntimeError::new_err)
+}
+
+/// 캐시 사용량, 적중률, 제거/스필 횟수
+#[pyfunction]
+pub fn cache_stats(py: Python<'_>) -> PyResult<Bound<'_, PyDict>> {
+    let stats = CACHE.lock().unwrap().stats();
+    let lookups = stats.hits + stats.misses;
+
+    let result = PyDict::new_bound(py);
+    result.set_item("budget_bytes", stats.budget_bytes)?;
+    result.set_item("used_bytes", stats.used_bytes)?;
+    result.set_item("peak_bytes", stats.peak_bytes)?;
+    result.set_item("entries", stats.entries)?;
+    result.set_item("pinned_days", stats.pinned_days)?;
+    result.set_item("hits", stats.hits)?;
+    result.set_item("misses", stats.misses)?;
+    result.set_item("disk_hits", stats.disk_hits)?;
+    result.set_item("hit_rate", if lookups > 0 { stats.hits as f64 / lookups as f64 } else { 0.0 })?;
+    result.set_item("evictions", stats.evictions)?;
+    result.set_item("spills", stats.spills)?;
+    result.set_item("spilled_entries", stats.spilled_entries)?;
+    result.set_item("spilled_bytes", stats.spilled_bytes)?;
+    Ok(result)
+}
+
+/// 캐시와 스필 파일 비우기
+#[pyfunction]
+pub fn clear_cache() {
+    CACHE.lock().unwrap().clear();
+}
+
+/// 이 프로세스가 쓴 스필 파일 삭제 (모듈 로드 시 atexit 에 등록되어 인터프리터 종료 때 호출됨)
+#[pyfunction]
+pub fn release_cache_spills() {
+    if let Ok(mut cache) = CACHE.lock() {
+        cache.release_spills();
+    }
+}
+
+/// 날짜 고정 (unpin_day 를 호출할 때까지 해당 날짜 항목은 제거되지 않음)
+#[pyfunction]
+pub fn pin_day(date: &str) -> PyResult<()> {
+    let date_num = parse_date_num(date)?;
+    CACHE.lock().unwrap().pin_day(date_num);
+    Ok(())
+}
+
+#[pyfunction]
+pub fn unpin_day(date: &str) -> PyResult<()> {
+    let date_num = parse_date_num(date)?;
+    CACHE.lock().unwrap().unpin_day(date_num);
+    Ok(())
+}
@@ -0,0 +1,145 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use std::collections::HashMap;
+use crate::core::coverage::{CoverageIndex, WEEKDAY_NAMES, slots_to_hhmm};
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::d::parse_date_num;
+
+fn default_threads() -> usize {
+    std::thread::available_parallelism().map(|n| n.get()).unwrap_or(4)
+}
+
+fn format_date(date_num: i64) -> String {
+    format!("{}-{:02}-{:02}", date_num / 10000, date_num / 100 % 100, date_num % 100)
+}
+
+fn parse_dates(dates: &[String]) -> PyResult<Vec<i64>> {
+    dates.iter().map(|d| parse_date_num(d)).collect()
+}
+
+/// 종목코드 (테이블명 앞의 "A" 제거)
+fn code_of(table: &str) -> String {
+    table.strip_prefix('A').unwrap_or(table).to_string()
+}
+
+/// 5분봉 DB의 종목별·날짜별 봉 개수 인덱스
+#[pyclass(name = "CoverageIndex")]
+pub struct PyCoverageIndex {
+    inner: CoverageIndex,
+}
+
+#[pymethods]
+impl PyCoverageIndex {
+    /// 5분봉 DB 전체를 병렬 스캔해 인덱스 생성
+    #[staticmethod]
+    #[pyo3(signature = (db_path=None, threads=None))]
+    fn build(py: Python<'_>, db_path: Option<String>, threads: Option<usize>) -> PyResult<Self> {
+        init_logger();
+        let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+        let threads = threads.unwrap_or_else(default_threads);
+        let inner = py.allow_threads(|| CoverageIndex::build(&db_path, threads).map_err(|e| e.to_string()))
+            .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("커버리지 인덱스 생성 실패: {}", e)))?;
+        Ok(Self { inner })
+    }
+
+    /// save 로 저장한 인덱스 읽기
+    #[staticmethod]
+    fn load(path: &str) -> PyResult<Self> {
+        init_logger();
+        let inner = CoverageIndex::load(path)
+            .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("커버리지 인덱스 로드 실패: {}", e)))?;
+        Ok(Self { inner })
+    }
+
+    /// 마지막 인덱싱 이후 추가된 봉만 반영. 새로 반영된 봉 개수를 반환
+    #[pyo3(signature = (db_path=None, threads=None))]
+    fn update(&mut self, py: Python<'_>, db_path: Option<String>, threads: Option<usize>) -> PyResult<u64> {
+        let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+        let threads = threads.unwrap_or_else(default_threads);
+        let inner = &mut self.inner;
+        py.allow_threads(|| inner.update(&db_path, threads).map_err(|e| e.to_string()))
+            .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("커버리지 인덱스 갱신 실패: {}", e)))
+    }
+
+    fn save(&self, path: &str) -> PyResult<()> {
+        self.inner.save(path)
+            .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("커버리지 인덱스 저장 실패: {}", e)))
+    }
+
+    #[getter]
+    fn ticker_count(&self) -> usize {
+        self.inner.tables().len()
+    }
+
+    #[getter]
+    fn entry_count(&self) -> usize {
+        self.inner.entry_count()
+    }
+
+    /// 주어진 날짜 중 전 종목 봉이 하나도 없는 날짜
+    fn zero_bar_dates(&self, dates: Vec<String>) -> PyResult<Vec<String>> {
+        let date_nums = parse_dates(&dates)?;
+        Ok(self.inner.zero_bar_dates(&date_nums).into_iter().map(format_date).collect())
+    }
+
+    /// 시장 전체에서 봉이 있는 슬롯 중 빠진 슬롯이 있는 종목 [(종목코드, ["HHMM", ...])]
+    fn tickers_missing_slots(&self, date: &str) -> PyResult<Vec<(String, Vec<String>)>> {
+        let date_num = parse_date_num(date)?;
+        let tables = self.inner.tables();
+        Ok(self.inner.tickers_missing_slots(date_num)
+            .into_iter()
+            .map(|(idx, missing)| (code_of(&tables[idx]), missing.into_iter().map(|t| format!("{:04}", t)).collect()))
+            .collect())
+    }
+
+    /// 종목 하나의 하루 (봉 수, 첫 봉 "HHMM", 마지막 봉 "HHMM"), 봉이 없으면 None
+    fn ticker_day(&self, code: &str, date: &str) -> PyResult<Option<(u32, String, String)>> {
+        let table = if code.starts_with('A') { code.to_string() } else { format!("A{}", code) };
+        Ok(self.inner.ticker_day(&table, parse_date_num(date)?)
+            .map(|d| (d.bars, format!("{:04}", d.first), format!("{:04}", d.last))))
+    }
+
+    /// 날짜 하나의 전 종목 합계 {tickers, bars, first, last, slots}
+    fn date_summary<'py>(&self, py: Python<'py>, date: &str) -> PyResult<Bound<'py, PyDict>> {
+        let total = self.inner.date_coverage(parse_date_num(date)?);
+        let slots: Vec<String> = slots_to_hhmm(total.slots).into_iter().map(|t| format!("{:04}", t)).collect();
+
+        let result = PyDict::new_bound(py);
+        result.set_item("tickers", total.tickers)?;
+        result.set_item("bars", total.bars)?;
+        result.set_item("first", format!("{:04}", total.first))?;
+        result.set_item("last", format!("{:04}", total.last))?;
+        result.set_item("slots", slots)?;
+        Ok(result)
+    }
+
+    /// 주어진 날짜들의 날짜별 합계 {date: (종목 수, 봉 수, ["HHMM", ...])}, 봉이 없는 날짜는 제외
+    fn date_totals(&self, dates: Vec<String>) -> PyResult<HashMap<String, (usize, u64, Vec<String>)>> {
+        let totals = self.inner.date_totals();
+        let mut result = HashMap::new();
+        for (date, date_num) in dates.iter().zip(parse_dates(&dates)?) {
+            if let Some(total) = totals.get(&date_num) {
+                let slots = slots_to_hhmm(total.slots).into_iter().map(|t| format!("{:04}", t)).collect();
+                result.insert(date.clone(), (total.tickers, total.bars, slots));
+            }
+        }
+        Ok(result)
+    }
+
+    /// 요일별 커버리지 {요일: {days, days_with_data, bars}}
+    fn weekday_coverage(&self, dates: Vec<String>) -> PyResult<HashMap<String, HashMap<String, u64>>> {
+        let weekdays = self.inner.weekday_coverage(&parse_dates(&dates)?);
+        Ok(WEEKDAY_NAMES.iter().zip(weekdays.iter())
+            .filter(|(_, w)| w.days > 0)
+            .map(|(name, w)| {
+                let stats = HashMap::from([
+                    ("days".to_string(), w.days as u64),
+                    ("days_with_data".to_string(), w.days_with_data as u64),
+                    ("bars".to_string(), w.bars),
+                ]);
+                (name.to_string(), stats)
+            })
+            .collect())
+    }
+}
@@ -0,0 +1,112 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use crate::core::bar_time;
+use crate::core::daemon::{self, Request, Response};
+use crate::core::day_data::DayData;
+use crate::core::feature_graph::FeatureGraph;
+use crate::core::resample::resampled_day;
+use crate::core::trace;
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::features::stock_info::STOCK_INFO_MANAGER;
+use crate::rules::d::DStrategy;
+use crate::rules::strategy::Strategy;
+use crate::utility::price_calculator::increase_rates_from_day;
+
+/// 데몬이 받은 계산 요청 처리 (Ping/Shutdown 은 서버가 직접 처리)
+///
+/// D 선정과 상승률은 데몬이 캐시에 올려 둔 하루치 봉(DayData::cached) 위에서 계산합니다.
+/// D 선정은 피처 그래프 D 전략으로, 참조 SQL 구현과 같은 결과임을 differential_check 로 검증합니다.
+fn handle(request: Request) -> Result<Response, String> {
+    match request {
+        Request::EvaluateD { date, time } => {
+            let date_num = bar_time::parse_date(&date)?;
+            let cutoff = bar_time::parse_hhmm(&time)?;
+            let day = DayData::cached(db::MIN5_DB_PATH, date_num).map_err(|e| e.to_string())?;
+            let mut graph = FeatureGraph::new(&day);
+            let stocks = DStrategy::default().select(&mut graph, cutoff).map_err(|e| e.to_string())?;
+            Ok(Response::Stocks(stocks.into_iter().map(|s| (s.code, s.name, s.sector)).collect()))
+        },
+        Request::IncreaseRates { codes, date, time } => {
+            let date_num = bar_time::parse_date(&date)?;
+            let to = bar_time::parse_hhmm(&time)?;
+            let day = DayData::cached(db::MIN5_DB_PATH, date_num).map_err(|e| e.to_string())?;
+            Ok(Response::Rates(increase_rates_from_day(&day, codes, to)))
+        },
+        Request::DayBars { db_path, cache_path, date_num, minutes } => resampled_day(&db_path, cache_path.as_deref(), date_num, minutes)
+            .map(Response::Day)
+            .map_err(|e| e.to_string()),
+        Request::Ping | Request::Shutdown => Err("서버가 직접 처리하는 요청입니다".to_string()),
+    }
+}
+
+/// 로컬 쿼리 데몬 실행 (stop_query_daemon 을 부를 때까지 블록)
+///
+/// 업종 정보와 일별 캐시를 한 번만 올려 두고 여러 분석 프로세스의 evaluate_d_for_date_and_time,
+/// calculate_increase_rates_batch, resample_bars 요청을 처리합니다.
+/// 다른 프로세스는 소켓(socket_path, 기본 RUST_CORE_DAEMON_SOCKET 또는 /tmp/rust_core_daemon.sock)이 있으면
+/// 자동으로 데몬을 쓰고, 없으면 지금처럼 프로세스 안에서 계산합니다.
+/// 반환: 처리한 요청 수
+#[cfg(unix)]
+#[pyfunction]
+#[pyo3(signature = (socket_path=None))]
+pub fn run_query_daemon(py: Python<'_>, socket_path: Option<String>) -> PyResult<u64> {
+    init_logger();
+    let _span = trace::span("ffi.run_query_daemon");
+    let path = socket_path.unwrap_or_else(daemon::socket_path);
+    // 첫 요청이 업종 CSV 로드를 기다리지 않도록 미리 올려 둠
+    drop(STOCK_INFO_MANAGER.lock().unwrap());
+    py.allow_threads(|| {
+        let handler: std::sync::Arc<daemon::Handler> = std::sync::Arc::new(handle);
+        daemon::serve(&path, handler).map_err(|e| e.to_string())
+    })
+        .map_err(pyo3::exceptions::PyRuntimeError::new_err)
+}
+
+#[cfg(not(unix))]
+#[pyfunction]
+#[pyo3(signature = (socket_path=None))]
+pub fn run_query_daemon(socket_path: Option<String>) -> PyResult<u64> {
+    let _ = socket_path;
+    Err(pyo3::exceptions::PyRuntimeError::new_err("쿼리 데몬은 유닉스 소켓을 지원하는 OS 에서만 실행할 수 있습니다"))
+}
+
+#[cfg(unix)]
+fn call(socket_path: Option<String>, request: &Request) -> Result<Response, String> {
+    let path = socket_path.unwrap_or_else(daemon::socket_path);
+    let mut client = daemon::Client::connect(&path).map_err(|e| format!("데몬 연결 실패 ({}): {}", path, e))?;
+    client.call(request).map_err(|e| e.to_string())?
+}
+
+#[cfg(not(unix))]
+fn call(_socket_path: Option<String>, _request: &Request) -> Result<Response, String> {
+    Err("유닉스 소켓을 지원하지 않는 OS 입니다".to_string())
+}
+
+/// 쿼리 데몬 상태
+///
+/// 반환: {"running": bool, "socket": 경로} + 실행 중이면 {"pid", "served", "uptime_secs"}
+#[pyfunction]
+#[pyo3(signature = (socket_path=None))]
+pub fn query_daemon_status<'py>(py: Python<'py>, socket_path: Option<String>) -> PyResult<Bound<'py, PyDict>> {
+    let path = socket_path.unwrap_or_else(daemon::socket_path);
+    let dict = PyDict::new_bound(py);
+    dict.set_item("socket", &path)?;
+    match call(Some(path), &Request::Ping) {
+        Ok(Response::Pong { pid, served, uptime_secs }) => {
+            dict.set_item("running", true)?;
+            dict.set_item("pid", pid)?;
+            dict.set_item("served", served)?;
+            dict.set_item("uptime_secs", uptime_secs)?;
+        },
+        _ => dict.set_item("running", false)?,
+    }
+    Ok(dict)
+}
+
+/// 쿼리 데몬 종료 요청. 반환: 데몬이 실행 중이었으면 True
+#[pyfunction]
+#[pyo3(signature = (socket_path=None))]
+pub fn stop_query_daemon(socket_path: Option<String>) -> PyResult<bool> {
+    Ok(matches!(call(socket_path, &Request::Shutdown), Ok(Response::Done)))
+}
@@ -0,0 +1,50 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use numpy::PyArray1;
+use crate::core::daily_context::{prefetch_range, DailyContext};
+use crate::core::trace;
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::d::parse_date_num;
+
+/// 여러 날짜의 전일 일봉 컨텍스트 (5분봉 DB에 일봉 DB를 ATTACH 해 한 번에 계산하고 날짜별로 캐시)
+///
+/// 반환: {"YYYY-MM-DD": {"codes": [종목코드], "prev_date" / "prev_close" / "high_20" / "prev_trade_value": int64 배열}}
+/// 값이 없는 종목은 0 입니다. high_20 은 직전 20거래일 고가의 최댓값입니다.
+#[pyfunction]
+#[pyo3(signature = (dates, db_path=None, day_db_path=None))]
+pub fn prior_day_context<'py>(
+    py: Python<'py>,
+    dates: Vec<String>,
+    db_path: Option<String>,
+    day_db_path: Option<String>
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.prior_day_context");
+    init_logger();
+    let date_nums = dates.iter().map(|d| parse_date_num(d)).collect::<PyResult<Vec<i64>>>()?;
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+    let day_db_path = day_db_path.unwrap_or_else(|| db::DAY_DB_PATH.to_string());
+
+    let contexts = py.allow_threads(|| {
+        prefetch_range(&db_path, &day_db_path, &date_nums).map_err(|e| e.to_string())?;
+        date_nums.iter()
+            .map(|&d| DailyContext::cached(&db_path, &day_db_path, d).map_err(|e| e.to_string()))
+            .collect::<Result<Vec<_>, String>>()
+    }).map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("일봉 컨텍스트 계산 실패: {}", e)))?;
+
+    let result = PyDict::new_bound(py);
+    for context in &contexts {
+        let codes: Vec<String> = context.tables.iter()
+            .map(|t| t.strip_prefix('A').unwrap_or(t).to_string())
+            .collect();
+        let entry = PyDict::new_bound(py);
+        entry.set_item("codes", codes)?;
+        entry.set_item("prev_date", PyArray1::from_slice_bound(py, &context.prev_date))?;
+        entry.set_item("prev_close", PyArray1::from_slice_bound(py, &context.prev_close))?;
+        entry.set_item("high_20", PyArray1::from_slice_bound(py, &context.high_20))?;
+        entry.set_item("prev_trade_value", PyArray1::from_slice_bound(py, &context.prev_trade_value))?;
+        let date_num = context.date_num;
+        result.set_item(format!("{}-{:02}-{:02}", date_num / 10000, date_num / 100 % 100, date_num % 100), entry)?;
+    }
+    Ok(result)
+}
@@ -0,0 +1,89 @@
+use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList};
+use crate::core::differential::{run_differential, write_synthetic_db, DiffConfig};
+use crate::core::trace;
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::d::{parse_date_num, parse_hhmm};
+
+/// 기준 D 구현(테이블별 SQL)과 빠른 경로(피처 그래프, 업종 집계 인덱스, 아카이브)를 나란히 실행해 비교
+///
+/// 상위 30 목록, D 종목, 업종 대표 종목, 대표 종목 상승률이 하나라도 다르면 불일치로 기록합니다.
+/// 반환: {"attempts", "reference_seconds",
+///        "engines": {엔진: {"seconds", "speedup", "mismatches"}},
+///        "mismatches": [{"date", "time", "engine", "field", "reference", "fast"}] (앞 max_mismatches 건),
+///        "total_mismatches"}
+#[pyfunction]
+#[pyo3(signature = (dates, times, db_path=None, archive_path=None, max_mismatches=100))]
+pub fn differential_benchmark<'py>(
+    py: Python<'py>,
+    dates: Vec<String>,
+    times: Vec<String>,
+    db_path: Option<String>,
+    archive_path: Option<String>,
+    max_mismatches: usize
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.differential_benchmark");
+    init_logger();
+    let config = DiffConfig {
+        db_path: db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string()),
+        archive_path,
+        dates: dates.iter().map(|d| parse_date_num(d)).collect::<PyResult<Vec<i64>>>()?,
+        cutoffs: times.iter().map(|t| parse_hhmm(t)).collect::<PyResult<Vec<i64>>>()?,
+    };
+
+    let report = py.allow_threads(|| run_differential(&config).map_err(|e| e.to_string()))
+        .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("차분 벤치마크 실패: {}", e)))?;
+
+    let engines = PyDict::new_bound(py);
+    for &(engine, seconds) in &report.engine_seconds {
+        let entry = PyDict::new_bound(py);
+        entry.set_item("seconds", seconds)?;
+        entry.set_item("speedup", report.speedup(engine))?;
+        entry.set_item("mismatches", report.mismatch_count(engine))?;
+        engines.set_item(engine.label(), entry)?;
+    }
+
+    let mismatches = PyList::empty_bound(py);
+    for m in report.mismatches.iter().take(max_mismatches) {
+        let entry = PyDict::new_bound(py);
+        entry.set_item("date", m.date_num)?;
+        entry.set_item("time", format!("{:04}", m.cutoff))?;
+        entry.set_item("engine", m.engine.label())?;
+        entry.set_item("field", m.field)?;
+        entry.set_item("reference", &m.reference)?;
+        entry.set_item("fast", &m.fast)?;
+        mismatches.append(entry)?;
+    }
+
+    let result = PyDict::new_bound(py);
+    result.set_item("attempts", report.attempts)?;
+    result.set_item("reference_seconds", report.reference_seconds)?;
+    result.set_item("engines", engines)?;
+    result.set_item("mismatches", mismatches)?;
+    result.set_item("total_mismatches", report.mismatches.len())?;
+    Ok(result)
+}
+
+/// 차분 벤치마크용 합성 5분봉 DB 생성 (업종 CSV 앞쪽 tickers 개 종목, 기존 파일은 덮어쓰지 않음)
+/// 반환: {"path", "tables", "bars"}
+#[pyfunction]
+#[pyo3(signature = (path, dates, tickers=300, seed=42))]
+pub fn generate_synthetic_db<'py>(
+    py: Python<'py>,
+    path: String,
+    dates: Vec<String>,
+    tickers: usize,
+    seed: u64
+) -> PyResult<Bound<'py, PyDict>> {
+    init_logger();
+    let date_nums = dates.iter().map(|d| parse_date_num(d)).collect::<PyResult<Vec<i64>>>()?;
+    let (tables, bars) = py.allow_threads(|| write_synthetic_db(&path, tickers, &date_nums, seed).map_err(|e| e.to_string()))
+        .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("합성 DB 생성 실패: {}", e)))?;
+
+    let result = PyDict::new_bound(py);
+    result.set_item("path", &path)?;
+    result.set_item("tables", tables)?;
+    result.set_item("bars", bars)?;
+    Ok(result)
+}
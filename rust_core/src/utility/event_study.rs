@@ -0,0 +1,98 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use numpy::{PyArray1, PyArrayMethods};
+use crate::core::event_study::{event_horizons, run_event_study, Event, GroupBy, GroupStats};
+use crate::core::forward_returns::Horizon;
+use crate::core::trace;
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::d::{parse_date_num, parse_hhmm};
+
+/// D 신호 이벤트 스터디: 신호 이후 여러 구간의 누적 수익률 경로와 그룹별 요약
+///
+/// events: [(날짜, 신호 시각 "HHMM", 종목코드)] (예: evaluate_d_for_date_and_time 결과를 날짜/시간대별로 모은 것)
+/// horizons: 분 단위 또는 "close" (기본 ["5", "15", "30", "60", "close"])
+/// group_by: "all", "interval"(신호 시각), "sector", "interval_sector" 또는 그 리스트 (리스트면 경로를 한 번만 계산해 기준별로 요약)
+/// hit_threshold: 적중으로 볼 최소 수익률 (%, 초과)
+/// 반환: {"horizons", "paths": float64 [이벤트, 구간] (봉이 없으면 NaN),
+///        "groups": [그룹 키], "events": [그룹별 이벤트 수],
+///        "count": int64 [그룹, 구간], "mean"/"median"/"hit_rate": float64 [그룹, 구간]}
+///       group_by 가 리스트면 그룹 요약 대신 "summaries": {기준: {"groups", "events", "count", "mean", "median", "hit_rate"}}
+#[pyfunction]
+#[pyo3(signature = (events, horizons=None, group_by=None, hit_threshold=0.0, db_path=None, prefetch=2))]
+pub fn event_study<'py>(
+    py: Python<'py>,
+    events: Vec<(String, String, String)>,
+    horizons: Option<Vec<String>>,
+    group_by: Option<&Bound<'py, PyAny>>,
+    hit_threshold: f64,
+    db_path: Option<String>,
+    prefetch: usize
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.event_study");
+    init_logger();
+    let events = events.iter()
+        .map(|(date, time, code)| Ok(Event {
+            date_num: parse_date_num(date)?,
+            time: parse_hhmm(time)?,
+            table: format!("A{}", code.trim_start_matches('A')),
+        }))
+        .collect::<PyResult<Vec<Event>>>()?;
+    let horizons = match horizons {
+        Some(horizons) => horizons.iter()
+            .map(|h| Horizon::parse(h).map_err(pyo3::exceptions::PyValueError::new_err))
+            .collect::<PyResult<Vec<Horizon>>>()?,
+        None => event_horizons(),
+    };
+    // 문자열 하나면 기존 형식(그룹 요약을 최상위에), 리스트면 기준별 summaries
+    let (names, single) = match group_by {
+        None => (vec!["interval".to_string()], true),
+        Some(value) => match value.extract::<String>() {
+            Ok(name) => (vec![name], true),
+            Err(_) => (value.extract::<Vec<String>>()
+                .map_err(|_| pyo3::exceptions::PyValueError::new_err("group_by 는 문자열 또는 문자열 리스트여야 합니다"))?, false),
+        },
+    };
+    let group_bys = names.iter()
+        .map(|name| GroupBy::parse(name).map_err(pyo3::exceptions::PyValueError::new_err))
+        .collect::<PyResult<Vec<GroupBy>>>()?;
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+
+    let study = py.allow_threads(|| {
+        run_event_study(&db_path, &events, &horizons, &group_bys, hit_threshold, prefetch).map_err(|e| e.to_string())
+    }).map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("이벤트 스터디 실패: {}", e)))?;
+
+    let n_h = study.horizons.len();
+    let result = PyDict::new_bound(py);
+    result.set_item("horizons", study.horizons.iter().map(Horizon::label).collect::<Vec<_>>())?;
+    result.set_item("paths", PyArray1::from_slice_bound(py, &study.paths).reshape([events.len(), n_h])?)?;
+    if single {
+        set_groups(py, &result, &study.summaries[0], n_h)?;
+    } else {
+        let summaries = PyDict::new_bound(py);
+        for (name, groups) in names.iter().zip(&study.summaries) {
+            let summary = PyDict::new_bound(py);
+            set_groups(py, &summary, groups, n_h)?;
+            summaries.set_item(name, summary)?;
+        }
+        result.set_item("summaries", summaries)?;
+    }
+    Ok(result)
+}
+
+/// 그룹 요약을 "groups", "events", "count", "mean", "median", "hit_rate" 키로 dict 에 채움
+fn set_groups<'py>(py: Python<'py>, dict: &Bound<'py, PyDict>, groups: &[GroupStats], n_h: usize) -> PyResult<()> {
+    let n_g = groups.len();
+    let mean: Vec<f64> = groups.iter().flat_map(|g| g.mean.iter().copied()).collect();
+    let median: Vec<f64> = groups.iter().flat_map(|g| g.median.iter().copied()).collect();
+    let hit_rate: Vec<f64> = groups.iter().flat_map(|g| g.hit_rate.iter().copied()).collect();
+    let count: Vec<i64> = groups.iter().flat_map(|g| g.count.iter().map(|&c| c as i64)).collect();
+
+    dict.set_item("groups", groups.iter().map(|g| g.key.clone()).collect::<Vec<_>>())?;
+    dict.set_item("events", groups.iter().map(|g| g.events).collect::<Vec<_>>())?;
+    dict.set_item("count", PyArray1::from_slice_bound(py, &count).reshape([n_g, n_h])?)?;
+    dict.set_item("mean", PyArray1::from_slice_bound(py, &mean).reshape([n_g, n_h])?)?;
+    dict.set_item("median", PyArray1::from_slice_bound(py, &median).reshape([n_g, n_h])?)?;
+    dict.set_item("hit_rate", PyArray1::from_slice_bound(py, &hit_rate).reshape([n_g, n_h])?)?;
+    Ok(())
+}
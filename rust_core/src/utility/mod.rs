@@ -1 +1,16 @@
-pub mod price_calculator; 
\ No newline at end of file
+pub mod archive;
+pub mod cache;
+pub mod coverage;
+pub mod daemon;
+pub mod daily_context;
+pub mod differential;
+pub mod event_study;
+pub mod prefetch;
+pub mod price_calculator;
+pub mod quality;
+pub mod resample;
+pub mod screen;
+pub mod sector_index;
+pub mod snapshot;
+pub mod startup;
+pub mod trace;
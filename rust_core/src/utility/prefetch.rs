@@ -0,0 +1,70 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use crate::core::prefetch::{PrefetchConfig, Prefetcher};
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::d::parse_date_num;
+
+/// 파이썬 배치 루프용 일별 데이터 프리페처
+///
+/// 처리할 날짜 목록을 주고, 루프에서 날짜마다 rust_core 함수를 부르기 전에 advance(date) 를 호출하면
+/// 다음 depth 일의 5분봉(forward=True 면 기본 선행 수익률 행렬까지)을 백그라운드 스레드가 캐시에 올려 둡니다.
+/// 같은 db_path 를 쓰는 함수(screen_market, forward_return_matrix, sector_index_for_date 등)가 그 캐시를 그대로 사용합니다.
+#[pyclass(name = "DayPrefetcher")]
+pub struct PyDayPrefetcher {
+    inner: Option<Prefetcher>,
+    dates: Vec<i64>,
+    position: usize,
+}
+
+#[pymethods]
+impl PyDayPrefetcher {
+    #[new]
+    #[pyo3(signature = (dates, depth=2, threads=2, forward=false, db_path=None))]
+    fn new(dates: Vec<String>, depth: usize, threads: usize, forward: bool, db_path: Option<String>) -> PyResult<Self> {
+        init_logger();
+        let dates = dates.iter().map(|d| parse_date_num(d)).collect::<PyResult<Vec<i64>>>()?;
+        let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+        let inner = Prefetcher::start(&db_path, &dates, PrefetchConfig { depth, threads, forward });
+        Ok(Self { inner: Some(inner), dates, position: 0 })
+    }
+
+    /// date 처리를 시작함을 알림 (목록에서 현재 위치 이후의 같은 날짜를 찾음)
+    ///
+    /// 그 날짜를 백그라운드에서 읽는 중이면 끝날 때까지 기다립니다. 목록에 없는 날짜면 ValueError.
+    fn advance(&mut self, py: Python<'_>, date: &str) -> PyResult<()> {
+        let date_num = parse_date_num(date)?;
+        let idx = self.dates.iter().skip(self.position).position(|&d| d == date_num)
+            .map(|i| i + self.position)
+            .ok_or_else(|| pyo3::exceptions::PyValueError::new_err(format!("프리페치 날짜 목록의 남은 구간에 없는 날짜입니다: {}", date)))?;
+        self.position = idx;
+        if let Some(inner) = &self.inner {
+            py.allow_threads(|| inner.advance(idx));
+        }
+        Ok(())
+    }
+
+    /// 반환: {"loaded", "ready_hits", "misses", "failed", "wait_seconds", "day_bytes", "depth"}
+    fn stats<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        let result = PyDict::new_bound(py);
+        let Some(inner) = &self.inner else {
+            return Ok(result);
+        };
+        let stats = inner.stats();
+        result.set_item("loaded", stats.loaded)?;
+        result.set_item("ready_hits", stats.ready_hits)?;
+        result.set_item("misses", stats.misses)?;
+        result.set_item("failed", stats.failed)?;
+        result.set_item("wait_seconds", stats.wait_seconds)?;
+        result.set_item("day_bytes", stats.day_bytes)?;
+        result.set_item("depth", inner.depth())?;
+        Ok(result)
+    }
+
+    /// 백그라운드 스레드를 멈추고 미리 올린 날짜의 고정을 해제
+    fn close(&mut self, py: Python<'_>) {
+        if let Some(inner) = self.inner.take() {
+            py.allow_threads(|| drop(inner));
+        }
+    }
+}
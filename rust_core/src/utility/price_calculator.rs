@@ -1,6 +1,14 @@
 use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use numpy::{PyArray1, PyArrayMethods};
 use rusqlite::Connection;
+use std::collections::HashMap;
+use log::warn;
+use crate::core::day_data::DayData;
+use crate::core::forward_returns::{Horizon, DEFAULT_BOUNDARIES, default_horizons, forward_returns_for_date};
+use crate::core::{bar_time, daemon, trace};
 use crate::features::db;
+use crate::rules::d::{parse_date_num, parse_hhmm};
 
 /// 특정 종목의 9:00부터 지정된 시간까지의 상승률을 계산하는 함수
 #[pyfunction]
@@ -9,7 +17,8 @@ pub fn calculate_increase_rate(
     date: &str, 
     to_time: &str
 ) -> PyResult<f64> {
-    let conn = db::open("D:/db/stock_price(5min).db")
+    let _span = trace::span("ffi.calculate_increase_rate");
+    let conn = db::open(db::MIN5_DB_PATH)
         .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("DB 연결 실패: {}", e)))?;
     
     let result = calculate_increase_rate_internal(&conn, stock_code, date, to_time)
@@ -25,7 +34,8 @@ pub fn calculate_30min_increase_rate(
     date: &str, 
     to_time: &str
 ) -> PyResult<f64> {
-    let conn = db::open("D:/db/stock_price(5min).db")
+    let _span = trace::span("ffi.calculate_30min_increase_rate");
+    let conn = db::open(db::MIN5_DB_PATH)
         .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("DB 연결 실패: {}", e)))?;
     
     let result = calculate_30min_increase_rate_internal(&conn, stock_code, date, to_time)
@@ -41,60 +51,15 @@ fn calculate_30min_increase_rate_internal(
     date: &str,
     to_time: &str
 ) -> Result<f64, Box<dyn std::error::Error>> {
-    // 날짜 형식 변환 (YYYY-MM-DD -> YYYYMMDD)
-    let date_num = date.replace("-", "");
+    let date_num = bar_time::parse_date(date)?;
     
-    // 30분 이전 시간 계산
-    let from_time = match to_time {
-        "0930" => "0900",
-        "1000" => "0930", 
-        "1030" => "1000",
-        "1100" => "1030",
-        "1130" => "1100",
-        "1200" => "1130",
-        "1230" => "1200",
-        "1300" => "1230",
-        "1330" => "1300",
-        "1400" => "1330",
-        "1430" => "1400",
-        "1500" => "1430",
-        "1530" => "1500",
-        _ => return Err(format!("지원하지 않는 시간대입니다: {}", to_time).into())
-    };
-    
-    let start_time = format!("{}{}", date_num, from_time);
-    let end_time = format!("{}{}", date_num, to_time);
-    
-    // 테이블명은 "A" + 종목코드 형태
-    let table_name = format!("A{}", stock_code);
-    
-    let query = format!(
-        "SELECT open, close FROM {} WHERE date BETWEEN ?1 AND ?2 ORDER BY date", 
-        table_name
-    );
+    // 30분 이전 시간 계산 (09:30 이후의 HHMM 이면 모두 지원)
+    let to = bar_time::parse_hhmm(to_time).ok()
+        .filter(|&t| t >= 930)
+        .ok_or_else(|| format!("지원하지 않는 시간대입니다: {}", to_time))?;
+    let from = bar_time::plus_minutes(to, -30);
     
-    let mut stmt = conn.prepare(&query)?;
-    let mut rows = stmt.query(&[&start_time, &end_time])?;
-
-    let mut first_open = None;
-    let mut last_close = None;
-
-    while let Some(row) = rows.next()? {
-        let open: i64 = row.get(0)?;
-        let close: i64 = row.get(1)?;
-        
-        if first_open.is_none() {
-            first_open = Some(open);
-        }
-        last_close = Some(close);
-    }
-
-    if let (Some(open), Some(close)) = (first_open, last_close) {
-        let rate = (close - open) as f64 / open as f64 * 100.0;
-        Ok(rate)
-    } else {
-        Ok(0.0) // 데이터가 없으면 0% 반환
-    }
+    Ok(window_increase_rate(conn, stock_code, bar_time::at(date_num, from), bar_time::at(date_num, to))?)
 }
 
 /// 내부 상승률 계산 함수
@@ -104,11 +69,18 @@ fn calculate_increase_rate_internal(
     date: &str,
     to_time: &str
 ) -> Result<f64, Box<dyn std::error::Error>> {
-    // 날짜 형식 변환 (YYYY-MM-DD -> YYYYMMDD)
-    let date_num = date.replace("-", "");
-    let open_time = format!("{}0900", date_num);
-    let close_time = format!("{}{}", date_num, to_time);
-    
+    let date_num = bar_time::parse_date(date)?;
+    let to = bar_time::parse_hhmm(to_time)?;
+    Ok(window_increase_rate(conn, stock_code, bar_time::at(date_num, 900), bar_time::at(date_num, to))?)
+}
+
+/// from <= date <= to 구간 첫 봉 시가 대비 마지막 봉 종가 상승률 (데이터가 없으면 0%)
+fn window_increase_rate(
+    conn: &Connection,
+    stock_code: &str,
+    from: i64,
+    to: i64
+) -> Result<f64, rusqlite::Error> {
     // 테이블명은 "A" + 종목코드 형태
     let table_name = format!("A{}", stock_code);
     
@@ -118,43 +90,55 @@ fn calculate_increase_rate_internal(
     );
     
     let mut stmt = conn.prepare(&query)?;
-    let mut rows = stmt.query(&[&open_time, &close_time])?;
+    let mut rows = stmt.query([from, to])?;
 
-    let mut open_0900 = None;
-    let mut close_to = None;
+    let mut first_open = None;
+    let mut last_close = None;
 
     while let Some(row) = rows.next()? {
         let open: i64 = row.get(0)?;
         let close: i64 = row.get(1)?;
         
-        if open_0900.is_none() {
-            open_0900 = Some(open);
+        if first_open.is_none() {
+            first_open = Some(open);
         }
-        close_to = Some(close);
+        last_close = Some(close);
     }
 
-    if let (Some(open), Some(close)) = (open_0900, close_to) {
-        let rate = (close - open) as f64 / open as f64 * 100.0;
-        Ok(rate)
-    } else {
-        Ok(0.0) // 데이터가 없으면 0% 반환
+    match (first_open, last_close) {
+        (Some(open), Some(close)) if open > 0 => Ok((close - open) as f64 / open as f64 * 100.0),
+        _ => Ok(0.0), // 데이터가 없거나 시가가 0 이하이면 0% 반환
     }
 }
 
 /// 여러 종목의 상승률을 일괄 계산하는 함수
+///
+/// 쿼리 데몬이 떠 있으면 데몬에 맡기고, 없으면 프로세스 안에서 계산합니다.
 #[pyfunction]
 pub fn calculate_increase_rates_batch(
+    py: Python<'_>,
     stock_codes: Vec<String>,
     date: &str,
     to_time: &str
 ) -> PyResult<Vec<(String, f64)>> {
-    let conn = db::open("D:/db/stock_price(5min).db")
+    let _span = trace::span("ffi.calculate_increase_rates_batch");
+    let request = daemon::Request::IncreaseRates { codes: stock_codes.clone(), date: date.to_string(), time: to_time.to_string() };
+    let forwarded = py.allow_threads(|| daemon::forward(&request));
+    if let Some(result) = forwarded {
+        return result.and_then(|r| r.into_rates()).map_err(pyo3::exceptions::PyRuntimeError::new_err);
+    }
+
+    let conn = db::open(db::MIN5_DB_PATH)
         .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("DB 연결 실패: {}", e)))?;
-    
+    Ok(increase_rates_batch(&conn, stock_codes, date, to_time))
+}
+
+/// 여러 종목의 9:00 ~ to_time 상승률 (쿼리 데몬과 공용)
+pub fn increase_rates_batch(conn: &Connection, stock_codes: Vec<String>, date: &str, to_time: &str) -> Vec<(String, f64)> {
     let mut results = Vec::new();
     
     for code in stock_codes {
-        match calculate_increase_rate_internal(&conn, &code, date, to_time) {
+        match calculate_increase_rate_internal(conn, &code, date, to_time) {
             Ok(rate) => results.push((code, rate)),
             Err(e) => {
                 // 개별 종목 오류는 로그만 남기고 계속 진행
@@ -164,7 +148,30 @@ pub fn calculate_increase_rates_batch(
         }
     }
     
-    Ok(results)
+    results
+}
+
+/// 캐시된 하루치 봉으로 여러 종목의 9:00 ~ to 상승률 (쿼리 데몬용, increase_rates_batch 와 같은 규칙)
+///
+/// 봉이 없거나 시가가 0 이하이면 0%, 하루치 데이터에 없는(또는 격리된) 종목도 0% 입니다.
+pub fn increase_rates_from_day(day: &DayData, stock_codes: Vec<String>, to: i64) -> Vec<(String, f64)> {
+    let index: HashMap<&str, usize> = day.tickers.iter().enumerate().map(|(i, t)| (t.table.as_str(), i)).collect();
+    let (from, to) = (day.at(900), day.at(to));
+    stock_codes.into_iter()
+        .map(|code| {
+            let rate = match index.get(format!("A{}", code).as_str()) {
+                Some(&i) => match day.tickers[i].open_close_between(from, to) {
+                    Some((open, close)) if open > 0 => (close - open) as f64 / open as f64 * 100.0,
+                    _ => 0.0,
+                },
+                None => {
+                    warn!("⚠️ {} 일중 데이터에 없는 종목입니다", code);
+                    0.0
+                },
+            };
+            (code, rate)
+        })
+        .collect()
 }
 
 /// 특정 종목의 특정 시간대 상승률을 계산하는 함수 (시작 시간 지정 가능)
@@ -175,7 +182,8 @@ pub fn calculate_increase_rate_custom_period(
     from_time: &str,
     to_time: &str
 ) -> PyResult<f64> {
-    let conn = db::open("D:/db/stock_price(5min).db")
+    let _span = trace::span("ffi.calculate_increase_rate_custom_period");
+    let conn = db::open(db::MIN5_DB_PATH)
         .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("DB 연결 실패: {}", e)))?;
     
     let result = calculate_increase_rate_custom_period_internal(&conn, stock_code, date, from_time, to_time)
@@ -192,41 +200,94 @@ fn calculate_increase_rate_custom_period_internal(
     from_time: &str,
     to_time: &str
 ) -> Result<f64, Box<dyn std::error::Error>> {
-    // 날짜 형식 변환 (YYYY-MM-DD -> YYYYMMDD)
-    let date_num = date.replace("-", "");
-    let start_time = format!("{}{}", date_num, from_time);
-    let end_time = format!("{}{}", date_num, to_time);
-    
-    // 테이블명은 "A" + 종목코드 형태
-    let table_name = format!("A{}", stock_code);
-    
-    let query = format!(
-        "SELECT open, close FROM {} WHERE date BETWEEN ?1 AND ?2 ORDER BY date", 
-        table_name
-    );
-    
-    let mut stmt = conn.prepare(&query)?;
-    let mut rows = stmt.query(&[&start_time, &end_time])?;
-
-    let mut first_open = None;
-    let mut last_close = None;
+    let date_num = bar_time::parse_date(date)?;
+    let from = bar_time::parse_hhmm(from_time)?;
+    let to = bar_time::parse_hhmm(to_time)?;
+    Ok(window_increase_rate(conn, stock_code, bar_time::at(date_num, from), bar_time::at(date_num, to))?)
+}
 
-    while let Some(row) = rows.next()? {
-        let open: i64 = row.get(0)?;
-        let close: i64 = row.get(1)?;
-        
-        if first_open.is_none() {
-            first_open = Some(open);
-        }
-        last_close = Some(close);
+fn parse_horizons(horizons: Option<Vec<String>>) -> PyResult<Vec<Horizon>> {
+    match horizons {
+        Some(horizons) => horizons.iter()
+            .map(|h| Horizon::parse(h).map_err(pyo3::exceptions::PyValueError::new_err))
+            .collect(),
+        None => Ok(default_horizons()),
     }
+}
 
-    if let (Some(open), Some(close)) = (first_open, last_close) {
-        let rate = (close - open) as f64 / open as f64 * 100.0;
-        Ok(rate)
+/// 하루치 전 종목 × 경계 × 구간 선행 수익률 행렬
+///
+/// 반환: {"codes": [종목코드], "boundaries": ["HHMM"], "horizons": ["5", ..., "close"],
+///        "returns": numpy float64 배열 [종목, 경계, 구간]} (구간에 봉이 없으면 NaN)
+#[pyfunction]
+#[pyo3(signature = (date, boundaries=None, horizons=None, db_path=None))]
+pub fn forward_return_matrix<'py>(
+    py: Python<'py>,
+    date: &str,
+    boundaries: Option<Vec<String>>,
+    horizons: Option<Vec<String>>,
+    db_path: Option<String>
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.forward_return_matrix");
+    let date_num = parse_date_num(date)?;
+    let boundaries: Vec<i64> = match boundaries {
+        Some(times) => times.iter().map(|t| parse_hhmm(t)).collect::<PyResult<_>>()?,
+        None => DEFAULT_BOUNDARIES.to_vec(),
+    };
+    let horizons = parse_horizons(horizons)?;
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+
+    let matrix = py.allow_threads(|| {
+        forward_returns_for_date(&db_path, date_num, &boundaries, &horizons).map_err(|e| e.to_string())
+    }).map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("선행 수익률 계산 실패: {}", e)))?;
+
+    let codes: Vec<String> = matrix.tables.iter()
+        .map(|t| t.strip_prefix('A').unwrap_or(t).to_string())
+        .collect();
+    let returns = PyArray1::from_slice_bound(py, &matrix.values).reshape(matrix.shape())?;
+
+    let result = PyDict::new_bound(py);
+    result.set_item("date", format!("{}-{:02}-{:02}", matrix.date_num / 10000, matrix.date_num / 100 % 100, matrix.date_num % 100))?;
+    result.set_item("codes", codes)?;
+    result.set_item("boundaries", matrix.boundaries.iter().map(|b| format!("{:04}", b)).collect::<Vec<_>>())?;
+    result.set_item("horizons", matrix.horizons.iter().map(Horizon::label).collect::<Vec<_>>())?;
+    result.set_item("returns", returns)?;
+    Ok(result)
+}
+
+/// 선행 수익률 행렬에서 종목 하나의 값 조회 (같은 날짜의 반복 조회는 캐시된 행렬 사용)
+///
+/// time 부터 horizon(분 또는 "close") 동안의 상승률, 봉이 없으면 NaN
+#[pyfunction]
+#[pyo3(signature = (stock_code, date, time, horizon="30", db_path=None))]
+pub fn forward_return(
+    py: Python<'_>,
+    stock_code: &str,
+    date: &str,
+    time: &str,
+    horizon: &str,
+    db_path: Option<String>
+) -> PyResult<f64> {
+    let _span = trace::span("ffi.forward_return");
+    let date_num = parse_date_num(date)?;
+    let boundary = parse_hhmm(time)?;
+    let horizon = Horizon::parse(horizon).map_err(pyo3::exceptions::PyValueError::new_err)?;
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+
+    // 기본 경계/구간에 포함되면 기본 행렬을 공유
+    let defaults = default_horizons();
+    let (boundaries, horizons) = if DEFAULT_BOUNDARIES.contains(&boundary) && defaults.contains(&horizon) {
+        (DEFAULT_BOUNDARIES.to_vec(), defaults)
     } else {
-        Ok(0.0) // 데이터가 없으면 0% 반환
-    }
+        (vec![boundary], vec![horizon])
+    };
+
+    let matrix = py.allow_threads(|| {
+        forward_returns_for_date(&db_path, date_num, &boundaries, &horizons).map_err(|e| e.to_string())
+    }).map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("선행 수익률 계산 실패: {}", e)))?;
+
+    let table = format!("A{}", stock_code);
+    Ok(matrix.get(&table, boundary, horizon).unwrap_or(f64::NAN))
 }
 
 #[cfg(test)]
@@ -236,7 +297,7 @@ mod tests {
     #[test]
     fn test_calculate_increase_rate() {
         // 실제 DB가 있는 경우에만 테스트 실행
-        let conn = db::open("D:/db/stock_price(5min).db");
+        let conn = db::open(db::MIN5_DB_PATH);
         if conn.is_err() {
             println!("⚠️ 테스트 DB가 없어서 테스트를 건너뜁니다.");
             return;
@@ -255,4 +316,14 @@ mod tests {
             }
         }
     }
-} 
\ No newline at end of file
+
+    #[test]
+    fn test_increase_rates_from_day() {
+        use crate::core::day_data::TickerDay;
+        let rows = vec![(20250430_0900, 1000, 1010, 990, 1000, 10), (20250430_0905, 1000, 1060, 1000, 1050, 10),
+                        (20250430_0935, 1050, 1100, 1050, 1100, 10)];
+        let day = DayData::from_tickers(20250430, vec![TickerDay::from_rows("A000001", rows)]);
+        let codes = vec!["000001".to_string(), "999999".to_string()];
+        assert_eq!(increase_rates_from_day(&day, codes, 930), vec![("000001".to_string(), 5.0), ("999999".to_string(), 0.0)]);
+    }
+}
@@ -0,0 +1,98 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use crate::core::quality::{self, IssueKind, Quarantine, ScanConfig, DEFAULT_QUARANTINE_PATH};
+use crate::core::trace;
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::d::parse_date_num;
+
+fn default_threads() -> usize {
+    std::thread::available_parallelism().map(|n| n.get()).unwrap_or(4)
+}
+
+/// 5분봉/일봉 DB 전체 데이터 품질 검사
+///
+/// 시가 0 이하, NULL, 중복/역순 date, 빠진 5분 슬롯, 일봉과 맞지 않는 5분봉을 찾아 output(기본 "D:/db/quarantine.db")에 저장합니다.
+/// apply=True 이면 검사 결과의 격리 목록을 바로 적용합니다 (빠른 경로가 해당 종목-날짜를 건너뜀).
+/// 반환: {"tables", "rows", "issues": {항목: 개수}, "quarantined": 격리 종목-날짜 수, "output"}
+#[pyfunction]
+#[pyo3(signature = (start=None, end=None, threads=None, min5_db_path=None, day_db_path=None, output=None, apply=true))]
+pub fn scan_data_quality<'py>(
+    py: Python<'py>,
+    start: Option<String>,
+    end: Option<String>,
+    threads: Option<usize>,
+    min5_db_path: Option<String>,
+    day_db_path: Option<String>,
+    output: Option<String>,
+    apply: bool
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.scan_data_quality");
+    init_logger();
+    let start = start.map(|d| parse_date_num(&d)).transpose()?;
+    let end = end.map(|d| parse_date_num(&d)).transpose()?;
+    if let (Some(s), Some(e)) = (start, end) {
+        if s > e {
+            return Err(pyo3::exceptions::PyValueError::new_err(format!("시작 날짜가 종료 날짜보다 늦습니다: {} > {}", s, e)));
+        }
+    }
+    let config = ScanConfig {
+        min5_db_path: min5_db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string()),
+        day_db_path: Some(day_db_path.unwrap_or_else(|| db::DAY_DB_PATH.to_string())).filter(|p| !p.is_empty()),
+        start,
+        end,
+        threads: threads.unwrap_or_else(default_threads),
+    };
+    let output = output.unwrap_or_else(|| DEFAULT_QUARANTINE_PATH.to_string());
+
+    let report = py.allow_threads(|| {
+        let report = quality::scan(&config).map_err(|e| e.to_string())?;
+        report.save(&output).map_err(|e| e.to_string())?;
+        Ok::<_, String>(report)
+    }).map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("데이터 품질 검사 실패: {}", e)))?;
+
+    let quarantine = report.quarantine();
+    let counts = report.count_by_kind();
+    let issues = PyDict::new_bound(py);
+    for kind in IssueKind::ALL {
+        issues.set_item(kind.label(), counts.get(&kind).copied().unwrap_or(0))?;
+    }
+
+    let result = PyDict::new_bound(py);
+    result.set_item("tables", report.tables)?;
+    result.set_item("rows", report.rows)?;
+    result.set_item("issues", issues)?;
+    result.set_item("quarantined", quarantine.len())?;
+    result.set_item("output", &output)?;
+    if apply {
+        quality::set_quarantine(quarantine);
+    }
+    Ok(result)
+}
+
+/// scan_data_quality 로 저장한 격리 목록 적용 (path 기본 "D:/db/quarantine.db"). 격리 종목-날짜 수 반환
+#[pyfunction]
+#[pyo3(signature = (path=None))]
+pub fn load_quarantine(path: Option<String>) -> PyResult<usize> {
+    init_logger();
+    let path = path.unwrap_or_else(|| DEFAULT_QUARANTINE_PATH.to_string());
+    let quarantine = Quarantine::load(&path)
+        .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("격리 목록 로드 실패: {}", e)))?;
+    let count = quarantine.len();
+    quality::set_quarantine(quarantine);
+    Ok(count)
+}
+
+/// 격리 목록 비우기 (모든 종목-날짜 사용)
+#[pyfunction]
+pub fn clear_quarantine() {
+    quality::set_quarantine(Quarantine::default());
+}
+
+/// 종목-날짜가 격리되어 있는지 확인
+#[pyfunction]
+pub fn is_quarantined(stock_code: &str, date: &str) -> PyResult<bool> {
+    let date_num = parse_date_num(date)?;
+    let table = format!("A{}", stock_code.trim_start_matches('A'));
+    Ok(quality::QUARANTINE.read().unwrap().contains(&table, date_num))
+}
@@ -0,0 +1,76 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use numpy::PyArray1;
+use crate::core::resample::{resampled_day, resampled_db_path, validate_cache, validate_minutes};
+use crate::core::{daemon, trace};
+use crate::features::db;
+use crate::rules::d::parse_date_num;
+
+/// 하루치 전 종목 5분봉을 minutes 간격(5의 배수, 09:00 정렬)으로 리샘플링
+///
+/// 반환: {"codes": [종목코드], "offsets": 종목별 시작 위치 (길이 = 종목 수 + 1),
+///        "date"/"open"/"high"/"low"/"close"/"volume"/"trade_value": 전 종목을 이어붙인 int64 배열}
+/// 종목 i 의 봉은 offsets[i]:offsets[i+1] 구간입니다.
+/// cache=True 이면 간격별 캐시 DB(cache_path, 기본 "D:/db/stock_price(Nmin)_resampled.db")를 먼저 읽고 없으면 저장합니다.
+/// 5분봉(원본)이나 원본 DB와 같은 cache_path 는 캐시할 수 없어 ValueError 입니다.
+/// 쿼리 데몬이 떠 있으면 데몬이 읽어 둔 봉을 받아 옵니다.
+#[pyfunction]
+#[pyo3(signature = (date, minutes, cache=false, db_path=None, cache_path=None))]
+pub fn resample_bars<'py>(
+    py: Python<'py>,
+    date: &str,
+    minutes: i64,
+    cache: bool,
+    db_path: Option<String>,
+    cache_path: Option<String>
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.resample_bars");
+    validate_minutes(minutes).map_err(pyo3::exceptions::PyValueError::new_err)?;
+    let date_num = parse_date_num(date)?;
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+    let cache_path = cache.then(|| cache_path.unwrap_or_else(|| resampled_db_path(minutes)));
+    if let Some(path) = &cache_path {
+        validate_cache(&db_path, path, minutes).map_err(pyo3::exceptions::PyValueError::new_err)?;
+    }
+
+    let day = py.allow_threads(|| {
+        let request = daemon::Request::DayBars { db_path: db_path.clone(), cache_path: cache_path.clone(), date_num, minutes };
+        match daemon::forward(&request) {
+            Some(result) => result.and_then(|r| r.into_day()),
+            None => resampled_day(&db_path, cache_path.as_deref(), date_num, minutes).map_err(|e| e.to_string()),
+        }
+    }).map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("리샘플링 실패: {}", e)))?;
+
+    let total: usize = day.tickers.iter().map(|t| t.len()).sum();
+    let mut offsets = Vec::with_capacity(day.tickers.len() + 1);
+    let mut columns: [Vec<i64>; 7] = Default::default();
+    for column in columns.iter_mut() {
+        column.reserve(total);
+    }
+
+    offsets.push(0i64);
+    for ticker in &day.tickers {
+        columns[0].extend_from_slice(&ticker.dates);
+        columns[1].extend_from_slice(&ticker.open);
+        columns[2].extend_from_slice(&ticker.high);
+        columns[3].extend_from_slice(&ticker.low);
+        columns[4].extend_from_slice(&ticker.close);
+        columns[5].extend_from_slice(&ticker.volume);
+        columns[6].extend((0..ticker.len()).map(|i| ticker.trade_value_at(i)));
+        offsets.push(columns[0].len() as i64);
+    }
+
+    let codes: Vec<String> = day.tickers.iter()
+        .map(|t| t.table.strip_prefix('A').unwrap_or(&t.table).to_string())
+        .collect();
+
+    let result = PyDict::new_bound(py);
+    result.set_item("minutes", minutes)?;
+    result.set_item("codes", codes)?;
+    result.set_item("offsets", PyArray1::from_vec_bound(py, offsets))?;
+    let names = ["date", "open", "high", "low", "close", "volume", "trade_value"];
+    for (name, column) in names.iter().zip(columns) {
+        result.set_item(*name, PyArray1::from_vec_bound(py, column))?;
+    }
+    Ok(result)
+}
@@ -0,0 +1,118 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use numpy::PyArray1;
+use crate::core::archive;
+use crate::core::daily_context::DailyContext;
+use crate::core::day_data::DayData;
+use crate::core::feature_graph::FeatureGraph;
+use crate::core::screen::{run_screen, Column, Expr, ScreenSpec, Screener};
+use crate::core::trace;
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::d::{parse_date_num, parse_hhmm};
+
+fn parse_expr(source: &str) -> PyResult<Expr> {
+    Expr::parse(source).map_err(|e| pyo3::exceptions::PyValueError::new_err(format!("수식 오류 ({}): {}", source, e)))
+}
+
+/// 전일 컨텍스트를 계산할 (5분봉 DB, 일봉 DB)
+///
+/// 5분봉 쪽은 db_path 를 그대로 쓰고, 아카이브면 아카이브를 만든 기본 5분봉 DB를 씁니다.
+/// 일봉 DB 를 지정하지 않으면 기본 5분봉 DB나 아카이브일 때만 기본 일봉 DB를 쓰고,
+/// 다른 5분봉 DB(합성 DB 등)에 운영 일봉 데이터를 섞지 않도록 ValueError 를 냅니다.
+fn context_sources(db_path: &str, day_db_path: Option<String>) -> PyResult<(String, String)> {
+    let production = db_path == db::MIN5_DB_PATH || archive::is_archive_path(db_path);
+    let min5_db_path = if archive::is_archive_path(db_path) { db::MIN5_DB_PATH } else { db_path };
+    let day_db_path = match day_db_path {
+        Some(path) => path,
+        None if production => db::DAY_DB_PATH.to_string(),
+        None => return Err(pyo3::exceptions::PyValueError::new_err(format!(
+            "전일 컨텍스트 컬럼을 쓰려면 {} 에 맞는 day_db_path 를 지정해야 합니다", db_path))),
+    };
+    Ok((min5_db_path.to_string(), day_db_path))
+}
+
+/// 하루치 전 종목 스냅샷 위에서 수식으로 종목 스크리닝
+///
+/// where: 통과 조건 (예: "top(trade_value, 50) and ret > 3 and tv_ratio > 2")
+/// order_by: 정렬 수식 (기본 내림차순, ascending=True 면 오름차순, NaN 은 맨 뒤)
+/// per_sector: 업종별 최대 종목 수, limit: 최대 종목 수
+/// columns: 함께 돌려받을 수식 목록 (결과 dict 의 키는 수식 문자열 그대로)
+///
+/// 컬럼: open, close, high, low, volume, trade_value, ret, ret_30m, bars, d, long_bull, sector,
+///       prev_close, high_20, prev_trade_value, gap, high_distance, tv_ratio (뒤의 6개는 일봉 컨텍스트 사용)
+/// day_db_path: 일봉 컨텍스트용 일봉 DB (기본 5분봉 DB·아카이브가 아닌 db_path 로 컨텍스트 컬럼을 쓰면 필수)
+/// 함수: abs(x), rank(x), top(x, k), sector_rank(x), sector_mean(x), sector_count(조건)
+/// 반환: {"codes", "names", "sectors", "score": float64 배열, 각 columns 수식: float64 배열}
+#[pyfunction]
+#[pyo3(signature = (date, time, r#where=None, order_by=None, ascending=false, per_sector=None, limit=None, columns=None, db_path=None, day_db_path=None))]
+pub fn screen_market<'py>(
+    py: Python<'py>,
+    date: &str,
+    time: &str,
+    r#where: Option<String>,
+    order_by: Option<String>,
+    ascending: bool,
+    per_sector: Option<usize>,
+    limit: Option<usize>,
+    columns: Option<Vec<String>>,
+    db_path: Option<String>,
+    day_db_path: Option<String>
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.screen_market");
+    init_logger();
+    let date_num = parse_date_num(date)?;
+    let cutoff = parse_hhmm(time)?;
+    let spec = ScreenSpec {
+        filter: r#where.as_deref().map(parse_expr).transpose()?,
+        order_by: order_by.as_deref().map(parse_expr).transpose()?,
+        ascending,
+        per_sector,
+        limit,
+    };
+    let columns = columns.unwrap_or_default();
+    let extra = columns.iter().map(|c| parse_expr(c)).collect::<PyResult<Vec<Expr>>>()?;
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+    // 전일 컨텍스트 컬럼을 쓰는 수식이 있을 때만 일봉 DB를 읽음
+    let context_sources = if spec.needs_context() || extra.iter().any(|e| e.needs_context()) {
+        Some(context_sources(&db_path, day_db_path)?)
+    } else {
+        None
+    };
+
+    let (stocks, scores, values) = py.allow_threads(|| {
+        let day = DayData::cached(&db_path, date_num).map_err(|e| format!("일중 데이터 로드 실패: {}", e))?;
+        let mut graph = FeatureGraph::new(&day);
+        if let Some((min5_db_path, day_db_path)) = &context_sources {
+            let context = DailyContext::cached(min5_db_path, day_db_path, date_num)
+                .map_err(|e| format!("일봉 컨텍스트 로드 실패: {}", e))?;
+            graph.attach_context(context);
+        }
+        let mut screener = Screener::new(&mut graph, cutoff);
+        let result = run_screen(&mut screener, &spec);
+        let values: Vec<Vec<f64>> = extra.iter()
+            .map(|e| {
+                let all = screener.eval(e);
+                result.indices.iter().map(|&i| all[i]).collect()
+            })
+            .collect();
+        let stocks: Vec<_> = result.indices.iter().map(|&i| graph.stock(i)).collect();
+        Ok::<_, String>((stocks, result.scores, values))
+    }).map_err(pyo3::exceptions::PyRuntimeError::new_err)?;
+
+    let dict = PyDict::new_bound(py);
+    dict.set_item("codes", stocks.iter().map(|s| s.code.as_str()).collect::<Vec<_>>())?;
+    dict.set_item("names", stocks.iter().map(|s| s.name.as_str()).collect::<Vec<_>>())?;
+    dict.set_item("sectors", stocks.iter().map(|s| s.sector.as_str()).collect::<Vec<_>>())?;
+    dict.set_item("score", PyArray1::from_vec_bound(py, scores))?;
+    for (name, column) in columns.iter().zip(values) {
+        dict.set_item(name, PyArray1::from_vec_bound(py, column))?;
+    }
+    Ok(dict)
+}
+
+/// 스크리닝 수식에서 쓸 수 있는 컬럼 이름 목록
+#[pyfunction]
+pub fn screen_columns() -> Vec<&'static str> {
+    Column::ALL.iter().map(|c| c.name()).collect()
+}
@@ -0,0 +1,78 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use std::collections::HashMap;
+use numpy::{PyArray1, PyArrayMethods};
+use crate::core::day_data::DayData;
+use crate::core::feature_graph::{DParams, D_MIN_RATE, LONG_BULL_DIVISOR, TOP_N, MIN_SECTOR_COUNT};
+use crate::core::sector_index::SectorIndex;
+use crate::core::trace;
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::d::parse_date_num;
+
+/// 하루치 업종 × 기준시각(09:00~15:30, 5분 간격) 집계
+///
+/// 반환: {"date", "sectors": [업종명], "cutoffs": ["HHMM"],
+///        "trade_value" (int64) / "active" / "advancers" / "d_flags" / "d_top" / "d_before" (uint32)
+///        / "mean_return" (float64, 집계 종목이 없으면 NaN): 모두 [업종, 기준시각] numpy 배열}
+/// d_before 가 D 로직 업종 필터(이전 시간대 포함 D 종목 수)와 같은 값이고,
+/// "d_sectors": {"HHMM": [업종명]} 은 d_before 가 min_sector_count 이상인 업종입니다.
+#[pyfunction]
+#[pyo3(signature = (date, min_rate=D_MIN_RATE, long_bull_divisor=LONG_BULL_DIVISOR, top_n=TOP_N, min_sector_count=MIN_SECTOR_COUNT, db_path=None))]
+pub fn sector_index_for_date<'py>(
+    py: Python<'py>,
+    date: &str,
+    min_rate: f64,
+    long_bull_divisor: i64,
+    top_n: usize,
+    min_sector_count: usize,
+    db_path: Option<String>
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.sector_index_for_date");
+    init_logger();
+    if long_bull_divisor <= 0 || top_n == 0 {
+        return Err(pyo3::exceptions::PyValueError::new_err("long_bull_divisor 와 top_n 은 0보다 커야 합니다"));
+    }
+    let date_num = parse_date_num(date)?;
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+    let params = DParams { min_rate, long_bull_divisor, top_n, min_sector_count };
+
+    let index = py.allow_threads(|| {
+        let day = DayData::cached(&db_path, date_num).map_err(|e| e.to_string())?;
+        Ok::<_, String>(SectorIndex::for_day(&day, &params))
+    }).map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("업종 인덱스 생성 실패: {}", e)))?;
+
+    let shape = index.shape();
+    let mean_return: Vec<f64> = (0..shape[0])
+        .flat_map(|s| (0..shape[1]).map(move |c| (s, c)))
+        .map(|(s, c)| index.mean_return(s, c))
+        .collect();
+
+    let d_sectors: HashMap<String, Vec<&str>> = index.cutoffs.iter()
+        .map(|&cutoff| {
+            let names = index.sectors_with_min_d(cutoff, min_sector_count).into_iter()
+                .map(|s| index.sectors[s].as_str())
+                .collect();
+            (format!("{:04}", cutoff), names)
+        })
+        .collect();
+
+    let result = PyDict::new_bound(py);
+    result.set_item("date", format!("{}-{:02}-{:02}", index.date_num / 10000, index.date_num / 100 % 100, index.date_num % 100))?;
+    result.set_item("sectors", &index.sectors)?;
+    result.set_item("cutoffs", index.cutoffs.iter().map(|c| format!("{:04}", c)).collect::<Vec<_>>())?;
+    result.set_item("trade_value", PyArray1::from_slice_bound(py, &index.trade_value).reshape(shape)?)?;
+    result.set_item("mean_return", PyArray1::from_vec_bound(py, mean_return).reshape(shape)?)?;
+    let counts = [
+        ("active", &index.active),
+        ("advancers", &index.advancers),
+        ("d_flags", &index.d_flags),
+        ("d_top", &index.d_top),
+        ("d_before", &index.d_before),
+    ];
+    for (name, values) in counts {
+        result.set_item(name, PyArray1::from_slice_bound(py, values).reshape(shape)?)?;
+    }
+    result.set_item("d_sectors", d_sectors)?;
+    Ok(result)
+}
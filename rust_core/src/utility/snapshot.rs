@@ -0,0 +1,136 @@
+use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList, PyTuple};
+use crate::core::snapshot::{self, SnapshotInfo, SnapshotRegistry};
+use crate::core::trace;
+use crate::features::db;
+use crate::features::logging::init_logger;
+use crate::rules::d::parse_date_num;
+
+fn info_dict<'py>(py: Python<'py>, info: &SnapshotInfo) -> PyResult<Bound<'py, PyDict>> {
+    let result = PyDict::new_bound(py);
+    result.set_item("path", info.path.to_string_lossy().to_string())?;
+    result.set_item("date", format!("{}-{:02}-{:02}", info.date_num / 10000, info.date_num / 100 % 100, info.date_num % 100))?;
+    result.set_item("source", &info.source)?;
+    result.set_item("tickers", info.tables.len())?;
+    result.set_item("bars", info.bars())?;
+    result.set_item("bytes", info.bytes)?;
+    result.set_item("forward", info.column("forward").is_some())?;
+    result.set_item("stale", info.is_stale())?;
+    Ok(result)
+}
+
+/// 하루치 전 종목 봉과 파생 배열을 공유 스냅샷으로 발행 (이미 있으면 그대로 사용)
+///
+/// 스냅샷 폴더(snapshot_dir, 기본 RUST_CORE_SNAPSHOT_DIR 또는 /dev/shm/rust_core_snapshots)에 불변 파일로 저장하며,
+/// 같은 폴더를 보는 다른 프로세스는 attach_day_snapshot 으로 복사 없이 붙고 일별 로드도 스냅샷을 읽습니다.
+/// snapshot_dir 을 주면 이 프로세스의 일별 로드도 그 폴더를 찾습니다 (다른 프로세스는 attach_day_snapshot 이나
+/// RUST_CORE_SNAPSHOT_DIR 로 같은 폴더를 지정). 복사 없는 공유는 numpy 경로에만 해당하고, 러스트 일별 로드는
+/// 스냅샷을 프로세스 메모리로 복사합니다. 원본 DB 가 발행 뒤 갱신되었으면 다시 발행합니다.
+/// forward=True 면 기본 경계/구간 선행 수익률 행렬도 함께 저장합니다.
+/// 반환: {"path", "date", "source", "tickers", "bars", "bytes", "forward", "stale", "created"}
+#[pyfunction]
+#[pyo3(signature = (date, db_path=None, snapshot_dir=None, forward=true))]
+pub fn publish_day_snapshot<'py>(
+    py: Python<'py>,
+    date: &str,
+    db_path: Option<String>,
+    snapshot_dir: Option<String>,
+    forward: bool
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.publish_day_snapshot");
+    init_logger();
+    let date_num = parse_date_num(date)?;
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+    if snapshot_dir.is_some() {
+        snapshot::set_default_dir(snapshot_dir.as_deref());
+    }
+    let registry = SnapshotRegistry::new(snapshot_dir.as_deref());
+
+    let (info, created) = py.allow_threads(|| registry.publish(&db_path, date_num, forward).map_err(|e| e.to_string()))
+        .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("스냅샷 발행 실패: {}", e)))?;
+    let result = info_dict(py, &info)?;
+    result.set_item("created", created)?;
+    Ok(result)
+}
+
+/// 발행된 스냅샷에 읽기 전용으로 붙기 (컬럼은 numpy.memmap 이라 프로세스 간 메모리를 공유)
+///
+/// 반환: {"path", "codes", "boundaries", "horizons", "offsets", "date"/"open"/"high"/"low"/"close"/"volume"/"tv_prefix",
+///        "forward" (발행 시 포함했으면 [종목, 경계, 구간] float64)}
+/// 종목 i 의 봉은 offsets[i]:offsets[i+1], 거래대금 누적합은 tv_prefix[offsets[i]+i : offsets[i+1]+i+1] 구간입니다.
+/// publish=True 면 스냅샷이 없거나 원본보다 오래되었을 때 먼저 발행합니다.
+/// snapshot_dir 을 주면 이 프로세스의 일별 로드(러스트 함수들)도 그 폴더의 스냅샷을 읽습니다.
+#[pyfunction]
+#[pyo3(signature = (date, db_path=None, snapshot_dir=None, publish=true))]
+pub fn attach_day_snapshot<'py>(
+    py: Python<'py>,
+    date: &str,
+    db_path: Option<String>,
+    snapshot_dir: Option<String>,
+    publish: bool
+) -> PyResult<Bound<'py, PyDict>> {
+    let _span = trace::span("ffi.attach_day_snapshot");
+    init_logger();
+    let date_num = parse_date_num(date)?;
+    let db_path = db_path.unwrap_or_else(|| db::MIN5_DB_PATH.to_string());
+    if snapshot_dir.is_some() {
+        snapshot::set_default_dir(snapshot_dir.as_deref());
+    }
+    let registry = SnapshotRegistry::new(snapshot_dir.as_deref());
+
+    let info = match registry.find(&db_path, date_num) {
+        Some(info) => info,
+        None if publish => py.allow_threads(|| registry.publish(&db_path, date_num, true).map_err(|e| e.to_string()))
+            .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("스냅샷 발행 실패: {}", e)))?.0,
+        None => return Err(pyo3::exceptions::PyFileNotFoundError::new_err(format!(
+            "{} 스냅샷이 없습니다 (publish_day_snapshot 으로 먼저 발행): {}", date, registry.path_for(&db_path, date_num).display()
+        ))),
+    };
+
+    let numpy = py.import_bound("numpy")?;
+    let path = info.path.to_string_lossy().to_string();
+    let result = PyDict::new_bound(py);
+    result.set_item("path", &path)?;
+    result.set_item("codes", info.tables.iter().map(|t| t.strip_prefix('A').unwrap_or(t).to_string()).collect::<Vec<_>>())?;
+    result.set_item("boundaries", info.boundaries.iter().map(|b| format!("{:04}", b)).collect::<Vec<_>>())?;
+    result.set_item("horizons", &info.horizons)?;
+    for column in &info.columns {
+        let shape = PyTuple::new_bound(py, column.shape.iter().copied());
+        let kwargs = PyDict::new_bound(py);
+        kwargs.set_item("dtype", &column.dtype)?;
+        // numpy.memmap 은 길이 0 배열을 만들 수 없어 빈 배열로 대체
+        let view = if column.len() == 0 {
+            numpy.getattr("zeros")?.call((shape,), Some(&kwargs))?
+        } else {
+            kwargs.set_item("mode", "r")?;
+            kwargs.set_item("offset", column.offset)?;
+            kwargs.set_item("shape", shape)?;
+            numpy.getattr("memmap")?.call((&path,), Some(&kwargs))?
+        };
+        result.set_item(column.name.as_str(), view)?;
+    }
+    Ok(result)
+}
+
+/// 스냅샷 폴더의 발행 목록 (날짜 순)
+#[pyfunction]
+#[pyo3(signature = (snapshot_dir=None))]
+pub fn list_day_snapshots<'py>(py: Python<'py>, snapshot_dir: Option<String>) -> PyResult<Bound<'py, PyList>> {
+    let registry = SnapshotRegistry::new(snapshot_dir.as_deref());
+    let infos = registry.list()
+        .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("스냅샷 목록 조회 실패: {}", e)))?;
+    let result = PyList::empty_bound(py);
+    for info in &infos {
+        result.append(info_dict(py, info)?)?;
+    }
+    Ok(result)
+}
+
+/// 스냅샷 삭제 (date 가 없으면 전체). 반환: 삭제한 파일 수
+#[pyfunction]
+#[pyo3(signature = (date=None, snapshot_dir=None))]
+pub fn remove_day_snapshots(date: Option<&str>, snapshot_dir: Option<String>) -> PyResult<usize> {
+    let date_num = date.map(parse_date_num).transpose()?;
+    SnapshotRegistry::new(snapshot_dir.as_deref()).remove(date_num)
+        .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("스냅샷 삭제 실패: {}", e)))
+}
@@ -0,0 +1,47 @@
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use std::time::Instant;
+use crate::core::{cache, quality};
+use crate::features::logging::init_logger;
+use crate::features::stock_info::{self, SECTOR_SOURCE, STOCK_INFO_MANAGER};
+
+/// 명시적 초기화 (로거, 업종 표, 격리 목록, 캐시). 여러 번 불러도 안전하고 패닉하지 않습니다.
+///
+/// 부르지 않아도 각 함수가 처음 쓰일 때 같은 초기화가 일어나지만, 워커 프로세스 시작 시 한 번 불러 두면
+/// 첫 계산이 초기화 비용을 떠안지 않습니다.
+/// sector_csv: 포함된 업종 표 대신 읽을 CSV (실패하면 RuntimeError, 기존 표 유지)
+/// 반환: {"sector_source", "stocks", "quarantined", "logger_ms", "sector_ms", "quarantine_ms", "cache_ms", "total_ms"}
+#[pyfunction]
+#[pyo3(signature = (sector_csv=None))]
+pub fn initialize<'py>(py: Python<'py>, sector_csv: Option<String>) -> PyResult<Bound<'py, PyDict>> {
+    let started = Instant::now();
+    init_logger();
+    let logger_ms = started.elapsed().as_secs_f64() * 1000.0;
+
+    let step = Instant::now();
+    let stocks = match &sector_csv {
+        Some(path) => stock_info::reload_from_csv(path)
+            .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("업종 CSV 로드 실패: {}", e)))?,
+        None => STOCK_INFO_MANAGER.lock().unwrap().len(),
+    };
+    let sector_ms = step.elapsed().as_secs_f64() * 1000.0;
+
+    let step = Instant::now();
+    let quarantined = quality::QUARANTINE.read().unwrap().len();
+    let quarantine_ms = step.elapsed().as_secs_f64() * 1000.0;
+
+    let step = Instant::now();
+    drop(cache::CACHE.lock().unwrap());
+    let cache_ms = step.elapsed().as_secs_f64() * 1000.0;
+
+    let result = PyDict::new_bound(py);
+    result.set_item("sector_source", SECTOR_SOURCE.lock().unwrap().clone())?;
+    result.set_item("stocks", stocks)?;
+    result.set_item("quarantined", quarantined)?;
+    result.set_item("logger_ms", logger_ms)?;
+    result.set_item("sector_ms", sector_ms)?;
+    result.set_item("quarantine_ms", quarantine_ms)?;
+    result.set_item("cache_ms", cache_ms)?;
+    result.set_item("total_ms", started.elapsed().as_secs_f64() * 1000.0)?;
+    Ok(result)
+}
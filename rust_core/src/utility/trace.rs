@@ -0,0 +1,82 @@
+use pyo3::prelude::*;
+use std::borrow::Cow;
+use crate::core::trace::{self, ContextGuard, Span};
+use crate::rules::d::{parse_date_num, parse_hhmm};
+
+/// 이전 기록을 지우고 구간 추적 시작
+#[pyfunction]
+pub fn start_trace() {
+    trace::start();
+}
+
+/// 구간 추적 중지, 모은 구간 수 반환
+#[pyfunction]
+pub fn stop_trace() -> usize {
+    trace::stop()
+}
+
+#[pyfunction]
+pub fn trace_enabled() -> bool {
+    trace::is_enabled()
+}
+
+/// 모은 구간 저장
+///
+/// format: "chrome" (trace-event JSON) 또는 "folded" (flamegraph 입력), 생략하면 확장자로 판단 (.folded/.txt → folded)
+#[pyfunction]
+#[pyo3(signature = (path, format=None))]
+pub fn write_trace(path: &str, format: Option<&str>) -> PyResult<usize> {
+    let format = format.unwrap_or(if path.ends_with(".folded") || path.ends_with(".txt") { "folded" } else { "chrome" });
+    let written = match format {
+        "chrome" => trace::write_chrome(path),
+        "folded" => trace::write_folded(path),
+        _ => return Err(pyo3::exceptions::PyValueError::new_err(format!("지원하지 않는 추적 형식입니다: {}", format))),
+    };
+    written.map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(format!("추적 파일 저장 실패: {} ({})", path, e)))
+}
+
+/// 파이썬 드라이버 구간 (with 문으로 사용, 안쪽의 rust_core 구간이 이 구간 아래에 중첩됨)
+#[pyclass]
+pub struct TraceSpan {
+    name: String,
+    context: Option<(i64, i64)>,
+    span: Option<Span>,
+    guard: Option<ContextGuard>,
+}
+
+#[pymethods]
+impl TraceSpan {
+    #[new]
+    #[pyo3(signature = (name, date=None, interval=None))]
+    fn new(name: String, date: Option<&str>, interval: Option<&str>) -> PyResult<Self> {
+        let context = match (date, interval) {
+            (None, None) => None,
+            (date, interval) => Some((
+                date.map(parse_date_num).transpose()?.unwrap_or(0),
+                interval.map(parse_hhmm).transpose()?.unwrap_or(0),
+            )),
+        };
+        Ok(Self { name, context, span: None, guard: None })
+    }
+
+    fn __enter__(mut slf: PyRefMut<'_, Self>) -> PyRefMut<'_, Self> {
+        if trace::is_enabled() {
+            slf.guard = slf.context.map(|(date_num, hhmm)| trace::context(date_num, hhmm));
+            slf.span = Some(trace::span_named(Cow::Owned(format!("py.{}", slf.name))));
+        }
+        slf
+    }
+
+    #[pyo3(signature = (_exc_type=None, _exc_value=None, _traceback=None))]
+    fn __exit__(
+        &mut self,
+        _exc_type: Option<&Bound<'_, PyAny>>,
+        _exc_value: Option<&Bound<'_, PyAny>>,
+        _traceback: Option<&Bound<'_, PyAny>>
+    ) -> bool {
+        // 구간을 먼저 끝내야 태그가 남아 있는 상태로 기록됨
+        self.span.take();
+        self.guard.take();
+        false
+    }
+}